@@ -20,7 +20,7 @@ from apps.chatbots.serializers import (
     ChatbotTestSerializer, ChatbotCloneSerializer,
     ChatbotExportSerializer, ChatbotImportSerializer
 )
-from apps.core.tasks import train_chatbot_task
+from apps.core.tasks import task_manager
 # from apps.core.rate_limiting import rate_limiter, RateLimitType  # TODO: Fix rate limiting import
 
 logger = structlog.get_logger()
@@ -85,6 +85,17 @@ class ChatbotViewSet(viewsets.ModelViewSet):
             user_id=str(self.request.user.id)
         )
     
+    def perform_destroy(self, instance):
+        """Delete chatbot and queue deletion of its vectors."""
+        super().perform_destroy(instance)
+        deletion_task_id = task_manager.submit_vector_deletion(instance.id)
+        
+        logger.info(
+            "Chatbot deleted",
+            chatbot_id=str(instance.id),
+            vector_deletion_task_id=deletion_task_id
+        )
+    
     @action(detail=True, methods=['post'])
     def train(self, request, pk=None):
         """
@@ -105,33 +116,31 @@ class ChatbotViewSet(viewsets.ModelViewSet):
         # Trigger training task with proper eager mode handling
         from django.conf import settings
         
+        # Identical retrain requests collapse onto the run already in flight
+        task_id, submitted = task_manager.submit_chatbot_training(
+            chatbot,
+            force_retrain=serializer.validated_data.get('force_retrain', False),
+            knowledge_source_ids=serializer.validated_data.get('knowledge_source_ids')
+        )
+        
         if getattr(settings, 'CELERY_TASK_ALWAYS_EAGER', False):
-            # In eager mode: task executes synchronously, don't override status
-            task_result = train_chatbot_task.delay(
-                chatbot_id=str(chatbot.id),
-                force_retrain=serializer.validated_data.get('force_retrain', False),
-                knowledge_source_ids=serializer.validated_data.get('knowledge_source_ids')
-            )
-            # Task already completed, get updated status from DB
+            # In eager mode: task executed synchronously, get updated status from DB
             chatbot.refresh_from_db()
         else:
             # In async mode: task runs in background, set processing status
-            train_chatbot_task.delay(
-                chatbot_id=str(chatbot.id),
-                force_retrain=serializer.validated_data.get('force_retrain', False),
-                knowledge_source_ids=serializer.validated_data.get('knowledge_source_ids')
-            )
-            # Update status for async execution
             chatbot.update_training_status('processing')
         
         logger.info(
             "Chatbot training initiated",
             chatbot_id=str(chatbot.id),
-            user_id=str(request.user.id)
+            user_id=str(request.user.id),
+            task_id=task_id,
+            deduplicated=not submitted
         )
         
         return Response({
             'message': 'Training initiated' if not getattr(settings, 'CELERY_TASK_ALWAYS_EAGER', False) else 'Training completed',
+            'task_id': task_id,
             'status': chatbot.status,
             'estimated_time': '2-5 minutes' if not getattr(settings, 'CELERY_TASK_ALWAYS_EAGER', False) else 'Completed instantly'
         })
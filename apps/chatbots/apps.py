@@ -3,4 +3,8 @@ from django.apps import AppConfig
 
 class ChatbotsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
-    name = "apps.chatbots"
\ No newline at end of file
+    name = "apps.chatbots"
+
+    def ready(self):
+        # Connects the config and answer cache invalidation signals
+        from apps.core import answer_cache, chatbot_cache  # noqa: F401
@@ -9,7 +9,7 @@ from rest_framework.response import Response
 from rest_framework.exceptions import ValidationError, NotFound
 from rest_framework.permissions import AllowAny
 from django.shortcuts import get_object_or_404
-from django.db.models import Q, Count, Avg
+from django.db.models import F, Q, Count, Avg
 from django.utils import timezone
 from django.views.decorators.csrf import csrf_exempt
 from django.core.cache import cache
@@ -26,6 +26,7 @@ from apps.conversations.serializers import (
     ConversationFeedbackSerializer, MessageFeedbackSerializer,
     ConversationExportSerializer
 )
+from apps.core.chatbot_cache import chatbot_config_cache
 from apps.core.services import ServiceRegistry
 from apps.core.rate_limiting import rate_limiter, RateLimitType
 
@@ -500,11 +501,13 @@ def public_chat_message(request, slug):
     Public endpoint for chat widget.
     Handles messages from embedded chatbot.
     """
-    # Get chatbot by slug
+    # Get chatbot by slug from the config cache
     try:
-        chatbot = Chatbot.objects.get(public_url_slug=slug, status='completed')
+        chatbot = chatbot_config_cache.get_by_slug(slug)
     except Chatbot.DoesNotExist:
         raise NotFound('Chatbot not found or not ready')
+    if chatbot.status != 'completed':
+        raise NotFound('Chatbot not found or not ready')
     
     # Check rate limiting
     ip_address = request.META.get('REMOTE_ADDR')
@@ -528,7 +531,7 @@ def public_chat_message(request, slug):
     if session_id:
         conversation = Conversation.objects.filter(
             session_id=session_id,
-            chatbot=chatbot
+            chatbot_id=chatbot.id
         ).first()
     else:
         conversation = None
@@ -537,7 +540,7 @@ def public_chat_message(request, slug):
         # Create new conversation
         session_id = uuid.uuid4()
         conversation = Conversation.objects.create(
-            chatbot=chatbot,
+            chatbot_id=chatbot.id,
             session_id=session_id,
             user_identifier=ip_address,
             ip_address=ip_address,
@@ -545,11 +548,11 @@ def public_chat_message(request, slug):
             language=serializer.validated_data.get('language', 'en')
         )
         
-        # Increment chatbot conversation count
-        chatbot.increment_conversation_count()
+        # Increment chatbot conversation count without loading the chatbot
+        Chatbot.objects.filter(id=chatbot.id).update(total_conversations=F('total_conversations') + 1)
     
     # Check conversation-level rate limits
-    if conversation.message_count >= chatbot.settings.rate_limit_messages_per_hour:
+    if conversation.message_count >= chatbot.rate_limit_messages_per_hour:
         return Response(
             {'error': 'Message limit reached for this conversation'},
             status=status.HTTP_429_TOO_MANY_REQUESTS
@@ -564,22 +567,13 @@ def public_chat_message(request, slug):
     
     # Generate response using RAG Pipeline
     from apps.core.rag.pipeline import get_rag_pipeline
-    from apps.core.rag.llm_service import ChatbotConfig
     
     try:
         # Get RAG pipeline for this chatbot
         rag_pipeline = get_rag_pipeline(str(chatbot.id))
         
         # Create chatbot configuration
-        chatbot_config = ChatbotConfig(
-            name=chatbot.name,
-            description=chatbot.description or "AI Assistant",
-            company_name=getattr(chatbot.user, 'organization', {}).get('name', 'our company'),
-            temperature=getattr(chatbot.settings, 'temperature', 0.7),
-            max_response_tokens=getattr(chatbot.settings, 'max_response_tokens', 500),
-            strict_citation_mode=True,
-            allow_private_reasoning=True
-        )
+        chatbot_config = chatbot.chatbot_config()
         
         # Process query through RAG pipeline
         # Convert async call to sync for DRF compatibility
@@ -636,7 +630,7 @@ def public_chat_message(request, slug):
                 
                 # Look for chunks that match our chatbot and are citable
                 citable_chunks = KnowledgeChunk.objects.filter(
-                    source__chatbot=chatbot,
+                    source__chatbot_id=chatbot.id,
                     is_citable=True
                 ).order_by('-created_at')[:5]  # Get recent citable chunks as fallback
                 
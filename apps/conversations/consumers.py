@@ -8,6 +8,7 @@ import uuid
 import asyncio
 import structlog
 from channels.generic.websocket import AsyncWebsocketConsumer
+from asgiref.sync import sync_to_async
 from channels.db import database_sync_to_async
 from django.contrib.auth.models import AnonymousUser
 from django.core.exceptions import ObjectDoesNotExist
@@ -15,6 +16,7 @@ from django.core.exceptions import ObjectDoesNotExist
 from apps.chatbots.models import Chatbot
 from apps.conversations.models import Conversation, Message
 from apps.core.rate_limiting import rate_limiter, RateLimitType
+from apps.core.task_progress import get_task_owner, get_task_progress, progress_group_name
 
 logger = structlog.get_logger()
 
@@ -28,6 +30,7 @@ class BaseChatConsumer(AsyncWebsocketConsumer):
         self.conversation = None
         self.room_group_name = None
         self.user_identifier = None
+        self.task_progress_groups = set()
     
     async def connect(self):
         """Handle WebSocket connection."""
@@ -72,6 +75,8 @@ class BaseChatConsumer(AsyncWebsocketConsumer):
                 self.room_group_name,
                 self.channel_name
             )
+        for group_name in self.task_progress_groups:
+            await self.channel_layer.group_discard(group_name, self.channel_name)
         
         logger.info(
             "WebSocket connection closed",
@@ -90,6 +95,8 @@ class BaseChatConsumer(AsyncWebsocketConsumer):
                 await self.handle_chat_message(data)
             elif message_type == 'typing_indicator':
                 await self.handle_typing_indicator(data)
+            elif message_type == 'subscribe_task_progress':
+                await self.handle_task_progress_subscription(data)
             elif message_type == 'ping':
                 await self.send(text_data=json.dumps({'type': 'pong'}))
             else:
@@ -177,6 +184,19 @@ class BaseChatConsumer(AsyncWebsocketConsumer):
                 'is_typing': event['is_typing']
             }))
     
+    async def task_progress_update(self, event):
+        """Send pushed task progress to WebSocket."""
+        await self.send(text_data=json.dumps({
+            'type': 'task_progress',
+            'task_id': event['task_id'],
+            'progress': event['progress'],
+            'final': event['final']
+        }))
+    
+    async def handle_task_progress_subscription(self, data):
+        """Subscribe to task progress pushes. Override in subclasses."""
+        await self.send_error("Task progress is not available on this connection")
+    
     async def send_error(self, error_message):
         """Send error message to client."""
         await self.send(text_data=json.dumps({
@@ -240,6 +260,33 @@ class PrivateChatConsumer(BaseChatConsumer):
         )
         return conversation
     
+    async def handle_task_progress_subscription(self, data):
+        """Push a task's progress over this connection instead of polling."""
+        try:
+            task_id = str(uuid.UUID(str(data.get('task_id'))))
+        except ValueError:
+            await self.send_error("Invalid task_id")
+            return
+        
+        # Unknown and other users' tasks get the same answer
+        if await sync_to_async(get_task_owner)(task_id) != self.user_identifier:
+            await self.send_error("Task not found")
+            return
+        
+        group_name = progress_group_name(task_id)
+        if group_name not in self.task_progress_groups:
+            await self.channel_layer.group_add(group_name, self.channel_name)
+            self.task_progress_groups.add(group_name)
+        
+        # Current state first, so updates written before subscribing aren't missed
+        progress = await sync_to_async(get_task_progress)(task_id)
+        await self.send(text_data=json.dumps({
+            'type': 'task_progress',
+            'task_id': task_id,
+            'progress': progress,
+            'final': False
+        }))
+    
     async def check_rate_limits(self):
         """Check rate limits for authenticated users."""
         # Authenticated users get higher rate limits
@@ -0,0 +1,250 @@
+"""
+Semantic answer cache for near-duplicate questions.
+
+Support chatbots get the same question phrased many ways. Once the query
+embedding is known, ``SemanticAnswerCache`` compares it with the queries
+already answered for that chatbot; if one is within
+``ANSWER_CACHE_MAX_DISTANCE`` cosine distance, its privacy-validated answer
+and citations are reused and vector search, LLM generation and privacy
+filtering are skipped.
+
+Answers are kept per process, per chatbot and per LLM configuration (the
+widget and the public chat page use different settings). Each chatbot has a
+generation token in the shared Django cache; retraining, source changes and
+index cutovers replace it, which drops the answers in every process on
+their next lookup.
+"""
+
+import hashlib
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+import structlog
+from django.core.cache import cache
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from chatbot_saas.config import get_settings
+
+logger = structlog.get_logger()
+settings = get_settings()
+
+GENERATION_KEY_PREFIX = "answer_cache:generation"
+MAX_ANSWER_SETS = 256  # Chatbot and configuration pairs kept per process
+
+# Chatbot saves touching only these fields don't change answers
+COUNTER_FIELDS = frozenset({'total_conversations', 'total_messages', 'updated_at'})
+
+
+@dataclass(frozen=True)
+class CachedAnswer:
+    """A privacy-validated answer and what it cost to generate."""
+    query: str
+    content: str
+    citations: Tuple[str, ...]
+    citable_sources: Tuple[Any, ...]  # ContextSource objects saved with the message
+    sources_used: int
+    citable_count: int
+    private_count: int
+    context_score: float
+    response_quality_score: float
+    input_tokens: int
+    output_tokens: int
+    estimated_cost: float
+
+
+@dataclass
+class _AnswerSet:
+    """Answers for one chatbot and configuration, with a matrix of their query embeddings."""
+    generation: str
+    answers: List[CachedAnswer] = field(default_factory=list)
+    expires_at: List[float] = field(default_factory=list)
+    embeddings: Optional[np.ndarray] = None  # Unit rows, one per answer
+
+
+def config_scope(chatbot_config=None) -> str:
+    """Cache scope for an LLM configuration; callers without one share the default."""
+    if chatbot_config is None:
+        return "default"
+    return hashlib.sha256(repr(sorted(asdict(chatbot_config).items())).encode()).hexdigest()[:16]
+
+
+class SemanticAnswerCache:
+    """Per-process cache of answers keyed by query embedding similarity."""
+
+    def __init__(
+        self,
+        max_distance: Optional[float] = None,
+        max_answers: Optional[int] = None,
+        ttl: Optional[int] = None
+    ):
+        """
+        Initialize cache.
+
+        Args:
+            max_distance: Cosine distance under which two queries count as the same question
+            max_answers: Answers kept per chatbot and configuration
+            ttl: Seconds an answer is reused
+        """
+        self.enabled = settings.ANSWER_CACHE_ENABLED
+        self.max_distance = settings.ANSWER_CACHE_MAX_DISTANCE if max_distance is None else max_distance
+        self.max_answers = max_answers or settings.ANSWER_CACHE_SIZE
+        self.ttl = ttl or settings.ANSWER_CACHE_TTL
+        self._sets: 'OrderedDict[Tuple[str, str], _AnswerSet]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {
+            "hits": 0,
+            "misses": 0,
+            "stores": 0,
+            "invalidations": 0,
+            "saved_cost_usd": 0.0,
+            "saved_tokens": 0,
+        }
+
+    @staticmethod
+    def _generation_key(chatbot_id: str) -> str:
+        return f"{GENERATION_KEY_PREFIX}:{chatbot_id}"
+
+    def _generation(self, chatbot_id: str) -> Optional[str]:
+        key = self._generation_key(chatbot_id)
+        try:
+            generation = cache.get(key)
+            if generation is None:
+                cache.add(key, uuid.uuid4().hex, None)
+                generation = cache.get(key)
+        except Exception as e:
+            logger.warning("Answer cache generation unavailable", chatbot_id=chatbot_id, error=str(e))
+            return None
+        return generation
+
+    def lookup(self, chatbot_id, query_embedding: List[float], scope: str = "default") -> Optional[CachedAnswer]:
+        """Cached answer for a query within ``max_distance`` of ``query_embedding``, if any."""
+        if not self.enabled:
+            return None
+        chatbot_id = str(chatbot_id)
+        generation = self._generation(chatbot_id)
+        query = _unit(query_embedding)
+
+        with self._lock:
+            answer_set = self._current_set(chatbot_id, scope, generation)
+            answer = None
+            if answer_set is not None and answer_set.embeddings is not None \
+                    and answer_set.embeddings.shape[1] == query.shape[0]:
+                similarities = answer_set.embeddings @ query
+                best = int(np.argmax(similarities))
+                if 1.0 - float(similarities[best]) <= self.max_distance \
+                        and answer_set.expires_at[best] > time.monotonic():
+                    answer = answer_set.answers[best]
+
+            if answer is None:
+                self.stats["misses"] += 1
+                return None
+            self.stats["hits"] += 1
+            self.stats["saved_cost_usd"] += answer.estimated_cost
+            self.stats["saved_tokens"] += answer.input_tokens + answer.output_tokens
+            return answer
+
+    def store(self, chatbot_id, query_embedding: List[float], answer: CachedAnswer, scope: str = "default") -> None:
+        """Remember an answer for later near-duplicate queries."""
+        if not self.enabled:
+            return
+        chatbot_id = str(chatbot_id)
+        generation = self._generation(chatbot_id)
+        if generation is None:
+            # Without the shared token other processes couldn't invalidate it
+            return
+        query = _unit(query_embedding)
+        now = time.monotonic()
+
+        with self._lock:
+            answer_set = self._current_set(chatbot_id, scope, generation)
+            if answer_set is None or (
+                answer_set.embeddings is not None and answer_set.embeddings.shape[1] != query.shape[0]
+            ):
+                answer_set = _AnswerSet(generation=generation)
+                self._sets[(chatbot_id, scope)] = answer_set
+                while len(self._sets) > MAX_ANSWER_SETS:
+                    self._sets.popitem(last=False)
+
+            # Drop expired answers, then the oldest ones over the limit
+            keep = [i for i, expires_at in enumerate(answer_set.expires_at) if expires_at > now]
+            keep = keep[-(self.max_answers - 1):] if self.max_answers > 1 else []
+            answers = [answer_set.answers[i] for i in keep] + [answer]
+            rows = [answer_set.embeddings[keep]] if keep else []
+            answer_set.answers = answers
+            answer_set.expires_at = [answer_set.expires_at[i] for i in keep] + [now + self.ttl]
+            answer_set.embeddings = np.vstack(rows + [query[np.newaxis, :]])
+            self.stats["stores"] += 1
+
+    def invalidate(self, chatbot_id) -> None:
+        """Drop a chatbot's answers in this process and, through the generation token, in every other."""
+        chatbot_id = str(chatbot_id)
+        with self._lock:
+            for key in [key for key in self._sets if key[0] == chatbot_id]:
+                del self._sets[key]
+            self.stats["invalidations"] += 1
+        try:
+            cache.set(self._generation_key(chatbot_id), uuid.uuid4().hex, None)
+        except Exception as e:
+            logger.warning("Failed to invalidate answer cache", chatbot_id=chatbot_id, error=str(e))
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self.stats)
+            answers = sum(len(answer_set.answers) for answer_set in self._sets.values())
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+        stats["cached_answers"] = answers
+        return stats
+
+    def clear(self) -> None:
+        with self._lock:
+            self._sets.clear()
+
+    def _current_set(self, chatbot_id: str, scope: str, generation: Optional[str]) -> Optional[_AnswerSet]:
+        key = (chatbot_id, scope)
+        answer_set = self._sets.get(key)
+        if answer_set is None:
+            return None
+        if generation is None or answer_set.generation != generation:
+            del self._sets[key]
+            return None
+        self._sets.move_to_end(key)
+        return answer_set
+
+
+def _unit(embedding: List[float]) -> np.ndarray:
+    vector = np.asarray(embedding, dtype=np.float32)
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+semantic_answer_cache = SemanticAnswerCache()
+
+
+@receiver(post_save, sender='chatbots.Chatbot')
+def invalidate_on_chatbot_change(sender, instance, update_fields=None, **kwargs):
+    """Retraining and configuration changes make cached answers stale."""
+    if update_fields and set(update_fields) <= COUNTER_FIELDS:
+        return
+    semantic_answer_cache.invalidate(instance.id)
+
+
+@receiver(post_save, sender='knowledge.KnowledgeSource')
+@receiver(post_delete, sender='knowledge.KnowledgeSource')
+def invalidate_on_source_change(sender, instance, **kwargs):
+    """Added, reprocessed and deleted sources change what answers should say."""
+    semantic_answer_cache.invalidate(instance.chatbot_id)
+
+
+@receiver(post_save, sender='knowledge.VectorIndexVersion')
+def invalidate_on_index_change(sender, instance, update_fields=None, **kwargs):
+    """Query embeddings from another model can't be compared with cached ones."""
+    # Only cutovers and rollbacks; shadow builds save progress on every batch
+    if instance.status != sender.STATUS_ACTIVE or (update_fields and 'status' not in update_fields):
+        return
+    semantic_answer_cache.invalidate(instance.chatbot_id)
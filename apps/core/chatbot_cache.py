@@ -0,0 +1,285 @@
+"""
+Runtime configuration cache for chatbots.
+
+Every chat turn needs the same handful of chatbot fields (name, status,
+temperature, rate limits, ...) to build the LLM configuration. Loading the
+``Chatbot``, its owner and its ``ChatbotSettings`` on each turn is three
+queries on the hot path for data that changes a few times a day.
+
+``ChatbotConfigCache`` keeps immutable ``ChatbotSnapshot`` objects in two
+levels: a per-process LRU, then the shared Django cache (Redis in
+production). Snapshots are keyed by chatbot id; a slug key points at the id
+so public endpoints resolve slugs without a query. Saves of ``Chatbot`` and
+``ChatbotSettings`` invalidate both levels through model signals. Local
+entries also expire after ``CHATBOT_CONFIG_LOCAL_TTL`` seconds, which bounds
+how long another process can serve a snapshot invalidated elsewhere.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, Optional, Tuple
+import structlog
+from django.apps import apps as django_apps
+from django.core.cache import cache
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from chatbot_saas.config import get_settings
+
+logger = structlog.get_logger()
+settings = get_settings()
+
+CACHE_KEY_PREFIX = "chatbot_config"
+
+# Saves touching only these fields don't change runtime configuration
+COUNTER_FIELDS = frozenset({'total_conversations', 'total_messages', 'updated_at'})
+
+
+@dataclass(frozen=True)
+class ChatbotSnapshot:
+    """Read-only view of the chatbot fields used while serving chats."""
+    id: str
+    user_id: str
+    name: str
+    description: str
+    public_url_slug: str
+    status: str
+    temperature: float
+    max_tokens: int
+    model_name: str
+    welcome_message: str
+    theme_color: str
+    enable_citations: bool
+    crm_enabled: bool
+    company_name: str
+    # ChatbotSettings
+    system_prompt: str = ""
+    response_guidelines: str = ""
+    rate_limit_messages_per_hour: int = 60
+    rate_limit_messages_per_day: int = 500
+    show_powered_by: bool = True
+
+    @classmethod
+    def from_model(cls, chatbot) -> 'ChatbotSnapshot':
+        """Build a snapshot from a chatbot loaded with its user and settings."""
+        try:
+            chatbot_settings = chatbot.settings
+        except django_apps.get_model('chatbots', 'ChatbotSettings').DoesNotExist:
+            chatbot_settings = None
+
+        settings_fields = {}
+        if chatbot_settings is not None:
+            settings_fields = {
+                'system_prompt': chatbot_settings.system_prompt,
+                'response_guidelines': chatbot_settings.response_guidelines,
+                'rate_limit_messages_per_hour': chatbot_settings.rate_limit_messages_per_hour,
+                'rate_limit_messages_per_day': chatbot_settings.rate_limit_messages_per_day,
+                'show_powered_by': chatbot_settings.show_powered_by,
+            }
+
+        return cls(
+            id=str(chatbot.id),
+            user_id=str(chatbot.user_id),
+            name=chatbot.name,
+            description=chatbot.description,
+            public_url_slug=chatbot.public_url_slug,
+            status=chatbot.status,
+            temperature=chatbot.temperature,
+            max_tokens=chatbot.max_tokens,
+            model_name=chatbot.model_name,
+            welcome_message=chatbot.welcome_message,
+            theme_color=chatbot.theme_color,
+            enable_citations=chatbot.enable_citations,
+            crm_enabled=chatbot.crm_enabled,
+            company_name=getattr(chatbot.user, 'organization', {}).get('name', 'our company'),
+            **settings_fields
+        )
+
+    def chatbot_config(self, **overrides):
+        """LLM ``ChatbotConfig`` for this chatbot; keyword arguments override defaults."""
+        from apps.core.rag.llm_service import ChatbotConfig
+
+        config = {
+            'name': self.name,
+            'description': self.description or "AI Assistant",
+            'company_name': self.company_name,
+            'temperature': 0.7,
+            'max_response_tokens': 500,
+            'strict_citation_mode': True,
+            'allow_private_reasoning': True,
+        }
+        config.update(overrides)
+        return ChatbotConfig(**config)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+class ChatbotConfigCache:
+    """Two-level cache of ``ChatbotSnapshot`` by chatbot id and public slug."""
+
+    def __init__(
+        self,
+        max_entries: Optional[int] = None,
+        local_ttl: Optional[float] = None,
+        shared_ttl: Optional[int] = None
+    ):
+        """
+        Initialize cache.
+
+        Args:
+            max_entries: Snapshots kept in process memory
+            local_ttl: Seconds a snapshot is served from process memory
+            shared_ttl: Seconds a snapshot is kept in the shared cache
+        """
+        self.max_entries = max_entries or settings.CHATBOT_CONFIG_CACHE_SIZE
+        self.local_ttl = settings.CHATBOT_CONFIG_LOCAL_TTL if local_ttl is None else local_ttl
+        self.shared_ttl = shared_ttl or settings.CHATBOT_CONFIG_CACHE_TTL
+        self._entries: 'OrderedDict[str, Tuple[float, ChatbotSnapshot]]' = OrderedDict()
+        self._slugs: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        self.stats = {"local_hits": 0, "shared_hits": 0, "misses": 0, "invalidations": 0}
+
+    @staticmethod
+    def _id_key(chatbot_id: str) -> str:
+        return f"{CACHE_KEY_PREFIX}:id:{chatbot_id}"
+
+    @staticmethod
+    def _slug_key(slug: str) -> str:
+        return f"{CACHE_KEY_PREFIX}:slug:{slug}"
+
+    def get_by_id(self, chatbot_id) -> ChatbotSnapshot:
+        """
+        Snapshot for a chatbot id.
+
+        Raises:
+            Chatbot.DoesNotExist: If the chatbot doesn't exist or was deleted
+        """
+        chatbot_id = str(chatbot_id)
+        snapshot = self._get_local(chatbot_id)
+        if snapshot is not None:
+            return snapshot
+
+        snapshot = self._get_shared(chatbot_id)
+        if snapshot is None:
+            snapshot = self._load(id=chatbot_id)
+        return snapshot
+
+    def get_by_slug(self, slug: str) -> ChatbotSnapshot:
+        """
+        Snapshot for a public URL slug.
+
+        Raises:
+            Chatbot.DoesNotExist: If no chatbot uses the slug
+        """
+        with self._lock:
+            chatbot_id = self._slugs.get(slug)
+        snapshot = self._get_local(chatbot_id) if chatbot_id else None
+        if snapshot is not None and snapshot.public_url_slug == slug:
+            return snapshot
+
+        chatbot_id = cache.get(self._slug_key(slug))
+        snapshot = self._get_shared(chatbot_id) if chatbot_id else None
+        # The pointer can outlive a slug change; trust it only if it still matches
+        if snapshot is not None and snapshot.public_url_slug == slug:
+            return snapshot
+
+        return self._load(public_url_slug=slug)
+
+    def invalidate(self, chatbot_id, slugs=()) -> None:
+        """Drop a chatbot from both levels, along with any of its slugs."""
+        chatbot_id = str(chatbot_id)
+        with self._lock:
+            entry = self._entries.pop(chatbot_id, None)
+            stale_slugs = {slug for slug, owner in self._slugs.items() if owner == chatbot_id}
+            for slug in stale_slugs:
+                del self._slugs[slug]
+            self.stats["invalidations"] += 1
+
+        stale_slugs.update(slug for slug in slugs if slug)
+        if entry is not None:
+            stale_slugs.add(entry[1].public_url_slug)
+        try:
+            cache.delete_many([self._id_key(chatbot_id)] + [self._slug_key(slug) for slug in stale_slugs])
+        except Exception as e:
+            logger.warning("Failed to invalidate shared chatbot config", chatbot_id=chatbot_id, error=str(e))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._slugs.clear()
+
+    def _get_local(self, chatbot_id: str) -> Optional[ChatbotSnapshot]:
+        with self._lock:
+            entry = self._entries.get(chatbot_id)
+            if entry is None:
+                return None
+            expires_at, snapshot = entry
+            if expires_at < time.monotonic():
+                del self._entries[chatbot_id]
+                return None
+            self._entries.move_to_end(chatbot_id)
+            self.stats["local_hits"] += 1
+            return snapshot
+
+    def _get_shared(self, chatbot_id: str) -> Optional[ChatbotSnapshot]:
+        try:
+            snapshot = cache.get(self._id_key(chatbot_id))
+        except Exception as e:
+            logger.warning("Shared chatbot config cache unavailable", chatbot_id=chatbot_id, error=str(e))
+            return None
+        if not isinstance(snapshot, ChatbotSnapshot):
+            return None
+        with self._lock:
+            self.stats["shared_hits"] += 1
+        self._store_local(snapshot)
+        return snapshot
+
+    def _load(self, **lookup) -> ChatbotSnapshot:
+        Chatbot = django_apps.get_model('chatbots', 'Chatbot')
+        chatbot = Chatbot.objects.select_related('user', 'settings').get(**lookup)
+        snapshot = ChatbotSnapshot.from_model(chatbot)
+        with self._lock:
+            self.stats["misses"] += 1
+
+        try:
+            cache.set_many({
+                self._id_key(snapshot.id): snapshot,
+                self._slug_key(snapshot.public_url_slug): snapshot.id,
+            }, self.shared_ttl)
+        except Exception as e:
+            logger.warning("Failed to store shared chatbot config", chatbot_id=snapshot.id, error=str(e))
+        self._store_local(snapshot)
+        return snapshot
+
+    def _store_local(self, snapshot: ChatbotSnapshot) -> None:
+        with self._lock:
+            self._entries[snapshot.id] = (time.monotonic() + self.local_ttl, snapshot)
+            self._entries.move_to_end(snapshot.id)
+            self._slugs[snapshot.public_url_slug] = snapshot.id
+            while len(self._entries) > self.max_entries:
+                evicted_id, (_, evicted) = self._entries.popitem(last=False)
+                if self._slugs.get(evicted.public_url_slug) == evicted_id:
+                    del self._slugs[evicted.public_url_slug]
+
+
+chatbot_config_cache = ChatbotConfigCache()
+
+
+@receiver(post_save, sender='chatbots.Chatbot')
+@receiver(post_delete, sender='chatbots.Chatbot')
+def invalidate_chatbot(sender, instance, update_fields=None, **kwargs):
+    """Drop cached config when a chatbot changes."""
+    if update_fields and set(update_fields) <= COUNTER_FIELDS:
+        return
+    # A slug change leaves the old slug pointing at this chatbot until dropped
+    chatbot_config_cache.invalidate(instance.id, slugs=[instance.public_url_slug])
+
+
+@receiver(post_save, sender='chatbots.ChatbotSettings')
+@receiver(post_delete, sender='chatbots.ChatbotSettings')
+def invalidate_chatbot_settings(sender, instance, **kwargs):
+    """Drop cached config when a chatbot's settings change."""
+    chatbot_config_cache.invalidate(instance.chatbot_id)
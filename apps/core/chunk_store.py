@@ -0,0 +1,129 @@
+"""
+Chunk content lookup for vector search results.
+
+Knowledge chunk vectors carry only ids and filter fields (source, privacy
+flag, position); the text itself is stored once, in ``KnowledgeChunk``.
+Keeping it out of vector metadata means it isn't duplicated in JSONB or
+Pinecone, shipped back with every match, or cached in every search
+result. ``hydrate_results`` fills the content in after top-k selection,
+from a per-process LRU with misses fetched in one ``in_bulk`` query. The
+token count computed at ingest comes along, so context building can budget
+without re-tokenizing.
+
+A chunk's content never changes under the same id (reprocessing creates
+new chunks), so cached entries don't need invalidation.
+"""
+
+import threading
+import uuid
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
+import structlog
+from asgiref.sync import sync_to_async
+from django.apps import apps as django_apps
+
+from chatbot_saas.config import get_settings
+
+logger = structlog.get_logger()
+settings = get_settings()
+
+
+class ChunkContentStore:
+    """LRU of chunk content and token counts by chunk id, backed by ``KnowledgeChunk``."""
+
+    def __init__(self, max_entries: Optional[int] = None):
+        """
+        Initialize store.
+
+        Args:
+            max_entries: Chunks kept in memory
+        """
+        self.max_entries = max_entries or settings.CHUNK_CONTENT_CACHE_SIZE
+        self._entries: 'OrderedDict[str, Tuple[str, int]]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "queries": 0}
+
+    def get_many(self, chunk_ids: Iterable[str]) -> Dict[str, str]:
+        """Content for the given chunk ids; unknown ids are left out."""
+        return {chunk_id: content for chunk_id, (content, _) in self.get_chunks(chunk_ids).items()}
+
+    def get_chunks(self, chunk_ids: Iterable[str]) -> Dict[str, Tuple[str, int]]:
+        """Content and token count for the given chunk ids; unknown ids are left out."""
+        found = {}
+        missing = []
+        with self._lock:
+            for chunk_id in chunk_ids:
+                entry = self._entries.get(chunk_id)
+                if entry is None:
+                    missing.append(chunk_id)
+                else:
+                    self._entries.move_to_end(chunk_id)
+                    found[chunk_id] = entry
+            self.stats["hits"] += len(found)
+            self.stats["misses"] += len(missing)
+
+        missing = [chunk_id for chunk_id in missing if _is_uuid(chunk_id)]
+        if not missing:
+            return found
+
+        KnowledgeChunk = django_apps.get_model('knowledge', 'KnowledgeChunk')
+        fetched = {
+            str(chunk_id): (chunk.content, chunk.token_count)
+            for chunk_id, chunk in KnowledgeChunk.objects.only('id', 'content', 'token_count').in_bulk(missing).items()
+        }
+        with self._lock:
+            self.stats["queries"] += 1
+            for chunk_id, entry in fetched.items():
+                self._entries[chunk_id] = entry
+                self._entries.move_to_end(chunk_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+        found.update(fetched)
+        return found
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+def _is_uuid(value: str) -> bool:
+    try:
+        uuid.UUID(value)
+        return True
+    except (TypeError, ValueError):
+        return False
+
+
+chunk_content_store = ChunkContentStore()
+
+
+def hydrate_results(results: List) -> List:
+    """
+    Fill in ``content`` of search results whose vectors don't carry it.
+
+    Results from vectors stored with inline content (older vectors, and
+    document pipelines without ``KnowledgeChunk`` rows) are left as they are.
+    """
+    pending = [result for result in results if not result.content]
+    if not pending:
+        return results
+
+    chunks = chunk_content_store.get_chunks([result.id for result in pending])
+    for result in pending:
+        if result.id not in chunks:
+            logger.warning("No content found for vector search result", vector_id=result.id)
+            continue
+        content, token_count = chunks[result.id]
+        result.content = content
+        result.metadata = {**(result.metadata or {}), 'content': content}
+        if token_count:
+            result.metadata['token_count'] = token_count
+    return results
+
+
+async def ahydrate_results(results: List) -> List:
+    """Async variant of ``hydrate_results``."""
+    if all(result.content for result in results):
+        return results
+    return await sync_to_async(hydrate_results)(results)
@@ -51,6 +51,25 @@ class ChunkingConfig:
     # Privacy enforcement
     preserve_privacy_boundaries: bool = True
     merge_short_chunks: bool = True
+    
+    # Retrieval embedding model; when it matches the semantic chunker's
+    # sentence model, chunks carry pooled sentence embeddings
+    retrieval_embedding_model: Optional[str] = None
+
+
+def pool_embeddings(vectors: np.ndarray, weights: List[float]) -> List[float]:
+    """
+    Weighted mean of unit vectors, re-normalized to unit length.
+    
+    Approximates the embedding of the concatenated text for models that
+    produce normalized, mean-pooled embeddings (e.g. MiniLM).
+    """
+    vectors = np.asarray(vectors, dtype=np.float32)
+    pooled = np.average(vectors, axis=0, weights=np.asarray(weights, dtype=np.float32))
+    norm = np.linalg.norm(pooled)
+    if norm > 0:
+        pooled = pooled / norm
+    return pooled.tolist()
 
 
 class Chunker(ABC):
@@ -281,16 +300,19 @@ class SlidingWindowChunker(Chunker):
 class SemanticChunker(Chunker):
     """Semantic chunking based on sentence similarity."""
     
+    model_name = 'all-MiniLM-L6-v2'
+    
     def __init__(self, config: ChunkingConfig):
         super().__init__(config)
         self.sentence_model = None
+        self.emit_embeddings = config.retrieval_embedding_model == self.model_name
         self._load_sentence_model()
     
     def _load_sentence_model(self):
         """Load sentence transformer model for semantic similarity."""
         try:
             # Use a lightweight model for embeddings
-            self.sentence_model = SentenceTransformer('all-MiniLM-L6-v2')
+            self.sentence_model = SentenceTransformer(self.model_name)
         except Exception as e:
             logger.warning(f"Failed to load sentence transformer: {e}")
             self.sentence_model = None
@@ -392,6 +414,7 @@ class SemanticChunker(Chunker):
                 )
                 
                 if self._validate_chunk_size(chunk):
+                    self._attach_embedding(chunk, sentences, embeddings, current_start_idx, i)
                     chunks.append(chunk)
                     chunk_index += 1
                 
@@ -423,10 +446,26 @@ class SemanticChunker(Chunker):
             )
             
             if self._validate_chunk_size(chunk):
+                self._attach_embedding(chunk, sentences, embeddings, current_start_idx, len(sentences) - 1)
                 chunks.append(chunk)
         
         return chunks
     
+    def _attach_embedding(
+        self,
+        chunk: DocumentChunk,
+        sentences: List[str],
+        embeddings: np.ndarray,
+        start_idx: int,
+        end_idx: int
+    ) -> None:
+        """Pool the chunk's sentence embeddings so it needn't be embedded again."""
+        if not self.emit_embeddings:
+            return
+        weights = [max(self._count_tokens(s), 1) for s in sentences[start_idx:end_idx + 1]]
+        chunk.embedding = pool_embeddings(embeddings[start_idx:end_idx + 1], weights)
+        chunk.embedding_model = self.model_name
+    
     def _should_break_on_similarity(
         self,
         embeddings: np.ndarray,
@@ -665,6 +704,18 @@ class ChunkingPipeline:
                         "merged_with": chunk.chunk_index
                     })
                     
+                    # Pooled embeddings survive merging only if both halves have one
+                    merged_embedding = None
+                    if (
+                        current_chunk.embedding is not None
+                        and chunk.embedding is not None
+                        and current_chunk.embedding_model == chunk.embedding_model
+                    ):
+                        merged_embedding = pool_embeddings(
+                            [current_chunk.embedding, chunk.embedding],
+                            [current_chunk.token_count, chunk.token_count]
+                        )
+                    
                     current_chunk = DocumentChunk(
                         content=merged_content,
                         chunk_index=current_chunk.chunk_index,
@@ -673,7 +724,9 @@ class ChunkingPipeline:
                         token_count=current_chunk.token_count + chunk.token_count,
                         privacy_level=current_chunk.privacy_level,
                         metadata=merged_metadata,
-                        content_hash=hashlib.sha256(merged_content.encode()).hexdigest()
+                        content_hash=hashlib.sha256(merged_content.encode()).hexdigest(),
+                        embedding=merged_embedding,
+                        embedding_model=current_chunk.embedding_model if merged_embedding else None
                     )
             else:
                 if current_chunk is not None:
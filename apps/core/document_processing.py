@@ -70,6 +70,10 @@ class DocumentChunk:
     privacy_level: PrivacyLevel
     metadata: Dict[str, Any]
     content_hash: str
+    # Pooled vector emitted by the chunker, reusable when embedding_model
+    # matches the retrieval model
+    embedding: Optional[List[float]] = None
+    embedding_model: Optional[str] = None
 
 
 class DocumentProcessor(ABC):
@@ -8,19 +8,32 @@ and model creation to provide a complete document-to-chunks pipeline.
 import os
 import hashlib
 import mimetypes
-from typing import Dict, List, Optional, Tuple, Any
+from typing import Dict, Iterable, List, Optional, Tuple, Any
 from dataclasses import dataclass
 import structlog
+from django.db.models import F, Q, Value
+from django.db.models.functions import SHA256, Concat
 from django.utils import timezone
 from django.conf import settings
 
 from .document_processors import document_processor_factory, ProcessedDocument
-from .text_chunking import ChunkerFactory, ChunkingConfig, ChunkingStrategy, TextChunk
+from .text_chunking import (
+    ChunkerFactory, ChunkingConfig, ChunkingStrategy, TextChunk, iter_text_segments
+)
 from .exceptions import DocumentProcessingError, TextExtractionError, ChunkingError
+from .site_crawler import CrawlConfig, canonicalize_url, iter_site_pages
+from .html_extraction import ExtractionStrategy, HTMLExtractorFactory, response_charset
 from apps.knowledge.models import KnowledgeSource, KnowledgeChunk, ProcessingJob
 from apps.core.models import ProcessingStatus
+from chatbot_saas.config import get_settings
 
 logger = structlog.get_logger()
+app_settings = get_settings()
+
+# Chunks replaced by a recrawl move this far up the chunk_index range, and
+# take a derived content hash, out of the new chunks' way; they keep serving
+# until the new ones are embedded
+SUPERSEDED_CHUNK_OFFSET = 1_000_000_000
 
 
 @dataclass
@@ -28,12 +41,47 @@ class DocumentProcessingResult:
     """Result of complete document processing."""
     source: KnowledgeSource
     processed_document: Optional[ProcessedDocument]
-    chunks: List[KnowledgeChunk]
+    chunk_count: int
     processing_job: Optional[ProcessingJob]
     total_tokens: int
     processing_time_ms: int
     success: bool
     error_message: Optional[str] = None
+    unchanged: bool = False
+    
+    @property
+    def chunks(self):
+        """The source's chunks as a lazy queryset; rows load only when iterated."""
+        return self.source.chunks.all()
+
+
+@dataclass
+class CreatedChunks:
+    """Totals for the KnowledgeChunk rows written for a source."""
+    count: int = 0
+    total_tokens: int = 0
+
+
+def compute_content_hash(text: str) -> str:
+    """
+    Hash extracted text after whitespace normalization.
+    
+    Layout-only differences (re-indented markup, trailing spaces, blank
+    lines) produce the same hash so they don't trigger re-embedding.
+    """
+    normalized = ' '.join(text.split())
+    return hashlib.sha256(normalized.encode('utf-8')).hexdigest()
+
+
+def remove_superseded_chunks(knowledge_source: KnowledgeSource, chunk_ids: Optional[List[str]]) -> None:
+    """Hard-delete chunks replaced by a recrawl, and their vectors."""
+    from .reindexing import delete_vectors_by_id
+    
+    if not chunk_ids:
+        return
+    KnowledgeChunk.all_objects.filter(source=knowledge_source, id__in=chunk_ids).delete()
+    # Shadow builds and rollback targets hold copies of these vectors too
+    delete_vectors_by_id(knowledge_source.chatbot_id, chunk_ids)
 
 
 class DocumentProcessingService:
@@ -44,9 +92,16 @@ class DocumentProcessingService:
     to provide a complete pipeline from file upload to searchable chunks.
     """
     
-    def __init__(self):
-        """Initialize document processing service."""
+    def __init__(self, queue_embeddings: bool = True):
+        """
+        Initialize document processing service.
+        
+        Args:
+            queue_embeddings: Queue the embedding task once chunks are written;
+                callers that embed the chunks themselves pass False
+        """
         self.logger = structlog.get_logger().bind(service="DocumentProcessingService")
+        self.queue_embeddings = queue_embeddings
         
         # Default chunking configuration
         self.default_chunking_config = ChunkingConfig(
@@ -57,6 +112,12 @@ class DocumentProcessingService:
             max_chunk_size=2000,
             preserve_structure=True
         )
+        
+        # HTML extraction for URL sources
+        self.html_extractor = HTMLExtractorFactory.create_extractor(
+            ExtractionStrategy(app_settings.HTML_EXTRACTION_STRATEGY),
+            max_chars=app_settings.HTML_EXTRACTION_MAX_CHARS
+        )
     
     def process_uploaded_file(
         self,
@@ -118,7 +179,7 @@ class DocumentProcessingService:
                 return DocumentProcessingResult(
                     source=knowledge_source,
                     processed_document=None,
-                    chunks=[],
+                    chunk_count=0,
                     processing_job=processing_job,
                     total_tokens=0,
                     processing_time_ms=0,
@@ -126,6 +187,9 @@ class DocumentProcessingService:
                     error_message=error_msg
                 )
             
+            # Retraining replaces the previous chunks and vectors
+            self._remove_existing_chunks(knowledge_source)
+            
             # Update content preview
             preview_text = processed_doc.text_content[:500] if processed_doc.text_content else ""
             knowledge_source.content_preview = preview_text
@@ -160,7 +224,7 @@ class DocumentProcessingService:
                 return DocumentProcessingResult(
                     source=knowledge_source,
                     processed_document=processed_doc,
-                    chunks=[],
+                    chunk_count=0,
                     processing_job=processing_job,
                     total_tokens=0,
                     processing_time_ms=0,
@@ -176,7 +240,7 @@ class DocumentProcessingService:
             )
             
             try:
-                knowledge_chunks = self._create_knowledge_chunks(
+                created = self._create_knowledge_chunks(
                     knowledge_source, text_chunks, processed_doc
                 )
             except Exception as e:
@@ -185,7 +249,7 @@ class DocumentProcessingService:
                 return DocumentProcessingResult(
                     source=knowledge_source,
                     processed_document=processed_doc,
-                    chunks=[],
+                    chunk_count=0,
                     processing_job=processing_job,
                     total_tokens=0,
                     processing_time_ms=0,
@@ -194,59 +258,28 @@ class DocumentProcessingService:
                 )
             
             # Calculate totals
-            total_tokens = sum(chunk.token_count for chunk in knowledge_chunks)
+            total_tokens = created.total_tokens
             processing_time_ms = int((timezone.now() - start_time).total_seconds() * 1000)
             
             # Step 4: Trigger embedding generation (async)
-            self.logger.info(
-                "Triggering embedding generation for chunks",
-                source_id=str(knowledge_source.id),
-                chunk_count=len(knowledge_chunks)
-            )
-            
-            try:
-                from .tasks import generate_embeddings_for_knowledge_chunks
-                
-                # Trigger embedding generation task
-                embedding_task = generate_embeddings_for_knowledge_chunks.apply_async(
-                    args=[str(knowledge_source.id)],
-                    kwargs={
-                        'force_regenerate': False,
-                        'batch_size': 50
-                    },
-                    priority=1  # Normal priority
-                )
-                
-                self.logger.info(
-                    "Embedding generation task queued",
-                    source_id=str(knowledge_source.id),
-                    embedding_task_id=embedding_task.id
-                )
-                
-            except Exception as e:
-                self.logger.warning(
-                    "Failed to queue embedding generation task",
-                    source_id=str(knowledge_source.id),
-                    error=str(e)
-                )
-                # Don't fail the whole process if embedding queueing fails
+            embedding_queued = self._queue_embedding_generation(knowledge_source, created.count)
             
             # Step 5: Update final status
             knowledge_source.update_processing_status(
                 ProcessingStatus.COMPLETED,
-                chunk_count=len(knowledge_chunks),
+                chunk_count=created.count,
                 token_count=total_tokens
             )
             
             # Update processing job
             processing_job.status = ProcessingStatus.COMPLETED
             processing_job.result_data = {
-                'chunks_created': len(knowledge_chunks),
+                'chunks_created': created.count,
                 'total_tokens': total_tokens,
                 'processing_time_ms': processing_time_ms,
                 'quality_score': processed_doc.quality_score,
                 'metadata': processed_doc.metadata,
-                'embedding_task_queued': True
+                'embedding_task_queued': embedding_queued
             }
             processing_job.completed_at = timezone.now()
             processing_job.save()
@@ -254,7 +287,7 @@ class DocumentProcessingService:
             self.logger.info(
                 "Document processing completed successfully",
                 source_id=str(knowledge_source.id),
-                chunks_created=len(knowledge_chunks),
+                chunks_created=created.count,
                 total_tokens=total_tokens,
                 processing_time_ms=processing_time_ms,
                 quality_score=processed_doc.quality_score
@@ -263,7 +296,7 @@ class DocumentProcessingService:
             return DocumentProcessingResult(
                 source=knowledge_source,
                 processed_document=processed_doc,
-                chunks=knowledge_chunks,
+                chunk_count=created.count,
                 processing_job=processing_job,
                 total_tokens=total_tokens,
                 processing_time_ms=processing_time_ms,
@@ -289,7 +322,7 @@ class DocumentProcessingService:
             return DocumentProcessingResult(
                 source=knowledge_source,
                 processed_document=None,
-                chunks=[],
+                chunk_count=0,
                 processing_job=processing_job if 'processing_job' in locals() else None,
                 total_tokens=0,
                 processing_time_ms=0,
@@ -361,7 +394,7 @@ class DocumentProcessingService:
                 return DocumentProcessingResult(
                     source=knowledge_source,
                     processed_document=None,
-                    chunks=[],
+                    chunk_count=0,
                     processing_job=processing_job,
                     total_tokens=0,
                     processing_time_ms=0,
@@ -369,10 +402,16 @@ class DocumentProcessingService:
                     error_message=error_msg
                 )
             
+            # Retraining replaces the previous chunks and vectors
+            self._remove_existing_chunks(knowledge_source)
+            
             # Continue with same chunking process as files
-            return self._process_extracted_content(
+            result = self._process_extracted_content(
                 knowledge_source, processed_doc, processing_job, start_time, chunking_config
             )
+            if result.success:
+                self._store_crawl_validators(knowledge_source, metadata)
+            return result
             
         except Exception as e:
             error_msg = f"Unexpected URL processing error: {str(e)}"
@@ -393,7 +432,7 @@ class DocumentProcessingService:
             return DocumentProcessingResult(
                 source=knowledge_source,
                 processed_document=None,
-                chunks=[],
+                chunk_count=0,
                 processing_job=processing_job if 'processing_job' in locals() else None,
                 total_tokens=0,
                 processing_time_ms=0,
@@ -401,15 +440,336 @@ class DocumentProcessingService:
                 error_message=error_msg
             )
     
+    def recrawl_url_content(
+        self,
+        knowledge_source: KnowledgeSource,
+        chunking_config: Optional[ChunkingConfig] = None
+    ) -> DocumentProcessingResult:
+        """
+        Re-crawl a URL source, reprocessing it only if the page changed.
+        
+        Sends a conditional request using the stored ETag/Last-Modified
+        validators. A 304 response or an identical normalized content hash
+        short-circuits before chunking and embedding, so unchanged pages
+        cost one lightweight request.
+        
+        Args:
+            knowledge_source: URL-based KnowledgeSource to refresh
+            chunking_config: Optional chunking configuration
+            
+        Returns:
+            DocumentProcessingResult: unchanged=True when nothing was reprocessed
+        """
+        start_time = timezone.now()
+        url = knowledge_source.source_url
+        
+        # Only trust validators when the previous crawl fully succeeded
+        can_short_circuit = knowledge_source.status == ProcessingStatus.COMPLETED
+        
+        try:
+            content, metadata = self._crawl_url(
+                url,
+                etag=knowledge_source.http_etag if can_short_circuit else None,
+                last_modified=knowledge_source.http_last_modified if can_short_circuit else None
+            )
+        except Exception as e:
+            error_msg = f"URL recrawl failed: {str(e)}"
+            self.logger.error(
+                "URL recrawl failed",
+                source_id=str(knowledge_source.id),
+                url=url,
+                error=error_msg
+            )
+            return DocumentProcessingResult(
+                source=knowledge_source,
+                processed_document=None,
+                chunk_count=0,
+                processing_job=None,
+                total_tokens=0,
+                processing_time_ms=0,
+                success=False,
+                error_message=error_msg
+            )
+        
+        if can_short_circuit and (
+            metadata.get('not_modified')
+            or metadata.get('content_hash') == knowledge_source.content_hash
+        ):
+            self._store_crawl_validators(knowledge_source, metadata)
+            processing_time_ms = int((timezone.now() - start_time).total_seconds() * 1000)
+            
+            self.logger.info(
+                "URL content unchanged, skipping reprocessing",
+                source_id=str(knowledge_source.id),
+                url=url,
+                not_modified=metadata.get('not_modified', False),
+                processing_time_ms=processing_time_ms
+            )
+            
+            return DocumentProcessingResult(
+                source=knowledge_source,
+                processed_document=None,
+                chunk_count=0,
+                processing_job=None,
+                total_tokens=knowledge_source.token_count,
+                processing_time_ms=processing_time_ms,
+                success=True,
+                unchanged=True
+            )
+        
+        self.logger.info(
+            "URL content changed, reprocessing",
+            source_id=str(knowledge_source.id),
+            url=url,
+            previous_hash=knowledge_source.content_hash,
+            new_hash=metadata.get('content_hash')
+        )
+        
+        processing_job = ProcessingJob.objects.create(
+            source=knowledge_source,
+            job_type='url_crawl',
+            status=ProcessingStatus.PROCESSING,
+            result_data={'recrawl': True}
+        )
+        knowledge_source.update_processing_status(ProcessingStatus.PROCESSING)
+        
+        superseded_chunk_ids = self._supersede_existing_chunks(knowledge_source)
+        
+        processed_doc = ProcessedDocument(
+            text_content=content,
+            metadata=metadata,
+            word_count=len(content.split()),
+            char_count=len(content),
+            processing_time_ms=0,
+            quality_score=1.0
+        )
+        
+        result = self._process_extracted_content(
+            knowledge_source, processed_doc, processing_job, start_time, chunking_config,
+            superseded_chunk_ids=superseded_chunk_ids
+        )
+        if result.success:
+            self._store_crawl_validators(knowledge_source, metadata)
+        else:
+            self._restore_superseded_chunks(knowledge_source, superseded_chunk_ids)
+        return result
+    
+    def process_site_crawl(
+        self,
+        root_source: KnowledgeSource,
+        crawl_config: Optional[CrawlConfig] = None,
+        chunking_config: Optional[ChunkingConfig] = None
+    ) -> Dict[str, Any]:
+        """
+        Crawl the site behind a URL source and ingest each discovered page.
+        
+        Pages are fetched concurrently and handed to chunking as they arrive.
+        Each page becomes its own URL knowledge source (so it can be
+        recrawled independently) linked to the root via
+        ``metadata['parent_source_id']``. Pages the chatbot already has are
+        skipped.
+        
+        Args:
+            root_source: URL source the crawl starts from
+            crawl_config: Optional crawl limits
+            chunking_config: Optional chunking configuration
+            
+        Returns:
+            Dict[str, Any]: Crawl summary
+        """
+        if crawl_config is None:
+            crawl_depth = (root_source.metadata or {}).get('crawl_depth', 1)
+            crawl_config = CrawlConfig(
+                max_depth=max(crawl_depth - 1, 0),
+                max_pages=app_settings.URL_CRAWL_MAX_PAGES,
+                per_host_concurrency=app_settings.URL_CRAWL_PER_HOST_CONCURRENCY
+            )
+        
+        root_url = canonicalize_url(root_source.source_url)
+        known_hashes = set(
+            KnowledgeSource.objects.filter(
+                chatbot_id=root_source.chatbot_id,
+                file_hash__isnull=False
+            ).values_list('file_hash', flat=True)
+        )
+        
+        summary = {
+            'pages_processed': 0,
+            'pages_failed': 0,
+            'pages_skipped': 0,
+            'chunks_created': 0,
+            'total_tokens': 0,
+            'source_ids': []
+        }
+        
+        self.logger.info(
+            "Starting site crawl",
+            source_id=str(root_source.id),
+            url=root_url,
+            max_pages=crawl_config.max_pages,
+            max_depth=crawl_config.max_depth
+        )
+        
+        for page in iter_site_pages(root_source.source_url, crawl_config):
+            url_hash = hashlib.sha256(page.url.encode()).hexdigest()
+            if page.url == root_url or url_hash in known_hashes:
+                summary['pages_skipped'] += 1
+                continue
+            known_hashes.add(url_hash)
+            
+            start_time = timezone.now()
+            content, title = self._extract_html_text(page.content, response_charset(page.headers))
+            if not content.strip():
+                summary['pages_skipped'] += 1
+                continue
+            
+            metadata = self._url_metadata(page.url, content, title, page.status_code, page.headers)
+            page_source = KnowledgeSource.objects.create(
+                chatbot_id=root_source.chatbot_id,
+                name=(title or page.url)[:255],
+                content_type='url',
+                source_url=page.url,
+                file_hash=url_hash,
+                is_citable=root_source.is_citable,
+                status=ProcessingStatus.PROCESSING,
+                metadata={
+                    'parent_source_id': str(root_source.id),
+                    'original_url': page.url,
+                    'discovered_via': page.discovered_via,
+                    'link_depth': page.depth
+                }
+            )
+            processing_job = ProcessingJob.objects.create(
+                source=page_source,
+                job_type='url_crawl',
+                status=ProcessingStatus.PROCESSING,
+                result_data={'parent_source_id': str(root_source.id)}
+            )
+            processed_doc = ProcessedDocument(
+                text_content=content,
+                metadata=metadata,
+                word_count=len(content.split()),
+                char_count=len(content),
+                processing_time_ms=0,
+                quality_score=1.0
+            )
+            
+            result = self._process_extracted_content(
+                page_source, processed_doc, processing_job, start_time, chunking_config
+            )
+            if result.success:
+                self._store_crawl_validators(page_source, metadata)
+                summary['pages_processed'] += 1
+                summary['chunks_created'] += result.chunk_count
+                summary['total_tokens'] += result.total_tokens
+                summary['source_ids'].append(str(page_source.id))
+            else:
+                summary['pages_failed'] += 1
+        
+        self.logger.info(
+            "Site crawl ingestion completed",
+            source_id=str(root_source.id),
+            pages_processed=summary['pages_processed'],
+            pages_failed=summary['pages_failed'],
+            pages_skipped=summary['pages_skipped'],
+            chunks_created=summary['chunks_created']
+        )
+        
+        return summary
+    
+    def _store_crawl_validators(
+        self,
+        knowledge_source: KnowledgeSource,
+        crawl_metadata: Dict[str, Any]
+    ) -> None:
+        """Persist HTTP validators and content hash from a crawl."""
+        update_fields = ['last_crawled_at']
+        knowledge_source.last_crawled_at = timezone.now()
+        
+        # A 304 may omit validators; keep the stored ones in that case
+        if crawl_metadata.get('etag'):
+            knowledge_source.http_etag = crawl_metadata['etag']
+            update_fields.append('http_etag')
+        if crawl_metadata.get('last_modified'):
+            knowledge_source.http_last_modified = crawl_metadata['last_modified']
+            update_fields.append('http_last_modified')
+        if crawl_metadata.get('content_hash'):
+            knowledge_source.content_hash = crawl_metadata['content_hash']
+            update_fields.append('content_hash')
+        
+        knowledge_source.save(update_fields=update_fields)
+    
+    def _remove_existing_chunks(self, knowledge_source: KnowledgeSource) -> None:
+        """Hard-delete a source's chunks and their vectors before reprocessing."""
+        from .reindexing import delete_indexed_vectors
+        
+        chunk_ids = [
+            str(chunk_id)
+            for chunk_id in KnowledgeChunk.all_objects.filter(
+                source=knowledge_source
+            ).values_list('id', flat=True)
+        ]
+        if not chunk_ids:
+            return
+        
+        # Soft-deleted rows would still hit the (source, chunk_index) constraint
+        KnowledgeChunk.all_objects.filter(source=knowledge_source).delete()
+        
+        # Shadow builds and rollback targets hold copies of these vectors too
+        delete_indexed_vectors(knowledge_source.chatbot_id, knowledge_source.id, chunk_ids=chunk_ids)
+    
+    def _supersede_existing_chunks(self, knowledge_source: KnowledgeSource) -> List[str]:
+        """
+        Move a source's chunks out of the way of reprocessing.
+        
+        The chunks and their vectors keep serving; they are retired by
+        ``remove_superseded_chunks`` once the new chunks are embedded, or
+        put back by ``_restore_superseded_chunks`` if reprocessing fails.
+        Leftovers that can't serve (soft-deleted rows, chunks superseded by
+        an earlier recrawl that never finished) are removed now.
+        
+        Returns:
+            List[str]: IDs of the superseded chunks
+        """
+        leftovers = KnowledgeChunk.all_objects.filter(source=knowledge_source).filter(
+            Q(deleted_at__isnull=False) | Q(chunk_index__gte=SUPERSEDED_CHUNK_OFFSET)
+        )
+        remove_superseded_chunks(
+            knowledge_source, [str(chunk_id) for chunk_id in leftovers.values_list('id', flat=True)]
+        )
+        
+        chunks = KnowledgeChunk.all_objects.filter(source=knowledge_source)
+        chunk_ids = [str(chunk_id) for chunk_id in chunks.values_list('id', flat=True)]
+        # Frees the (source, chunk_index) and (source, content_hash) constraints
+        chunks.update(
+            chunk_index=F('chunk_index') + SUPERSEDED_CHUNK_OFFSET,
+            content_hash=SHA256(Concat(Value('superseded:'), F('content_hash')))
+        )
+        return chunk_ids
+    
+    def _restore_superseded_chunks(self, knowledge_source: KnowledgeSource, chunk_ids: List[str]) -> None:
+        """Drop a failed reprocess's partial chunks and bring back the ones it replaced."""
+        KnowledgeChunk.all_objects.filter(source=knowledge_source).exclude(id__in=chunk_ids).delete()
+        KnowledgeChunk.all_objects.filter(id__in=chunk_ids).update(
+            chunk_index=F('chunk_index') - SUPERSEDED_CHUNK_OFFSET,
+            content_hash=SHA256('content')
+        )
+    
     def _process_extracted_content(
         self,
         knowledge_source: KnowledgeSource,
         processed_doc: ProcessedDocument,
         processing_job: ProcessingJob,
         start_time,
-        chunking_config: Optional[ChunkingConfig] = None
+        chunking_config: Optional[ChunkingConfig] = None,
+        superseded_chunk_ids: Optional[List[str]] = None
     ) -> DocumentProcessingResult:
-        """Process already extracted content (common for files and URLs)."""
+        """
+        Process already extracted content (common for files and URLs).
+        
+        ``superseded_chunk_ids`` are chunks the new ones replace; they are
+        retired once the new chunks are embedded.
+        """
         
         # Update content preview
         preview_text = processed_doc.text_content[:500] if processed_doc.text_content else ""
@@ -435,7 +795,10 @@ class DocumentProcessingService:
                 **processed_doc.metadata
             }
             
-            text_chunks = chunker.chunk_text(processed_doc.text_content, doc_metadata)
+            # Chunks are produced lazily and written in bounded batches below
+            text_chunks = chunker.iter_chunks(
+                iter_text_segments(processed_doc.text_content), doc_metadata
+            )
             
         except Exception as e:
             error_msg = f"Text chunking failed: {str(e)}"
@@ -443,7 +806,7 @@ class DocumentProcessingService:
             return DocumentProcessingResult(
                 source=knowledge_source,
                 processed_document=processed_doc,
-                chunks=[],
+                chunk_count=0,
                 processing_job=processing_job,
                 total_tokens=0,
                 processing_time_ms=0,
@@ -454,21 +817,33 @@ class DocumentProcessingService:
         # Step 3: Create KnowledgeChunk records
         self.logger.info(
             "Creating knowledge chunks in database",
-            source_id=str(knowledge_source.id),
-            chunk_count=len(text_chunks)
+            source_id=str(knowledge_source.id)
         )
         
         try:
-            knowledge_chunks = self._create_knowledge_chunks(
+            created = self._create_knowledge_chunks(
                 knowledge_source, text_chunks, processed_doc
             )
+        except ChunkingError as e:
+            error_msg = f"Text chunking failed: {str(e)}"
+            self._handle_processing_error(knowledge_source, processing_job, error_msg)
+            return DocumentProcessingResult(
+                source=knowledge_source,
+                processed_document=processed_doc,
+                chunk_count=0,
+                processing_job=processing_job,
+                total_tokens=0,
+                processing_time_ms=0,
+                success=False,
+                error_message=error_msg
+            )
         except Exception as e:
             error_msg = f"Database chunk creation failed: {str(e)}"
             self._handle_processing_error(knowledge_source, processing_job, error_msg)
             return DocumentProcessingResult(
                 source=knowledge_source,
                 processed_document=processed_doc,
-                chunks=[],
+                chunk_count=0,
                 processing_job=processing_job,
                 total_tokens=0,
                 processing_time_ms=0,
@@ -477,59 +852,33 @@ class DocumentProcessingService:
             )
         
         # Calculate totals
-        total_tokens = sum(chunk.token_count for chunk in knowledge_chunks)
+        total_tokens = created.total_tokens
         processing_time_ms = int((timezone.now() - start_time).total_seconds() * 1000)
         
         # Step 4: Trigger embedding generation (async)
-        self.logger.info(
-            "Triggering embedding generation for chunks",
-            source_id=str(knowledge_source.id),
-            chunk_count=len(knowledge_chunks)
+        embedding_queued = self._queue_embedding_generation(
+            knowledge_source, created.count, superseded_chunk_ids
         )
-        
-        try:
-            from .tasks import generate_embeddings_for_knowledge_chunks
-            
-            # Trigger embedding generation task
-            embedding_task = generate_embeddings_for_knowledge_chunks.apply_async(
-                args=[str(knowledge_source.id)],
-                kwargs={
-                    'force_regenerate': False,
-                    'batch_size': 50
-                },
-                priority=1  # Normal priority
-            )
-            
-            self.logger.info(
-                "Embedding generation task queued",
-                source_id=str(knowledge_source.id),
-                embedding_task_id=embedding_task.id
-            )
-            
-        except Exception as e:
-            self.logger.warning(
-                "Failed to queue embedding generation task",
-                source_id=str(knowledge_source.id),
-                error=str(e)
-            )
-            # Don't fail the whole process if embedding queueing fails
+        if superseded_chunk_ids and not embedding_queued:
+            # Nothing will swap them out later
+            remove_superseded_chunks(knowledge_source, superseded_chunk_ids)
         
         # Step 5: Update final status
         knowledge_source.update_processing_status(
             ProcessingStatus.COMPLETED,
-            chunk_count=len(knowledge_chunks),
+            chunk_count=created.count,
             token_count=total_tokens
         )
         
         # Update processing job
         processing_job.status = ProcessingStatus.COMPLETED
         processing_job.result_data = {
-            'chunks_created': len(knowledge_chunks),
+            'chunks_created': created.count,
             'total_tokens': total_tokens,
             'processing_time_ms': processing_time_ms,
             'quality_score': processed_doc.quality_score,
             'metadata': processed_doc.metadata,
-            'embedding_task_queued': True
+            'embedding_task_queued': embedding_queued
         }
         processing_job.completed_at = timezone.now()
         processing_job.save()
@@ -537,7 +886,7 @@ class DocumentProcessingService:
         self.logger.info(
             "Content processing completed successfully",
             source_id=str(knowledge_source.id),
-            chunks_created=len(knowledge_chunks),
+            chunks_created=created.count,
             total_tokens=total_tokens,
             processing_time_ms=processing_time_ms,
             quality_score=processed_doc.quality_score
@@ -546,31 +895,94 @@ class DocumentProcessingService:
         return DocumentProcessingResult(
             source=knowledge_source,
             processed_document=processed_doc,
-            chunks=knowledge_chunks,
+            chunk_count=created.count,
             processing_job=processing_job,
             total_tokens=total_tokens,
             processing_time_ms=processing_time_ms,
             success=True
         )
     
+    def _queue_embedding_generation(
+        self,
+        knowledge_source: KnowledgeSource,
+        chunk_count: int,
+        superseded_chunk_ids: Optional[List[str]] = None
+    ) -> bool:
+        """
+        Queue embedding generation for a source's new chunks.
+        
+        The task removes ``superseded_chunk_ids`` once the new vectors are stored.
+        
+        Returns:
+            bool: Whether the embedding task was queued
+        """
+        if not self.queue_embeddings:
+            return False
+        
+        self.logger.info(
+            "Triggering embedding generation for chunks",
+            source_id=str(knowledge_source.id),
+            chunk_count=chunk_count
+        )
+        
+        try:
+            from .tasks import generate_embeddings_for_knowledge_chunks
+            from .task_scheduling import submit_bulk_task
+            
+            # Trigger embedding generation task, fairly scheduled per chatbot owner
+            embedding_task_id = submit_bulk_task(
+                generate_embeddings_for_knowledge_chunks,
+                knowledge_source.chatbot.user_id,
+                args=[str(knowledge_source.id)],
+                kwargs={
+                    'force_regenerate': False,
+                    'batch_size': 50,
+                    'superseded_chunk_ids': superseded_chunk_ids
+                },
+                priority=1  # Normal priority
+            )
+            
+            self.logger.info(
+                "Embedding generation task queued",
+                source_id=str(knowledge_source.id),
+                embedding_task_id=embedding_task_id
+            )
+            return True
+            
+        except Exception as e:
+            # Don't fail the whole process if embedding queueing fails
+            self.logger.warning(
+                "Failed to queue embedding generation task",
+                source_id=str(knowledge_source.id),
+                error=str(e)
+            )
+            return False
+    
     def _create_knowledge_chunks(
         self,
         knowledge_source: KnowledgeSource,
-        text_chunks: List[TextChunk],
-        processed_doc: ProcessedDocument
-    ) -> List[KnowledgeChunk]:
+        text_chunks: Iterable[TextChunk],
+        processed_doc: ProcessedDocument,
+        batch_size: int = 200
+    ) -> CreatedChunks:
         """
         Create KnowledgeChunk records from TextChunk objects.
         
+        Chunks are consumed lazily and inserted with one bulk query per
+        ``batch_size`` chunks. Only totals are kept, so neither the TextChunks
+        nor the created rows are ever all held in memory.
+        
         Args:
             knowledge_source: The source to associate chunks with
-            text_chunks: List of TextChunk objects
+            text_chunks: TextChunk objects (any iterable, typically a generator)
             processed_doc: The processed document
+            batch_size: Chunks per bulk insert
             
         Returns:
-            List[KnowledgeChunk]: Created knowledge chunks
+            CreatedChunks: Number of chunks created and their total tokens
         """
-        knowledge_chunks = []
+        created = CreatedChunks()
+        batch = []
         
         for text_chunk in text_chunks:
             # Create chunk metadata including original document info
@@ -585,78 +997,104 @@ class DocumentProcessingService:
                 **text_chunk.metadata
             }
             
-            # Create KnowledgeChunk with privacy inheritance
-            knowledge_chunk = KnowledgeChunk.objects.create(
+            # bulk_create skips save(), so inherit privacy and hash here
+            batch.append(KnowledgeChunk(
                 source=knowledge_source,
                 content=text_chunk.content,
+                content_hash=hashlib.sha256(text_chunk.content.encode('utf-8')).hexdigest(),
                 chunk_index=text_chunk.metadata.get('chunk_index', 0),
                 start_char=text_chunk.start_index,
                 end_char=text_chunk.end_index,
                 is_citable=knowledge_source.is_citable,  # Inherit privacy setting
                 token_count=text_chunk.token_count,
                 metadata=chunk_metadata
-            )
+            ))
             
-            knowledge_chunks.append(knowledge_chunk)
+            created.count += 1
+            created.total_tokens += text_chunk.token_count
             
-            self.logger.debug(
-                "Created knowledge chunk",
-                source_id=str(knowledge_source.id),
-                chunk_id=str(knowledge_chunk.id),
-                chunk_index=knowledge_chunk.chunk_index,
-                token_count=knowledge_chunk.token_count,
-                is_citable=knowledge_chunk.is_citable,
-                quality_score=text_chunk.quality_score
-            )
+            if len(batch) >= batch_size:
+                KnowledgeChunk.objects.bulk_create(batch)
+                batch = []
+        
+        if batch:
+            KnowledgeChunk.objects.bulk_create(batch)
         
-        return knowledge_chunks
+        self.logger.debug(
+            "Created knowledge chunks",
+            source_id=str(knowledge_source.id),
+            chunk_count=created.count,
+            is_citable=knowledge_source.is_citable
+        )
+        
+        return created
     
-    def _crawl_url(self, url: str) -> Tuple[str, Dict[str, Any]]:
+    def _crawl_url(
+        self,
+        url: str,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None
+    ) -> Tuple[str, Dict[str, Any]]:
         """
         Crawl URL and extract text content.
         
+        When validators from a previous crawl are supplied the request is
+        conditional; a 304 response returns empty text with
+        ``metadata['not_modified'] = True``.
+        
         Args:
             url: URL to crawl
+            etag: ETag from a previous crawl (sent as If-None-Match)
+            last_modified: Last-Modified from a previous crawl (sent as If-Modified-Since)
             
         Returns:
             Tuple[str, Dict]: (extracted_text, metadata)
         """
         import requests
-        from bs4 import BeautifulSoup
         
         try:
             # Make request with reasonable timeout and headers
             headers = {
                 'User-Agent': 'Mozilla/5.0 (compatible; ChatbotSaaS/1.0; +http://example.com/bot)'
             }
+            if etag:
+                headers['If-None-Match'] = etag
+            if last_modified:
+                headers['If-Modified-Since'] = last_modified
             
-            response = requests.get(url, timeout=30, headers=headers)
-            response.raise_for_status()
-            
-            # Parse HTML content
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            # Remove script and style elements
-            for script in soup(["script", "style", "nav", "header", "footer"]):
-                script.decompose()
+            response = requests.get(url, timeout=30, headers=headers, stream=True)
             
-            # Extract title
-            title = soup.title.string.strip() if soup.title else ""
-            
-            # Extract main content
-            content = soup.get_text()
-            
-            # Clean up whitespace
-            content = '\n'.join(line.strip() for line in content.splitlines() if line.strip())
+            try:
+                if response.status_code == 304:
+                    return "", {
+                        'url': url,
+                        'status_code': 304,
+                        'not_modified': True,
+                        'etag': response.headers.get('ETag') or etag,
+                        'last_modified': response.headers.get('Last-Modified') or last_modified,
+                        'extracted_at': timezone.now().isoformat()
+                    }
+                
+                response.raise_for_status()
+                
+                # Stream the body into the parser instead of buffering the page
+                encoding = response_charset(response.headers)
+                if self.html_extractor.supports_streaming:
+                    extracted = self.html_extractor.extract_stream(
+                        response.iter_content(chunk_size=64 * 1024), encoding
+                    )
+                else:
+                    extracted = self.html_extractor.extract(response.content, encoding)
+            finally:
+                # Streamed responses hold their pooled connection until closed
+                response.close()
             
-            metadata = {
-                'url': url,
-                'title': title,
-                'content_type': response.headers.get('content-type', ''),
-                'status_code': response.status_code,
-                'content_length': len(content),
-                'extracted_at': timezone.now().isoformat()
-            }
+            content, title = extracted.text, extracted.title
+            metadata = self._url_metadata(
+                url, content, title, response.status_code, response.headers
+            )
+            metadata['extractor'] = type(self.html_extractor).__name__
+            metadata['truncated'] = extracted.truncated
             
             return content, metadata
             
@@ -665,6 +1103,40 @@ class DocumentProcessingService:
         except Exception as e:
             raise DocumentProcessingError(f"Failed to parse URL content: {str(e)}")
     
+    def _extract_html_text(self, html: bytes, encoding: Optional[str] = None) -> Tuple[str, str]:
+        """
+        Extract readable text and title from HTML.
+        
+        Returns:
+            Tuple[str, str]: (text, title)
+        """
+        extracted = self.html_extractor.extract(html, encoding)
+        return extracted.text, extracted.title
+    
+    def _url_metadata(
+        self,
+        url: str,
+        content: str,
+        title: str,
+        status_code: int,
+        headers: Dict[str, str]
+    ) -> Dict[str, Any]:
+        """Build document metadata for a fetched URL."""
+        # requests and the crawler use different header containers
+        headers = {key.lower(): value for key, value in headers.items()}
+        return {
+            'url': url,
+            'title': title,
+            'content_type': headers.get('content-type', ''),
+            'status_code': status_code,
+            'content_length': len(content),
+            'not_modified': False,
+            'etag': headers.get('etag'),
+            'last_modified': headers.get('last-modified'),
+            'content_hash': compute_content_hash(content),
+            'extracted_at': timezone.now().isoformat()
+        }
+    
     def _handle_processing_error(
         self,
         knowledge_source: KnowledgeSource,
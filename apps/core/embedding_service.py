@@ -63,6 +63,7 @@ class BatchEmbeddingResult:
 class EmbeddingConfig:
     """Configuration for embedding generation."""
     model: str = "text-embedding-ada-002"
+    dimensions: Optional[int] = None  # Shortened output (text-embedding-3 models only)
     max_batch_size: int = 100  # OpenAI limit for ada-002
     cache_ttl_hours: int = 24 * 7  # 1 week
     enable_caching: bool = True
@@ -92,6 +93,8 @@ class EmbeddingCache:
     def _get_text_hash(self, text: str, model: str) -> str:
         """Generate hash for text and model combination."""
         content = f"{text}:{model}"
+        if self.config.dimensions:
+            content = f"{content}:{self.config.dimensions}"
         return hashlib.sha256(content.encode()).hexdigest()[:16]
     
     def get_cached_embedding(self, text: str, model: str) -> Optional[EmbeddingResult]:
@@ -714,19 +717,23 @@ class OpenAIEmbeddingService:
         if not self.cost_tracker.check_daily_budget(estimated_cost):
             raise EmbeddingGenerationError("Daily budget exceeded")
         
+        request_options = {'dimensions': self.config.dimensions} if self.config.dimensions else {}
+        
         # Use circuit breaker if enabled
         if self.circuit_breaker:
             response = await self.circuit_breaker.call(
                 lambda: self.client.embeddings.create(
                     input=batch,
-                    model=self.config.model
+                    model=self.config.model,
+                    **request_options
                 )
             )
         else:
             response = await asyncio.to_thread(
                 self.client.embeddings.create,
                 input=batch,
-                model=self.config.model
+                model=self.config.model,
+                **request_options
             )
         
         processing_time_ms = int((time.time() - start_time) * 1000)
@@ -283,9 +283,19 @@ class EmbeddingGenerator:
         # Prepare texts and check cache
         texts_to_embed = []
         cached_embeddings = []
+        precomputed_embeddings = []
         chunk_indices = []
         
         for i, chunk in enumerate(chunks):
+            # Reuse vectors the chunker already produced with this model
+            if (
+                chunk.embedding is not None
+                and chunk.embedding_model == config.model
+                and len(chunk.embedding) == config.dimension
+            ):
+                precomputed_embeddings.append((i, chunk.embedding))
+                continue
+            
             # Check cache first
             cached_embedding = self.cache.get_embedding(
                 chunk.content, config.model, chunk.privacy_level
@@ -300,8 +310,8 @@ class EmbeddingGenerator:
         # Generate embeddings for non-cached texts
         embeddings = [None] * len(chunks)
         
-        # Fill in cached embeddings
-        for chunk_idx, embedding in cached_embeddings:
+        # Fill in cached and precomputed embeddings
+        for chunk_idx, embedding in cached_embeddings + precomputed_embeddings:
             embeddings[chunk_idx] = embedding
         
         # Generate missing embeddings in batches
@@ -341,6 +351,7 @@ class EmbeddingGenerator:
             metadata={
                 "total_chunks": len(chunks),
                 "cached_chunks": len(cached_embeddings),
+                "precomputed_chunks": len(precomputed_embeddings),
                 "generated_chunks": len(texts_to_embed),
                 "batch_count": (len(texts_to_embed) + config.batch_size - 1) // config.batch_size,
                 "model": config.model,
@@ -353,7 +364,8 @@ class EmbeddingGenerator:
         
         logger.info(
             f"Generated embeddings for {len(chunks)} chunks "
-            f"({len(cached_embeddings)} cached, {len(texts_to_embed)} generated) "
+            f"({len(cached_embeddings)} cached, {len(precomputed_embeddings)} precomputed, "
+            f"{len(texts_to_embed)} generated) "
             f"in {processing_time:.2f}s"
         )
         
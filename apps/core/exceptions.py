@@ -197,4 +197,19 @@ class RAGError(ServiceError):
     
     def __init__(self, message: str, stage: str = None):
         self.stage = stage
-        super().__init__(message, "RAG_ERROR", 500)
\ No newline at end of file
+        super().__init__(message, "RAG_ERROR", 500)
+
+
+class ReindexError(ServiceError):
+    """Raised when a vector index rebuild, cutover or rollback can't proceed."""
+    
+    def __init__(self, message: str = "Vector re-index operation failed"):
+        super().__init__(message, "REINDEX_ERROR", 409)
+
+
+class ReindexBudgetExceeded(ReindexError):
+    """Raised when a re-index would exceed its cost budget."""
+    
+    def __init__(self, message: str = "Re-index cost budget exhausted"):
+        super().__init__(message)
+        self.error_code = "REINDEX_BUDGET_EXCEEDED"
@@ -0,0 +1,360 @@
+"""
+HTML-to-text extraction for URL knowledge sources.
+
+Extractors turn fetched HTML into plain text for chunking. The lxml
+extractors drive libxml2's SAX-style target interface directly, so no
+tree is built for the common case; the main-content extractor builds a
+tree and keeps only the densest content block; the BeautifulSoup
+extractor is kept as a fallback when lxml is unavailable.
+"""
+
+import re
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from enum import Enum
+from typing import Iterable, List, Optional
+import structlog
+
+try:
+    from lxml import etree
+    import lxml.html
+    LXML_AVAILABLE = True
+except ImportError:  # pragma: no cover - lxml ships with most deployments
+    etree = None
+    LXML_AVAILABLE = False
+
+logger = structlog.get_logger()
+
+
+class ExtractionStrategy(Enum):
+    """Available HTML extraction strategies."""
+    SOUP = "soup"
+    LXML = "lxml"
+    MAIN_CONTENT = "main_content"
+
+
+# Elements whose text is never page content
+SKIPPED_TAGS = frozenset({
+    'script', 'style', 'noscript', 'template', 'nav', 'header', 'footer',
+    'head', 'svg', 'iframe', 'object', 'select',
+})
+
+# Elements that start a new line of text
+BLOCK_TAGS = frozenset({
+    'address', 'article', 'aside', 'blockquote', 'br', 'dd', 'details', 'div',
+    'dl', 'dt', 'figcaption', 'figure', 'form', 'h1', 'h2', 'h3', 'h4', 'h5',
+    'h6', 'hr', 'li', 'main', 'ol', 'p', 'pre', 'section', 'summary', 'table',
+    'tbody', 'td', 'tfoot', 'th', 'thead', 'tr', 'ul',
+})
+
+# class/id hints for boilerplate containers in main-content mode
+BOILERPLATE_HINTS = re.compile(
+    r'(^|[\s_-])(nav|navbar|menu|sidebar|breadcrumbs?|cookie|banner|footer|header|'
+    r'share|social|comments?|advert|ads?|promo|related|subscribe|newsletter|toc)($|[\s_-])',
+    re.I
+)
+
+_WHITESPACE = re.compile(r'[ \t\r\f\v\xa0]+')
+
+
+@dataclass
+class ExtractedHTML:
+    """Text extracted from an HTML document."""
+    text: str
+    title: str
+    truncated: bool = False
+
+
+class _TextCollector:
+    """
+    lxml parser target that accumulates readable text line by line.
+
+    Also used to render trees (see ``_feed_tree``) so every lxml extractor
+    produces identically formatted text.
+    """
+
+    def __init__(self, max_chars: Optional[int] = None):
+        self.max_chars = max_chars
+        self.lines: List[str] = []
+        self.title_parts: List[str] = []
+        self.truncated = False
+        self._current: List[str] = []
+        self._skip_depth = 0
+        self._in_title = False
+        self._chars = 0
+
+    def start(self, tag, attrib=None):
+        tag = tag.lower() if isinstance(tag, str) else ''
+        if tag == 'title':
+            self._in_title = True
+        if self._skip_depth or tag in SKIPPED_TAGS:
+            self._skip_depth += 1
+        elif tag in BLOCK_TAGS:
+            self._break()
+
+    def end(self, tag):
+        tag = tag.lower() if isinstance(tag, str) else ''
+        if tag == 'title':
+            self._in_title = False
+        if self._skip_depth:
+            self._skip_depth -= 1
+        elif tag in BLOCK_TAGS:
+            self._break()
+
+    def data(self, data):
+        if self._in_title:
+            self.title_parts.append(data)
+        elif not self._skip_depth and not self.truncated:
+            self._current.append(data)
+
+    def comment(self, text):
+        pass
+
+    def close(self) -> ExtractedHTML:
+        self._break()
+        return ExtractedHTML(
+            text='\n'.join(self.lines),
+            title=' '.join(''.join(self.title_parts).split()),
+            truncated=self.truncated
+        )
+
+    def _break(self):
+        if not self._current:
+            return
+        for raw_line in ''.join(self._current).splitlines():
+            line = _WHITESPACE.sub(' ', raw_line).strip()
+            if not line:
+                continue
+            if self.max_chars is not None and self._chars + len(line) > self.max_chars:
+                self.truncated = True
+                break
+            self.lines.append(line)
+            self._chars += len(line) + 1
+        self._current = []
+
+
+def _feed_tree(element, collector: _TextCollector) -> None:
+    """Replay a parsed tree into a collector in document order."""
+    is_element = isinstance(element.tag, str)
+    if is_element:
+        collector.start(element.tag)
+        if element.text:
+            collector.data(element.text)
+        for child in element:
+            _feed_tree(child, collector)
+        collector.end(element.tag)
+    if element.tail:
+        collector.data(element.tail)
+
+
+class HTMLExtractor(ABC):
+    """Abstract base class for HTML extraction strategies."""
+
+    supports_streaming = False
+
+    def __init__(self, max_chars: Optional[int] = None):
+        """
+        Initialize extractor.
+
+        Args:
+            max_chars: Stop collecting text after this many characters
+        """
+        self.max_chars = max_chars
+
+    @abstractmethod
+    def extract(self, html: bytes, encoding: Optional[str] = None) -> ExtractedHTML:
+        """Extract text and title from a complete HTML document."""
+        pass
+
+    def extract_stream(self, chunks: Iterable[bytes], encoding: Optional[str] = None) -> ExtractedHTML:
+        """Extract from an iterable of byte chunks (buffers the whole document by default)."""
+        return self.extract(b''.join(chunks), encoding)
+
+
+class SoupExtractor(HTMLExtractor):
+    """BeautifulSoup extraction (fallback when lxml is not installed)."""
+
+    def extract(self, html: bytes, encoding: Optional[str] = None) -> ExtractedHTML:
+        from bs4 import BeautifulSoup
+
+        soup = BeautifulSoup(html, 'html.parser', from_encoding=encoding)
+
+        # Remove script and style elements
+        for script in soup(["script", "style", "nav", "header", "footer"]):
+            script.decompose()
+
+        title = soup.title.string.strip() if soup.title and soup.title.string else ""
+
+        content = '\n'.join(
+            line.strip() for line in soup.get_text().splitlines() if line.strip()
+        )
+        truncated = self.max_chars is not None and len(content) > self.max_chars
+        if truncated:
+            content = content[:self.max_chars]
+
+        return ExtractedHTML(text=content, title=title, truncated=truncated)
+
+
+class LxmlExtractor(HTMLExtractor):
+    """
+    Fast extraction via libxml2 parser callbacks.
+
+    No element tree is built, so memory is bounded by the extracted text.
+    ``extract_stream`` feeds the parser chunk by chunk, so the raw document
+    never needs to be held in memory either.
+    """
+
+    supports_streaming = True
+
+    def extract(self, html: bytes, encoding: Optional[str] = None) -> ExtractedHTML:
+        return self.extract_stream([html], encoding)
+
+    def extract_stream(self, chunks: Iterable[bytes], encoding: Optional[str] = None) -> ExtractedHTML:
+        collector = _TextCollector(self.max_chars)
+        parser = etree.HTMLParser(
+            target=collector,
+            encoding=encoding,
+            remove_comments=True,
+            remove_pis=True,
+            recover=True
+        )
+        fed = False
+        for chunk in chunks:
+            if chunk:
+                parser.feed(chunk)
+                fed = True
+            if collector.truncated:
+                break
+        if not fed:
+            return ExtractedHTML(text='', title='')
+        return parser.close()
+
+
+class MainContentExtractor(HTMLExtractor):
+    """
+    Boilerplate-removing extraction.
+
+    Drops navigation/sidebar/footer-like containers, then keeps the
+    ``<main>``/``<article>`` element or, failing that, the block with the
+    most paragraph text. Falls back to the whole body when no block holds
+    a meaningful share of the page text.
+    """
+
+    min_share = 0.25
+
+    def extract(self, html: bytes, encoding: Optional[str] = None) -> ExtractedHTML:
+        if not html.strip():
+            return ExtractedHTML(text='', title='')
+
+        parser = lxml.html.HTMLParser(encoding=encoding, remove_comments=True, recover=True)
+        root = lxml.html.document_fromstring(html, parser=parser)
+
+        title_element = root.find('.//title')
+        title = ' '.join((title_element.text_content() if title_element is not None else '').split())
+
+        etree.strip_elements(root, *SKIPPED_TAGS, 'aside', with_tail=False)
+
+        body = root.find('body')
+        if body is None:
+            body = root
+        self._drop_boilerplate(body)
+        node = self._content_node(body)
+
+        collector = _TextCollector(self.max_chars)
+        _feed_tree(node, collector)
+        result = collector.close()
+        result.title = title
+        return result
+
+    def _drop_boilerplate(self, body) -> None:
+        body_length = len(body.text_content().strip())
+        for element in list(body.iter('div', 'section', 'ul', 'ol', 'table', 'form')):
+            hints = f"{element.get('class', '')} {element.get('id', '')} {element.get('role', '')}"
+            if not BOILERPLATE_HINTS.search(hints) or element.getparent() is None:
+                continue
+            # Layout wrappers like "has-sidebar" can hold the whole page
+            if element.xpath('.//main | .//article | .//*[@role="main"]'):
+                continue
+            if len(element.text_content().strip()) > body_length / 2:
+                continue
+            element.drop_tree()
+
+    def _content_node(self, body):
+        body_length = len(body.text_content().strip())
+        if not body_length:
+            return body
+
+        semantic = body.xpath('.//main | .//article | .//*[@role="main"]')
+        if semantic:
+            best = max(semantic, key=lambda element: len(element.text_content()))
+            if len(best.text_content().strip()) >= self.min_share * body_length:
+                return best
+
+        # Paragraph text votes for its parent (and, at half weight, grandparent)
+        scores = {}
+        for paragraph in body.iter('p', 'pre', 'li', 'td'):
+            length = len(paragraph.text_content().strip())
+            if length < 25:
+                continue
+            parent = paragraph.getparent()
+            if parent is not None:
+                scores[parent] = scores.get(parent, 0) + length
+                grandparent = parent.getparent()
+                if grandparent is not None:
+                    scores[grandparent] = scores.get(grandparent, 0) + length / 2
+
+        if not scores:
+            return body
+        best = max(scores, key=scores.get)
+        if len(best.text_content().strip()) < self.min_share * body_length:
+            return body
+        return best
+
+
+def response_charset(headers) -> Optional[str]:
+    """
+    Charset declared in a Content-Type header, if any.
+
+    Returns None when undeclared so the parser can sniff ``<meta charset>``
+    instead of assuming ISO-8859-1 like ``requests`` does.
+    """
+    content_type = ''
+    for key, value in headers.items():
+        if key.lower() == 'content-type':
+            content_type = value
+            break
+    match = re.search(r'charset=["\']?([\w.:-]+)', content_type, re.I)
+    return match.group(1) if match else None
+
+
+class HTMLExtractorFactory:
+    """Factory for creating HTML extractors based on strategy."""
+
+    @staticmethod
+    def create_extractor(
+        strategy: ExtractionStrategy = ExtractionStrategy.LXML,
+        max_chars: Optional[int] = None
+    ) -> HTMLExtractor:
+        """
+        Create an extractor for the given strategy.
+
+        lxml-based strategies fall back to BeautifulSoup when lxml is not
+        installed.
+
+        Raises:
+            ValueError: If strategy is not supported
+        """
+        extractors = {
+            ExtractionStrategy.SOUP: SoupExtractor,
+            ExtractionStrategy.LXML: LxmlExtractor,
+            ExtractionStrategy.MAIN_CONTENT: MainContentExtractor,
+        }
+
+        if strategy not in extractors:
+            raise ValueError(f"Unsupported extraction strategy: {strategy}")
+
+        if strategy != ExtractionStrategy.SOUP and not LXML_AVAILABLE:
+            logger.warning("lxml not installed, falling back to BeautifulSoup extraction")
+            strategy = ExtractionStrategy.SOUP
+
+        return extractors[strategy](max_chars=max_chars)
@@ -0,0 +1,260 @@
+"""
+Full-text search over knowledge chunk content.
+
+Vector search is weak on exact terms: SKUs, error codes and product names
+embed close to their neighbours, so "ERR-4012" finds chunks about errors in
+general. ``LexicalIndex`` searches ``KnowledgeChunk.content`` per chatbot
+with the database's own full-text engine, and ``reciprocal_rank_fusion``
+merges its ranking with the vector ranking.
+
+- PostgreSQL: GIN expression index on ``to_tsvector('english', content)``,
+  matched with OR semantics and ranked by ``ts_rank_cd``.
+- SQLite: external-content FTS5 table kept in sync by triggers, ranked by
+  ``bm25``.
+
+The index is created by migration and, like the vector backend tables,
+idempotently on first use, so databases built without migrations
+(tests, fresh SQLite files) get it too.
+"""
+
+import re
+import threading
+import uuid
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+import structlog
+from asgiref.sync import sync_to_async
+from django.db import connection as default_connection
+
+from chatbot_saas.config import get_settings
+
+logger = structlog.get_logger()
+settings = get_settings()
+
+TERM_PATTERN = re.compile(r'\w+(?:[-./:]\w+)*')
+MAX_QUERY_TERMS = 32
+FTS_TABLE = 'knowledge_chunks_fts'
+TEXT_SEARCH_CONFIG = 'english'
+
+
+@dataclass
+class LexicalMatch:
+    """Chunk matched by full-text search."""
+    chunk_id: str
+    source_id: str
+    content: str
+    is_citable: bool
+    chunk_index: int
+    token_count: int
+    score: float  # Higher is better; only comparable within one query
+
+
+def ensure_lexical_index(connection=None) -> None:
+    """Create the full-text index and its sync triggers if they don't exist."""
+    connection = connection or default_connection
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            _ensure_fts5(cursor)
+        elif connection.vendor == 'postgresql':
+            cursor.execute(f"""
+                CREATE INDEX IF NOT EXISTS knowledge_chunks_content_fts_idx
+                ON knowledge_chunks USING GIN (to_tsvector('{TEXT_SEARCH_CONFIG}', content));
+            """)
+
+
+def drop_lexical_index(connection=None) -> None:
+    """Drop the full-text index and its triggers."""
+    connection = connection or default_connection
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            for event in ('insert', 'delete', 'update'):
+                cursor.execute(f"DROP TRIGGER IF EXISTS {FTS_TABLE}_{event};")
+            cursor.execute(f"DROP TABLE IF EXISTS {FTS_TABLE};")
+        elif connection.vendor == 'postgresql':
+            cursor.execute("DROP INDEX IF EXISTS knowledge_chunks_content_fts_idx;")
+
+
+def _ensure_fts5(cursor) -> None:
+    """
+    External-content FTS5 table over ``knowledge_chunks``, keyed by rowid.
+
+    Only the inverted index is stored; content is read back from
+    ``knowledge_chunks``. A newly created table is rebuilt from existing rows.
+    """
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s", [FTS_TABLE])
+    existed = cursor.fetchone() is not None
+
+    cursor.execute(f"""
+        CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE}
+        USING fts5(content, content='knowledge_chunks', content_rowid='rowid');
+    """)
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_insert
+        AFTER INSERT ON knowledge_chunks
+        BEGIN
+            INSERT INTO {FTS_TABLE} (rowid, content) VALUES (NEW.rowid, NEW.content);
+        END;
+    """)
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_delete
+        AFTER DELETE ON knowledge_chunks
+        BEGIN
+            INSERT INTO {FTS_TABLE} ({FTS_TABLE}, rowid, content) VALUES ('delete', OLD.rowid, OLD.content);
+        END;
+    """)
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_update
+        AFTER UPDATE OF content ON knowledge_chunks
+        BEGIN
+            INSERT INTO {FTS_TABLE} ({FTS_TABLE}, rowid, content) VALUES ('delete', OLD.rowid, OLD.content);
+            INSERT INTO {FTS_TABLE} (rowid, content) VALUES (NEW.rowid, NEW.content);
+        END;
+    """)
+
+    if not existed:
+        cursor.execute(f"INSERT INTO {FTS_TABLE} ({FTS_TABLE}) VALUES ('rebuild');")
+
+
+def query_terms(query: str) -> List[str]:
+    """Distinct search terms, keeping codes like ``ERR-4012`` or ``v2.1`` whole."""
+    terms = []
+    for term in TERM_PATTERN.findall(query.lower()):
+        if term not in terms:
+            terms.append(term)
+    return terms[:MAX_QUERY_TERMS]
+
+
+class LexicalIndex:
+    """Full-text search over a chatbot's knowledge chunks."""
+
+    def __init__(self, connection=None):
+        self.connection = connection or default_connection
+        self._ready = False
+        self._lock = threading.Lock()
+
+    def search(
+        self,
+        chatbot_id: str,
+        query: str,
+        top_k: int = 10,
+        citable_only: bool = True
+    ) -> List[LexicalMatch]:
+        """
+        Chunks of the chatbot's live sources matching any query term, best first.
+
+        Args:
+            chatbot_id: Chatbot whose knowledge is searched
+            query: Free-text query
+            top_k: Maximum matches
+            citable_only: If True, only return citable chunks
+
+        Returns:
+            List[LexicalMatch]: Matches ordered by text relevance
+        """
+        terms = query_terms(query)
+        if not terms or top_k <= 0:
+            return []
+        try:
+            chatbot_key = uuid.UUID(str(chatbot_id)).hex
+        except ValueError:
+            return []
+
+        self._ensure_ready()
+        if self.connection.vendor == 'sqlite':
+            # Each term is quoted as a phrase, so punctuation inside codes is not FTS5 syntax
+            match = " OR ".join(f'"{term}"' for term in terms)
+            sql = f"""
+                SELECT c.id, c.source_id, c.content, c.is_citable, c.chunk_index, c.token_count,
+                       -bm25({FTS_TABLE}) AS rank
+                FROM {FTS_TABLE}
+                JOIN knowledge_chunks c ON c.rowid = {FTS_TABLE}.rowid
+                JOIN knowledge_sources s ON s.id = c.source_id
+                WHERE {FTS_TABLE} MATCH %s
+                  AND s.chatbot_id = %s AND s.deleted_at IS NULL AND c.deleted_at IS NULL
+                  {"AND c.is_citable" if citable_only else ""}
+                ORDER BY rank DESC
+                LIMIT %s
+            """
+            params = [match, chatbot_key, top_k]
+        else:
+            document = f"to_tsvector('{TEXT_SEARCH_CONFIG}', c.content)"
+            sql = f"""
+                WITH q AS (
+                    SELECT replace(
+                        plainto_tsquery('{TEXT_SEARCH_CONFIG}', %s)::text, ' & ', ' | '
+                    )::tsquery AS query
+                )
+                SELECT c.id, c.source_id, c.content, c.is_citable, c.chunk_index, c.token_count,
+                       ts_rank_cd({document}, q.query) AS rank
+                FROM knowledge_chunks c
+                JOIN knowledge_sources s ON s.id = c.source_id
+                CROSS JOIN q
+                WHERE {document} @@ q.query
+                  AND s.chatbot_id = %s AND s.deleted_at IS NULL AND c.deleted_at IS NULL
+                  {"AND c.is_citable" if citable_only else ""}
+                ORDER BY rank DESC
+                LIMIT %s
+            """
+            params = [" ".join(terms), chatbot_key, top_k]
+
+        with self.connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            rows = cursor.fetchall()
+
+        return [
+            LexicalMatch(
+                chunk_id=str(uuid.UUID(str(row[0]))),
+                source_id=str(uuid.UUID(str(row[1]))),
+                content=row[2],
+                is_citable=bool(row[3]),
+                chunk_index=row[4],
+                token_count=row[5] or 0,
+                score=float(row[6])
+            )
+            for row in rows
+        ]
+
+    async def asearch(self, chatbot_id: str, query: str, top_k: int = 10, citable_only: bool = True) -> List[LexicalMatch]:
+        """Async variant of ``search``."""
+        return await sync_to_async(self.search)(chatbot_id, query, top_k, citable_only)
+
+    def _ensure_ready(self) -> None:
+        if self._ready:
+            return
+        with self._lock:
+            if not self._ready:
+                ensure_lexical_index(self.connection)
+                self._ready = True
+
+
+lexical_index = LexicalIndex()
+
+
+def reciprocal_rank_fusion(
+    rankings: Sequence[Iterable[str]],
+    k: Optional[int] = None,
+    weights: Optional[Sequence[float]] = None
+) -> List[Tuple[str, float]]:
+    """
+    Merge rankings by reciprocal rank fusion.
+
+    Each id scores ``weight / (k + rank)`` per ranking it appears in (rank
+    from 1). Only positions are used, so cosine similarities and BM25 scores
+    never have to be put on one scale.
+
+    Args:
+        rankings: Id lists, best first
+        k: Damping constant; larger values flatten the head of each ranking
+        weights: Weight per ranking, 1.0 each by default
+
+    Returns:
+        List[Tuple[str, float]]: Ids with fused scores, best first
+    """
+    k = settings.HYBRID_RRF_K if k is None else k
+    weights = weights or [1.0] * len(rankings)
+    fused: Dict[str, float] = {}
+    for ranking, weight in zip(rankings, weights):
+        for rank, item_id in enumerate(ranking, start=1):
+            fused[item_id] = fused.get(item_id, 0.0) + weight / (k + rank)
+    # Stable sort: ties keep first-seen order, so the first ranking wins them
+    return sorted(fused.items(), key=lambda item: item[1], reverse=True)
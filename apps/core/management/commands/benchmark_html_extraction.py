@@ -0,0 +1,137 @@
+"""
+Management command to benchmark HTML-to-text extraction strategies.
+"""
+
+import re
+import time
+import tracemalloc
+from collections import Counter
+from pathlib import Path
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.core.html_extraction import ExtractionStrategy, HTMLExtractorFactory
+
+WORD = re.compile(r'\w+')
+
+
+def token_f1(extracted: str, reference: str) -> float:
+    """Bag-of-words F1 between extracted text and a reference extraction."""
+    extracted_counts = Counter(WORD.findall(extracted.lower()))
+    reference_counts = Counter(WORD.findall(reference.lower()))
+    overlap = sum((extracted_counts & reference_counts).values())
+    if not overlap:
+        return 0.0
+    precision = overlap / sum(extracted_counts.values())
+    recall = overlap / sum(reference_counts.values())
+    return 2 * precision * recall / (precision + recall)
+
+
+class Command(BaseCommand):
+    """Benchmark HTML extraction throughput and text quality."""
+
+    help = (
+        'Benchmark HTML extraction strategies over a saved corpus. '
+        'Pages with a sibling .txt file are scored against it for quality.'
+    )
+
+    def add_arguments(self, parser):
+        """Add command arguments."""
+        parser.add_argument(
+            '--corpus',
+            type=str,
+            default=str(Path(settings.BASE_DIR) / 'tests' / 'fixtures' / 'html_corpus'),
+            help='Directory of saved .html pages'
+        )
+
+        parser.add_argument(
+            '--iterations',
+            type=int,
+            default=20,
+            help='Passes over the corpus per strategy'
+        )
+
+        parser.add_argument(
+            '--strategies',
+            type=str,
+            default=','.join(strategy.value for strategy in ExtractionStrategy),
+            help='Comma-separated strategies to compare'
+        )
+
+        parser.add_argument(
+            '--stream-chunk-size',
+            type=int,
+            default=64 * 1024,
+            help='Chunk size used for the streaming variants'
+        )
+
+    def handle(self, *args, **options):
+        """Handle command execution."""
+        corpus_dir = Path(options['corpus'])
+        pages = sorted(corpus_dir.glob('*.html'))
+        if not pages:
+            raise CommandError(f"No .html files found in {corpus_dir}")
+
+        try:
+            strategies = [ExtractionStrategy(name.strip()) for name in options['strategies'].split(',')]
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        corpus = []
+        for page in pages:
+            reference = page.with_suffix('.txt')
+            corpus.append((
+                page.name,
+                page.read_bytes(),
+                reference.read_text() if reference.exists() else None
+            ))
+        total_bytes = sum(len(html) for _, html, _ in corpus)
+
+        self.stdout.write(
+            f"Corpus: {len(corpus)} pages, {total_bytes / 1024:.1f} KiB, "
+            f"{options['iterations']} iterations\n"
+        )
+        self.stdout.write(
+            f"{'strategy':<22} {'pages/s':>10} {'MiB/s':>8} {'peak KiB':>10} {'quality F1':>11}"
+        )
+
+        chunk_size = options['stream_chunk_size']
+        for strategy in strategies:
+            extractor = HTMLExtractorFactory.create_extractor(strategy)
+            variants = [(strategy.value, extractor.extract)]
+            if extractor.supports_streaming:
+                variants.append((
+                    f"{strategy.value} (stream)",
+                    lambda html, e=extractor: e.extract_stream(
+                        html[i:i + chunk_size] for i in range(0, len(html), chunk_size)
+                    )
+                ))
+
+            for label, extract in variants:
+                self._benchmark(label, extract, corpus, total_bytes, options['iterations'])
+
+    def _benchmark(self, label, extract, corpus, total_bytes, iterations):
+        """Time one extraction variant and score it against references."""
+        start = time.perf_counter()
+        for _ in range(iterations):
+            for _, html, _ in corpus:
+                extract(html)
+        elapsed = time.perf_counter() - start
+
+        tracemalloc.start()
+        scores = []
+        for _, html, reference in corpus:
+            result = extract(html)
+            if reference is not None:
+                scores.append(token_f1(result.text, reference))
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        pages_per_second = len(corpus) * iterations / elapsed
+        mib_per_second = total_bytes * iterations / elapsed / (1024 * 1024)
+        quality = f"{sum(scores) / len(scores):.3f}" if scores else "n/a"
+
+        self.stdout.write(
+            f"{label:<22} {pages_per_second:>10.1f} {mib_per_second:>8.2f} "
+            f"{peak / 1024:>10.1f} {quality:>11}"
+        )
@@ -0,0 +1,138 @@
+"""
+Management command to benchmark private-content leak detection.
+"""
+
+import random
+import time
+from django.core.management.base import BaseCommand
+
+from apps.core.rag.context_builder import ContextData, ContextSource
+from apps.core.rag.privacy_filter import PrivateContentDetector
+
+VOCABULARY = (
+    "account billing refund invoice customer order shipping delivery warranty return policy "
+    "support ticket escalation manager contract renewal discount pricing plan upgrade "
+    "migration backup server region latency outage incident report review schedule team"
+).split()
+
+
+def synthetic_text(rng: random.Random, words: int) -> str:
+    """Sentences of random vocabulary words."""
+    sentences = []
+    while words > 0:
+        length = min(words, rng.randint(8, 20))
+        sentence = " ".join(rng.choice(VOCABULARY) for _ in range(length))
+        sentences.append(sentence.capitalize() + ".")
+        words -= length
+    return " ".join(sentences)
+
+
+def naive_quote_scan(response: str, context: ContextData) -> int:
+    """Direct-quote check as done before fingerprinting: every phrase against the whole response."""
+    leaks = 0
+    for source in context.private_sources:
+        source_words = source.content.split()
+        for i in range(len(source_words) - 4):
+            phrase = " ".join(source_words[i:i + 5])
+            if len(phrase) >= 20 and phrase.lower() in response.lower():
+                leaks += 1
+    return leaks
+
+
+class Command(BaseCommand):
+    """Benchmark leak detection against private sources."""
+
+    help = 'Benchmark private-content leak detection on synthetic sources and responses'
+
+    def add_arguments(self, parser):
+        """Add command arguments."""
+        parser.add_argument(
+            '--sources',
+            type=int,
+            default=10,
+            help='Private sources in the context'
+        )
+
+        parser.add_argument(
+            '--source-words',
+            type=int,
+            default=400,
+            help='Words per private source'
+        )
+
+        parser.add_argument(
+            '--response-tokens',
+            type=int,
+            default=2000,
+            help='Approximate tokens per response'
+        )
+
+        parser.add_argument(
+            '--iterations',
+            type=int,
+            default=20,
+            help='Responses checked per variant'
+        )
+
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=7,
+            help='Random seed for the synthetic corpus'
+        )
+
+    def handle(self, *args, **options):
+        """Handle command execution."""
+        rng = random.Random(options['seed'])
+        sources = [
+            ContextSource(
+                content=synthetic_text(rng, options['source_words']), source_id=f"chunk-{i}",
+                document_id=f"doc-{i}", knowledge_base_id="kb-1", score=0.5, is_citable=False
+            )
+            for i in range(options['sources'])
+        ]
+        context = ContextData(
+            full_context="", citable_sources=[], private_sources=sources, token_count=0,
+            total_sources=len(sources), citable_count=0, private_count=len(sources),
+            context_score=0.5, search_metadata={}
+        )
+
+        # Roughly 0.75 words per token; each response quotes one private sentence
+        response_words = int(options['response_tokens'] * 0.75)
+        responses = []
+        for _ in range(options['iterations']):
+            quote = rng.choice(sources).content.split(".")[0]
+            responses.append(f"{synthetic_text(rng, response_words)} {quote}.")
+
+        self.stdout.write(
+            f"{len(sources)} private sources x {options['source_words']} words, "
+            f"{len(responses)} responses of ~{options['response_tokens']} tokens\n"
+        )
+        self.stdout.write(f"{'variant':<28} {'ms/response':>12} {'violations':>11}")
+
+        self._benchmark("naive quote scan", lambda response: naive_quote_scan(response, context), responses)
+
+        # Fresh detector per response: fingerprints built every time
+        self._benchmark(
+            "fingerprint (cold)",
+            lambda response: len(PrivateContentDetector().detect_leak(response, context)),
+            responses
+        )
+
+        detector = PrivateContentDetector()
+        detector.detect_leak(responses[0], context)
+        self._benchmark(
+            "fingerprint (cached)",
+            lambda response: len(detector.detect_leak(response, context)),
+            responses
+        )
+
+    def _benchmark(self, label, detect, responses):
+        """Time one detection variant."""
+        start = time.perf_counter()
+        violations = sum(detect(response) for response in responses)
+        elapsed = time.perf_counter() - start
+
+        self.stdout.write(
+            f"{label:<28} {elapsed * 1000 / len(responses):>12.2f} {violations:>11}"
+        )
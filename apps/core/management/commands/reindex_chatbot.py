@@ -0,0 +1,103 @@
+"""
+Django management command to re-embed a chatbot's knowledge into a new index version.
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.chatbots.models import Chatbot
+from apps.core.exceptions import ReindexError
+from apps.core.reindexing import EMBEDDING_MODELS, ShadowReindexer, get_active_index
+from apps.core.tasks import reindex_chatbot_task
+from apps.knowledge.models import VectorIndexVersion
+
+
+class Command(BaseCommand):
+    help = 'Build, verify and switch vector index versions for a chatbot'
+
+    def add_arguments(self, parser):
+        parser.add_argument('chatbot_id', help='Chatbot to re-index')
+        parser.add_argument(
+            '--model',
+            choices=sorted(EMBEDDING_MODELS),
+            help='Embedding model for a new index version (starts or resumes a build)'
+        )
+        parser.add_argument(
+            '--dimensions',
+            type=int,
+            default=None,
+            help="Vector size (default: the model's native size)"
+        )
+        parser.add_argument(
+            '--cutover',
+            action='store_true',
+            help='Activate the built version once verified (or the ready version if no --model)'
+        )
+        parser.add_argument(
+            '--rollback',
+            action='store_true',
+            help='Reactivate the previously active version'
+        )
+        parser.add_argument(
+            '--sync',
+            action='store_true',
+            help='Build in this process instead of queueing a task'
+        )
+
+    def handle(self, *args, **options):
+        try:
+            chatbot = Chatbot.objects.get(id=options['chatbot_id'])
+        except (Chatbot.DoesNotExist, ValueError):
+            raise CommandError(f"Chatbot {options['chatbot_id']} not found")
+
+        reindexer = ShadowReindexer()
+        try:
+            if options['rollback']:
+                version = reindexer.rollback(chatbot)
+                self.stdout.write(self.style.SUCCESS(f"Rolled back to index v{version.version}"))
+            elif options['model']:
+                self.build(chatbot, options)
+            elif options['cutover']:
+                version = VectorIndexVersion.objects.filter(
+                    chatbot=chatbot,
+                    status=VectorIndexVersion.STATUS_READY
+                ).order_by('-version').first()
+                if version is None:
+                    raise CommandError("No verified index version to cut over to")
+                reindexer.cutover(version)
+                self.stdout.write(self.style.SUCCESS(f"Switched to index v{version.version}"))
+        except ReindexError as e:
+            raise CommandError(e.message)
+
+        self.show_versions(chatbot)
+
+    def build(self, chatbot, options):
+        if not options['sync']:
+            result = reindex_chatbot_task.delay(
+                str(chatbot.id), options['model'], options['dimensions'], options['cutover']
+            )
+            self.stdout.write(f"Re-index queued as task {result.id}")
+            return
+
+        reindexer = ShadowReindexer()
+        version = reindexer.start(chatbot, options['model'], options['dimensions'])
+        self.stdout.write(f"Building index v{version.version} ({version.embedding_model}, {version.dimensions}d)")
+        reindexer.build(version)
+        reindexer.verify(version)
+        if version.status != VectorIndexVersion.STATUS_READY:
+            raise CommandError(version.error_message)
+        self.stdout.write(self.style.SUCCESS(
+            f"Verified: {version.vectors_indexed}/{version.vectors_expected} vectors, "
+            f"recall@k {version.recall_at_k:.2f}, ${version.build_state.get('spent_usd', 0.0):.4f}"
+        ))
+        if options['cutover']:
+            reindexer.cutover(version)
+            self.stdout.write(self.style.SUCCESS(f"Switched to index v{version.version}"))
+
+    def show_versions(self, chatbot):
+        active = get_active_index(chatbot.id)
+        self.stdout.write(f"\nActive: v{active.version} {active.embedding_model} ({active.dimensions}d)")
+        for version in VectorIndexVersion.objects.filter(chatbot=chatbot).order_by('version'):
+            self.stdout.write(
+                f"  v{version.version} {version.status:<9} {version.embedding_model} "
+                f"{version.vectors_indexed}/{version.vectors_expected} vectors"
+            )
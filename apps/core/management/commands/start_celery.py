@@ -30,7 +30,7 @@ class Command(BaseCommand):
         parser.add_argument(
             '--queues',
             type=str,
-            default='celery',
+            default='interactive,documents,embeddings,vectors,maintenance',
             help='Comma-separated list of queues to consume from'
         )
         parser.add_argument(
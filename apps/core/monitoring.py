@@ -407,9 +407,12 @@ task_monitor = TaskMonitor()
 
 def get_monitoring_dashboard() -> Dict[str, Any]:
     """Get comprehensive monitoring dashboard data."""
+    from apps.core.task_scheduling import tenant_queue_stats
+    
     return {
         "system_health": task_monitor.check_system_health(),
         "task_analytics": task_monitor.get_task_analytics(),
+        "tenant_queues": tenant_queue_stats(),
         "recent_alerts": [
             {
                 "level": alert.level.value,
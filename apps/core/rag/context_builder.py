@@ -10,14 +10,24 @@ citable and private sources are clearly separated.
 
 import time
 import logging
+from functools import lru_cache
 from typing import List, Dict, Any, Optional, Tuple
 from dataclasses import dataclass
 from enum import Enum
+import numpy as np
+import tiktoken
 
 from .vector_search_service import SearchResult
 from apps.core.monitoring import track_metric
+from chatbot_saas.config import get_settings
 
 logger = logging.getLogger(__name__)
+settings = get_settings()
+
+CITABLE_HEADER = "CITABLE SOURCES (can be referenced):"
+PRIVATE_HEADER = "\nPRIVATE SOURCES (for reasoning only, do not reference):"
+CITABLE_EXCERPT_CHARS = 500
+TOKEN_ENCODING = "cl100k_base"  # Encoding chunk token counts are stored in at ingest
 
 
 class RankingStrategy(Enum):
@@ -63,23 +73,59 @@ class ContextData:
     search_metadata: Dict[str, Any]
 
 
+@lru_cache(maxsize=1)
+def get_encoding():
+    """Tokenizer for context budgeting, or None to fall back to estimates."""
+    try:
+        return tiktoken.get_encoding(TOKEN_ENCODING)
+    except Exception as e:
+        logger.warning(f"Failed to load tokenizer, using character-based estimation: {str(e)}")
+        return None
+
+
+@lru_cache(maxsize=settings.TOKEN_COUNT_CACHE_SIZE)
+def _count_tokens(text: str) -> int:
+    encoding = get_encoding()
+    if encoding is None:
+        return len(text) // 4
+    return len(encoding.encode(text, disallowed_special=()))
+
+
 class TokenCounter:
-    """Simple token counter for context management."""
+    """Token counter for context management."""
     
     @staticmethod
     def count_tokens(text: str) -> int:
         """
-        Count approximate tokens in text.
+        Count tokens in text.
+        
+        Counts are exact when the tokenizer is available and cached per text,
+        so chunks seen in recent contexts aren't tokenized again.
         
         Args:
             text: Text to count
             
         Returns:
-            int: Approximate token count
+            int: Token count
         """
-        # Simple approximation: ~4 characters per token
-        # This is conservative for GPT models
-        return len(text) // 4
+        return _count_tokens(text)
+    
+    @staticmethod
+    def count_source_tokens(content: str, metadata: Optional[Dict[str, Any]] = None) -> int:
+        """
+        Count tokens in a chunk, preferring the count stored at ingest.
+        
+        Args:
+            content: Chunk content
+            metadata: Search result metadata, with ``token_count`` if known
+            
+        Returns:
+            int: Token count
+        """
+        stored = (metadata or {}).get('token_count')
+        if isinstance(stored, int) and stored > 0:
+            return stored
+        return _count_tokens(content)
     
     @staticmethod
     def truncate_to_token_limit(text: str, max_tokens: int) -> str:
@@ -96,6 +142,13 @@ class TokenCounter:
         if TokenCounter.count_tokens(text) <= max_tokens:
             return text
         
+        encoding = get_encoding()
+        if encoding is not None:
+            # Leave a token for the ellipsis, then back off to a word boundary
+            tokens = encoding.encode(text, disallowed_special=())
+            truncated = encoding.decode(tokens[:max(max_tokens - 1, 0)]).rsplit(' ', 1)[0]
+            return truncated + "..."
+        
         # Approximate character limit
         char_limit = max_tokens * 4
         
@@ -107,6 +160,47 @@ class TokenCounter:
         return truncated + "..."
 
 
+def pack_within_budget(costs: List[int], values: List[float], budget: int) -> List[int]:
+    """
+    Choose items with the highest total value whose costs fit a budget.
+    
+    Solves the 0/1 knapsack exactly by dynamic programming over every budget
+    up to ``budget``, one NumPy pass per item. Items with no value still
+    fill leftover room.
+    
+    Args:
+        costs: Token cost of each item
+        values: Value of each item, e.g. relevance score
+        budget: Tokens available
+        
+    Returns:
+        List[int]: Indices of the chosen items, in input order
+    """
+    if budget <= 0:
+        return [i for i, cost in enumerate(costs) if cost <= 0]
+    if sum(costs) <= budget:
+        return list(range(len(costs)))
+    
+    best = np.zeros(budget + 1)
+    taken = np.zeros((len(costs), budget + 1), dtype=bool)
+    for i, (cost, value) in enumerate(zip(costs, values)):
+        if cost > budget:
+            continue
+        # Small bonus so items without value still use spare room
+        candidate = best[:budget + 1 - cost] + max(value, 0.0) + 1e-6
+        improved = candidate > best[cost:]
+        taken[i, cost:] = improved
+        best[cost:] = np.where(improved, candidate, best[cost:])
+    
+    chosen = []
+    remaining = budget
+    for i in range(len(costs) - 1, -1, -1):
+        if taken[i, remaining]:
+            chosen.append(i)
+            remaining -= costs[i]
+    return chosen[::-1]
+
+
 class RelevanceRanker:
     """Ranking strategies for search results."""
     
@@ -154,6 +248,9 @@ class RelevanceRanker:
         """
         Boost results with exact keyword matches.
         
+        Results from hybrid search carry their full-text score as
+        ``lexical_score``; others are scored by word overlap with the query.
+        
         Args:
             results: Search results to rank
             query: Original search query
@@ -164,11 +261,14 @@ class RelevanceRanker:
         query_words = set(query.lower().split())
         
         for result in results:
-            content_words = set(result.content.lower().split())
-            
-            # Calculate keyword overlap
-            overlap = len(query_words.intersection(content_words))
-            overlap_ratio = overlap / len(query_words) if query_words else 0
+            lexical_score = (result.metadata or {}).get('lexical_score')
+            if lexical_score is not None:
+                overlap_ratio = lexical_score
+            else:
+                # Calculate keyword overlap
+                content_words = set(result.content.lower().split())
+                overlap = len(query_words.intersection(content_words))
+                overlap_ratio = overlap / len(query_words) if query_words else 0
             
             # Apply keyword boost
             keyword_boost = 1.0 + (overlap_ratio * 0.5)  # Up to 50% boost
@@ -226,43 +326,59 @@ class DiversityOptimizer:
         return diversified_results
     
     @staticmethod
-    def remove_redundancy(results: List[SearchResult], similarity_threshold: float = 0.9) -> List[SearchResult]:
+    def select_mmr(
+        results: List[SearchResult],
+        max_results: int,
+        mmr_lambda: float = 0.7,
+        duplicate_threshold: float = 0.95
+    ) -> List[SearchResult]:
         """
-        Remove highly similar chunks.
+        Select relevant but mutually diverse results by maximal marginal relevance.
+        
+        Each step picks the result maximizing
+        ``lambda * relevance - (1 - lambda) * max similarity to those already
+        picked``, with similarity the cosine of the chunk embeddings. Pairwise
+        similarities come from one matrix product. Results without an
+        embedding can't be compared, so they compete on relevance alone.
         
         Args:
-            results: Search results
-            similarity_threshold: Similarity threshold for redundancy
+            results: Ranked search results
+            max_results: Results to select
+            mmr_lambda: 1.0 ranks by relevance only, 0.0 by diversity only
+            duplicate_threshold: Results this similar to a selected one are dropped
             
         Returns:
-            List[SearchResult]: Deduplicated results
+            List[SearchResult]: Selected results, most relevant first
         """
-        if len(results) <= 1:
-            return results
-        
-        unique_results = [results[0]]  # Always keep the top result
-        
-        for result in results[1:]:
-            is_redundant = False
-            
-            for unique_result in unique_results:
-                # Simple similarity check based on content overlap
-                content1_words = set(result.content.lower().split())
-                content2_words = set(unique_result.content.lower().split())
-                
-                if content1_words and content2_words:
-                    overlap = len(content1_words.intersection(content2_words))
-                    union = len(content1_words.union(content2_words))
-                    jaccard_similarity = overlap / union if union > 0 else 0
-                    
-                    if jaccard_similarity > similarity_threshold:
-                        is_redundant = True
-                        break
-            
-            if not is_redundant:
-                unique_results.append(result)
-        
-        return unique_results
+        dimension = next((len(result.embedding) for result in results if result.embedding is not None), None)
+        if len(results) <= 1 or dimension is None:
+            return results[:max_results]
+        
+        # Zero vectors for missing embeddings: similarity 0 to everything
+        embeddings = np.asarray([
+            result.embedding if result.embedding is not None else [0.0] * dimension
+            for result in results
+        ], dtype=np.float32)
+        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+        embeddings /= np.where(norms > 0, norms, 1.0)
+        similarity = embeddings @ embeddings.T
+        
+        # Ranking strategies boost scores past 1; keep relevance on the similarity scale
+        scores = np.asarray([result.score for result in results], dtype=np.float32)
+        relevance = scores / scores.max() if scores.max() > 0 else scores
+        
+        available = np.ones(len(results), dtype=bool)
+        max_similarity = np.zeros(len(results), dtype=np.float32)
+        selected = []
+        while len(selected) < max_results and available.any():
+            marginal = mmr_lambda * relevance - (1 - mmr_lambda) * max_similarity
+            best = int(np.argmax(np.where(available, marginal, -np.inf)))
+            selected.append(best)
+            available[best] = False
+            max_similarity = np.maximum(max_similarity, similarity[best])
+            available &= max_similarity < duplicate_threshold
+        
+        return [results[i] for i in selected]
 
 
 class ContextBuilder:
@@ -273,14 +389,16 @@ class ContextBuilder:
     and private sources for privacy compliance.
     """
     
-    def __init__(self, max_context_tokens: int = 3000):
+    def __init__(self, max_context_tokens: int = 3000, mmr_lambda: Optional[float] = None):
         """
         Initialize context builder.
         
         Args:
             max_context_tokens: Maximum tokens for context
+            mmr_lambda: Relevance/diversity trade-off for source selection
         """
         self.max_tokens = max_context_tokens
+        self.mmr_lambda = settings.CONTEXT_MMR_LAMBDA if mmr_lambda is None else mmr_lambda
         self.token_counter = TokenCounter()
         
         logger.info(f"Initialized ContextBuilder with max_tokens={max_context_tokens}")
@@ -314,13 +432,15 @@ class ContextBuilder:
             # Apply ranking strategy
             ranked_results = self._apply_ranking(search_results, query, ranking_strategy)
             
-            # Apply diversity optimization if enabled
+            # Apply diversity optimization if enabled, then limit number of sources
             if enable_diversity:
                 ranked_results = DiversityOptimizer.maximize_coverage(ranked_results)
-                ranked_results = DiversityOptimizer.remove_redundancy(ranked_results)
+                ranked_results = DiversityOptimizer.select_mmr(ranked_results, max_sources, self.mmr_lambda)
+            else:
+                ranked_results = ranked_results[:max_sources]
             
-            # Limit number of sources
-            ranked_results = ranked_results[:max_sources]
+            # Keep the most relevant sources that fit the token budget
+            ranked_results, token_count = self._pack_results(ranked_results, include_private)
             
             # Separate citable and private sources
             citable_sources = []
@@ -348,24 +468,20 @@ class ContextBuilder:
             
             # Add citable sources (these can be referenced in responses)
             if citable_sources:
-                context_parts.append("CITABLE SOURCES (can be referenced):")
+                context_parts.append(CITABLE_HEADER)
                 for i, source in enumerate(citable_sources, 1):
-                    # Truncate content for cleaner context (full content in citation)
-                    truncated_content = source.content[:500] + "..." if len(source.content) > 500 else source.content
-                    context_parts.append(f"[CITABLE-{i}] {truncated_content}")
+                    context_parts.append(f"[CITABLE-{i}] {self._citable_excerpt(source.content)}")
             
             # Add private sources (for reasoning only, not citation)
             if include_private and private_sources:
-                context_parts.append("\nPRIVATE SOURCES (for reasoning only, do not reference):")
+                context_parts.append(PRIVATE_HEADER)
                 for source in private_sources:
                     context_parts.append(f"[PRIVATE] {source.content}")
             
             # Combine all context
             full_context = "\n\n".join(context_parts)
             
-            # Check token limit and truncate if necessary
-            token_count = self.token_counter.count_tokens(full_context)
-            
+            # Packing keeps the context within budget; truncation is a safety net
             if token_count > self.max_tokens:
                 logger.warning(f"Context exceeds token limit ({token_count} > {self.max_tokens}), truncating")
                 full_context = self.token_counter.truncate_to_token_limit(full_context, self.max_tokens)
@@ -400,6 +516,7 @@ class ContextBuilder:
                     "query": query,
                     "ranking_strategy": ranking_strategy.value,
                     "diversity_enabled": enable_diversity,
+                    "mmr_lambda": self.mmr_lambda if enable_diversity else None,
                     "max_sources": max_sources,
                     "build_time": build_time
                 }
@@ -409,6 +526,63 @@ class ContextBuilder:
             logger.error(f"Context building failed: {str(e)}")
             raise
     
+    @staticmethod
+    def _citable_excerpt(content: str) -> str:
+        """Citable content as shown in the context (full content in citation)."""
+        return content[:CITABLE_EXCERPT_CHARS] + "..." if len(content) > CITABLE_EXCERPT_CHARS else content
+    
+    def _pack_results(
+        self,
+        results: List[SearchResult],
+        include_private: bool
+    ) -> Tuple[List[SearchResult], int]:
+        """
+        Choose the results that maximize total relevance within ``max_tokens``.
+        
+        Costs use stored chunk token counts where available plus the exact
+        cost of section headers and source markers.
+        
+        Returns:
+            Tuple[List[SearchResult], int]: Chosen results in ranked order, context tokens
+        """
+        # The widest marker and the separator bound each entry's overhead
+        separator = self.token_counter.count_tokens("\n\n")
+        citable_overhead = self.token_counter.count_tokens(f"[CITABLE-{len(results)}] ") + separator
+        private_overhead = self.token_counter.count_tokens("[PRIVATE] ") + separator
+        
+        packed, free, costs, values = [], [], [], []
+        for index, result in enumerate(results):
+            if result.is_citable:
+                excerpt = self._citable_excerpt(result.content)
+                if excerpt == result.content:
+                    tokens = self.token_counter.count_source_tokens(result.content, result.metadata)
+                else:
+                    tokens = self.token_counter.count_tokens(excerpt)
+                tokens += citable_overhead
+            elif include_private:
+                tokens = self.token_counter.count_source_tokens(result.content, result.metadata) + private_overhead
+            else:
+                # Not shown to the model, kept for privacy checks
+                free.append(index)
+                continue
+            packed.append(index)
+            costs.append(tokens)
+            values.append(result.score)
+        
+        headers = 0
+        if any(result.is_citable for result in results):
+            headers += self.token_counter.count_tokens(CITABLE_HEADER)
+        if include_private and any(not result.is_citable for result in results):
+            headers += self.token_counter.count_tokens(PRIVATE_HEADER) + separator
+        
+        chosen = pack_within_budget(costs, values, self.max_tokens - headers)
+        if len(chosen) < len(packed):
+            track_metric("context_builder.sources_dropped", len(packed) - len(chosen))
+        
+        keep = sorted(free + [packed[i] for i in chosen])
+        token_count = headers + sum(costs[i] for i in chosen)
+        return [results[i] for i in keep], token_count
+    
     def _apply_ranking(
         self,
         results: List[SearchResult],
@@ -19,6 +19,7 @@ import openai
 from openai import AsyncOpenAI
 
 from .context_builder import ContextData
+from .privacy_filter import StreamingLeakDetector
 from apps.core.circuit_breaker import CircuitBreaker
 from apps.core.monitoring import track_metric
 from chatbot_saas.config import get_settings
@@ -448,20 +449,29 @@ class LLMService:
                 timeout=30.0
             )
             
-            full_response = ""
+            # Index private content once; each chunk is then scanned on its own
+            leak_detector = StreamingLeakDetector.for_context(context)
             
             async for chunk in stream:
                 if chunk.choices[0].delta.content:
                     content_chunk = chunk.choices[0].delta.content
-                    full_response += content_chunk
                     
-                    # Basic privacy check on accumulating content
-                    if not self._contains_private_leak(full_response, context):
-                        yield content_chunk
-                    else:
+                    # Only text the detector has fully checked is sent
+                    checked = leak_detector.feed(content_chunk)
+                    if leak_detector.leak:
                         logger.warning("Privacy leak detected in streaming response")
                         yield "[Response filtered for privacy protection]"
                         break
+                    if checked:
+                        yield checked
+            else:
+                # The last word has no boundary after it until the stream ends
+                checked = leak_detector.finish()
+                if leak_detector.leak:
+                    logger.warning("Privacy leak detected at the end of streaming response")
+                    yield "[Response filtered for privacy protection]"
+                elif checked:
+                    yield checked
             
         except Exception as e:
             logger.error(f"Streaming generation failed: {str(e)}")
@@ -529,34 +539,6 @@ class LLMService:
                         return False
         
         return True
-    
-    def _contains_private_leak(
-        self,
-        partial_response: str,
-        context: ContextData
-    ) -> bool:
-        """
-        Check if partial response contains privacy leaks.
-        
-        Args:
-            partial_response: Partial response being generated
-            context: Context data
-            
-        Returns:
-            bool: True if private leak detected
-        """
-        # Simple check for private markers
-        if "[PRIVATE]" in partial_response:
-            return True
-        
-        # Check against private source content
-        for source in context.private_sources:
-            if source.content and len(source.content) > 20:
-                # Check for exact matches of longer phrases
-                if source.content[:20].lower() in partial_response.lower():
-                    return True
-        
-        return False
 
 
 class LLMFallbackStrategy:
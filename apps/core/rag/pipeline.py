@@ -11,30 +11,94 @@ Layer 3: Response post-processing and sanitization (PrivacyFilter)
 CRITICAL: This pipeline enforces ZERO tolerance for privacy leaks.
 """
 
+import asyncio
+import threading
 import time
 import logging
-from typing import Dict, Any, Optional, List
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Awaitable, Callable, Dict, Any, Optional, List, Set
 from dataclasses import dataclass
 from enum import Enum
 
+from asgiref.sync import sync_to_async
+from django.db import close_old_connections, transaction
+
 from .vector_search_service import VectorSearchService, get_vector_search_service
 from .context_builder import ContextBuilder, ContextData, RankingStrategy
 from .llm_service import LLMService, GenerationResult, ChatbotConfig, get_llm_service
 from .privacy_filter import PrivacyFilter, FilterResult, get_privacy_filter
 
+from apps.core.answer_cache import CachedAnswer, config_scope, semantic_answer_cache
+from apps.core.chatbot_cache import chatbot_config_cache
 from apps.core.embedding_service import OpenAIEmbeddingService
+from apps.core.reindexing import aget_active_index
 from apps.core.monitoring import track_metric
 # Note: Using conversation models directly from their apps
-from apps.chatbots.models import Chatbot
 from apps.conversations.models import Conversation as ConversationModel
 from django.utils import timezone
 
 logger = logging.getLogger(__name__)
 
+# Conversation history is written here, after the response has been returned
+_persistence_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="rag-persist")
+
+# Last scheduled write per conversation; the next one starts once it is done
+_conversation_write_tails: Dict[str, Future] = {}
+_conversation_write_lock = threading.Lock()
+
+
+def _submit_conversation_write(conversation_id: str, func: Callable, *args) -> Future:
+    """
+    Run ``func`` on the persistence executor after earlier writes to the conversation.
+    
+    Keeps a conversation's turns in the order they were answered; writes to
+    different conversations still run in parallel.
+    """
+    done: Future = Future()
+    with _conversation_write_lock:
+        previous = _conversation_write_tails.get(conversation_id)
+        _conversation_write_tails[conversation_id] = done
+    
+    def finish(write: Future) -> None:
+        with _conversation_write_lock:
+            if _conversation_write_tails.get(conversation_id) is done:
+                del _conversation_write_tails[conversation_id]
+        if write.exception() is not None:
+            done.set_exception(write.exception())
+        else:
+            done.set_result(write.result())
+    
+    def start(_: Optional[Future] = None) -> None:
+        _persistence_executor.submit(func, *args).add_done_callback(finish)
+    
+    if previous is None:
+        start()
+    else:
+        previous.add_done_callback(start)
+    return done
+
+
+def _concurrent_db_call(func: Callable) -> Callable[..., Awaitable]:
+    """
+    Async wrapper for a sync ORM call that may overlap with other DB calls.
+    
+    ``sync_to_async`` normally runs every call on one shared thread, which
+    serializes them; these get an executor thread and its own connection.
+    """
+    def run(*args, **kwargs):
+        try:
+            return func(*args, **kwargs)
+        finally:
+            close_old_connections()
+    return sync_to_async(run, thread_sensitive=False)
+
 
 class RAGStage(Enum):
     """RAG pipeline stages for tracking."""
+    CONVERSATION_SETUP = "conversation_setup"
+    CONFIG_LOADING = "config_loading"
     EMBEDDING_GENERATION = "embedding_generation"
+    ANSWER_CACHE = "answer_cache"
     VECTOR_SEARCH = "vector_search" 
     CONTEXT_BUILDING = "context_building"
     LLM_GENERATION = "llm_generation"
@@ -117,18 +181,18 @@ class ConversationManager:
         Returns:
             str: Conversation ID
         """
-        from asgiref.sync import sync_to_async
-        
-        try:
-            # Use async database operations
-            chatbot = await sync_to_async(Chatbot.objects.get)(id=chatbot_id)
-            
-            conversation = await sync_to_async(ConversationModel.objects.create)(
-                chatbot=chatbot,
+        def create():
+            snapshot = chatbot_config_cache.get_by_id(chatbot_id)
+            return ConversationModel.objects.create(
+                chatbot_id=snapshot.id,
                 session_id=session_id,
                 user_identifier=user_id,
                 created_at=timezone.now()
             )
+        
+        try:
+            # Runs alongside config loading and query embedding
+            conversation = await _concurrent_db_call(create)()
             
             logger.info(f"Created conversation {conversation.id} for chatbot {chatbot_id}")
             return str(conversation.id)
@@ -256,7 +320,8 @@ class RAGMetrics:
             "avg_latency": 0.0,
             "privacy_compliance_rate": 1.0,
             "avg_cost_per_query": 0.0,
-            "avg_context_score": 0.0
+            "avg_context_score": 0.0,
+            "answer_cache": semantic_answer_cache.get_stats()
         }
 
 
@@ -283,10 +348,14 @@ class RAGPipeline:
         self.llm_service = get_llm_service()
         self.privacy_filter = get_privacy_filter()
         self.embedding_service = OpenAIEmbeddingService()
+        self._index_embedding_service = None  # (index, service) for re-indexed chatbots
         
         # Performance tracking
         self.metrics = RAGMetrics()
         
+        # Conversation writes still in flight
+        self._pending_writes: Set[Future] = set()
+        
         logger.info(f"Initialized RAG pipeline for chatbot {chatbot_id}")
     
     async def process_query(
@@ -316,10 +385,22 @@ class RAGPipeline:
         try:
             logger.info(f"Processing query for user {user_id}: '{user_query[:100]}...'")
             
-            # Create conversation if needed
+            # Answers are cached per configuration; callers without one get the chatbot's default
+            answer_scope = config_scope(chatbot_config)
+            query_embedding = None
+            cached_answer = None
+            
+            # Conversation setup, config loading and retrieval don't depend on
+            # each other; run them concurrently
+            stages = {}
             if not conversation_id and session_id:
-                conversation_id = await ConversationManager.create_conversation(
-                    self.chatbot_id, session_id, user_id
+                stages['conversation_id'] = self._timed(
+                    stage_times, RAGStage.CONVERSATION_SETUP,
+                    ConversationManager.create_conversation(self.chatbot_id, session_id, user_id)
+                )
+            if not chatbot_config:
+                stages['chatbot_config'] = self._timed(
+                    stage_times, RAGStage.CONFIG_LOADING, self._get_default_chatbot_config()
                 )
             
             # Check if this is a simple greeting or query that doesn't need document context
@@ -328,7 +409,6 @@ class RAGPipeline:
             if is_simple_query:
                 # Skip vector search for simple queries
                 logger.info(f"Simple query detected, skipping document search: '{user_query[:30]}...'")
-                query_embedding = None
                 search_results = []
                 context = ContextData(
                     full_context="",
@@ -345,33 +425,18 @@ class RAGPipeline:
                 stage_times[RAGStage.VECTOR_SEARCH.value] = 0
                 stage_times[RAGStage.CONTEXT_BUILDING.value] = 0
             else:
-                # Stage 1: Generate query embedding
-                stage_start = time.time()
-                query_embedding = await self._generate_embedding(user_query)
-                stage_times[RAGStage.EMBEDDING_GENERATION.value] = time.time() - stage_start
-                
-                # Stage 2: Vector search with privacy filtering (Layer 1)
-                stage_start = time.time()
-                search_results = await self.vector_search.search(
-                    query_embedding=query_embedding,
-                    query_text=user_query,
-                    user_id=user_id,
-                    top_k=10,
-                    filter_citable=False,  # Get both citable and private for context
-                    score_threshold=0.7
-                )
-                stage_times[RAGStage.VECTOR_SEARCH.value] = time.time() - stage_start
-                
-                # Stage 3: Build context with privacy separation
-                stage_start = time.time()
-                context = self.context_builder.build_context(
-                    search_results=search_results,
-                    query=user_query,
-                    include_private=True,  # Include private for reasoning, not citation
-                    ranking_strategy=RankingStrategy.HYBRID,
-                    enable_diversity=True
+                stages['retrieval'] = self._retrieve_context(user_query, user_id, stage_times, answer_scope)
+            
+            results = dict(zip(stages, await self._run_concurrently(*stages.values())))
+            conversation_id = results.get('conversation_id', conversation_id)
+            chatbot_config = results.get('chatbot_config', chatbot_config)
+            if 'retrieval' in results:
+                query_embedding, cached_answer, search_results, context = results['retrieval']
+            
+            if cached_answer is not None:
+                return self._cached_response(
+                    cached_answer, user_query, conversation_id, stage_times, start_time
                 )
-                stage_times[RAGStage.CONTEXT_BUILDING.value] = time.time() - stage_start
             
             # Validate context privacy before proceeding
             context_validation = self.context_builder.validate_context_privacy(context)
@@ -381,9 +446,6 @@ class RAGPipeline:
             
             # Stage 4: Generate response with LLM (Layer 2 privacy enforcement)
             stage_start = time.time()
-            if not chatbot_config:
-                chatbot_config = await self._get_default_chatbot_config()
-            
             generation_result = await self.llm_service.generate_response(
                 context=context,
                 user_query=user_query,
@@ -409,10 +471,10 @@ class RAGPipeline:
                 else generation_result.content
             )
             
-            # Stage 6: Save to conversation history
+            # Stage 6: Save to conversation history, off the response path
             stage_start = time.time()
             if conversation_id:
-                await self._save_conversation_messages(
+                self._schedule_conversation_save(
                     conversation_id, user_query, final_response, context
                 )
             stage_times[RAGStage.CONVERSATION_SAVING.value] = time.time() - stage_start
@@ -427,6 +489,28 @@ class RAGPipeline:
                 generation_result, context, privacy_result
             )
             
+            # Only answers that passed the privacy filter and were grounded in search results are reused
+            if query_embedding is not None and privacy_result.passed and search_results:
+                await sync_to_async(semantic_answer_cache.store)(
+                    self.chatbot_id,
+                    query_embedding,
+                    CachedAnswer(
+                        query=user_query,
+                        content=final_response,
+                        citations=tuple(citations),
+                        citable_sources=tuple(context.citable_sources),
+                        sources_used=len(search_results),
+                        citable_count=context.citable_count,
+                        private_count=context.private_count,
+                        context_score=context.context_score,
+                        response_quality_score=response_quality,
+                        input_tokens=generation_result.input_tokens,
+                        output_tokens=generation_result.output_tokens,
+                        estimated_cost=generation_result.estimated_cost
+                    ),
+                    scope=answer_scope
+                )
+            
             # Track comprehensive metrics
             self._track_pipeline_metrics(
                 context, generation_result, privacy_result, stage_times, total_time
@@ -475,9 +559,139 @@ class RAGPipeline:
             
             return self._generate_fallback_response(e, time.time() - start_time)
     
+    async def _retrieve_context(
+        self,
+        user_query: str,
+        user_id: str,
+        stage_times: Dict[str, float],
+        answer_scope: str = "default"
+    ):
+        """
+        Embedding, answer cache lookup, vector search and context building.
+        
+        Returns:
+            (query_embedding, cached_answer, search_results, context); on a
+            cache hit search is skipped and the last two are empty
+        """
+        # Stage 1: Generate query embedding
+        query_embedding = await self._timed(
+            stage_times, RAGStage.EMBEDDING_GENERATION, self._generate_embedding(user_query)
+        )
+        
+        # A near-duplicate question was already answered
+        cached_answer = await self._timed(
+            stage_times, RAGStage.ANSWER_CACHE,
+            sync_to_async(semantic_answer_cache.lookup)(self.chatbot_id, query_embedding, answer_scope)
+        )
+        track_metric("rag.answer_cache.hit", 1 if cached_answer is not None else 0)
+        if cached_answer is not None:
+            return query_embedding, cached_answer, [], None
+        
+        # Stage 2: Vector search with privacy filtering (Layer 1)
+        search_results = await self._timed(
+            stage_times, RAGStage.VECTOR_SEARCH,
+            self.vector_search.search(
+                query_embedding=query_embedding,
+                query_text=user_query,
+                user_id=user_id,
+                top_k=10,
+                filter_citable=False,  # Get both citable and private for context
+                score_threshold=0.7
+            )
+        )
+        
+        # Stage 3: Build context with privacy separation
+        stage_start = time.time()
+        context = self.context_builder.build_context(
+            search_results=search_results,
+            query=user_query,
+            include_private=True,  # Include private for reasoning, not citation
+            ranking_strategy=RankingStrategy.HYBRID,
+            enable_diversity=True
+        )
+        stage_times[RAGStage.CONTEXT_BUILDING.value] = time.time() - stage_start
+        
+        return query_embedding, None, search_results, context
+    
+    def _cached_response(
+        self,
+        answer: CachedAnswer,
+        user_query: str,
+        conversation_id: Optional[str],
+        stage_times: Dict[str, float],
+        start_time: float
+    ) -> RAGResponse:
+        """Respond with a cached answer; it is saved to the conversation like a generated one."""
+        if conversation_id:
+            context = ContextData(
+                full_context="",
+                citable_sources=list(answer.citable_sources),
+                private_sources=[],
+                token_count=0,
+                total_sources=answer.citable_count + answer.private_count,
+                citable_count=answer.citable_count,
+                private_count=answer.private_count,
+                context_score=answer.context_score,
+                search_metadata={"answer_cache": "hit", "cached_query": answer.query}
+            )
+            self._schedule_conversation_save(conversation_id, user_query, answer.content, context)
+        
+        total_time = time.time() - start_time
+        track_metric("rag.answer_cache.saved_cost_usd", answer.estimated_cost)
+        track_metric("rag.pipeline.total_time", total_time)
+        logger.info(
+            f"RAG pipeline answered from cache in {total_time:.3f}s: "
+            f"saved ${answer.estimated_cost:.4f}"
+        )
+        
+        return RAGResponse(
+            content=answer.content,
+            citations=list(answer.citations),
+            privacy_compliant=True,
+            privacy_violations=0,
+            total_time=total_time,
+            stage_times=stage_times,
+            input_tokens=0,
+            output_tokens=0,
+            estimated_cost=0.0,
+            sources_used=answer.sources_used,
+            citable_sources=answer.citable_count,
+            private_sources=answer.private_count,
+            context_score=answer.context_score,
+            response_quality_score=answer.response_quality_score,
+            user_satisfaction_predicted=min(answer.response_quality_score * 1.2, 1.0)
+        )
+    
+    @staticmethod
+    async def _timed(stage_times: Dict[str, float], stage: RAGStage, awaitable: Awaitable):
+        """Await a stage and record its duration."""
+        stage_start = time.time()
+        try:
+            return await awaitable
+        finally:
+            stage_times[stage.value] = time.time() - stage_start
+    
+    @staticmethod
+    async def _run_concurrently(*awaitables: Awaitable) -> List[Any]:
+        """Run independent stages together; if one fails the others are cancelled."""
+        tasks = [asyncio.ensure_future(awaitable) for awaitable in awaitables]
+        try:
+            return await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            raise
+    
     async def _generate_embedding(self, query: str) -> List[float]:
-        """Generate embedding for query."""
+        """Generate embedding for query with the active index's model."""
         try:
+            active_index = await aget_active_index(self.chatbot_id)
+            if active_index.version > 1:
+                if self._index_embedding_service is None or self._index_embedding_service[0] != active_index:
+                    self._index_embedding_service = (
+                        active_index, OpenAIEmbeddingService(active_index.embedding_config())
+                    )
+                return await self._index_embedding_service[1].generate_embedding(query)
             return await self.embedding_service.generate_embedding(query)
         except Exception as e:
             logger.error(f"Embedding generation failed: {str(e)}")
@@ -485,19 +699,9 @@ class RAGPipeline:
     
     async def _get_default_chatbot_config(self) -> ChatbotConfig:
         """Get default chatbot configuration."""
-        from asgiref.sync import sync_to_async
-        
         try:
-            chatbot = await sync_to_async(Chatbot.objects.get)(id=self.chatbot_id)
-            return ChatbotConfig(
-                name=chatbot.name,
-                description=chatbot.description or "AI Assistant",
-                company_name=getattr(chatbot.user, 'organization', {}).get('name', 'our company'),
-                temperature=0.7,
-                max_response_tokens=500,
-                strict_citation_mode=True,
-                allow_private_reasoning=True
-            )
+            snapshot = await _concurrent_db_call(chatbot_config_cache.get_by_id)(self.chatbot_id)
+            return snapshot.chatbot_config()
         except Exception as e:
             logger.warning(f"Failed to get chatbot config: {str(e)}")
             return ChatbotConfig(
@@ -506,7 +710,27 @@ class RAGPipeline:
                 company_name="our company"
             )
     
-    async def _save_conversation_messages(
+    def _schedule_conversation_save(
+        self,
+        conversation_id: str,
+        user_query: str,
+        response: str,
+        context: ContextData
+    ) -> Future:
+        """Write both messages on the persistence executor, in order per conversation."""
+        future = _submit_conversation_write(
+            conversation_id, self._save_conversation_messages, conversation_id, user_query, response, context
+        )
+        self._pending_writes.add(future)
+        future.add_done_callback(self._pending_writes.discard)
+        return future
+    
+    def wait_for_pending_writes(self, timeout: Optional[float] = None) -> None:
+        """Block until scheduled conversation writes have finished (shutdown, tests)."""
+        for future in list(self._pending_writes):
+            future.result(timeout=timeout)
+    
+    def _save_conversation_messages(
         self,
         conversation_id: str,
         user_query: str,
@@ -514,16 +738,9 @@ class RAGPipeline:
         context: ContextData
     ):
         """Save messages to conversation history."""
-        from asgiref.sync import sync_to_async
+        stage_start = time.time()
         
         try:
-            # Save user message using sync_to_async
-            await sync_to_async(ConversationManager.add_message)(
-                conversation_id=conversation_id,
-                role="user",
-                content=user_query
-            )
-            
             # Save assistant response with source metadata
             sources_metadata = [
                 {
@@ -535,23 +752,33 @@ class RAGPipeline:
                 for source in context.citable_sources
             ]
             
-            await sync_to_async(ConversationManager.add_message)(
-                conversation_id=conversation_id,
-                role="assistant",
-                content=response,
-                sources_used=[s["source_id"] for s in sources_metadata],
-                metadata={
-                    "sources": sources_metadata,
-                    "context_score": context.context_score,
-                    "token_count": context.token_count
-                }
-            )
+            # One transaction keeps the pair's sequence numbers together
+            with transaction.atomic():
+                ConversationManager.add_message(
+                    conversation_id=conversation_id,
+                    role="user",
+                    content=user_query
+                )
+                ConversationManager.add_message(
+                    conversation_id=conversation_id,
+                    role="assistant",
+                    content=response,
+                    sources_used=[s["source_id"] for s in sources_metadata],
+                    metadata={
+                        "sources": sources_metadata,
+                        "context_score": context.context_score,
+                        "token_count": context.token_count
+                    }
+                )
             
+            self.metrics.track_query_latency("conversation_write", (time.time() - stage_start) * 1000)
             logger.info(f"Successfully saved conversation messages to {conversation_id}")
             
         except Exception as e:
             logger.error(f"Failed to save conversation: {str(e)}")
             # Don't raise - conversation saving shouldn't break pipeline
+        finally:
+            close_old_connections()
     
     def _is_simple_query(self, query: str) -> bool:
         """
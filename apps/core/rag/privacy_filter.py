@@ -10,7 +10,9 @@ All responses must pass through this filter before being returned to users.
 
 import re
 import logging
-from typing import List, Dict, Any, Optional, Set
+import threading
+from collections import OrderedDict, deque
+from typing import Deque, FrozenSet, Iterable, List, Dict, Any, Optional, Set, Tuple
 from dataclasses import dataclass
 from enum import Enum
 
@@ -50,13 +52,65 @@ class FilterResult:
     filter_time: float
 
 
+# Patterns for values that identify a private source when repeated in a response
+UNIQUE_PATTERNS = [
+    re.compile(r'\b[A-Z]{2,}\d{3,}\b'),  # Codes like ABC123
+    re.compile(r'\b\d{3}-\d{2}-\d{4}\b'),  # SSN-like patterns
+    re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'),  # Emails
+    re.compile(r'\b\$\d{1,3}(?:,\d{3})*(?:\.\d{2})?\b'),  # Currency amounts
+]
+
+# Common PII patterns
+PII_PATTERNS = {
+    "phone": re.compile(r'\b(?:\+?1[-.\s]?)?\(?[0-9]{3}\)?[-.\s]?[0-9]{3}[-.\s]?[0-9]{4}\b'),
+    "credit_card": re.compile(r'\b(?:4[0-9]{12}(?:[0-9]{3})?|5[1-5][0-9]{14}|3[47][0-9]{13}|3[0-9]{13}|6(?:011|5[0-9]{2})[0-9]{12})\b'),
+    "address": re.compile(r'\b\d+\s+[A-Za-z\s]+(?:Street|St|Avenue|Ave|Road|Rd|Drive|Dr|Lane|Ln|Boulevard|Blvd)\b'),
+}
+
+WORD_PATTERN = re.compile(r'\w+')
+SHINGLE_WORDS = 5  # Words in a phrase that counts as a direct quote
+MIN_SHINGLE_CHARS = 20  # Skip very short phrases
+FINGERPRINT_CACHE_SIZE = 2048  # Private chunks fingerprinted per process
+
+
+@dataclass(frozen=True)
+class TextFingerprint:
+    """Everything leak detection compares, extracted from a text once."""
+    shingles: Dict[str, int]  # Lowercased 5-word phrase -> first word position
+    identifiers: FrozenSet[str]
+    pii_types: FrozenSet[str]
+    
+    @classmethod
+    def from_text(cls, text: str) -> 'TextFingerprint':
+        words = WORD_PATTERN.findall(text.lower())
+        shingles = {}
+        for i in range(len(words) - SHINGLE_WORDS + 1):
+            phrase = " ".join(words[i:i + SHINGLE_WORDS])
+            if len(phrase) >= MIN_SHINGLE_CHARS:
+                shingles.setdefault(phrase, i)
+        
+        return cls(
+            shingles=shingles,
+            identifiers=frozenset(match for pattern in UNIQUE_PATTERNS for match in pattern.findall(text)),
+            pii_types=frozenset(name for name, pattern in PII_PATTERNS.items() if pattern.search(text)),
+        )
+
+
 class PrivateContentDetector:
     """ML-based detector for private content leaks."""
     
-    def __init__(self):
-        """Initialize content detector."""
+    def __init__(self, cache_size: int = FINGERPRINT_CACHE_SIZE):
+        """
+        Initialize content detector.
+        
+        Args:
+            cache_size: Private source fingerprints kept, keyed by chunk id
+        """
         self.min_phrase_length = 3
         self.similarity_threshold = 0.8
+        self.cache_size = cache_size
+        self._fingerprints: 'OrderedDict[Tuple[str, int], TextFingerprint]' = OrderedDict()
+        self._lock = threading.Lock()
     
     def detect_leak(
         self,
@@ -67,6 +121,9 @@ class PrivateContentDetector:
         """
         Detect potential private content leaks using pattern matching.
         
+        The response is fingerprinted once; each private source is then
+        checked with set intersections against its cached fingerprint.
+        
         Args:
             response: Generated response to check
             context: Context data with private sources
@@ -80,120 +137,256 @@ class PrivateContentDetector:
         if not context.private_sources:
             return violations
         
-        response_lower = response.lower()
+        response_fingerprint = TextFingerprint.from_text(response)
         
         for source in context.private_sources:
             if not source.content:
                 continue
+            source_fingerprint = self.fingerprint(source)
             
             # Check for direct quotes or near-exact matches
             violations.extend(
-                self._check_direct_quotes(response, source, confidence_threshold)
+                self._check_direct_quotes(response_fingerprint, source_fingerprint, source)
             )
             
             # Check for unique phrases
             violations.extend(
-                self._check_unique_phrases(response, source, confidence_threshold)
+                self._check_unique_phrases(response_fingerprint, source_fingerprint, source)
             )
             
             # Check for identifiable information
             violations.extend(
-                self._check_identifiable_info(response, source, confidence_threshold)
+                self._check_identifiable_info(response_fingerprint, source_fingerprint, source)
             )
         
         return violations
     
+    def fingerprint(self, source) -> TextFingerprint:
+        """Fingerprint of a private source, computed once per chunk."""
+        # Content is part of the key in case a chunk is truncated or reprocessed
+        key = (source.source_id, hash(source.content))
+        with self._lock:
+            fingerprint = self._fingerprints.get(key)
+            if fingerprint is not None:
+                self._fingerprints.move_to_end(key)
+                return fingerprint
+        
+        fingerprint = TextFingerprint.from_text(source.content)
+        with self._lock:
+            self._fingerprints[key] = fingerprint
+            while len(self._fingerprints) > self.cache_size:
+                self._fingerprints.popitem(last=False)
+        return fingerprint
+    
     def _check_direct_quotes(
         self,
-        response: str,
-        source,
-        threshold: float
+        response: TextFingerprint,
+        source_fingerprint: TextFingerprint,
+        source
     ) -> List[PrivacyViolation]:
         """Check for direct quotes from private sources."""
-        violations = []
-        
-        # Look for phrases of 5+ words
-        source_words = source.content.split()
-        if len(source_words) < 5:
-            return violations
-        
-        for i in range(len(source_words) - 4):
-            phrase = " ".join(source_words[i:i+5])
-            if len(phrase) < 20:  # Skip very short phrases
-                continue
-            
-            if phrase.lower() in response.lower():
-                violations.append(PrivacyViolation(
-                    violation_type=ViolationType.PRIVATE_CONTENT_LEAK,
-                    description=f"Direct quote from private source detected: '{phrase[:50]}...'",
-                    confidence=0.95,
-                    location=f"Source: {source.source_id}",
-                    suggested_replacement="[Information removed for privacy]"
-                ))
-        
-        return violations
+        quoted = source_fingerprint.shingles.keys() & response.shingles.keys()
+        
+        return [
+            PrivacyViolation(
+                violation_type=ViolationType.PRIVATE_CONTENT_LEAK,
+                description=f"Direct quote from private source detected: '{phrase[:50]}...'",
+                confidence=0.95,
+                location=f"Source: {source.source_id}",
+                suggested_replacement="[Information removed for privacy]"
+            )
+            for phrase in sorted(quoted, key=source_fingerprint.shingles.get)
+        ]
     
     def _check_unique_phrases(
         self,
-        response: str,
-        source,
-        threshold: float
+        response: TextFingerprint,
+        source_fingerprint: TextFingerprint,
+        source
     ) -> List[PrivacyViolation]:
         """Check for unique phrases that might identify private content."""
-        violations = []
-        
-        # Extract potential unique identifiers
-        unique_patterns = [
-            r'\b[A-Z]{2,}\d{3,}\b',  # Codes like ABC123
-            r'\b\d{3}-\d{2}-\d{4}\b',  # SSN-like patterns
-            r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b',  # Emails
-            r'\b\$\d{1,3}(?:,\d{3})*(?:\.\d{2})?\b',  # Currency amounts
+        common_matches = source_fingerprint.identifiers & response.identifiers
+        
+        return [
+            PrivacyViolation(
+                violation_type=ViolationType.PRIVATE_CONTENT_LEAK,
+                description=f"Unique identifier from private source: {match}",
+                confidence=0.9,
+                location=f"Source: {source.source_id}",
+                suggested_replacement="[REDACTED]"
+            )
+            for match in sorted(common_matches)
         ]
-        
-        for pattern in unique_patterns:
-            matches_source = re.findall(pattern, source.content)
-            matches_response = re.findall(pattern, response)
-            
-            common_matches = set(matches_source).intersection(set(matches_response))
-            
-            for match in common_matches:
-                violations.append(PrivacyViolation(
-                    violation_type=ViolationType.PRIVATE_CONTENT_LEAK,
-                    description=f"Unique identifier from private source: {match}",
-                    confidence=0.9,
-                    location=f"Source: {source.source_id}",
-                    suggested_replacement="[REDACTED]"
-                ))
-        
-        return violations
     
     def _check_identifiable_info(
         self,
-        response: str,
-        source,
-        threshold: float
+        response: TextFingerprint,
+        source_fingerprint: TextFingerprint,
+        source
     ) -> List[PrivacyViolation]:
         """Check for personally identifiable information."""
-        violations = []
+        return [
+            PrivacyViolation(
+                violation_type=ViolationType.PRIVATE_CONTENT_LEAK,
+                description=f"Potential {pii_type} leaked from private source",
+                confidence=0.8,
+                location=f"Source: {source.source_id}",
+                suggested_replacement=f"[{pii_type.upper()} REDACTED]"
+            )
+            for pii_type in PII_PATTERNS
+            if pii_type in source_fingerprint.pii_types and pii_type in response.pii_types
+        ]
+
+
+class StreamingLeakDetector:
+    """
+    Incremental detector for private content in streamed responses.
+    
+    Every run of ``ngram_words`` consecutive words in the private sources is
+    indexed once, by a polynomial rolling hash over word hashes. ``feed``
+    then tokenizes only the new delta, carrying over the unfinished last
+    word and the previous ``ngram_words - 1`` words, so each delta costs
+    time proportional to its own length rather than the whole response.
+    A word is only matched once something follows it, so a prefix of a
+    longer word is never flagged. Until then it is held back, so callers
+    send only what ``feed`` returns; ``finish`` screens and releases the
+    final word.
+    Private sources shorter than one n-gram are matched whole.
+    """
+    
+    PRIVATE_MARKER = "[private]"
+    _BASE = 1000003
+    _MOD = (1 << 61) - 1
+    
+    def __init__(
+        self,
+        private_texts: Iterable[str],
+        ngram_words: int = SHINGLE_WORDS,
+        min_chars: int = MIN_SHINGLE_CHARS
+    ):
+        """
+        Build the n-gram index.
+        
+        Args:
+            private_texts: Content that must not appear in responses
+            ngram_words: Consecutive words that count as a leak
+            min_chars: Shorter phrases are too common to count
+        """
+        self.ngram_words = ngram_words
+        self._top_power = pow(self._BASE, ngram_words - 1, self._MOD)
+        self._index: Dict[int, Set[Tuple[str, ...]]] = {}
+        self._short: Set[Tuple[str, ...]] = set()
+        
+        for text in private_texts:
+            words = WORD_PATTERN.findall((text or "").lower())
+            if len(words) < ngram_words:
+                if words and len(" ".join(words)) >= min_chars:
+                    self._short.add(tuple(words))
+                continue
+            for i in range(len(words) - ngram_words + 1):
+                gram = tuple(words[i:i + ngram_words])
+                if len(" ".join(gram)) >= min_chars:
+                    self._index.setdefault(self._hash(gram), set()).add(gram)
+        self._short_sizes = sorted({len(words) for words in self._short})
+        
+        # Carry-over between deltas
+        self._window: Deque[Tuple[str, int]] = deque(maxlen=ngram_words)
+        self._window_hash = 0
+        self._held = ""  # Unfinished last word, not yet returned by ``feed``
+        self._tail = ""
+        self.leak: Optional[str] = None
+    
+    @classmethod
+    def for_context(cls, context: ContextData, **kwargs) -> 'StreamingLeakDetector':
+        """Detector for the private sources of a pipeline context."""
+        return cls((source.content for source in context.private_sources), **kwargs)
+    
+    @property
+    def indexed_phrases(self) -> int:
+        return sum(len(grams) for grams in self._index.values()) + len(self._short)
+    
+    def feed(self, delta: str) -> str:
+        """
+        Scan the next piece of a streamed response.
         
-        # Common PII patterns
-        pii_patterns = {
-            "phone": r'\b(?:\+?1[-.\s]?)?\(?[0-9]{3}\)?[-.\s]?[0-9]{3}[-.\s]?[0-9]{4}\b',
-            "credit_card": r'\b(?:4[0-9]{12}(?:[0-9]{3})?|5[1-5][0-9]{14}|3[47][0-9]{13}|3[0-9]{13}|6(?:011|5[0-9]{2})[0-9]{12})\b',
-            "address": r'\b\d+\s+[A-Za-z\s]+(?:Street|St|Avenue|Ave|Road|Rd|Drive|Dr|Lane|Ln|Boulevard|Blvd)\b'
-        }
+        A word running up to the end of the delta may continue in the next
+        one, so it is held back until a boundary follows it (or ``finish``).
+        Once a leak is seen it is recorded on ``leak`` and nothing is
+        returned until ``clear_leak``.
         
-        for pii_type, pattern in pii_patterns.items():
-            if re.search(pattern, source.content) and re.search(pattern, response):
-                violations.append(PrivacyViolation(
-                    violation_type=ViolationType.PRIVATE_CONTENT_LEAK,
-                    description=f"Potential {pii_type} leaked from private source",
-                    confidence=0.8,
-                    location=f"Source: {source.source_id}",
-                    suggested_replacement=f"[{pii_type.upper()} REDACTED]"
-                ))
+        Returns:
+            str: The text that has been fully checked and is safe to send
+        """
+        if self.leak:
+            return ""
+        
+        marked = self._tail + delta.lower()
+        if self.PRIVATE_MARKER in marked:
+            self.leak = self.PRIVATE_MARKER
+        self._tail = marked[-(len(self.PRIVATE_MARKER) - 1):]
+        
+        if not self._index and not self._short:
+            return "" if self.leak else delta
+        
+        text = self._held + delta
+        words = list(WORD_PATTERN.finditer(text))
+        release = len(text)
+        if words and words[-1].end() == len(text):
+            release = words.pop().start()
+        self._held = text[release:]
+        # Every word goes into the window, even past a leak, so screening
+        # can carry on after ``clear_leak``
+        for word in words:
+            self._push(word.group().lower())
+        
+        return "" if self.leak else text[:release]
+    
+    def finish(self) -> str:
+        """
+        Screen the word the response ended on, once the stream is done.
         
-        return violations
+        Returns:
+            str: The held-back text, if it is safe to send
+        """
+        held, self._held = self._held, ""
+        if self.leak:
+            return ""
+        if held:
+            self._push(held.lower())
+        return "" if self.leak else held
+    
+    def clear_leak(self) -> None:
+        """Forget the reported leak, so later deltas are screened again."""
+        self.leak = None
+    
+    def _push(self, word: str) -> None:
+        word_hash = hash(word) & self._MOD
+        if len(self._window) == self.ngram_words:
+            self._window_hash = (self._window_hash - self._window[0][1] * self._top_power) % self._MOD
+        self._window_hash = (self._window_hash * self._BASE + word_hash) % self._MOD
+        self._window.append((word, word_hash))
+        if self.leak:
+            return
+        if len(self._window) == self.ngram_words:
+            self._match(self._window_hash, tuple(w for w, _ in self._window))
+        self._match_short(tuple(w for w, _ in self._window))
+    
+    def _match(self, window_hash: int, gram: Tuple[str, ...]) -> None:
+        candidates = self._index.get(window_hash)
+        if candidates and gram in candidates:
+            self.leak = " ".join(gram)
+    
+    def _match_short(self, words: Tuple[str, ...]) -> None:
+        for size in self._short_sizes:
+            if len(words) >= size and words[-size:] in self._short:
+                self.leak = " ".join(words[-size:])
+                return
+    
+    def _hash(self, words: Tuple[str, ...]) -> int:
+        value = 0
+        for word in words:
+            value = (value * self._BASE + (hash(word) & self._MOD)) % self._MOD
+        return value
 
 
 class ResponseSanitizer:
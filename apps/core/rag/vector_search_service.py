@@ -9,8 +9,11 @@ CRITICAL: This service enforces privacy filtering at multiple layers.
 
 import time
 import logging
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
 from dataclasses import dataclass
+import numpy as np
+from asgiref.sync import sync_to_async
+from django.apps import apps as django_apps
 
 from apps.core.vector_search import (
     VectorSearchEngine, 
@@ -21,6 +24,8 @@ from apps.core.vector_search import (
     SearchResultWithCitation
 )
 from apps.core.vector_storage import create_vector_storage
+from apps.core.lexical_search import LexicalMatch, lexical_index, reciprocal_rank_fusion
+from apps.core.reindexing import aget_active_index
 from apps.core.embedding_service import OpenAIEmbeddingService
 from apps.core.document_processing import PrivacyLevel
 from apps.core.monitoring import track_metric
@@ -41,6 +46,7 @@ class SearchResult:
     is_citable: bool
     citation_text: Optional[str] = None
     metadata: Dict[str, Any] = None
+    embedding: Optional[List[float]] = None  # Chunk embedding, for diversity selection
 
 
 class VectorSearchService:
@@ -69,8 +75,13 @@ class VectorSearchService:
         # Vector storage will be initialized lazily on first search
         self.vector_storage = None
         self.rag_search_service = None
+        self.search_engine = None
         self._initialization_lock = False
         
+        # Storage for a re-indexed chatbot's active version, keyed by
+        # (version, dimensions) and reused like ``vector_storage`` is for v1
+        self._index_storage: Dict[Tuple[int, int], Any] = {}
+        
         logger.info(f"Initialized VectorSearchService for chatbot {chatbot_id}")
     
     async def _ensure_initialized(self):
@@ -92,6 +103,19 @@ class VectorSearchService:
             finally:
                 self._initialization_lock = False
     
+    async def _index_vector_storage(self, active_index):
+        """Vector storage for the active index version, created once per version."""
+        if active_index.version <= 1:
+            return self.vector_storage
+        
+        key = (active_index.version, active_index.dimensions)
+        storage = self._index_storage.get(key)
+        if storage is None:
+            storage = await active_index.vector_storage()
+            # Only the active version is searched; drop storage for retired ones
+            self._index_storage = {key: storage}
+        return storage
+    
     async def search(
         self,
         query_embedding: List[float],
@@ -100,11 +124,15 @@ class VectorSearchService:
         top_k: int = 5,
         filter_citable: bool = True,
         score_threshold: float = 0.7,
-        enable_reranking: bool = True
+        enable_reranking: bool = True,
+        hybrid: Optional[bool] = None
     ) -> List[SearchResult]:
         """
         Search for similar vectors with privacy filtering.
         
+        Full-text matches for the query text are fused into the vector
+        results unless hybrid search is disabled.
+        
         Args:
             query_embedding: Query embedding vector
             query_text: Original query text for reranking  
@@ -113,6 +141,7 @@ class VectorSearchService:
             filter_citable: If True, only return citable sources
             score_threshold: Minimum similarity score
             enable_reranking: Whether to enable semantic reranking
+            hybrid: Fuse in full-text matches; defaults to HYBRID_SEARCH_ENABLED
             
         Returns:
             List[SearchResult]: Privacy-filtered search results
@@ -130,20 +159,22 @@ class VectorSearchService:
         start_time = time.time()
         
         try:
-            # Use vector storage service directly for search
-            namespace = f"chatbot_{self.chatbot_id}"
+            # Search the chatbot's active index version (see apps.core.reindexing)
+            active_index = await aget_active_index(self.chatbot_id)
+            namespace = active_index.namespace
+            vector_storage = await self._index_vector_storage(active_index)
             
             # Choose search method based on privacy requirements
             if filter_citable:
                 # Only citable content for citations
-                vector_results = await self.vector_storage.search_citable_only(
+                vector_results = await vector_storage.search_citable_only(
                     query_vector=query_embedding,
                     top_k=top_k,
                     namespace=namespace
                 )
             else:
                 # All content (including learn-only for context)
-                vector_results = await self.vector_storage.search_all_content(
+                vector_results = await vector_storage.search_all_content(
                     query_vector=query_embedding,
                     top_k=top_k,
                     namespace=namespace
@@ -173,6 +204,13 @@ class VectorSearchService:
                 )
                 simple_results.append(simple_result)
             
+            if (settings.HYBRID_SEARCH_ENABLED if hybrid is None else hybrid) and query_text:
+                simple_results = await self._fuse_lexical_matches(
+                    simple_results, query_embedding, query_text, top_k, filter_citable, active_index
+                )
+            
+            await self._attach_stored_embeddings(simple_results, active_index)
+            
             search_time = time.time() - start_time
             
             # Track metrics
@@ -191,6 +229,136 @@ class VectorSearchService:
             logger.error(f"Vector search failed for chatbot {self.chatbot_id}: {str(e)}")
             raise
     
+    async def _fuse_lexical_matches(
+        self,
+        vector_results: List[SearchResult],
+        query_embedding: List[float],
+        query_text: str,
+        top_k: int,
+        filter_citable: bool,
+        active_index
+    ) -> List[SearchResult]:
+        """
+        Merge full-text matches into vector results by reciprocal rank fusion.
+        
+        Scores stay cosine similarities: chunks only found by full-text search
+        are scored against their stored embedding. Every result records its
+        full-text score, relative to the best match, as ``lexical_score``.
+        """
+        try:
+            matches = await lexical_index.asearch(
+                self.chatbot_id, query_text, top_k=top_k, citable_only=filter_citable
+            )
+        except Exception as e:
+            logger.warning(f"Lexical search failed for chatbot {self.chatbot_id}: {str(e)}")
+            return vector_results
+        
+        track_metric("vector_search.lexical_count", len(matches))
+        if not matches:
+            return vector_results
+        
+        best = matches[0].score
+        lexical_scores = {match.chunk_id: match.score / best if best > 0 else 1.0 for match in matches}
+        
+        results_by_id = {result.chunk_id: result for result in vector_results}
+        new_matches = [match for match in matches if match.chunk_id not in results_by_id]
+        if new_matches:
+            embeddings = await sync_to_async(self._stored_embeddings)(
+                [match.chunk_id for match in new_matches], active_index
+            )
+            floor = min((result.score for result in vector_results), default=0.0)
+            for match in new_matches:
+                results_by_id[match.chunk_id] = self._lexical_result(
+                    match, query_embedding, embeddings.get(match.chunk_id), floor
+                )
+        
+        fused = reciprocal_rank_fusion([
+            [result.chunk_id for result in vector_results],
+            [match.chunk_id for match in matches]
+        ])
+        
+        fused_results = []
+        for chunk_id, rrf_score in fused[:top_k]:
+            result = results_by_id[chunk_id]
+            result.metadata = {
+                **(result.metadata or {}),
+                'lexical_score': lexical_scores.get(chunk_id, 0.0),
+                'rrf_score': rrf_score
+            }
+            fused_results.append(result)
+        
+        return fused_results
+    
+    def _lexical_result(
+        self,
+        match: LexicalMatch,
+        query_embedding: List[float],
+        embedding: Optional[List[float]],
+        floor: float
+    ) -> SearchResult:
+        """Search result for a chunk found only by full-text search."""
+        if embedding is not None:
+            query = np.asarray(query_embedding, dtype=np.float32)
+            chunk = np.asarray(embedding, dtype=np.float32)
+            norms = float(np.linalg.norm(query) * np.linalg.norm(chunk))
+            score = float(query @ chunk) / norms if norms else floor
+        else:
+            score = floor
+        
+        metadata = {
+            'source_id': match.source_id,
+            'is_citable': match.is_citable,
+            'chunk_index': match.chunk_index,
+            'content': match.content
+        }
+        if match.token_count:
+            metadata['token_count'] = match.token_count
+        
+        return SearchResult(
+            content=match.content,
+            score=score,
+            chunk_id=match.chunk_id,
+            document_id=match.source_id,
+            knowledge_base_id=self.chatbot_id,
+            is_citable=match.is_citable,
+            citation_text=match.content,
+            metadata=metadata,
+            embedding=embedding
+        )
+    
+    async def _attach_stored_embeddings(self, results: List[SearchResult], active_index) -> None:
+        """
+        Fill in result embeddings, for diversity selection, from the chunk rows.
+        
+        The vector store isn't asked for them: only the final candidates
+        need one, and cached search results stay small.
+        """
+        missing = [result.chunk_id for result in results if result.embedding is None]
+        if not missing:
+            return
+        try:
+            embeddings = await sync_to_async(self._stored_embeddings)(missing, active_index)
+        except Exception as e:
+            # Results without embeddings keep their ranking
+            logger.warning(f"Loading chunk embeddings failed for chatbot {self.chatbot_id}: {str(e)}")
+            return
+        for result in results:
+            if result.embedding is None:
+                result.embedding = embeddings.get(result.chunk_id)
+    
+    @staticmethod
+    def _stored_embeddings(chunk_ids: List[str], active_index) -> Dict[str, List[float]]:
+        """Stored chunk embeddings made with the active index's model."""
+        KnowledgeChunk = django_apps.get_model('knowledge', 'KnowledgeChunk')
+        rows = KnowledgeChunk.objects.filter(
+            id__in=chunk_ids, embedding_model=active_index.embedding_model
+        ).values_list('id', 'embedding_vector')
+        return {
+            str(chunk_id): embedding
+            for chunk_id, embedding in rows
+            if embedding and len(embedding) == active_index.dimensions
+        }
+    
     async def search_with_query_text(
         self,
         query_text: str,
@@ -264,9 +432,10 @@ class VectorSearchService:
             require_citations=filter_citable
         )
         
-        # Perform hybrid search using existing engine
-        search_engine = VectorSearchEngine(self.vector_storage)
-        detailed_results = await search_engine.hybrid_search(
+        # Perform hybrid search using existing engine, reused across calls
+        if self.search_engine is None or self.search_engine.vector_store is not self.vector_storage:
+            self.search_engine = VectorSearchEngine(self.vector_storage)
+        detailed_results = await self.search_engine.hybrid_search(
             query_vector=query_embedding,
             query_text=query_text,
             context=search_context,
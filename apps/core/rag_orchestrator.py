@@ -9,11 +9,12 @@ import asyncio
 import time
 import json
 import hashlib
-from typing import Dict, List, Optional, Any, Tuple
+from typing import AsyncIterator, Dict, List, Optional, Any, Tuple, Union
 from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
 import structlog
+from openai import AsyncOpenAI
 
 from django.core.cache import cache
 from django.conf import settings as django_settings
@@ -21,6 +22,9 @@ from django.conf import settings as django_settings
 from apps.core.vector_storage import VectorStorageService, VectorStorageConfig
 from apps.core.embedding_service import OpenAIEmbeddingService
 from apps.core.exceptions import RAGError, VectorStorageError
+from apps.core.monitoring import track_metric
+from apps.core.rag.context_builder import TokenCounter, pack_within_budget
+from apps.core.rag.privacy_filter import StreamingLeakDetector
 from chatbot_saas.config import get_settings
 
 settings = get_settings()
@@ -227,7 +231,8 @@ class ContextAssembler:
                 'chunk_id': result.get('id', ''),
                 'document_id': metadata.get('document_id', ''),
                 'knowledge_base_id': metadata.get('knowledge_base_id', ''),
-                'citation': self._generate_citation(metadata)
+                'citation': self._generate_citation(metadata),
+                'token_count': metadata.get('token_count')  # Counted at ingest
             }
             
             if is_citable:
@@ -311,48 +316,35 @@ class ContextAssembler:
         private_sources: List[Dict[str, Any]]
     ) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]], int, bool]:
         """Fit sources within token limit, prioritizing citable sources."""
-        # Simple token estimation: 4 characters per token
-        def estimate_tokens(text: str) -> int:
-            return len(text) // 4
-        
-        final_citable = []
-        final_private = []
-        total_tokens = 0
-        truncated = False
-        
-        # Add citable sources first (higher priority)
-        for source in citable_sources:
-            content = source['content']
-            tokens = estimate_tokens(content)
-            
-            if total_tokens + tokens <= self.max_tokens:
-                final_citable.append(source)
-                total_tokens += tokens
-            else:
-                truncated = True
-                break
+        def pack(sources, budget):
+            costs = [TokenCounter.count_source_tokens(source['content'], source) for source in sources]
+            chosen = pack_within_budget(costs, [source['score'] for source in sources], budget)
+            return [sources[i] for i in chosen], sum(costs[i] for i in chosen)
         
-        # Add private sources if space remains
-        for source in private_sources:
-            content = source['content']
-            tokens = estimate_tokens(content)
-            
-            if total_tokens + tokens <= self.max_tokens:
-                final_private.append(source)
-                total_tokens += tokens
-            else:
-                truncated = True
-                break
+        # Citable sources get the whole budget first (higher priority)
+        final_citable, citable_tokens = pack(citable_sources, self.max_tokens)
+        
+        # Private sources fill the space that remains
+        final_private, private_tokens = pack(private_sources, self.max_tokens - citable_tokens)
         
-        return final_citable, final_private, total_tokens, truncated
+        truncated = len(final_citable) + len(final_private) < len(citable_sources) + len(private_sources)
+        return final_citable, final_private, citable_tokens + private_tokens, truncated
 
 
 class LLMService:
     """Handles LLM interactions with cost tracking."""
     
+    MODEL = "gpt-3.5-turbo"
+    
     def __init__(self):
         self.logger = structlog.get_logger().bind(component="LLMService")
         self.cost_tracker = CostTracker()
+        
+        api_key = getattr(settings, 'OPENAI_API_KEY', None)
+        if api_key and api_key.startswith('sk-') and not api_key.startswith('sk-your'):
+            self.client = AsyncOpenAI(api_key=api_key, timeout=settings.OPENAI_TIMEOUT)
+        else:
+            self.client = None  # Mock responses
     
     async def generate_response(
         self,
@@ -361,20 +353,42 @@ class LLMService:
         query_analysis: Dict[str, Any]
     ) -> RAGResponse:
         """Generate response using LLM with context."""
+        response = None
+        async for item in self.stream_response(query, context, query_analysis):
+            if isinstance(item, RAGResponse):
+                response = item
+        return response
+    
+    async def stream_response(
+        self,
+        query: RAGQuery,
+        context: RAGContext,
+        query_analysis: Dict[str, Any]
+    ) -> AsyncIterator[Union[str, RAGResponse]]:
+        """
+        Generate response using LLM with context, as it is produced.
+        
+        Yields:
+            Text deltas as the LLM returns them, then the complete RAGResponse
+        """
         start_time = time.time()
         
         # Build prompt
         prompt = self._build_prompt(query, context, query_analysis)
         
-        # Call LLM (mock implementation for now)
-        response_text, token_usage = await self._call_llm(prompt, query.temperature)
+        parts = []
+        token_usage = {}
+        async for delta in self._stream_llm(prompt, query.temperature, token_usage):
+            parts.append(delta)
+            yield delta
+        response_text = "".join(parts)
         
         # Extract citations from response
         citations = self._extract_citations(response_text, context)
         
         # Calculate costs
         cost = self.cost_tracker.calculate_cost(
-            model="gpt-3.5-turbo",  # Default model
+            model=self.MODEL,
             input_tokens=token_usage['input'],
             output_tokens=token_usage['output']
         )
@@ -387,7 +401,7 @@ class LLMService:
             context_used=context,
             metadata={
                 'query_id': query.request_id,
-                'model': 'gpt-3.5-turbo',
+                'model': self.MODEL,
                 'prompt_tokens': len(prompt) // 4,  # Rough estimate
                 'query_analysis': query_analysis
             },
@@ -406,7 +420,7 @@ class LLMService:
             cost=cost
         )
         
-        return response
+        yield response
     
     def _build_prompt(
         self,
@@ -449,14 +463,51 @@ Response:"""
         
         return prompt
     
-    async def _call_llm(self, prompt: str, temperature: float) -> Tuple[str, Dict[str, int]]:
-        """Call LLM API (mock implementation)."""
-        # Mock implementation - in production, use OpenAI API
+    async def _stream_llm(
+        self,
+        prompt: str,
+        temperature: float,
+        token_usage: Dict[str, int]
+    ) -> AsyncIterator[str]:
+        """Stream LLM output deltas; ``token_usage`` is filled in once the stream ends."""
+        if self.client is None:
+            async for delta in self._stream_mock(prompt, token_usage):
+                yield delta
+            return
+        
+        stream = await self.client.chat.completions.create(
+            model=self.MODEL,
+            messages=[{"role": "user", "content": prompt}],
+            temperature=temperature,
+            stream=True,
+            stream_options={"include_usage": True}
+        )
+        output_chars = 0
+        try:
+            async for chunk in stream:
+                if chunk.usage:
+                    token_usage['input'] = chunk.usage.prompt_tokens
+                    token_usage['output'] = chunk.usage.completion_tokens
+                if chunk.choices and chunk.choices[0].delta.content:
+                    delta = chunk.choices[0].delta.content
+                    output_chars += len(delta)
+                    yield delta
+        finally:
+            # Stops generation (and billing) when the consumer goes away early
+            await stream.close()
+        
+        # Usage is only sent at the end of a completed stream
+        token_usage.setdefault('input', len(prompt) // 4)
+        token_usage.setdefault('output', output_chars // 4)
+    
+    async def _stream_mock(self, prompt: str, token_usage: Dict[str, int]) -> AsyncIterator[str]:
+        """Mock stream used when no OpenAI key is configured."""
         await asyncio.sleep(0.1)  # Simulate API delay
         
         # Estimate token usage
         input_tokens = len(prompt) // 4
-        output_tokens = min(500, max(50, input_tokens // 3))  # Reasonable output length
+        token_usage['input'] = input_tokens
+        token_usage['output'] = min(500, max(50, input_tokens // 3))  # Reasonable output length
         
         # Mock response
         response_text = f"""Based on the provided sources, I can help answer your question.
@@ -467,10 +518,8 @@ This is a mock response that would normally be generated by the LLM using the pr
 
 The response would be tailored to the query intent and privacy mode specified."""
         
-        return response_text, {
-            'input': input_tokens,
-            'output': output_tokens
-        }
+        for line in response_text.splitlines(keepends=True):
+            yield line
     
     def _extract_citations(self, response_text: str, context: RAGContext) -> List[Dict[str, Any]]:
         """Extract citation information from response."""
@@ -529,14 +578,16 @@ class CostTracker:
 class PrivacyValidator:
     """Validates responses for privacy compliance."""
     
+    REDACTED = "[redacted]"
+    
     def __init__(self):
         self.logger = structlog.get_logger().bind(component="PrivacyValidator")
     
-    def validate_response(self, response: RAGResponse, query: RAGQuery) -> bool:
-        """Validate response meets privacy requirements."""
-        # Check for private content leakage
-        private_content_snippets = []
-        for source in response.context_used.private_sources:
+    @staticmethod
+    def private_snippets(context: RAGContext) -> List[str]:
+        """Lowercased phrases from private sources that mustn't appear in responses."""
+        snippets = []
+        for source in context.private_sources:
             content = source.get('content', '')
             # Extract key phrases that shouldn't appear in responses
             words = content.split()
@@ -544,15 +595,30 @@ class PrivacyValidator:
                 # Sample 3-word phrases as potential leakage indicators
                 for i in range(len(words) - 2):
                     phrase = ' '.join(words[i:i+3])
-                    private_content_snippets.append(phrase)
-        
+                    if len(phrase) > 10:
+                        snippets.append(phrase.lower())
+        return snippets
+    
+    @staticmethod
+    def leak_detector(context: RAGContext) -> StreamingLeakDetector:
+        """Incremental detector for the same 3-word phrases, for screening streamed deltas."""
+        return StreamingLeakDetector(
+            (source.get('content', '') for source in context.private_sources), ngram_words=3, min_chars=11
+        )
+    
+    @staticmethod
+    def find_leaks(text: str, snippets: List[str]) -> List[str]:
+        """Private snippets contained in ``text``."""
+        text_lower = text.lower()
+        return [snippet for snippet in snippets if snippet in text_lower]
+    
+    def validate_response(self, response: RAGResponse, query: RAGQuery) -> bool:
+        """Validate response meets privacy requirements."""
         # Check if response contains private content
-        response_lower = response.text.lower()
-        violations = []
-        
-        for snippet in private_content_snippets:
-            if len(snippet) > 10 and snippet.lower() in response_lower:
-                violations.append(f"Private content detected: {snippet}")
+        violations = [
+            f"Private content detected: {snippet}"
+            for snippet in self.find_leaks(response.text, self.private_snippets(response.context_used))
+        ]
         
         if violations:
             self.logger.warning(
@@ -632,6 +698,45 @@ class RAGOrchestrator:
     
     async def process_query(self, query: RAGQuery) -> RAGResponse:
         """Process a complete RAG query pipeline."""
+        response = None
+        async for event in self.stream_query(query, screen_deltas=False):
+            if event["type"] == "completed":
+                response = event["response"]
+        return response
+    
+    async def stream_query(self, query: RAGQuery, screen_deltas: bool = True) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Process a RAG query, yielding events as the pipeline progresses.
+        
+        Args:
+            query: RAG query
+            screen_deltas: Check output for private content before it is
+                sent; an unfinished last word waits for the next delta. In
+                STRICT mode the stream stops at the first leak; other modes
+                send the withheld text redacted and carry on.
+                Streamed text can't be taken back, so only callers that
+                buffer the whole response should turn this off
+        
+        Yields:
+            ``{"type": "stage", "stage", "duration", "elapsed"}`` when a stage completes,
+            ``{"type": "delta", "text"}`` for each piece of LLM output as it arrives, and
+            finally ``{"type": "completed", "response", "time_to_first_token", "elapsed"}``
+        
+        Raises:
+            RAGError: If any stage fails, or a STRICT response leaks private content
+        """
+        start_time = time.time()
+        first_token_time = None
+        
+        def stage_event(stage: str, stage_start: float) -> Dict[str, Any]:
+            now = time.time()
+            return {"type": "stage", "stage": stage, "duration": now - stage_start, "elapsed": now - start_time}
+        
+        def first_token() -> float:
+            ttft = time.time() - start_time
+            track_metric("rag.stream.time_to_first_token", ttft * 1000)
+            return ttft
+        
         self.logger.info(
             "Processing RAG query",
             query_id=query.request_id,
@@ -646,56 +751,121 @@ class RAGOrchestrator:
             cached_response = cache.get(cache_key)
             if cached_response:
                 self.logger.info("Returning cached response", query_id=query.request_id)
-                return cached_response
+                yield stage_event("cache", start_time)
+                first_token_time = first_token()
+                yield {"type": "delta", "text": cached_response.text}
+                yield {
+                    "type": "completed", "response": cached_response,
+                    "time_to_first_token": first_token_time, "elapsed": time.time() - start_time
+                }
+                return
         
         try:
             # Step 1: Analyze query
+            stage_start = time.time()
             query_analysis = self.query_processor.analyze_query(query)
+            yield stage_event("analysis", stage_start)
             
             # Step 2: Generate embedding
+            stage_start = time.time()
             embedding_result = await self.embedding_service.generate_embeddings_batch([query.text])
             query_vector = embedding_result.embeddings[0].embedding if embedding_result.embeddings else None
             
             if not query_vector:
                 raise RAGError("Failed to generate query embedding")
+            yield stage_event("embedding", stage_start)
             
             # Step 3: Search for relevant content
+            stage_start = time.time()
             search_results = await self._search_relevant_content(
                 query_vector, query.knowledge_base_ids, query.top_k_results
             )
+            yield stage_event("search", stage_start)
             
             # Step 4: Assemble context
+            stage_start = time.time()
             context = self.context_assembler.assemble_context(
                 search_results, query_vector, query.privacy_mode
             )
+            yield stage_event("context", stage_start)
             
-            # Step 5: Generate response
-            response = await self.llm_service.generate_response(
-                query, context, query_analysis
-            )
+            # Step 5: Generate response, forwarding deltas as they arrive
+            stage_start = time.time()
+            leak_detector = self.privacy_validator.leak_detector(context) if screen_deltas else None
+            response = None
+            sent: List[str] = []
+            redacted = False
+            
+            def screen(text: Optional[str]) -> str:
+                """Text that is safe to send; ``None`` releases what the detector held back."""
+                nonlocal redacted
+                if leak_detector is None:
+                    return text or ""
+                checked = leak_detector.finish() if text is None else leak_detector.feed(text)
+                if not leak_detector.leak:
+                    return checked
+                self.logger.warning(
+                    "Privacy leak detected in streaming response",
+                    query_id=query.request_id,
+                    privacy_mode=query.privacy_mode.value
+                )
+                if query.privacy_mode == PrivacyMode.STRICT:
+                    raise RAGError("Response failed privacy validation")
+                # Other modes send the withheld text redacted and keep streaming
+                leak_detector.clear_leak()
+                redacted = True
+                return "" if sent and sent[-1] == self.privacy_validator.REDACTED else self.privacy_validator.REDACTED
+            
+            def delta_event(text: str) -> Dict[str, Any]:
+                nonlocal first_token_time
+                if first_token_time is None:
+                    first_token_time = first_token()
+                sent.append(text)
+                return {"type": "delta", "text": text}
+            
+            generation = self.llm_service.stream_response(query, context, query_analysis)
+            try:
+                async for item in generation:
+                    if isinstance(item, RAGResponse):
+                        response = item
+                        continue
+                    text = screen(item)
+                    if text:
+                        yield delta_event(text)
+                text = screen(None)
+                if text:
+                    yield delta_event(text)
+            finally:
+                await generation.aclose()
+            if redacted:
+                # Keep the returned and cached response to what was actually sent
+                response.text = "".join(sent)
+            yield stage_event("generation", stage_start)
             
             # Step 6: Validate privacy
+            stage_start = time.time()
             privacy_valid = self.privacy_validator.validate_response(response, query)
             response.privacy_validated = privacy_valid
             
             if not privacy_valid and query.privacy_mode == PrivacyMode.STRICT:
                 raise RAGError("Response failed privacy validation")
+            yield stage_event("privacy", stage_start)
             
             # Cache the response
             if settings.ENABLE_CACHING:
                 cache.set(cache_key, response, timeout=self.cache_ttl)
             
+            response.metadata['time_to_first_token'] = first_token_time
             self.logger.info(
                 "RAG query processed successfully",
                 query_id=query.request_id,
                 response_length=len(response.text),
                 citations_count=len(response.citations),
                 generation_time=response.generation_time,
+                time_to_first_token=first_token_time,
                 cost=response.cost_estimate
             )
             
-            return response
-            
         except Exception as e:
             self.logger.error(
                 "RAG query processing failed",
@@ -704,6 +874,11 @@ class RAGOrchestrator:
                 error_type=type(e).__name__
             )
             raise RAGError(f"RAG processing failed: {e}")
+        
+        yield {
+            "type": "completed", "response": response,
+            "time_to_first_token": first_token_time, "elapsed": time.time() - start_time
+        }
     
     async def _search_relevant_content(
         self,
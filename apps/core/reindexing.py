@@ -0,0 +1,697 @@
+"""
+Zero-downtime re-embedding of a chatbot's knowledge.
+
+Changing the embedding model (or its dimension) used to mean wiping a
+chatbot's vectors and re-running ingestion while it served degraded
+answers. ``ShadowReindexer`` instead builds a new ``VectorIndexVersion``
+next to the one that keeps serving:
+
+1. ``start`` registers a building version with its own namespace (and, on
+   pgvector, its own table).
+2. ``build`` embeds the chatbot's chunks in a stable order under a
+   ``ThroughputBudget`` (requests and tokens per minute, plus a cost cap).
+   The cursor is saved after every batch, so an interrupted build resumes.
+3. ``verify`` catches up on chunks added meanwhile, checks the stored
+   vector count against the chunk count and measures recall@k on a sample
+   of chunks searched by their own content.
+4. ``cutover`` swaps the active version in one transaction. ``rollback``
+   swaps back to the previous version, whose vectors are kept until
+   ``purge``. After either swap, chunk rows get the newly active version's
+   vectors, so they keep matching the index search reads them for.
+
+Ingestion, search and deletion resolve a chatbot's index through
+``get_active_index``, which is cached and invalidated on every swap.
+"""
+
+import itertools
+import random
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+import structlog
+from asgiref.sync import sync_to_async
+from django.apps import apps as django_apps
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from chatbot_saas.config import get_settings
+from apps.core.async_runtime import get_embedding_service, get_vector_storage, run_async
+from apps.core.embedding_service import EmbeddingConfig
+from apps.core.exceptions import ReindexBudgetExceeded, ReindexError
+from apps.core.vector_storage import DEFAULT_VECTOR_DIMENSION
+
+logger = structlog.get_logger()
+settings = get_settings()
+
+# Native dimensions and pricing; text-embedding-3 models can return shortened vectors
+EMBEDDING_MODELS: Dict[str, Dict[str, Any]] = {
+    "text-embedding-ada-002": {"dimensions": 1536, "cost_per_1k_tokens": 0.0001, "shortenable": False},
+    "text-embedding-3-small": {"dimensions": 1536, "cost_per_1k_tokens": 0.00002, "shortenable": True},
+    "text-embedding-3-large": {"dimensions": 3072, "cost_per_1k_tokens": 0.00013, "shortenable": True},
+}
+DEFAULT_EMBEDDING_MODEL = "text-embedding-ada-002"
+
+ACTIVE_INDEX_CACHE_TIMEOUT = 300
+RECALL_SAMPLE_SIZE = 50
+RECALL_TOP_K = 5
+
+
+def _index_version_model():
+    return django_apps.get_model('knowledge', 'VectorIndexVersion')
+
+
+def _chunk_model():
+    return django_apps.get_model('knowledge', 'KnowledgeChunk')
+
+
+@dataclass(frozen=True)
+class ActiveIndex:
+    """The embedding model, dimension and location of one index version."""
+    chatbot_id: str
+    version: int = 1
+    embedding_model: str = DEFAULT_EMBEDDING_MODEL
+    dimensions: int = DEFAULT_VECTOR_DIMENSION
+
+    @classmethod
+    def for_version(cls, version) -> 'ActiveIndex':
+        return cls(
+            chatbot_id=str(version.chatbot_id),
+            version=version.version,
+            embedding_model=version.embedding_model,
+            dimensions=version.dimensions
+        )
+
+    @property
+    def namespace(self) -> str:
+        return _index_version_model().namespace_for(self.chatbot_id, self.version)
+
+    @property
+    def cost_per_1k_tokens(self) -> float:
+        return EMBEDDING_MODELS.get(self.embedding_model, {}).get(
+            "cost_per_1k_tokens", EmbeddingConfig.cost_per_1k_tokens
+        )
+
+    def embedding_config(self, **overrides) -> EmbeddingConfig:
+        """Embedding config producing vectors for this index."""
+        native = EMBEDDING_MODELS.get(self.embedding_model, {}).get("dimensions")
+        return EmbeddingConfig(
+            model=self.embedding_model,
+            dimensions=self.dimensions if self.dimensions != native else None,
+            cost_per_1k_tokens=self.cost_per_1k_tokens,
+            **overrides
+        )
+
+    async def vector_storage(self):
+        """Vector storage holding this index."""
+        return await get_vector_storage(dimension=self.dimensions, index_version=self.version)
+
+
+def chunk_vector_metadata(chunk) -> Dict[str, Any]:
+    """
+    Metadata stored with a knowledge chunk's vector: filter fields only.
+
+    Content is hydrated from ``KnowledgeChunk`` after search (see
+    ``apps.core.chunk_store``).
+    """
+    return {
+        'source_id': str(chunk.source_id),
+        'is_citable': chunk.is_citable,
+        'chunk_index': chunk.chunk_index
+    }
+
+
+def _active_index_key(chatbot_id) -> str:
+    return f"active_index:{chatbot_id}"
+
+
+def get_active_index(chatbot_id) -> ActiveIndex:
+    """
+    Index currently serving a chatbot.
+
+    Chatbots that were never re-indexed serve from the original namespace
+    with the original model.
+    """
+    key = _active_index_key(chatbot_id)
+    index = cache.get(key)
+    if index is not None:
+        return index
+
+    try:
+        VectorIndexVersion = _index_version_model()
+        row = VectorIndexVersion.objects.filter(
+            chatbot_id=chatbot_id,
+            status=VectorIndexVersion.STATUS_ACTIVE
+        ).values('version', 'embedding_model', 'dimensions').first()
+    except Exception as e:
+        # Unknown chatbot id format or no database; serve the original index
+        logger.warning("Failed to resolve active vector index", chatbot_id=str(chatbot_id), error=str(e))
+        return ActiveIndex(chatbot_id=str(chatbot_id))
+
+    index = ActiveIndex(chatbot_id=str(chatbot_id), **row) if row else ActiveIndex(chatbot_id=str(chatbot_id))
+    cache.set(key, index, timeout=ACTIVE_INDEX_CACHE_TIMEOUT)
+    return index
+
+
+async def aget_active_index(chatbot_id) -> ActiveIndex:
+    """Async variant of ``get_active_index``."""
+    return await sync_to_async(get_active_index)(chatbot_id)
+
+
+def invalidate_active_index(chatbot_id) -> None:
+    cache.delete(_active_index_key(chatbot_id))
+
+
+def live_indexes(chatbot_id) -> List[ActiveIndex]:
+    """
+    Every index that may hold a chatbot's vectors.
+
+    Deleting chunks must reach shadow builds and rollback targets too, or
+    they would resurface after a cutover or rollback.
+    """
+    VectorIndexVersion = _index_version_model()
+    indexes = [ActiveIndex(chatbot_id=str(chatbot_id))]
+    for version in VectorIndexVersion.objects.filter(chatbot_id=chatbot_id).order_by('version'):
+        if version.version > 1 and not version.build_state.get('purged'):
+            indexes.append(ActiveIndex.for_version(version))
+    return indexes
+
+
+def delete_indexed_vectors(
+    chatbot_id,
+    source_id=None,
+    chunk_ids: Optional[List[str]] = None,
+    raise_errors: bool = False
+) -> int:
+    """
+    Delete one source's vectors, or all of a chatbot's, from every live index.
+
+    Uses each backend's filter delete (indexed DELETE, namespace drop or
+    Pinecone metadata filter) instead of listing ids; ``chunk_ids`` are only
+    used where a backend can't delete by filter. A failing index is logged
+    and skipped so the others are still cleaned; with ``raise_errors`` the
+    first failure is raised afterwards.
+
+    Returns:
+        int: Vectors deleted, where the backends report it
+    """
+    total = 0
+    error = None
+    for index in live_indexes(chatbot_id):
+        try:
+            storage = run_async(index.vector_storage())
+            deleted = run_async(storage.delete_by_filter(
+                index.namespace,
+                source_id=str(source_id) if source_id else None,
+                fallback_ids=chunk_ids
+            ))
+            total += deleted or 0
+        except Exception as e:
+            logger.warning(
+                "Failed to delete vectors from index",
+                chatbot_id=str(chatbot_id),
+                source_id=str(source_id) if source_id else None,
+                namespace=index.namespace,
+                error=str(e)
+            )
+            error = error or e
+    if error is not None and raise_errors:
+        raise error
+    return total
+
+
+def delete_vectors_by_id(chatbot_id, chunk_ids: List[str]) -> None:
+    """
+    Delete specific chunks' vectors from every live index.
+
+    For retiring some of a source's chunks while the rest keep serving,
+    where a source filter would take them all.
+    """
+    for index in live_indexes(chatbot_id):
+        try:
+            storage = run_async(index.vector_storage())
+            run_async(storage.delete_embeddings(chunk_ids, namespace=index.namespace))
+        except Exception as e:
+            logger.warning(
+                "Failed to delete vectors from index",
+                chatbot_id=str(chatbot_id),
+                namespace=index.namespace,
+                chunks=len(chunk_ids),
+                error=str(e)
+            )
+
+
+class ThroughputBudget:
+    """
+    Sliding-window request and token limits plus a total cost cap.
+
+    ``reserve`` blocks until a request fits in the last minute's limits and
+    refuses it outright if its estimated cost would exceed the cap.
+    """
+
+    WINDOW_SECONDS = 60.0
+
+    def __init__(
+        self,
+        requests_per_minute: Optional[int] = None,
+        tokens_per_minute: Optional[int] = None,
+        max_cost_usd: Optional[float] = None,
+        spent_usd: float = 0.0,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep
+    ):
+        self.requests_per_minute = requests_per_minute or settings.REINDEX_REQUESTS_PER_MINUTE
+        self.tokens_per_minute = tokens_per_minute or settings.REINDEX_TOKENS_PER_MINUTE
+        self.max_cost_usd = max_cost_usd if max_cost_usd is not None else settings.REINDEX_MAX_COST_USD
+        self.spent_usd = spent_usd
+        self.waited_seconds = 0.0
+        self._clock = clock
+        self._sleep = sleep
+        self._window: Deque[Tuple[float, int]] = deque()
+
+    @property
+    def remaining_usd(self) -> float:
+        return max(self.max_cost_usd - self.spent_usd, 0.0)
+
+    def reserve(self, tokens: int, cost_per_1k_tokens: float) -> None:
+        """Wait for room for one request of ``tokens`` tokens."""
+        estimated_cost = tokens / 1000 * cost_per_1k_tokens
+        if self.spent_usd + estimated_cost > self.max_cost_usd:
+            raise ReindexBudgetExceeded(
+                f"Re-index budget of ${self.max_cost_usd:.2f} would be exceeded "
+                f"(spent ${self.spent_usd:.4f}, next batch ~${estimated_cost:.4f})"
+            )
+
+        while True:
+            now = self._clock()
+            while self._window and self._window[0][0] <= now - self.WINDOW_SECONDS:
+                self._window.popleft()
+            used_tokens = sum(window_tokens for _, window_tokens in self._window)
+            # An oversized request still goes through once the window is empty
+            if not self._window or (
+                len(self._window) < self.requests_per_minute
+                and used_tokens + tokens <= self.tokens_per_minute
+            ):
+                self._window.append((now, tokens))
+                return
+            wait = max(self._window[0][0] + self.WINDOW_SECONDS - now, 0.01)
+            self.waited_seconds += wait
+            self._sleep(wait)
+
+    def charge(self, cost_usd: float) -> None:
+        """Record the actual cost of a request."""
+        self.spent_usd += cost_usd
+
+
+class ShadowReindexer:
+    """Builds, verifies and switches vector index versions."""
+
+    def __init__(
+        self,
+        budget: Optional[ThroughputBudget] = None,
+        batch_size: int = 50,
+        recall_sample_size: int = RECALL_SAMPLE_SIZE,
+        recall_k: int = RECALL_TOP_K,
+        min_recall: Optional[float] = None
+    ):
+        """
+        Initialize reindexer.
+
+        Args:
+            budget: Throughput and cost budget (from settings if omitted)
+            batch_size: Chunks embedded per API request
+            recall_sample_size: Chunks searched during verification
+            recall_k: Results a sampled chunk must appear in
+            min_recall: Recall required to pass verification
+        """
+        self.budget = budget
+        self.batch_size = batch_size
+        self.recall_sample_size = recall_sample_size
+        self.recall_k = recall_k
+        self.min_recall = min_recall if min_recall is not None else settings.REINDEX_MIN_RECALL
+        self.logger = logger.bind(service="shadow_reindexer")
+
+    # Lifecycle
+
+    def start(self, chatbot, embedding_model: str, dimensions: Optional[int] = None):
+        """
+        Register a new index version to build (or return the one in progress).
+
+        Raises:
+            ReindexError: Unknown model, unsupported dimension, or a build
+                with a different configuration is already in progress
+        """
+        spec = EMBEDDING_MODELS.get(embedding_model)
+        if spec is None:
+            raise ReindexError(f"Unknown embedding model: {embedding_model}")
+        dimensions = dimensions or spec["dimensions"]
+        if dimensions > spec["dimensions"] or (dimensions != spec["dimensions"] and not spec["shortenable"]):
+            raise ReindexError(f"{embedding_model} can't produce {dimensions}-dimensional vectors")
+
+        VectorIndexVersion = _index_version_model()
+        with transaction.atomic():
+            versions = VectorIndexVersion.objects.select_for_update().filter(chatbot=chatbot)
+            in_progress = versions.filter(
+                status__in=[VectorIndexVersion.STATUS_BUILDING, VectorIndexVersion.STATUS_READY]
+            ).first()
+            if in_progress is not None:
+                if (in_progress.embedding_model, in_progress.dimensions) == (embedding_model, dimensions):
+                    return in_progress
+                raise ReindexError(
+                    f"Index v{in_progress.version} ({in_progress.embedding_model}) is already "
+                    f"{in_progress.status}; cut it over or let it fail first"
+                )
+
+            latest = max(versions.values_list('version', flat=True), default=1)
+            version = VectorIndexVersion.objects.create(
+                chatbot=chatbot,
+                version=latest + 1,
+                embedding_model=embedding_model,
+                dimensions=dimensions,
+                vectors_expected=self._chunks(chatbot.id).count(),
+                build_state={'cursor': None, 'spent_usd': 0.0, 'tokens': 0, 'reused': 0}
+            )
+
+        self.logger.info(
+            "Index version build started",
+            chatbot_id=str(chatbot.id),
+            version=version.version,
+            embedding_model=embedding_model,
+            dimensions=dimensions
+        )
+        return version
+
+    def build(self, version, max_batches: Optional[int] = None, on_batch: Optional[Callable] = None):
+        """
+        Embed and store every chunk past the version's cursor.
+
+        Vectors already on a chunk row from the same model and dimension are
+        reused instead of re-embedded. Progress is saved after each batch.
+        """
+        VectorIndexVersion = _index_version_model()
+        if version.status in (VectorIndexVersion.STATUS_RETIRED, VectorIndexVersion.STATUS_FAILED):
+            raise ReindexError(f"Index v{version.version} is {version.status}")
+
+        index = ActiveIndex.for_version(version)
+        state = version.build_state
+        budget = self.budget or ThroughputBudget()
+        budget.spent_usd = state.get('spent_usd', 0.0)
+        embedding_service = None
+        storage = None
+        batches = 0
+
+        while max_batches is None or batches < max_batches:
+            batch = list(self._after_cursor(self._chunks(version.chatbot_id), state.get('cursor'))[:self.batch_size])
+            if not batch:
+                break
+
+            vectors = {}
+            to_embed = []
+            for chunk in batch:
+                if (
+                    chunk.embedding_model == index.embedding_model
+                    and chunk.embedding_vector
+                    and len(chunk.embedding_vector) == index.dimensions
+                ):
+                    vectors[chunk.id] = chunk.embedding_vector
+                else:
+                    to_embed.append(chunk)
+
+            if to_embed:
+                if embedding_service is None:
+                    embedding_service = get_embedding_service(index.embedding_config(max_batch_size=self.batch_size))
+                budget.reserve(sum(self._estimate_tokens(chunk) for chunk in to_embed), index.cost_per_1k_tokens)
+                result = run_async(embedding_service.generate_embeddings_batch([chunk.content for chunk in to_embed]))
+                budget.charge(result.total_cost_usd)
+                state['tokens'] = state.get('tokens', 0) + result.total_tokens
+                for chunk, embedding in zip(to_embed, result.embeddings):
+                    if embedding.embedding:
+                        vectors[chunk.id] = embedding.embedding
+
+            vector_data = [
+                (str(chunk.id), vectors[chunk.id], chunk_vector_metadata(chunk))
+                for chunk in batch if chunk.id in vectors
+            ]
+            if vector_data:
+                if storage is None:
+                    storage = run_async(index.vector_storage())
+                if not run_async(storage.store_embeddings(vector_data, namespace=index.namespace)):
+                    raise ReindexError(f"Vector storage failed for {len(vector_data)} embeddings")
+
+            last = batch[-1]
+            state['cursor'] = [last.created_at.isoformat(), str(last.id)]
+            state['spent_usd'] = budget.spent_usd
+            state['reused'] = state.get('reused', 0) + len(batch) - len(to_embed)
+            state['skipped'] = state.get('skipped', 0) + len(batch) - len(vector_data)
+            version.build_state = state
+            version.vectors_indexed += len(vector_data)
+            version.save(update_fields=['build_state', 'vectors_indexed', 'updated_at'])
+            batches += 1
+            if on_batch is not None:
+                on_batch(version)
+
+        return version
+
+    def verify(self, version):
+        """
+        Catch up, then check vector counts and sampled recall.
+
+        The version becomes ready if both pass, failed otherwise.
+        """
+        VectorIndexVersion = _index_version_model()
+        self.build(version)
+
+        index = ActiveIndex.for_version(version)
+        storage = run_async(index.vector_storage())
+        chunks = self._chunks(version.chatbot_id)
+        expected = chunks.count()
+        stored = run_async(storage.count_vectors(index.namespace))
+        indexed = stored if stored is not None else version.vectors_indexed
+
+        recall, sampled = self._sample_recall(index, storage, chunks)
+        passed = indexed == expected and recall >= self.min_recall
+
+        version.vectors_expected = expected
+        version.vectors_indexed = indexed
+        version.recall_at_k = recall
+        version.build_state = {
+            **version.build_state,
+            'verification': {
+                'expected': expected,
+                'indexed': indexed,
+                'recall': recall,
+                'sampled': sampled,
+                'k': self.recall_k,
+                'min_recall': self.min_recall,
+                'verified_at': timezone.now().isoformat(),
+            }
+        }
+        if passed:
+            version.status = VectorIndexVersion.STATUS_READY
+            version.error_message = None
+        else:
+            version.status = VectorIndexVersion.STATUS_FAILED
+            version.error_message = (
+                f"Verification failed: {indexed}/{expected} vectors, "
+                f"recall@{self.recall_k} {recall:.2f} (min {self.min_recall:.2f})"
+            )
+        version.save()
+
+        self.logger.info(
+            "Index version verified",
+            chatbot_id=str(version.chatbot_id),
+            version=version.version,
+            passed=passed,
+            expected=expected,
+            indexed=indexed,
+            recall=recall
+        )
+        return version
+
+    def cutover(self, version):
+        """Make a verified version the chatbot's active index."""
+        VectorIndexVersion = _index_version_model()
+        if version.status != VectorIndexVersion.STATUS_READY:
+            raise ReindexError(f"Index v{version.version} is {version.status}, not ready")
+
+        # Catch up before the swap so few chunks are left for after it
+        self.build(version)
+        self._activate(version)
+        return version
+
+    def rollback(self, chatbot):
+        """Reactivate the most recently retired version."""
+        VectorIndexVersion = _index_version_model()
+        target = VectorIndexVersion.objects.filter(
+            chatbot=chatbot,
+            status=VectorIndexVersion.STATUS_RETIRED
+        ).order_by('-retired_at', '-version').first()
+        if target is None or target.build_state.get('purged'):
+            raise ReindexError(f"No retired index to roll back to for chatbot {chatbot.id}")
+
+        self._activate(target)
+        return target
+
+    def purge(self, version) -> int:
+        """Delete a retired or failed version's vectors; returns the count."""
+        VectorIndexVersion = _index_version_model()
+        if version.status not in (VectorIndexVersion.STATUS_RETIRED, VectorIndexVersion.STATUS_FAILED):
+            raise ReindexError(f"Index v{version.version} is {version.status}; only retired or failed ones can be purged")
+
+        index = ActiveIndex.for_version(version)
+        storage = run_async(index.vector_storage())
+        chunk_ids = [str(chunk_id) for chunk_id in self._chunks(version.chatbot_id).values_list('id', flat=True)]
+        deleted = run_async(storage.delete_by_filter(index.namespace, fallback_ids=chunk_ids))
+
+        version.build_state = {**version.build_state, 'purged': True}
+        version.vectors_indexed = 0
+        version.save(update_fields=['build_state', 'vectors_indexed', 'updated_at'])
+        return len(chunk_ids) if deleted is None else deleted
+
+    # Internals
+
+    def _activate(self, target) -> None:
+        """Swap the active version atomically, then catch the new one up."""
+        VectorIndexVersion = _index_version_model()
+        chatbot_id = target.chatbot_id
+        now = timezone.now()
+
+        with transaction.atomic():
+            versions = list(VectorIndexVersion.objects.select_for_update().filter(chatbot_id=chatbot_id))
+            current = next((v for v in versions if v.status == VectorIndexVersion.STATUS_ACTIVE), None)
+            if current is None and not any(v.version == 1 for v in versions):
+                # Record the original namespace so it can be rolled back to
+                current = VectorIndexVersion(
+                    chatbot_id=chatbot_id,
+                    version=1,
+                    embedding_model=DEFAULT_EMBEDDING_MODEL,
+                    dimensions=DEFAULT_VECTOR_DIMENSION,
+                    vectors_indexed=self._chunks(chatbot_id).count(),
+                    build_state={}
+                )
+
+            if current is not None:
+                # Ingestion kept it complete up to now; rollback catches up from here
+                newest = self._chunks(chatbot_id).order_by('-created_at', '-id').first()
+                current.build_state = {
+                    **(current.build_state or {}),
+                    'cursor': [newest.created_at.isoformat(), str(newest.id)] if newest else None,
+                }
+                current.status = VectorIndexVersion.STATUS_RETIRED
+                current.retired_at = now
+                current.save()
+
+            target.status = VectorIndexVersion.STATUS_ACTIVE
+            target.activated_at = now
+            target.retired_at = None
+            target.save()
+            transaction.on_commit(lambda: invalidate_active_index(chatbot_id))
+
+        self.logger.info(
+            "Active index switched",
+            chatbot_id=str(chatbot_id),
+            version=target.version,
+            previous_version=current.version if current is not None else None
+        )
+
+        # Chunks ingested between the last catch-up and the swap went to the
+        # old index only; new ingestion already targets this one
+        self.build(target)
+        try:
+            self._sync_chunk_embeddings(target)
+        except Exception as e:
+            # Search still works; those chunks just skip diversity selection
+            self.logger.warning(
+                "Copying index vectors to chunks failed",
+                chatbot_id=str(chatbot_id),
+                version=target.version,
+                error=str(e)
+            )
+
+    def _sync_chunk_embeddings(self, version) -> int:
+        """
+        Copy a newly active version's vectors onto chunk rows from another model.
+
+        Search reads chunk embeddings from the rows (for diversity selection
+        and lexical-only matches), which ingestion keeps in the active
+        index's model; vectors built in the shadow index only existed in its
+        namespace. Returns the number of rows updated.
+        """
+        index = ActiveIndex.for_version(version)
+        chunks = self._chunks(version.chatbot_id).select_related(None).only('id', 'embedding_model', 'embedding_vector')
+        stale = (
+            chunk for chunk in chunks.iterator(chunk_size=self.batch_size)
+            if chunk.embedding_model != index.embedding_model
+            or not chunk.embedding_vector
+            or len(chunk.embedding_vector) != index.dimensions
+        )
+
+        storage = None
+        updated = 0
+        while True:
+            batch = list(itertools.islice(stale, self.batch_size))
+            if not batch:
+                break
+            if storage is None:
+                storage = run_async(index.vector_storage())
+            vectors = run_async(storage.fetch_embeddings([str(chunk.id) for chunk in batch], namespace=index.namespace))
+            synced = []
+            for chunk in batch:
+                vector = vectors.get(str(chunk.id))
+                if vector:
+                    chunk.embedding_vector = vector
+                    chunk.embedding_model = index.embedding_model
+                    synced.append(chunk)
+            _chunk_model().objects.bulk_update(synced, ['embedding_vector', 'embedding_model'])
+            updated += len(synced)
+
+        return updated
+
+    def _sample_recall(self, index: ActiveIndex, storage, chunks) -> Tuple[float, int]:
+        """Share of sampled chunks found in the top k when searched by their own content."""
+        chunk_ids = list(chunks.values_list('id', flat=True))
+        if not chunk_ids:
+            return 1.0, 0
+
+        sample_ids = random.sample(chunk_ids, min(self.recall_sample_size, len(chunk_ids)))
+        sample = list(_chunk_model().objects.filter(id__in=sample_ids))
+        embedding_service = get_embedding_service(index.embedding_config(max_batch_size=self.batch_size))
+        budget = self.budget or ThroughputBudget()
+        budget.reserve(sum(self._estimate_tokens(chunk) for chunk in sample), index.cost_per_1k_tokens)
+        result = run_async(embedding_service.generate_embeddings_batch([chunk.content for chunk in sample]))
+        budget.charge(result.total_cost_usd)
+
+        hits = 0
+        for chunk, embedding in zip(sample, result.embeddings):
+            matches = run_async(storage.search_similar(
+                query_vector=embedding.embedding,
+                top_k=self.recall_k,
+                namespace=index.namespace,
+                filter_metadata={'include_non_citable': True}
+            ))
+            if any(match.id == str(chunk.id) for match in matches):
+                hits += 1
+        return hits / len(sample), len(sample)
+
+    @staticmethod
+    def _chunks(chatbot_id):
+        return _chunk_model().objects.filter(
+            source__chatbot_id=chatbot_id,
+            source__deleted_at__isnull=True
+        ).select_related('source')
+
+    @staticmethod
+    def _after_cursor(chunks, cursor: Optional[List[str]]):
+        """Chunks past a (created_at, id) cursor, in cursor order."""
+        if cursor:
+            created_at, chunk_id = cursor
+            chunks = chunks.filter(
+                Q(created_at__gt=created_at) | Q(created_at=created_at, id__gt=chunk_id)
+            )
+        return chunks.order_by('created_at', 'id')
+
+    @staticmethod
+    def _estimate_tokens(chunk) -> int:
+        return chunk.token_count or max(len(chunk.content) // 4, 1)
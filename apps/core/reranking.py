@@ -0,0 +1,268 @@
+"""
+Process-wide cross-encoder reranking.
+
+One ``CrossEncoderReranker`` per process owns the model and a single
+inference thread. The model is loaded on that thread, at worker warm-up
+(``warm_up``) or on first use, so requests never wait for it. Concurrent
+requests are queued and scored together in batches, which keeps the model
+busy with few large ``predict`` calls instead of many small ones.
+
+Scores are cached per (query hash, chunk id): a chunk's content never
+changes under the same id (see ``apps.core.chunk_store``), so repeated and
+paginated queries only score chunks they haven't seen.
+
+Every call has a hard latency budget. When the model isn't loaded, failed
+to load, or doesn't answer within the budget, callers get ``None`` and keep
+the vector order.
+
+``sentence-transformers`` is optional; without it reranking is a no-op.
+"""
+
+import asyncio
+import hashlib
+import queue
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from dataclasses import dataclass
+from typing import List, Optional, Sequence, Tuple
+import structlog
+
+from chatbot_saas.config import get_settings
+
+logger = structlog.get_logger()
+settings = get_settings()
+
+
+@dataclass
+class _ScoreRequest:
+    """Query-chunk pairs waiting for the inference thread."""
+    query: str
+    query_hash: str
+    candidates: List[Tuple[str, str]]  # (chunk id, content)
+    future: Future
+
+
+def _query_hash(query: str) -> str:
+    return hashlib.sha256(query.encode('utf-8')).hexdigest()[:16]
+
+
+class CrossEncoderReranker:
+    """Lazily loaded cross-encoder with batched inference and a score cache."""
+
+    def __init__(
+        self,
+        model_name: Optional[str] = None,
+        batch_size: Optional[int] = None,
+        max_wait_ms: Optional[float] = None,
+        timeout_ms: Optional[float] = None,
+        cache_size: Optional[int] = None
+    ):
+        """
+        Initialize reranker; nothing is loaded until ``warm_up`` or first use.
+
+        Args:
+            model_name: sentence-transformers cross-encoder model
+            batch_size: Pairs scored per model call
+            max_wait_ms: How long a batch waits for more requests to join
+            timeout_ms: Default latency budget per call
+            cache_size: (query, chunk) scores kept in memory
+        """
+        self.model_name = model_name or settings.RERANKER_MODEL
+        self.batch_size = batch_size or settings.RERANKER_BATCH_SIZE
+        self.max_wait = (settings.RERANKER_MAX_WAIT_MS if max_wait_ms is None else max_wait_ms) / 1000
+        self.timeout_ms = settings.RERANKER_TIMEOUT_MS if timeout_ms is None else timeout_ms
+        self.cache_size = cache_size or settings.RERANKER_CACHE_SIZE
+        self.model = None
+        self.available: Optional[bool] = None  # None until the load attempt finishes
+        self._loaded = threading.Event()
+        self._queue: 'queue.Queue[_ScoreRequest]' = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self._scores: 'OrderedDict[Tuple[str, str], float]' = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "batches": 0, "fallbacks": 0}
+        self._stats_lock = threading.Lock()  # Updated from request threads and the inference thread
+
+    def warm_up(self, wait: bool = False) -> bool:
+        """
+        Start the inference thread, which loads the model first.
+
+        Args:
+            wait: Block until the load attempt finishes
+
+        Returns:
+            bool: Whether the model is ready
+        """
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="cross-encoder-reranker", daemon=True)
+                self._thread.start()
+        if wait:
+            self._loaded.wait()
+        return bool(self.available)
+
+    def score(
+        self,
+        query: str,
+        candidates: Sequence[Tuple[str, str]],
+        timeout_ms: Optional[float] = None
+    ) -> Optional[List[float]]:
+        """
+        Relevance of each (chunk id, content) candidate to the query.
+
+        Returns:
+            Optional[List[float]]: Scores in candidate order, or None if the
+            model is unavailable or missed the latency budget
+        """
+        scores, future = self._lookup(query, candidates)
+        if future is None:
+            return scores
+        budget = self.timeout_ms if timeout_ms is None else timeout_ms
+        try:
+            computed = future.result(timeout=budget / 1000)
+        except FutureTimeoutError:
+            future.cancel()
+            computed = None
+        return self._merge(scores, computed)
+
+    async def ascore(
+        self,
+        query: str,
+        candidates: Sequence[Tuple[str, str]],
+        timeout_ms: Optional[float] = None
+    ) -> Optional[List[float]]:
+        """Async variant of ``score``; waiting doesn't block the event loop."""
+        scores, future = self._lookup(query, candidates)
+        if future is None:
+            return scores
+        budget = self.timeout_ms if timeout_ms is None else timeout_ms
+        try:
+            # Cancelling the wrapper on timeout cancels the queued request too
+            computed = await asyncio.wait_for(asyncio.wrap_future(future), timeout=budget / 1000)
+        except asyncio.TimeoutError:
+            computed = None
+        return self._merge(scores, computed)
+
+    def clear(self) -> None:
+        with self._cache_lock:
+            self._scores.clear()
+
+    def _lookup(
+        self,
+        query: str,
+        candidates: Sequence[Tuple[str, str]]
+    ) -> Tuple[List[Optional[float]], Optional[Future]]:
+        """Cached scores, plus a queued request for the rest if the model is ready."""
+        query_hash = _query_hash(query)
+        with self._cache_lock:
+            scores = []
+            for chunk_id, _ in candidates:
+                score = self._scores.get((query_hash, chunk_id))
+                if score is not None:
+                    self._scores.move_to_end((query_hash, chunk_id))
+                scores.append(score)
+        missing = [candidate for candidate, score in zip(candidates, scores) if score is None]
+        self._count(hits=len(candidates) - len(missing), misses=len(missing))
+
+        if not missing:
+            return scores, None
+
+        future = Future()
+        if not self.warm_up():
+            # Still loading or unavailable: don't wait for it
+            future.set_result(None)
+        else:
+            self._queue.put(_ScoreRequest(query, query_hash, missing, future))
+        return scores, future
+
+    def _merge(self, scores: List[Optional[float]], computed: Optional[List[float]]) -> Optional[List[float]]:
+        if computed is None:
+            self._count(fallbacks=1)
+            return None
+        computed = iter(computed)
+        return [next(computed) if score is None else score for score in scores]
+
+    def _count(self, **increments: int) -> None:
+        with self._stats_lock:
+            for name, value in increments.items():
+                self.stats[name] += value
+
+    def _run(self) -> None:
+        """Inference thread: load the model, then score queued requests in batches."""
+        self._load_model()
+        while True:
+            request = self._queue.get()
+            batch = [request]
+            pairs = len(request.candidates)
+            deadline = time.monotonic() + self.max_wait
+            while pairs < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    request = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                batch.append(request)
+                pairs += len(request.candidates)
+            self._score_batch(batch)
+
+    def _load_model(self) -> None:
+        try:
+            from sentence_transformers import CrossEncoder
+            start = time.perf_counter()
+            self.model = CrossEncoder(self.model_name)
+            self.available = True
+            logger.info(
+                "Loaded cross-encoder reranking model",
+                model=self.model_name,
+                load_ms=round((time.perf_counter() - start) * 1000, 1)
+            )
+        except Exception as e:
+            self.available = False
+            logger.warning("Cross-encoder reranking unavailable", model=self.model_name, error=str(e))
+        finally:
+            self._loaded.set()
+
+    def _score_batch(self, batch: List[_ScoreRequest]) -> None:
+        # Requests whose callers already gave up are dropped, which sheds load when behind
+        batch = [request for request in batch if request.future.set_running_or_notify_cancel()]
+        if not batch:
+            return
+
+        pairs = [(request.query, content) for request in batch for _, content in request.candidates]
+        try:
+            scores = self.model.predict(pairs, batch_size=self.batch_size, show_progress_bar=False)
+        except Exception as e:
+            logger.error("Cross-encoder scoring failed", pairs=len(pairs), error=str(e))
+            for request in batch:
+                request.future.set_result(None)
+            return
+        self._count(batches=1)
+
+        offset = 0
+        for request in batch:
+            request_scores = [float(score) for score in scores[offset:offset + len(request.candidates)]]
+            offset += len(request.candidates)
+            self._remember(request, request_scores)
+            request.future.set_result(request_scores)
+
+    def _remember(self, request: _ScoreRequest, scores: List[float]) -> None:
+        with self._cache_lock:
+            for (chunk_id, _), score in zip(request.candidates, scores):
+                self._scores[(request.query_hash, chunk_id)] = score
+                self._scores.move_to_end((request.query_hash, chunk_id))
+            while len(self._scores) > self.cache_size:
+                self._scores.popitem(last=False)
+
+
+cross_encoder_reranker = CrossEncoderReranker()
+
+
+def warm_up() -> None:
+    """Start loading the reranking model if reranking is enabled; called at process start."""
+    if settings.RERANKER_ENABLED:
+        cross_encoder_reranker.warm_up()
@@ -0,0 +1,540 @@
+"""
+Asynchronous site crawler for URL knowledge sources.
+
+Fetches pages concurrently with a bounded per-host pool, discovers pages
+from sitemap.xml and in-page links, respects robots.txt, and canonicalizes
+URLs so each page is fetched once. Pages are yielded as soon as they are
+fetched so chunking can start before the crawl finishes.
+"""
+
+import asyncio
+import contextlib
+import gzip
+import hashlib
+import posixpath
+import queue
+import re
+import threading
+import time
+import xml.etree.ElementTree as ET
+from dataclasses import dataclass, field
+from html.parser import HTMLParser
+from typing import AsyncIterator, Dict, Iterator, List, Optional, Set, Tuple
+from urllib.parse import parse_qsl, urlencode, urljoin, urlsplit, urlunsplit
+from urllib.robotparser import RobotFileParser
+
+import httpx
+import structlog
+
+logger = structlog.get_logger()
+
+DEFAULT_USER_AGENT = 'Mozilla/5.0 (compatible; ChatbotSaaS/1.0; +http://example.com/bot)'
+
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+# Query parameters that never change page content
+TRACKING_PARAMS = frozenset({
+    'utm_source', 'utm_medium', 'utm_campaign', 'utm_term', 'utm_content',
+    'gclid', 'fbclid', 'mc_cid', 'mc_eid', 'ref',
+})
+
+HTML_CONTENT_TYPES = ('text/html', 'application/xhtml+xml')
+
+# Links to these are never HTML pages
+SKIPPED_EXTENSIONS = frozenset({
+    '.png', '.jpg', '.jpeg', '.gif', '.svg', '.webp', '.ico', '.css', '.js',
+    '.pdf', '.zip', '.gz', '.tar', '.mp3', '.mp4', '.avi', '.mov', '.woff',
+    '.woff2', '.ttf', '.eot', '.xml', '.json', '.rss',
+})
+
+SITEMAP_NS = re.compile(r'^\{[^}]*\}')
+
+
+def canonicalize_url(url: str, base: Optional[str] = None) -> Optional[str]:
+    """
+    Normalize a URL so equivalent spellings dedupe to one key.
+
+    Lowercases scheme and host, drops default ports, fragments and tracking
+    parameters, resolves dot segments and sorts the query string.
+
+    Returns:
+        Optional[str]: Canonical URL, or None for non-HTTP(S) URLs
+    """
+    try:
+        if base:
+            url = urljoin(base, url.strip())
+        parts = urlsplit(url.strip())
+        scheme = parts.scheme.lower()
+        host = (parts.hostname or '').lower()
+        port = parts.port
+    except ValueError:
+        return None
+
+    if scheme not in DEFAULT_PORTS or not host:
+        return None
+
+    netloc = host if port in (None, DEFAULT_PORTS[scheme]) else f"{host}:{port}"
+
+    path = parts.path or '/'
+    trailing_slash = path.endswith('/')
+    path = posixpath.normpath(re.sub(r'/{2,}', '/', path))
+    if path == '.':
+        path = '/'
+    if trailing_slash and not path.endswith('/'):
+        path += '/'
+
+    query = urlencode(sorted(
+        (key, value)
+        for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if key.lower() not in TRACKING_PARAMS
+    ))
+
+    return urlunsplit((scheme, netloc, path, query, ''))
+
+
+def parse_sitemap(content: bytes) -> Tuple[List[str], List[str]]:
+    """
+    Parse a sitemap or sitemap index.
+
+    Returns:
+        Tuple[List[str], List[str]]: (page URLs, nested sitemap URLs)
+    """
+    if content[:2] == b'\x1f\x8b':
+        content = gzip.decompress(content)
+
+    try:
+        root = ET.fromstring(content)
+    except ET.ParseError:
+        return [], []
+
+    locs = [
+        (element.text or '').strip()
+        for element in root.iter()
+        if SITEMAP_NS.sub('', element.tag) == 'loc'
+    ]
+    locs = [loc for loc in locs if loc]
+
+    if SITEMAP_NS.sub('', root.tag) == 'sitemapindex':
+        return [], locs
+    return locs, []
+
+
+class _LinkExtractor(HTMLParser):
+    """Collect hrefs from anchors, honouring <base> and nofollow."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.links: List[str] = []
+        self.base_href: Optional[str] = None
+        self.nofollow = False
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag == 'a':
+            href = attrs.get('href')
+            if href and 'nofollow' not in (attrs.get('rel') or '').lower():
+                self.links.append(href)
+        elif tag == 'base' and attrs.get('href') and self.base_href is None:
+            self.base_href = attrs['href']
+        elif tag == 'meta' and (attrs.get('name') or '').lower() == 'robots':
+            if 'nofollow' in (attrs.get('content') or '').lower():
+                self.nofollow = True
+
+
+def extract_links(html: str, page_url: str) -> List[str]:
+    """Extract canonical same-document links from an HTML page."""
+    parser = _LinkExtractor()
+    try:
+        parser.feed(html)
+        parser.close()
+    except Exception:
+        # Malformed markup; keep whatever was collected
+        pass
+
+    if parser.nofollow:
+        return []
+
+    base = urljoin(page_url, parser.base_href) if parser.base_href else page_url
+    links = []
+    for href in parser.links:
+        canonical = canonicalize_url(href, base)
+        if canonical:
+            links.append(canonical)
+    return links
+
+
+@dataclass
+class CrawlConfig:
+    """Crawl limits and politeness settings."""
+    max_pages: int = 500
+    max_depth: int = 2  # Link hops from the start URL
+    max_concurrency: int = 16
+    per_host_concurrency: int = 4
+    request_timeout: float = 30.0
+    max_page_bytes: int = 5 * 1024 * 1024
+    max_sitemaps: int = 50
+    max_crawl_delay: float = 10.0
+    user_agent: str = DEFAULT_USER_AGENT
+    respect_robots: bool = True
+    use_sitemaps: bool = True
+    same_host_only: bool = True
+    path_prefix: Optional[str] = None  # Restrict to URLs under this path
+    handoff_queue_size: int = 32
+
+
+@dataclass
+class CrawledPage:
+    """A fetched HTML page."""
+    url: str
+    content: bytes
+    status_code: int
+    headers: Dict[str, str]
+    depth: int
+    discovered_via: str  # 'start', 'sitemap' or 'link'
+    fetched_at: float = field(default_factory=time.time)
+
+
+@dataclass
+class CrawlStats:
+    """Counters for a finished or in-progress crawl."""
+    pages_fetched: int = 0
+    pages_failed: int = 0
+    duplicates_skipped: int = 0
+    robots_blocked: int = 0
+    sitemap_urls: int = 0
+
+
+class SiteCrawler:
+    """
+    Concurrent breadth-first site crawler.
+
+    Usage:
+        async for page in SiteCrawler(config).crawl("https://docs.example.com/"):
+            ...
+    """
+
+    def __init__(
+        self,
+        config: Optional[CrawlConfig] = None,
+        client: Optional[httpx.AsyncClient] = None
+    ):
+        self.config = config or CrawlConfig()
+        self.stats = CrawlStats()
+        self._client = client
+        self._owns_client = client is None
+        self._host_semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._host_delays: Dict[str, float] = {}
+        self._robots: Dict[str, Optional[RobotFileParser]] = {}
+        self._robots_locks: Dict[str, asyncio.Lock] = {}
+        self._seen: Set[str] = set()
+        self._content_hashes: Set[str] = set()
+        self.logger = logger.bind(service="site_crawler")
+
+    async def crawl(self, start_url: str) -> AsyncIterator[CrawledPage]:
+        """
+        Crawl a site starting at ``start_url``.
+
+        Yields pages as they are fetched. Closing the iterator early stops
+        all in-flight fetches.
+        """
+        start = canonicalize_url(start_url)
+        if not start:
+            raise ValueError(f"Unsupported URL: {start_url}")
+
+        start_parts = urlsplit(start)
+        self._scope_host = start_parts.netloc
+        self._scope_prefix = self.config.path_prefix
+
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                follow_redirects=True,
+                timeout=self.config.request_timeout,
+                headers={'User-Agent': self.config.user_agent},
+                limits=httpx.Limits(max_connections=self.config.max_concurrency),
+            )
+
+        frontier: asyncio.Queue = asyncio.Queue()
+        results: asyncio.Queue = asyncio.Queue(maxsize=self.config.handoff_queue_size)
+
+        self._enqueue(frontier, start, 0, 'start')
+
+        workers = [
+            asyncio.create_task(self._worker(frontier, results))
+            for _ in range(max(1, self.config.max_concurrency))
+        ]
+        seeder = (
+            asyncio.create_task(self._seed_from_sitemaps(start, frontier))
+            if self.config.use_sitemaps else None
+        )
+
+        async def close_when_done():
+            try:
+                if seeder is not None:
+                    try:
+                        await seeder
+                    except Exception as e:
+                        # Sitemaps only add URLs; pages reached through links are still crawled
+                        self.logger.warning("Sitemap seeding failed", start_url=start, error=str(e))
+                await frontier.join()
+                await results.put(None)
+            finally:
+                # The consumer only stops on the sentinel, so it goes out however this task ends
+                with contextlib.suppress(asyncio.QueueFull):
+                    results.put_nowait(None)
+
+        closer = asyncio.create_task(close_when_done())
+
+        try:
+            while True:
+                page = await results.get()
+                if page is None:
+                    break
+                yield page
+        finally:
+            for task in [*workers, closer] + ([seeder] if seeder else []):
+                task.cancel()
+            await asyncio.gather(*workers, closer, *([seeder] if seeder else []), return_exceptions=True)
+            if self._owns_client:
+                await self._client.aclose()
+                self._client = None
+
+            self.logger.info(
+                "Site crawl finished",
+                start_url=start,
+                pages_fetched=self.stats.pages_fetched,
+                pages_failed=self.stats.pages_failed,
+                duplicates_skipped=self.stats.duplicates_skipped,
+                robots_blocked=self.stats.robots_blocked,
+                sitemap_urls=self.stats.sitemap_urls
+            )
+
+    def _in_scope(self, url: str) -> bool:
+        parts = urlsplit(url)
+        if self.config.same_host_only and parts.netloc != self._scope_host:
+            return False
+        if self._scope_prefix and not parts.path.startswith(self._scope_prefix):
+            return False
+        extension = posixpath.splitext(parts.path)[1].lower()
+        return extension not in SKIPPED_EXTENSIONS
+
+    def _enqueue(self, frontier: asyncio.Queue, url: str, depth: int, via: str) -> bool:
+        if url in self._seen or not self._in_scope(url):
+            return False
+        if len(self._seen) >= self.config.max_pages:
+            return False
+        self._seen.add(url)
+        frontier.put_nowait((url, depth, via))
+        return True
+
+    async def _worker(self, frontier: asyncio.Queue, results: asyncio.Queue):
+        while True:
+            url, depth, via = await frontier.get()
+            try:
+                page = await self._fetch_page(url, depth, via)
+                if page is None:
+                    continue
+
+                if depth < self.config.max_depth:
+                    html = page.content.decode(self._charset(page.headers), errors='replace')
+                    for link in extract_links(html, page.url):
+                        self._enqueue(frontier, link, depth + 1, 'link')
+
+                await results.put(page)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.stats.pages_failed += 1
+                self.logger.warning("Page fetch failed", url=url, error=str(e))
+            finally:
+                frontier.task_done()
+
+    async def _fetch_page(self, url: str, depth: int, via: str) -> Optional[CrawledPage]:
+        if not await self._allowed(url):
+            self.stats.robots_blocked += 1
+            return None
+
+        host = urlsplit(url).netloc
+        semaphore = self._host_semaphores.setdefault(
+            host, asyncio.Semaphore(self.config.per_host_concurrency)
+        )
+
+        async with semaphore:
+            status_code, headers, content, final_url = await self._get(url)
+            delay = self._host_delays.get(host)
+            if delay:
+                await asyncio.sleep(delay)
+
+        if status_code >= 400:
+            self.stats.pages_failed += 1
+            return None
+
+        content_type = headers.get('content-type', '').split(';')[0].strip().lower()
+        if content_type and content_type not in HTML_CONTENT_TYPES:
+            return None
+
+        # Redirects can land on a page that was already fetched
+        final = canonicalize_url(final_url) or url
+        if final != url:
+            if final in self._seen or not self._in_scope(final):
+                self.stats.duplicates_skipped += 1
+                return None
+            self._seen.add(final)
+
+        content_hash = hashlib.sha256(content).hexdigest()
+        if content_hash in self._content_hashes:
+            self.stats.duplicates_skipped += 1
+            return None
+        self._content_hashes.add(content_hash)
+
+        self.stats.pages_fetched += 1
+        return CrawledPage(
+            url=final,
+            content=content,
+            status_code=status_code,
+            headers=headers,
+            depth=depth,
+            discovered_via=via
+        )
+
+    async def _get(self, url: str) -> Tuple[int, Dict[str, str], bytes, str]:
+        """Fetch a URL, reading at most ``max_page_bytes`` of the body."""
+        async with self._client.stream('GET', url) as response:
+            chunks = []
+            size = 0
+            async for chunk in response.aiter_bytes():
+                chunks.append(chunk)
+                size += len(chunk)
+                if size >= self.config.max_page_bytes:
+                    break
+            headers = {key.lower(): value for key, value in response.headers.items()}
+            return response.status_code, headers, b''.join(chunks)[:self.config.max_page_bytes], str(response.url)
+
+    @staticmethod
+    def _charset(headers: Dict[str, str]) -> str:
+        match = re.search(r'charset=([\w-]+)', headers.get('content-type', ''), re.I)
+        return match.group(1) if match else 'utf-8'
+
+    async def _allowed(self, url: str) -> bool:
+        if not self.config.respect_robots:
+            return True
+        parser = await self._robots_for(url)
+        return parser is None or parser.can_fetch(self.config.user_agent, url)
+
+    async def _robots_for(self, url: str) -> Optional[RobotFileParser]:
+        parts = urlsplit(url)
+        origin = f"{parts.scheme}://{parts.netloc}"
+        lock = self._robots_locks.setdefault(origin, asyncio.Lock())
+
+        async with lock:
+            if origin in self._robots:
+                return self._robots[origin]
+
+            parser = None
+            try:
+                status_code, _, content, _ = await self._get(f"{origin}/robots.txt")
+                if status_code < 400:
+                    parser = RobotFileParser()
+                    parser.parse(content.decode('utf-8', errors='replace').splitlines())
+                    delay = parser.crawl_delay(self.config.user_agent)
+                    if delay:
+                        # Serialize requests to the host and space them out
+                        self._host_delays[parts.netloc] = min(float(delay), self.config.max_crawl_delay)
+                        self._host_semaphores[parts.netloc] = asyncio.Semaphore(1)
+            except Exception as e:
+                self.logger.debug("robots.txt unavailable", origin=origin, error=str(e))
+
+            self._robots[origin] = parser
+            return parser
+
+    async def _seed_from_sitemaps(self, start: str, frontier: asyncio.Queue):
+        parts = urlsplit(start)
+        origin = f"{parts.scheme}://{parts.netloc}"
+
+        sitemaps = []
+        robots = await self._robots_for(start) if self.config.respect_robots else None
+        if robots is not None:
+            sitemaps.extend(robots.site_maps() or [])
+        if not sitemaps:
+            sitemaps.append(f"{origin}/sitemap.xml")
+
+        visited: Set[str] = set()
+        while sitemaps and len(visited) < self.config.max_sitemaps:
+            sitemap_url = sitemaps.pop(0)
+            if sitemap_url in visited:
+                continue
+            visited.add(sitemap_url)
+
+            try:
+                status_code, _, content, _ = await self._get(sitemap_url)
+            except Exception as e:
+                self.logger.debug("Sitemap fetch failed", sitemap_url=sitemap_url, error=str(e))
+                continue
+            if status_code >= 400:
+                continue
+
+            try:
+                page_urls, nested = parse_sitemap(content)
+            except Exception as e:
+                # Corrupt gzip and the like; fall back to link discovery
+                self.logger.warning("Sitemap parse failed", sitemap_url=sitemap_url, error=str(e))
+                continue
+            sitemaps.extend(nested)
+            for page_url in page_urls:
+                canonical = canonicalize_url(page_url)
+                if canonical and self._enqueue(frontier, canonical, 1, 'sitemap'):
+                    self.stats.sitemap_urls += 1
+
+
+def iter_site_pages(start_url: str, config: Optional[CrawlConfig] = None) -> Iterator[CrawledPage]:
+    """
+    Run a crawl on a background event loop and yield pages synchronously.
+
+    The handoff queue is bounded, so a slow consumer (chunking, database
+    writes) applies backpressure to the crawler instead of buffering the
+    whole site in memory. Breaking out of the loop stops the crawl.
+    """
+    config = config or CrawlConfig()
+    handoff: queue.Queue = queue.Queue(maxsize=config.handoff_queue_size)
+    stop = threading.Event()
+    done = object()
+
+    def put(item) -> bool:
+        while not stop.is_set():
+            try:
+                handoff.put(item, timeout=0.2)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    async def produce():
+        crawl = SiteCrawler(config).crawl(start_url)
+        try:
+            async for page in crawl:
+                if not await asyncio.to_thread(put, page):
+                    break
+        finally:
+            await crawl.aclose()
+
+    def run():
+        try:
+            asyncio.run(produce())
+        except BaseException as e:
+            put(e)
+        else:
+            put(done)
+
+    thread = threading.Thread(target=run, name='site-crawler', daemon=True)
+    thread.start()
+
+    try:
+        while True:
+            item = handoff.get()
+            if item is done:
+                break
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+    finally:
+        stop.set()
+        thread.join(timeout=config.request_timeout)
@@ -5,7 +5,6 @@ Provides WebSocket-based streaming of RAG responses with authentication,
 rate limiting, and comprehensive error handling.
 """
 
-import asyncio
 import json
 import time
 from typing import Dict, Any, Optional, AsyncGenerator
@@ -26,6 +25,17 @@ from chatbot_saas.config import get_settings
 settings = get_settings()
 logger = structlog.get_logger()
 
+# Status messages for orchestrator stage events
+STAGE_MESSAGES = {
+    "cache": "Found a recent answer to this question",
+    "analysis": "Analyzed your question",
+    "embedding": "Generated query embedding",
+    "search": "Searched knowledge base",
+    "context": "Assembled context from sources",
+    "generation": "Generated response",
+    "privacy": "Validated response privacy",
+}
+
 
 @dataclass
 class StreamingSession:
@@ -328,126 +338,78 @@ class RAGStreamingConsumer(AsyncWebsocketConsumer):
             await self.send_error("Failed to process query.")
     
     async def stream_rag_response(self, rag_query: RAGQuery):
-        """Stream RAG response in chunks."""
+        """Stream RAG response as the orchestrator produces it."""
+        query_id = rag_query.request_id
+        chunk_index = 0
         try:
-            # Send processing status updates
-            await self.send_message({
-                "type": "processing_status",
-                "query_id": rag_query.request_id,
-                "stage": "analyzing",
-                "message": "Analyzing your question..."
-            })
-            
-            # Process the query (this could be made more granular for better streaming)
-            start_time = time.time()
-            
-            # Send embedding status
-            await self.send_message({
-                "type": "processing_status",
-                "query_id": rag_query.request_id,
-                "stage": "embedding",
-                "message": "Generating query embedding..."
-            })
-            
-            # Send search status
-            await self.send_message({
-                "type": "processing_status",
-                "query_id": rag_query.request_id,
-                "stage": "searching",
-                "message": "Searching knowledge base..."
-            })
-            
-            # Process the full query
-            response = await self.rag_orchestrator.process_query(rag_query)
-            
-            # Send context assembly status
-            await self.send_message({
-                "type": "processing_status",
-                "query_id": rag_query.request_id,
-                "stage": "assembling",
-                "message": "Assembling context from sources..."
-            })
-            
-            # Send generation status
-            await self.send_message({
-                "type": "processing_status",
-                "query_id": rag_query.request_id,
-                "stage": "generating",
-                "message": "Generating response..."
-            })
-            
-            # Stream the response text (simulate streaming by chunking)
-            await self.stream_response_text(rag_query.request_id, response.text)
-            
-            # Send citations
-            await self.send_message({
-                "type": "citations",
-                "query_id": rag_query.request_id,
-                "citations": response.citations
-            })
-            
-            # Send final metadata
-            processing_time = time.time() - start_time
-            await self.send_message({
-                "type": "query_completed",
-                "query_id": rag_query.request_id,
-                "metadata": {
-                    "processing_time": processing_time,
-                    "generation_time": response.generation_time,
-                    "cost_estimate": response.cost_estimate,
-                    "privacy_validated": response.privacy_validated,
-                    "context_sources": response.context_used.source_count,
-                    "total_tokens": response.context_used.total_tokens
-                },
-                "timestamp": timezone.now().isoformat()
-            })
+            async for event in self.rag_orchestrator.stream_query(rag_query):
+                if event["type"] == "stage":
+                    # Sent when the stage has actually finished
+                    await self.send_message({
+                        "type": "processing_status",
+                        "query_id": query_id,
+                        "stage": event["stage"],
+                        "message": STAGE_MESSAGES.get(event["stage"], event["stage"]),
+                        "duration": event["duration"],
+                        "elapsed": event["elapsed"]
+                    })
+                
+                elif event["type"] == "delta":
+                    if chunk_index == 0:
+                        await self.send_message({
+                            "type": "response_start",
+                            "query_id": query_id,
+                            "timestamp": timezone.now().isoformat()
+                        })
+                    await self.send_message({
+                        "type": "response_chunk",
+                        "query_id": query_id,
+                        "chunk": event["text"],
+                        "chunk_index": chunk_index,
+                        "is_final": False
+                    })
+                    chunk_index += 1
+                
+                elif event["type"] == "completed":
+                    response = event["response"]
+                    await self.send_message({
+                        "type": "response_end",
+                        "query_id": query_id,
+                        "timestamp": timezone.now().isoformat()
+                    })
+                    
+                    # Send citations
+                    await self.send_message({
+                        "type": "citations",
+                        "query_id": query_id,
+                        "citations": response.citations
+                    })
+                    
+                    # Send final metadata
+                    await self.send_message({
+                        "type": "query_completed",
+                        "query_id": query_id,
+                        "metadata": {
+                            "processing_time": event["elapsed"],
+                            "time_to_first_token": event["time_to_first_token"],
+                            "generation_time": response.generation_time,
+                            "cost_estimate": response.cost_estimate,
+                            "privacy_validated": response.privacy_validated,
+                            "context_sources": response.context_used.source_count,
+                            "total_tokens": response.context_used.total_tokens
+                        },
+                        "timestamp": timezone.now().isoformat()
+                    })
             
         except RAGError as e:
-            await self.send_error(f"RAG processing failed: {str(e)}", rag_query.request_id)
+            await self.send_error(f"RAG processing failed: {str(e)}", query_id)
         except Exception as e:
             self.logger.error(
                 "Error streaming RAG response",
                 error=str(e),
-                query_id=rag_query.request_id
+                query_id=query_id
             )
-            await self.send_error("Failed to generate response.", rag_query.request_id)
-    
-    async def stream_response_text(self, query_id: str, text: str, chunk_size: int = 50):
-        """Stream response text in chunks to simulate real-time generation."""
-        words = text.split()
-        current_chunk = []
-        
-        await self.send_message({
-            "type": "response_start",
-            "query_id": query_id,
-            "timestamp": timezone.now().isoformat()
-        })
-        
-        for i, word in enumerate(words):
-            current_chunk.append(word)
-            
-            # Send chunk every N words or at the end
-            if len(current_chunk) >= chunk_size // 5 or i == len(words) - 1:  # Smaller chunks for demo
-                chunk_text = " ".join(current_chunk)
-                
-                await self.send_message({
-                    "type": "response_chunk",
-                    "query_id": query_id,
-                    "chunk": chunk_text,
-                    "chunk_index": i // (chunk_size // 5),
-                    "is_final": i == len(words) - 1
-                })
-                
-                current_chunk = []
-                
-                # Add small delay to simulate streaming
-                await asyncio.sleep(0.1)
-        
-        await self.send_message({
-            "type": "response_end",
-            "query_id": query_id,
-            "timestamp": timezone.now().isoformat()
-        })
+            await self.send_error("Failed to generate response.", query_id)
     
     async def handle_ping_message(self):
         """Handle ping messages for connection health checks."""
@@ -0,0 +1,176 @@
+"""
+Coalesced task progress publishing.
+
+Tasks report progress far more often than anyone can watch it (one update
+per embedding batch on large jobs). ``ProgressPublisher`` keeps the latest
+update per task in memory and writes it out at most once per
+``TASK_PROGRESS_MIN_INTERVAL_SECONDS``: to the cache for the polling
+status endpoint, and to a channel layer group so dashboard WebSockets
+subscribed to the task receive it as a push. Final states (success,
+failure) always flush immediately, and anything still buffered when a
+task ends is flushed from ``task_postrun``.
+"""
+
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+import structlog
+from asgiref.sync import async_to_sync
+from django.core.cache import cache
+
+from chatbot_saas.config import get_settings
+
+logger = structlog.get_logger()
+settings = get_settings()
+
+PROGRESS_KEY_PREFIX = "task_progress"
+PROGRESS_TIMEOUT_SECONDS = 3600
+OWNER_KEY_PREFIX = "task_owner"
+OWNER_TIMEOUT_SECONDS = 24 * 3600
+
+
+def progress_group_name(task_id: str) -> str:
+    """Channel layer group receiving a task's progress events."""
+    return f"task_progress_{task_id}"
+
+
+class ProgressPublisher:
+    """Per-process, per-task coalescing of progress writes."""
+
+    def __init__(self, min_interval_seconds: Optional[float] = None):
+        """
+        Initialize publisher.
+
+        Args:
+            min_interval_seconds: Minimum time between writes for one task
+        """
+        if min_interval_seconds is None:
+            min_interval_seconds = settings.TASK_PROGRESS_MIN_INTERVAL_SECONDS
+        self.min_interval_seconds = min_interval_seconds
+        self._last_flush: Dict[str, float] = {}
+        self._pending: Dict[str, Dict[str, Any]] = {}
+        self._on_flush: Dict[str, Callable[[Dict[str, Any]], None]] = {}
+        self._lock = threading.Lock()
+        self.stats = {"updates": 0, "writes": 0}
+
+    def publish(
+        self,
+        task_id: str,
+        data: Dict[str, Any],
+        final: bool = False,
+        force: bool = False,
+        on_flush: Optional[Callable[[Dict[str, Any]], None]] = None
+    ) -> bool:
+        """
+        Record a progress update, writing it out if the interval has passed.
+
+        Args:
+            task_id: Task the progress belongs to
+            data: Progress payload
+            final: Terminal state; written immediately and clears buffers
+            force: Write immediately without ending the task's stream
+            on_flush: Extra per-write hook (e.g. Celery ``update_state``)
+
+        Returns:
+            bool: Whether the update was written now
+        """
+        now = time.monotonic()
+        with self._lock:
+            self.stats["updates"] += 1
+            last = self._last_flush.get(task_id)
+            due = final or force or last is None or now - last >= self.min_interval_seconds
+            if not due:
+                self._pending[task_id] = data
+                if on_flush is not None:
+                    self._on_flush[task_id] = on_flush
+                return False
+
+            self._pending.pop(task_id, None)
+            self._on_flush.pop(task_id, None)
+            if final:
+                self._last_flush.pop(task_id, None)
+            else:
+                self._last_flush[task_id] = now
+
+        self._write(task_id, data, final, on_flush)
+        return True
+
+    def flush(self, task_id: Optional[str] = None) -> int:
+        """Write out buffered updates for one task, or all of them."""
+        with self._lock:
+            task_ids = [task_id] if task_id is not None else list(self._pending)
+            buffered = []
+            for pending_id in task_ids:
+                data = self._pending.pop(pending_id, None)
+                if data is not None:
+                    buffered.append((pending_id, data, self._on_flush.pop(pending_id, None)))
+                    self._last_flush[pending_id] = time.monotonic()
+            if task_id is None:
+                # Forget tasks whose interval has lapsed; their next update writes anyway
+                cutoff = time.monotonic() - self.min_interval_seconds
+                for stale_id in [key for key, at in self._last_flush.items() if at < cutoff]:
+                    del self._last_flush[stale_id]
+
+        for pending_id, data, on_flush in buffered:
+            self._write(pending_id, data, False, on_flush)
+        return len(buffered)
+
+    def _write(
+        self,
+        task_id: str,
+        data: Dict[str, Any],
+        final: bool,
+        on_flush: Optional[Callable[[Dict[str, Any]], None]]
+    ) -> None:
+        self.stats["writes"] += 1
+        try:
+            cache.set(f"{PROGRESS_KEY_PREFIX}:{task_id}", data, timeout=PROGRESS_TIMEOUT_SECONDS)
+        except Exception as e:
+            logger.warning("Failed to cache task progress", task_id=task_id, error=str(e))
+
+        if on_flush is not None:
+            try:
+                on_flush(data)
+            except Exception:
+                # Result backend unavailable (or eager mode); cache already has it
+                pass
+
+        self._push(task_id, data, final)
+
+    def _push(self, task_id: str, data: Dict[str, Any], final: bool) -> None:
+        """Send the update to WebSocket subscribers of the task."""
+        from channels.layers import get_channel_layer
+
+        try:
+            channel_layer = get_channel_layer()
+            if channel_layer is None:
+                return
+            async_to_sync(channel_layer.group_send)(
+                progress_group_name(task_id),
+                {
+                    "type": "task_progress_update",
+                    "task_id": task_id,
+                    "progress": data,
+                    "final": final
+                }
+            )
+        except Exception as e:
+            logger.warning("Failed to push task progress", task_id=task_id, error=str(e))
+
+
+progress_publisher = ProgressPublisher()
+
+
+def get_task_progress(task_id: str) -> Optional[Dict[str, Any]]:
+    """Latest written progress for a task."""
+    return cache.get(f"{PROGRESS_KEY_PREFIX}:{task_id}")
+
+
+def record_task_owner(task_id: str, user_id: Any) -> None:
+    """Remember who submitted a task; only they may subscribe to its progress."""
+    cache.set(f"{OWNER_KEY_PREFIX}:{task_id}", str(user_id), timeout=OWNER_TIMEOUT_SECONDS)
+
+
+def get_task_owner(task_id: str) -> Optional[str]:
+    """User id a task was submitted for, if recorded."""
+    return cache.get(f"{OWNER_KEY_PREFIX}:{task_id}")
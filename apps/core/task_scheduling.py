@@ -0,0 +1,350 @@
+"""
+Per-tenant fair scheduling for bulk Celery work.
+
+Bulk tasks (document processing, crawling, embedding generation) run on
+their own queues so they can't delay interactive work, but one tenant
+bulk-uploading hundreds of files could still fill those queues ahead of
+everyone else. ``FairTaskScheduler`` sits in front of the broker: each
+tenant (the chatbot owner) gets at most ``per_tenant_limit`` tasks in
+flight, further submissions wait in a per-tenant backlog, and freed slots
+are handed out round-robin across tenants with waiting work.
+
+State lives in the Django cache so every web process and worker shares
+it, behind a short cache lock: slots are reserved under the lock and the
+broker is only called after it is released. Per-tenant queue depth and
+wait times are reported by ``tenant_queue_stats``.
+"""
+
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+import structlog
+from celery.utils import uuid
+from django.core.cache import cache
+
+from chatbot_saas.config import get_settings
+
+logger = structlog.get_logger()
+settings = get_settings()
+
+# Task headers carrying scheduling context to the worker
+TENANT_HEADER = 'fair_tenant_id'
+ENQUEUED_AT_HEADER = 'fair_enqueued_at'
+
+# Backlog items outlive any realistic wait, but must expire eventually
+ITEM_TIMEOUT_SECONDS = 7 * 24 * 3600
+
+
+class FairTaskScheduler:
+    """Round-robin, per-tenant capped dispatch of bulk Celery tasks."""
+
+    def __init__(
+        self,
+        per_tenant_limit: Optional[int] = None,
+        in_flight_ttl_seconds: Optional[int] = None,
+        key_prefix: str = 'fair_queue'
+    ):
+        """
+        Initialize scheduler.
+
+        Args:
+            per_tenant_limit: Max tasks in flight per tenant
+            in_flight_ttl_seconds: Slots held longer than this are assumed
+                lost (e.g. a killed worker) and reclaimed
+            key_prefix: Cache key prefix for scheduler state
+        """
+        self.per_tenant_limit = per_tenant_limit or settings.BULK_TASKS_PER_TENANT
+        self.in_flight_ttl_seconds = in_flight_ttl_seconds or settings.BULK_TASK_SLOT_TTL_SECONDS
+        self.key_prefix = key_prefix
+        self.logger = logger.bind(service="fair_task_scheduler")
+
+    # Public API
+
+    def submit(self, task, tenant_id: str, args: Optional[List] = None, kwargs: Optional[Dict] = None, **options) -> str:
+        """
+        Submit a bulk task on behalf of a tenant.
+
+        The task is sent immediately if the tenant has a free slot and
+        nobody else is waiting, otherwise it joins the tenant's backlog.
+        The task id is assigned up front, so callers can track progress
+        either way.
+
+        Returns:
+            str: Celery task id
+        """
+        tenant_id = str(tenant_id)
+        item = {
+            'task': task.name,
+            'args': list(args or []),
+            'kwargs': kwargs or {},
+            'options': options,
+            'task_id': options.pop('task_id', None) or uuid(),
+            'enqueued_at': time.time(),
+        }
+
+        if task.app.conf.task_always_eager:
+            # Nothing to be fair about when tasks run inline
+            self._send(item, tenant_id)
+            return item['task_id']
+
+        with self._lock():
+            self._enqueue_locked(tenant_id, item)
+            reserved = self._reserve_locked()
+        self._send_reserved(reserved)
+
+        return item['task_id']
+
+    def task_started(self, request) -> None:
+        """Record how long a dispatched task waited in the broker."""
+        tenant_id, enqueued_at = self._request_context(request)
+        if tenant_id is None or enqueued_at is None:
+            return
+        wait_ms = (time.time() - enqueued_at) * 1000
+        with self._lock():
+            state = self._get_tenant(tenant_id)
+            state['started'] += 1
+            state['total_start_wait_ms'] += wait_ms
+            state['max_start_wait_ms'] = max(state['max_start_wait_ms'], wait_ms)
+            self._set_tenant(tenant_id, state)
+
+    def task_finished(self, request) -> None:
+        """Free a finished task's slot and dispatch waiting work."""
+        tenant_id, _ = self._request_context(request)
+        if tenant_id is None:
+            return
+        with self._lock():
+            state = self._get_tenant(tenant_id)
+            if state['in_flight'].pop(request.id, None) is not None:
+                self._set_tenant(tenant_id, state)
+            reserved = self._reserve_locked()
+        self._send_reserved(reserved)
+
+    def dispatch_pending(self) -> int:
+        """Reclaim expired slots and fill free ones; returns tasks sent."""
+        with self._lock():
+            now = time.time()
+            for tenant_id in self._tenants():
+                state = self._get_tenant(tenant_id)
+                expired = [
+                    task_id for task_id, dispatched_at in state['in_flight'].items()
+                    if now - dispatched_at > self.in_flight_ttl_seconds
+                ]
+                if expired:
+                    for task_id in expired:
+                        del state['in_flight'][task_id]
+                    self._set_tenant(tenant_id, state)
+                    self.logger.warning(
+                        "Reclaimed expired bulk task slots",
+                        tenant_id=tenant_id,
+                        task_ids=expired
+                    )
+            reserved = self._reserve_locked()
+        return self._send_reserved(reserved)
+
+    def tenant_queue_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Per-tenant queue depth, slots in use and wait times."""
+        now = time.time()
+        stats = {}
+        for tenant_id in self._tenants():
+            state = self._get_tenant(tenant_id)
+            pending = state['tail'] - state['head']
+            oldest = cache.get(self._item_key(tenant_id, state['head'] + 1)) if pending else None
+            stats[tenant_id] = {
+                'pending': pending,
+                'in_flight': len(state['in_flight']),
+                'limit': self.per_tenant_limit,
+                'dispatched': state['dispatched'],
+                'oldest_pending_wait_s': round(now - oldest['enqueued_at'], 1) if oldest else 0.0,
+                'avg_queue_wait_ms': round(state['total_queue_wait_ms'] / state['dispatched'], 1) if state['dispatched'] else 0.0,
+                'max_queue_wait_ms': round(state['max_queue_wait_ms'], 1),
+                'avg_start_wait_ms': round(state['total_start_wait_ms'] / state['started'], 1) if state['started'] else 0.0,
+                'max_start_wait_ms': round(state['max_start_wait_ms'], 1),
+            }
+        return stats
+
+    # Dispatch
+
+    def _enqueue_locked(self, tenant_id: str, item: Dict[str, Any]) -> None:
+        """Append an item to a tenant's backlog; caller holds the lock."""
+        state = self._get_tenant(tenant_id)
+        state['tail'] += 1
+        cache.set(self._item_key(tenant_id, state['tail']), item, timeout=ITEM_TIMEOUT_SECONDS)
+        self._set_tenant(tenant_id, state)
+        self._register_tenant(tenant_id)
+
+    def _reserve_locked(self) -> List[Tuple[str, int, Dict[str, Any]]]:
+        """
+        Hand free slots out round-robin across tenants; caller holds the lock.
+
+        Returns:
+            List[Tuple[str, int, Dict[str, Any]]]: (tenant, backlog position,
+            item) for each reserved slot, to send once the lock is released
+        """
+        tenants = self._tenants()
+        if not tenants:
+            return []
+
+        cursor = cache.get(self._key('cursor'), 0)
+        reserved = []
+        idle_passes = 0
+        # Keep cycling while some tenant still gets a task per full pass
+        while idle_passes < len(tenants):
+            tenant_id = tenants[cursor % len(tenants)]
+            cursor += 1
+            slot = self._reserve_one(tenant_id)
+            if slot:
+                reserved.append((tenant_id, *slot))
+                idle_passes = 0
+            else:
+                idle_passes += 1
+
+        cache.set(self._key('cursor'), cursor % len(tenants), timeout=None)
+        self._prune_tenants(tenants)
+        return reserved
+
+    def _reserve_one(self, tenant_id: str) -> Optional[Tuple[int, Dict[str, Any]]]:
+        state = self._get_tenant(tenant_id)
+        if state['head'] >= state['tail'] or len(state['in_flight']) >= self.per_tenant_limit:
+            return None
+
+        position = state['head'] + 1
+        item = cache.get(self._item_key(tenant_id, position))
+        state['head'] = position
+        if item is None:
+            self.logger.error("Bulk task backlog item expired", tenant_id=tenant_id, position=position)
+            self._set_tenant(tenant_id, state)
+            return None
+
+        wait_ms = (time.time() - item['enqueued_at']) * 1000
+        state['in_flight'][item['task_id']] = time.time()
+        state['dispatched'] += 1
+        state['total_queue_wait_ms'] += wait_ms
+        state['max_queue_wait_ms'] = max(state['max_queue_wait_ms'], wait_ms)
+        self._set_tenant(tenant_id, state)
+        return position, item
+
+    def _send_reserved(self, reserved: List[Tuple[str, int, Dict[str, Any]]]) -> int:
+        """Send reserved items to the broker, outside the lock; returns tasks sent."""
+        failed = []
+        for tenant_id, position, item in reserved:
+            try:
+                self._send(item, tenant_id)
+            except Exception as e:
+                self.logger.error("Failed to dispatch bulk task", tenant_id=tenant_id, task=item['task'], error=str(e))
+                failed.append((tenant_id, position, item))
+                continue
+            cache.delete(self._item_key(tenant_id, position))
+
+        if failed:
+            # Give the slots back and queue the items again for the next dispatch
+            with self._lock():
+                for tenant_id, position, item in failed:
+                    state = self._get_tenant(tenant_id)
+                    state['in_flight'].pop(item['task_id'], None)
+                    state['dispatched'] -= 1
+                    self._set_tenant(tenant_id, state)
+                    cache.delete(self._item_key(tenant_id, position))
+                    self._enqueue_locked(tenant_id, item)
+        return len(reserved) - len(failed)
+
+    def _send(self, item: Dict[str, Any], tenant_id: str) -> None:
+        from chatbot_saas.celery import app
+
+        options = dict(item['options'])
+        headers = dict(options.pop('headers', None) or {})
+        headers.update({TENANT_HEADER: tenant_id, ENQUEUED_AT_HEADER: item['enqueued_at']})
+        app.tasks[item['task']].apply_async(
+            args=item['args'],
+            kwargs=item['kwargs'],
+            task_id=item['task_id'],
+            headers=headers,
+            **options
+        )
+
+    # State
+
+    def _key(self, name: str) -> str:
+        return f"{self.key_prefix}:{name}"
+
+    def _item_key(self, tenant_id: str, position: int) -> str:
+        return self._key(f"{tenant_id}:item:{position}")
+
+    def _tenants(self) -> List[str]:
+        return cache.get(self._key('tenants'), [])
+
+    def _register_tenant(self, tenant_id: str) -> None:
+        tenants = self._tenants()
+        if tenant_id not in tenants:
+            cache.set(self._key('tenants'), tenants + [tenant_id], timeout=None)
+
+    def _prune_tenants(self, tenants: List[str]) -> None:
+        """Forget tenants with nothing waiting or running."""
+        active = []
+        for tenant_id in tenants:
+            state = self._get_tenant(tenant_id)
+            if state['head'] < state['tail'] or state['in_flight']:
+                active.append(tenant_id)
+        if active != tenants:
+            cache.set(self._key('tenants'), active, timeout=None)
+
+    def _get_tenant(self, tenant_id: str) -> Dict[str, Any]:
+        state = cache.get(self._key(f"{tenant_id}:state"))
+        if state is None:
+            state = {
+                'head': 0,
+                'tail': 0,
+                'in_flight': {},
+                'dispatched': 0,
+                'total_queue_wait_ms': 0.0,
+                'max_queue_wait_ms': 0.0,
+                'started': 0,
+                'total_start_wait_ms': 0.0,
+                'max_start_wait_ms': 0.0,
+            }
+        return state
+
+    def _set_tenant(self, tenant_id: str, state: Dict[str, Any]) -> None:
+        cache.set(self._key(f"{tenant_id}:state"), state, timeout=ITEM_TIMEOUT_SECONDS)
+
+    @contextmanager
+    def _lock(self, timeout: float = 10.0) -> Iterator[None]:
+        """
+        Cross-process mutex over scheduler state (cache.add is atomic).
+
+        Held only for cache reads and writes. The lock expires in case its
+        holder dies, so it is released only while it still holds this
+        holder's token, never a later holder's.
+        """
+        key = self._key('lock')
+        token = uuid()
+        deadline = time.monotonic() + timeout
+        while not cache.add(key, token, timeout=30):
+            if time.monotonic() > deadline:
+                raise TimeoutError("Timed out waiting for the fair scheduler lock")
+            time.sleep(0.01)
+        try:
+            yield
+        finally:
+            if cache.get(key) == token:
+                cache.delete(key)
+
+    @staticmethod
+    def _request_context(request) -> Tuple[Optional[str], Optional[float]]:
+        """Tenant and enqueue time from a task request (worker or eager)."""
+        headers = getattr(request, 'headers', None) or {}
+        tenant_id = getattr(request, TENANT_HEADER, None) or headers.get(TENANT_HEADER)
+        enqueued_at = getattr(request, ENQUEUED_AT_HEADER, None) or headers.get(ENQUEUED_AT_HEADER)
+        return tenant_id, enqueued_at
+
+
+fair_scheduler = FairTaskScheduler()
+
+
+def submit_bulk_task(task, tenant_id, args: Optional[List] = None, kwargs: Optional[Dict] = None, **options) -> str:
+    """Submit a bulk task through the shared fair scheduler."""
+    return fair_scheduler.submit(task, tenant_id, args=args, kwargs=kwargs, **options)
+
+
+def tenant_queue_stats() -> Dict[str, Dict[str, Any]]:
+    """Per-tenant bulk queue depth and wait times."""
+    return fair_scheduler.tenant_queue_stats()
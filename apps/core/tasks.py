@@ -3,27 +3,38 @@ Async task processing with Celery for document processing and embeddings.
 Implements robust task management with error handling and progress tracking.
 """
 
-import asyncio
+import hashlib
+import itertools
 import time
 import traceback
+from collections import Counter
 from typing import Any, Dict, List, Optional, Tuple
 from dataclasses import asdict
 from enum import Enum
 import logging
 import base64
 
-from celery import Celery, Task
-from celery.signals import task_prerun, task_postrun, task_failure
+from celery import Celery, Task, signature, states
+from celery.signals import (
+    task_prerun, task_postrun, task_failure, worker_process_init, worker_process_shutdown
+)
 from celery.exceptions import Retry, WorkerLostError
 from django.core.cache import cache
+from django.db.models import Q
 from django.utils import timezone
 
 from apps.core.document_processors import DocumentProcessorFactory, ProcessedDocument
 from apps.core.text_chunking import ChunkerFactory, ChunkingConfig, ChunkingStrategy
-from apps.core.embedding_service import OpenAIEmbeddingService, EmbeddingConfig
-from apps.core.vector_storage import create_vector_storage
+from apps.core.embedding_service import EmbeddingConfig
+from apps.core.async_runtime import (
+    begin_task_stats, end_task_stats, get_embedding_service, get_vector_storage,
+    run_async, start_worker_runtime, stop_worker_runtime
+)
 from apps.core.rag_integration import RAGIntegrationService
+from apps.core import reranking
 from apps.core.monitoring import task_monitor
+from apps.core.task_scheduling import fair_scheduler, submit_bulk_task
+from apps.core.task_progress import progress_publisher, record_task_owner
 from chatbot_saas.config import get_settings
 
 # For compatibility - will be removed when proper models are implemented
@@ -109,11 +120,19 @@ class BaseTaskWithProgress(Task):
         current: int,
         total: int,
         message: str = "",
-        metadata: Optional[Dict[str, Any]] = None
+        metadata: Optional[Dict[str, Any]] = None,
+        task_id: Optional[str] = None
     ):
-        """Update task progress."""
+        """
+        Update task progress.
+        
+        Pass ``task_id`` to report progress on behalf of another task, e.g.
+        fan-out subtasks updating the task that dispatched them. Updates are
+        coalesced per task by ``progress_publisher``; completion is written
+        immediately.
+        """
         # Handle eager mode where task_id might not be available
-        task_id = getattr(self.request, 'id', None) or 'eager-mode'
+        task_id = task_id or getattr(self.request, 'id', None) or 'eager-mode'
         
         progress_data = {
             "current": current,
@@ -126,36 +145,19 @@ class BaseTaskWithProgress(Task):
             "status": TaskStatus.PROCESSING.value
         }
         
-        # Only cache if we have a real task_id and caching is enabled
+        # Only publish if we have a real task_id and caching is enabled
         if task_id != 'eager-mode':
-            try:
-                from django.conf import settings
-                # Check if caching is enabled before attempting to cache
-                if getattr(settings, 'ENABLE_CACHING', True):
-                    cache.set(
-                        f"{self.progress_key_prefix}:{task_id}",
-                        progress_data,
-                        timeout=3600  # 1 hour
-                    )
-                else:
-                    # In development mode without caching, just log progress
-                    print(f"Task Progress: {progress_data['percentage']:.1f}% - {progress_data['message']}")
-            except Exception as e:
-                # If cache is not available, just continue without caching
-                print(f"Cache not available, skipping progress update: {e}")
+            from django.conf import settings
+            if getattr(settings, 'ENABLE_CACHING', True):
+                progress_publisher.publish(
+                    task_id,
+                    progress_data,
+                    force=total > 0 and current >= total,
+                    on_flush=lambda data: self.update_state(task_id=task_id, state="PROGRESS", meta=data)
+                )
+            else:
+                # In development mode without caching, just log progress
                 print(f"Task Progress: {progress_data['percentage']:.1f}% - {progress_data['message']}")
-            
-            # Also update task state (only if not in eager mode and caching enabled)
-            try:
-                from django.conf import settings
-                if getattr(settings, 'ENABLE_CACHING', True):
-                    self.update_state(
-                        state="PROGRESS",
-                        meta=progress_data
-                    )
-            except (ValueError, Exception) as e:
-                # Ignore if task_id is not available (eager mode) or caching issues
-                pass
         
         # Always log progress for debugging
         print(f"Task Progress: {current}/{total} ({progress_data['percentage']:.1f}%) - {message}")
@@ -172,9 +174,15 @@ class BaseTaskWithProgress(Task):
         except Exception:
             return None
     
-    def mark_success(self, result: Any, metadata: Optional[Dict[str, Any]] = None):
-        """Mark task as successful."""
-        task_id = getattr(self.request, 'id', None) or 'eager-mode'
+    def mark_success(self, result: Any, metadata: Optional[Dict[str, Any]] = None, task_id: Optional[str] = None):
+        """
+        Mark task as successful.
+        
+        Pass ``task_id`` to finish another task, e.g. a training callback ending
+        the run its dispatcher started; its result backend state is set too.
+        """
+        on_behalf = task_id is not None
+        task_id = task_id or getattr(self.request, 'id', None) or 'eager-mode'
         success_data = {
             "status": TaskStatus.SUCCESS.value,
             "result": result,
@@ -183,20 +191,19 @@ class BaseTaskWithProgress(Task):
             "task_id": task_id
         }
         
-        # Only cache if we have a real task_id
+        # Only publish if we have a real task_id
         if task_id != 'eager-mode':
-            cache.set(
-                f"{self.progress_key_prefix}:{task_id}",
-                success_data,
-                timeout=3600
-            )
+            progress_publisher.publish(task_id, success_data, final=True)
+            if on_behalf:
+                self._store_terminal_state(task_id, success_data, states.SUCCESS)
         
         print(f"✅ Task completed successfully: {result}")
         return success_data
     
-    def mark_failure(self, error: Exception, metadata: Optional[Dict[str, Any]] = None):
-        """Mark task as failed."""
-        task_id = getattr(self.request, 'id', None) or 'eager-mode'
+    def mark_failure(self, error: Exception, metadata: Optional[Dict[str, Any]] = None, task_id: Optional[str] = None):
+        """Mark task as failed; ``task_id`` fails another task as in ``mark_success``."""
+        on_behalf = task_id is not None
+        task_id = task_id or getattr(self.request, 'id', None) or 'eager-mode'
         failure_data = {
             "status": TaskStatus.FAILURE.value,
             "error": str(error),
@@ -207,17 +214,23 @@ class BaseTaskWithProgress(Task):
             "task_id": task_id
         }
         
-        # Only cache if we have a real task_id
+        # Only publish if we have a real task_id
         if task_id != 'eager-mode':
-            cache.set(
-                f"{self.progress_key_prefix}:{task_id}",
-                failure_data,
-                timeout=3600
-            )
+            progress_publisher.publish(task_id, failure_data, final=True)
+            if on_behalf:
+                self._store_terminal_state(task_id, error, states.FAILURE)
         
         print(f"❌ Task failed: {error}")
         return failure_data
     
+    def _store_terminal_state(self, task_id: str, result: Any, state: str) -> None:
+        """Replace the PROGRESS state written on another task's behalf."""
+        try:
+            self.backend.store_result(task_id, result, state)
+        except Exception as e:
+            # Result backend unavailable (or eager mode); the cache has the final state
+            logger.debug(f"Could not store {state} for task {task_id}: {str(e)}")
+    
     def retry_with_backoff(self, exc: Exception, **kwargs):
         """Retry task with exponential backoff."""
         retry_count = self.request.retries
@@ -258,28 +271,42 @@ def process_document_pipeline(
         Dict[str, Any]: Processing result
     """
     try:
-        import base64
+        from apps.knowledge.models import ProcessingJob
         
         self.update_progress(0, 100, "Starting document processing")
         
-        # Decode file content
-        file_content = base64.b64decode(file_content_base64)
+        # A retried attempt resumes from the checkpoints of the failed one
+        job, resumed = _resume_document_job(self, document_id)
         
-        self.update_progress(10, 100, "Extracting document content")
-        
-        # Extract document content using our DocumentProcessorFactory
-        try:
-            processor_factory = DocumentProcessorFactory()
-            processor = processor_factory.create_processor(content_type)
-            processed_doc = processor.extract_text(file_content, filename)
-        except Exception as e:
-            logger.error(f"Document content extraction failed: {str(e)}")
-            self.mark_failure(e)
-            raise
+        if job is not None and job.extracted_text is not None:
+            text_content = job.extracted_text
+            self.update_progress(30, 100, "Resuming from extracted text checkpoint")
+        else:
+            # Decode file content
+            file_content = base64.b64decode(file_content_base64)
+            
+            self.update_progress(10, 100, "Extracting document content")
+            
+            # Extract document content using our DocumentProcessorFactory
+            try:
+                processor_factory = DocumentProcessorFactory()
+                processor = processor_factory.create_processor(content_type)
+                processed_doc = processor.extract_text(file_content, filename)
+                text_content = processed_doc.text_content
+            except Exception as e:
+                logger.error(f"Document content extraction failed: {str(e)}")
+                self.mark_failure(e)
+                raise
+            
+            if job is not None:
+                job.extracted_text = text_content
+                job.save(update_fields=['extracted_text', 'updated_at'])
+                job.save_checkpoint(ProcessingJob.STAGE_EXTRACTED, char_count=len(text_content))
         
         self.update_progress(30, 100, "Chunking document content")
         
-        # Chunk document using our ChunkerFactory
+        # Chunk document using our ChunkerFactory (cheap and deterministic,
+        # so it is redone on resume and verified against the checkpoint)
         try:
             config = ChunkingConfig(
                 chunk_size=1000,
@@ -288,64 +315,99 @@ def process_document_pipeline(
                 min_chunk_size=100
             )
             chunker = ChunkerFactory.create_chunker(config)
-            chunks = chunker.chunk_text(processed_doc.content)
+            chunks = chunker.chunk_text(text_content)
         except Exception as e:
             logger.error(f"Document chunking failed: {str(e)}")
             self.mark_failure(e)
             raise
         
+        stored_through = -1
+        totals = {'total_tokens': 0, 'total_cost': 0.0, 'processing_time_ms': 0}
+        if job is not None:
+            chunk_set_hash = _text_chunk_set_hash(chunks)
+            if job.get_checkpoint(ProcessingJob.STAGE_CHUNKED).get('chunk_set_hash') != chunk_set_hash:
+                job.reset_checkpoints(
+                    ProcessingJob.STAGE_CHUNKED, ProcessingJob.STAGE_EMBEDDED, ProcessingJob.STAGE_STORED
+                )
+                job.save_checkpoint(
+                    ProcessingJob.STAGE_CHUNKED, chunk_set_hash=chunk_set_hash, chunk_count=len(chunks)
+                )
+            stored = job.get_checkpoint(ProcessingJob.STAGE_STORED)
+            stored_through = stored.get('batch', -1)
+            totals.update({key: stored[key] for key in totals if key in stored})
+        
         self.update_progress(50, 100, f"Generated {len(chunks)} chunks, creating embeddings")
         
-        # Generate embeddings using our EmbeddingService
-        try:
-            embedding_config = EmbeddingConfig()
-            embedding_service = OpenAIEmbeddingService(embedding_config)
+        embedding_config = EmbeddingConfig()
+        embedding_service = get_embedding_service(embedding_config)
+        batch_size = embedding_config.max_batch_size
+        namespace = f"kb_{knowledge_base_id}"
+        vector_storage = None
+        
+        # Embed and store batch by batch so each stored batch is checkpointed
+        for batch_number, batch_start in enumerate(range(0, len(chunks), batch_size)):
+            if batch_number <= stored_through:
+                continue
+            batch = chunks[batch_start:batch_start + batch_size]
             
-            # Extract text content from chunks
-            chunk_texts = [chunk.content for chunk in chunks]
+            self.update_progress(
+                50 + int(40 * batch_start / len(chunks)), 100,
+                f"Embedding and storing chunks {batch_start + 1}-{batch_start + len(batch)} of {len(chunks)}"
+            )
             
-            # Generate embeddings in batch
-            embedding_result = asyncio.run(embedding_service.generate_embeddings_batch(chunk_texts))
-        except Exception as e:
-            logger.error(f"Embedding generation failed: {str(e)}")
-            self.mark_failure(e)
-            raise
-        
-        self.update_progress(70, 100, "Storing embeddings in vector database")
-        
-        # Store embeddings in vector database
-        try:
-            vector_storage = asyncio.run(create_vector_storage("auto"))
+            # Generate embeddings using our EmbeddingService
+            try:
+                embedding_result = run_async(
+                    embedding_service.generate_embeddings_batch([chunk.content for chunk in batch])
+                )
+            except Exception as e:
+                logger.error(f"Embedding generation failed: {str(e)}")
+                self.mark_failure(e)
+                raise
             
-            # Prepare embedding data for storage
-            embeddings_to_store = []
-            for i, chunk in enumerate(chunks):
-                if i < len(embedding_result.embeddings):
-                    embedding_data = embedding_result.embeddings[i]
-                    metadata = {
-                        "document_id": document_id,
-                        "chunk_index": i,
-                        "content": chunk.content,
-                        "filename": filename,
-                        "content_type": content_type,
-                        "knowledge_base_id": knowledge_base_id,
-                        "user_id": user_id,
-                        "created_at": timezone.now().isoformat()
-                    }
-                    embeddings_to_store.append((
-                        f"{document_id}_chunk_{i}",
-                        embedding_data.embedding,
-                        metadata
-                    ))
+            if job is not None:
+                job.save_checkpoint(ProcessingJob.STAGE_EMBEDDED, batch=batch_number)
             
-            # Store in vector database with namespace
-            namespace = f"kb_{knowledge_base_id}"
-            asyncio.run(vector_storage.store_embeddings(embeddings_to_store, namespace))
+            # Store embeddings in vector database
+            try:
+                if vector_storage is None:
+                    vector_storage = run_async(get_vector_storage("auto"))
+                
+                # Prepare embedding data for storage
+                embeddings_to_store = []
+                for offset, chunk in enumerate(batch):
+                    if offset < len(embedding_result.embeddings):
+                        i = batch_start + offset
+                        embedding_data = embedding_result.embeddings[offset]
+                        metadata = {
+                            "document_id": document_id,
+                            "chunk_index": i,
+                            "content": chunk.content,
+                            "filename": filename,
+                            "content_type": content_type,
+                            "knowledge_base_id": knowledge_base_id,
+                            "user_id": user_id,
+                            "created_at": timezone.now().isoformat()
+                        }
+                        embeddings_to_store.append((
+                            f"{document_id}_chunk_{i}",
+                            embedding_data.embedding,
+                            metadata
+                        ))
+                
+                # Store in vector database with namespace
+                run_async(vector_storage.store_embeddings(embeddings_to_store, namespace))
+                
+            except Exception as e:
+                logger.error(f"Vector storage failed: {str(e)}")
+                self.mark_failure(e)
+                raise
             
-        except Exception as e:
-            logger.error(f"Vector storage failed: {str(e)}")
-            self.mark_failure(e)
-            raise
+            totals['total_tokens'] += embedding_result.total_tokens
+            totals['total_cost'] += embedding_result.total_cost_usd
+            totals['processing_time_ms'] += embedding_result.processing_time_ms
+            if job is not None:
+                job.save_checkpoint(ProcessingJob.STAGE_STORED, batch=batch_number, **totals)
         
         self.update_progress(90, 100, "Updating document status")
         
@@ -364,12 +426,16 @@ def process_document_pipeline(
             "document_id": document_id,
             "filename": filename,
             "chunk_count": len(chunks),
-            "total_tokens": embedding_result.total_tokens,
-            "total_cost": embedding_result.total_cost_usd,
-            "processing_time_ms": embedding_result.processing_time_ms,
-            "vector_storage_backend": vector_storage.backend_name if hasattr(vector_storage, 'backend_name') else 'unknown'
+            "total_tokens": totals['total_tokens'],
+            "total_cost": totals['total_cost'],
+            "processing_time_ms": totals['processing_time_ms'],
+            "vector_storage_backend": vector_storage.backend_name if hasattr(vector_storage, 'backend_name') else 'unknown',
+            "resumed": resumed
         }
         
+        if job is not None:
+            job.complete(result)
+        
         return self.mark_success(result)
         
     except Exception as e:
@@ -463,13 +529,13 @@ def process_url(
         # Generate embeddings using our EmbeddingService
         try:
             embedding_config = EmbeddingConfig()
-            embedding_service = OpenAIEmbeddingService(embedding_config)
+            embedding_service = get_embedding_service(embedding_config)
             
             # Extract text content from chunks
             chunk_texts = [chunk.content for chunk in chunks]
             
             # Generate embeddings in batch
-            embedding_result = asyncio.run(embedding_service.generate_embeddings_batch(chunk_texts))
+            embedding_result = run_async(embedding_service.generate_embeddings_batch(chunk_texts))
         except Exception as e:
             logger.error(f"Embedding generation failed: {str(e)}")
             self.mark_failure(e)
@@ -479,7 +545,7 @@ def process_url(
         
         # Store embeddings in vector database
         try:
-            vector_storage = asyncio.run(create_vector_storage("auto"))
+            vector_storage = run_async(get_vector_storage("auto"))
             
             # Prepare embedding data for storage
             embeddings_to_store = []
@@ -504,7 +570,7 @@ def process_url(
             
             # Store in vector database with namespace
             namespace = f"kb_{knowledge_base_id}"
-            asyncio.run(vector_storage.store_embeddings(embeddings_to_store, namespace))
+            run_async(vector_storage.store_embeddings(embeddings_to_store, namespace))
             
         except Exception as e:
             logger.error(f"Vector storage failed: {str(e)}")
@@ -546,27 +612,34 @@ def generate_embeddings_for_knowledge_chunks(
     self,
     knowledge_source_id: str,
     chunk_ids: Optional[List[str]] = None,
-    model: str = "text-embedding-ada-002",
+    model: Optional[str] = None,
     batch_size: int = 50,
-    force_regenerate: bool = False
+    force_regenerate: bool = False,
+    superseded_chunk_ids: Optional[List[str]] = None
 ) -> Dict[str, Any]:
     """
     Generate embeddings for KnowledgeChunk records.
     
+    Vectors are stored in the chatbot's active index (see
+    ``apps.core.reindexing``), embedded with that index's model.
+    
     Args:
         knowledge_source_id: KnowledgeSource ID to process chunks for
         chunk_ids: Optional list of specific chunk IDs to process
-        model: Embedding model to use
+        model: Embedding model; must match the active index if given
         batch_size: Batch size for processing
         force_regenerate: Whether to regenerate existing embeddings
+        superseded_chunk_ids: Chunks replaced by a recrawl, removed with
+            their vectors once the new chunks' vectors are stored
         
     Returns:
         Dict[str, Any]: Processing result
     """
     try:
         from apps.knowledge.models import KnowledgeSource, KnowledgeChunk, ProcessingJob
-        from apps.core.embedding_service import EmbeddingConfig, OpenAIEmbeddingService
         from apps.core.models import ProcessingStatus
+        from apps.core.reindexing import chunk_vector_metadata, get_active_index
+        from apps.core.document_processing_service import remove_superseded_chunks
         
         self.update_progress(0, 100, "Starting embedding generation for knowledge chunks")
         
@@ -576,25 +649,54 @@ def generate_embeddings_for_knowledge_chunks(
         except KnowledgeSource.DoesNotExist:
             raise ValueError(f"KnowledgeSource {knowledge_source_id} not found")
         
+        active_index = get_active_index(source.chatbot_id)
+        if model is not None and model != active_index.embedding_model:
+            raise ValueError(
+                f"Model {model} doesn't match the active index model {active_index.embedding_model}; "
+                "use a re-index to change models"
+            )
+        model = active_index.embedding_model
+        
         self.update_progress(10, 100, f"Loading chunks for source: {source.name}")
         
-        # Get chunks to process
+        # Chunks this task covers, regardless of embedding state
         if chunk_ids:
-            chunks = KnowledgeChunk.objects.filter(
-                id__in=chunk_ids,
-                source=source
-            ).order_by('chunk_index')
+            base_chunks = KnowledgeChunk.objects.filter(id__in=chunk_ids, source=source)
         else:
-            if force_regenerate:
-                chunks = source.chunks.all().order_by('chunk_index')
-            else:
-                # Only process chunks without embeddings
-                chunks = source.chunks.filter(
-                    embedding_vector__isnull=True
-                ).order_by('chunk_index')
+            base_chunks = source.chunks.all()
+        if superseded_chunk_ids:
+            base_chunks = base_chunks.exclude(id__in=superseded_chunk_ids)
+        
+        # A retried attempt picks up the job, and checkpoints, of the failed one
+        job, resumed = ProcessingJob.resume_or_create(
+            source, 'generate_embeddings', getattr(self.request, 'id', None)
+        )
+        chunk_set_hash = _chunk_set_hash(base_chunks)
+        if job.get_checkpoint(ProcessingJob.STAGE_CHUNKED).get('chunk_set_hash') != chunk_set_hash:
+            # Chunks changed since the checkpoints were written; start over
+            if resumed:
+                logger.info(f"Chunk set for source {knowledge_source_id} changed, discarding checkpoints")
+            job.reset_checkpoints()
+            job.save_checkpoint(ProcessingJob.STAGE_CHUNKED, chunk_set_hash=chunk_set_hash)
+        
+        # Watermarks by chunk_index: chunks at or below are done for that stage
+        embedded_through = job.get_checkpoint(ProcessingJob.STAGE_EMBEDDED).get('chunk_index', -1)
+        stored_through = job.get_checkpoint(ProcessingJob.STAGE_STORED).get('chunk_index', -1)
+        
+        # Get chunks to process
+        chunks = base_chunks.filter(chunk_index__gt=stored_through)
+        if not chunk_ids and not force_regenerate:
+            # Only chunks without embeddings, plus those embedded by an
+            # earlier attempt but not yet stored in the vector database
+            chunks = chunks.filter(
+                Q(embedding_vector__isnull=True) | Q(chunk_index__lte=embedded_through)
+            )
+        chunks = chunks.select_related('source').order_by('chunk_index')
         
         total_chunks = chunks.count()
         if total_chunks == 0:
+            job.complete({'processed_chunks': 0, 'model': model})
+            remove_superseded_chunks(source, superseded_chunk_ids)
             return self.mark_success({
                 "source_id": knowledge_source_id,
                 "processed_chunks": 0,
@@ -602,126 +704,125 @@ def generate_embeddings_for_knowledge_chunks(
                 "message": "No chunks found or all chunks already have embeddings"
             })
         
+        if resumed:
+            logger.info(
+                f"Resuming embedding job {job.id} for source {knowledge_source_id}: "
+                f"embedded through chunk {embedded_through}, stored through chunk {stored_through}, "
+                f"{total_chunks} chunks remaining"
+            )
+        
         self.update_progress(20, 100, f"Processing {total_chunks} chunks")
         
         # Initialize embedding service
-        embedding_config = EmbeddingConfig(
-            model=model,
+        embedding_config = active_index.embedding_config(
             max_batch_size=batch_size,
             enable_caching=True,
             enable_deduplication=True
         )
-        embedding_service = OpenAIEmbeddingService(embedding_config)
-        
-        # Process chunks in batches
-        processed_count = 0
-        total_cost = 0.0
-        total_tokens = 0
-        
-        chunk_list = list(chunks)
-        for i in range(0, len(chunk_list), batch_size):
-            batch_chunks = chunk_list[i:i + batch_size]
+        embedding_service = get_embedding_service(embedding_config)
+        vector_storage = None
+        
+        # Totals accumulate across attempts of the same job
+        progress = job.get_checkpoint(ProcessingJob.STAGE_STORED)
+        processed_count = progress.get('processed_chunks', 0)
+        total_cost = progress.get('total_cost', 0.0)
+        total_tokens = progress.get('total_tokens', 0)
+        
+        # Stream chunks from the database one batch at a time instead of
+        # loading the whole source into memory
+        chunk_iterator = chunks.iterator(chunk_size=batch_size)
+        for i in range(0, total_chunks, batch_size):
+            batch_chunks = list(itertools.islice(chunk_iterator, batch_size))
+            if not batch_chunks:
+                break
             
-            batch_progress = 20 + (i / len(chunk_list)) * 60
+            batch_progress = 20 + (i / total_chunks) * 60
             self.update_progress(
                 int(batch_progress), 100,
-                f"Processing batch {i // batch_size + 1}/{(len(chunk_list) - 1) // batch_size + 1}"
+                f"Processing batch {i // batch_size + 1}/{(total_chunks - 1) // batch_size + 1}"
             )
             
-            try:
-                # Generate embeddings for batch
-                chunk_embedding_results = asyncio.run(
+            # Chunks embedded by an earlier attempt only need storing
+            reused = [chunk for chunk in batch_chunks if chunk.chunk_index <= embedded_through]
+            to_embed = [chunk for chunk in batch_chunks if chunk.chunk_index > embedded_through]
+            chunk_embedding_results = []
+            if to_embed:
+                chunk_embedding_results = run_async(
                     embedding_service.generate_embeddings_for_knowledge_chunks(
-                        batch_chunks, update_db=True
+                        to_embed, update_db=True
                     )
                 )
+            
+            last_index = batch_chunks[-1].chunk_index
+            if last_index > embedded_through:
+                embedded_through = last_index
+                job.save_checkpoint(ProcessingJob.STAGE_EMBEDDED, chunk_index=embedded_through)
+            
+            vectors = [(chunk, chunk.embedding_vector) for chunk in reused if chunk.embedding_vector]
+            vectors.extend(
+                (chunk, embedding_result.embedding)
+                for chunk, embedding_result in chunk_embedding_results
+                if embedding_result.embedding
+            )
+            
+            # STEP 5 FIX: Direct vector storage transfer to avoid async/sync issues
+            vector_data = []
+            for chunk, embedding in vectors:
+                vector_data.append((str(chunk.id), embedding, chunk_vector_metadata(chunk)))
+            
+            if vector_data:
+                if vector_storage is None:
+                    vector_storage = run_async(active_index.vector_storage())
+                namespace = active_index.namespace
                 
-                # STEP 5 FIX: Direct vector storage transfer to avoid async/sync issues
-                if chunk_embedding_results:
-                    try:
-                        # Get embeddings from processed chunks and store directly in vector DB
-                        vector_data = []
-                        chatbot_id = batch_chunks[0].source.chatbot.id
-                        
-                        for chunk, embedding_result in chunk_embedding_results:
-                            if embedding_result.embedding:
-                                vector_id = str(chunk.id)
-                                metadata = {
-                                    'content': chunk.content,
-                                    'chunk_index': chunk.chunk_index,
-                                    'source_id': str(chunk.source.id),
-                                    'source_name': chunk.source.name,
-                                    'is_citable': chunk.is_citable,
-                                    'token_count': chunk.token_count
-                                }
-                                vector_data.append((vector_id, embedding_result.embedding, metadata))
-                        
-                        if vector_data:
-                            # Store directly in vector database
-                            vector_storage = asyncio.run(create_vector_storage())
-                            namespace = f"chatbot_{chatbot_id}"
-                            
-                            success = asyncio.run(vector_storage.store_embeddings(vector_data, namespace=namespace))
-                            
-                            if success:
-                                logger.info(f"Vector storage success: {len(vector_data)} embeddings stored in namespace {namespace}")
-                            else:
-                                logger.error(f"Vector storage failed for {len(vector_data)} embeddings")
-                        
-                    except Exception as vector_error:
-                        logger.error(f"Vector storage failed for batch: {str(vector_error)}")
-                        # Continue processing - embeddings are still in database
-                
-                # Track statistics
-                for chunk, embedding_result in chunk_embedding_results:
-                    if not embedding_result.cached:
-                        total_cost += embedding_result.cost_usd
-                        total_tokens += embedding_result.tokens_used
-                    processed_count += 1
-                
-                logger.info(
-                    f"Processed embedding batch: {len(batch_chunks)} chunks, "
-                    f"processed: {processed_count}/{total_chunks}, "
-                    f"batch cost: ${sum(r.cost_usd for _, r in chunk_embedding_results if not r.cached):.6f}"
-                )
-                
-            except Exception as e:
-                logger.error(
-                    f"Batch embedding generation failed for batch {i // batch_size}: {str(e)}"
-                )
-                # Continue with other batches rather than failing completely
-                continue
+                # Fail the attempt so the retry resumes from the stored checkpoint
+                if not run_async(vector_storage.store_embeddings(vector_data, namespace=namespace)):
+                    raise RuntimeError(f"Vector storage failed for {len(vector_data)} embeddings")
+                logger.info(f"Vector storage success: {len(vector_data)} embeddings stored in namespace {namespace}")
+            
+            # Track statistics
+            batch_cost = 0.0
+            for chunk, embedding_result in chunk_embedding_results:
+                if not embedding_result.cached:
+                    batch_cost += embedding_result.cost_usd
+                    total_tokens += embedding_result.tokens_used
+            total_cost += batch_cost
+            processed_count += len(batch_chunks)
+            
+            stored_through = last_index
+            job.save_checkpoint(
+                ProcessingJob.STAGE_STORED,
+                chunk_index=stored_through,
+                processed_chunks=processed_count,
+                total_cost=total_cost,
+                total_tokens=total_tokens
+            )
+            job.update_progress(batch_progress)
+            
+            logger.info(
+                f"Processed embedding batch: {len(batch_chunks)} chunks, "
+                f"processed: {processed_count}, through chunk {stored_through}, "
+                f"batch cost: ${batch_cost:.6f}"
+            )
         
         self.update_progress(85, 100, "Updating source status")
         
-        # Update source with embedding completion status
-        try:
-            # Check if all chunks now have embeddings
-            remaining_chunks = source.chunks.filter(embedding_vector__isnull=True).count()
-            
-            if remaining_chunks == 0:
-                # Create processing job for embeddings
-                from apps.knowledge.models import ProcessingJob
-                ProcessingJob.objects.create(
-                    source=source,
-                    job_type='generate_embeddings',
-                    status=ProcessingStatus.COMPLETED,
-                    result_data={
-                        'processed_chunks': processed_count,
-                        'total_cost': total_cost,
-                        'total_tokens': total_tokens,
-                        'model': model
-                    },
-                    completed_at=timezone.now()
-                )
-                
-                logger.info(
-                    f"All chunks for source {knowledge_source_id} now have embeddings: {total_chunks} chunks"
-                )
-            
-        except Exception as e:
-            logger.warning(
-                f"Failed to update source status for {knowledge_source_id}: {str(e)}"
+        job.complete({
+            'processed_chunks': processed_count,
+            'total_cost': total_cost,
+            'total_tokens': total_tokens,
+            'model': model,
+            'resumed': resumed
+        })
+        
+        # The new chunks are searchable now; retire the ones they replace
+        remove_superseded_chunks(source, superseded_chunk_ids)
+        
+        # Check if all chunks now have embeddings
+        remaining_chunks = source.chunks.filter(embedding_vector__isnull=True).count()
+        if remaining_chunks == 0:
+            logger.info(
+                f"All chunks for source {knowledge_source_id} now have embeddings"
             )
         
         self.update_progress(100, 100, "Embedding generation completed")
@@ -732,6 +833,7 @@ def generate_embeddings_for_knowledge_chunks(
             "processed_chunks": processed_count,
             "total_chunks": total_chunks,
             "generated_embeddings": processed_count,
+            "resumed": resumed,
             "total_cost_usd": total_cost,
             "total_tokens": total_tokens,
             "model": model,
@@ -755,7 +857,7 @@ def generate_embeddings_for_knowledge_chunks(
 def generate_embeddings(
     self,
     chunk_ids: List[str],
-    model: str = "text-embedding-ada-002",
+    model: Optional[str] = None,
     batch_size: int = 100
 ) -> Dict[str, Any]:
     """
@@ -815,6 +917,132 @@ def generate_embeddings(
             raise
 
 
+@app.task(bind=True, base=BaseTaskWithProgress, name='apps.core.tasks.reindex_chatbot_task')
+def reindex_chatbot_task(
+    self,
+    chatbot_id: str,
+    embedding_model: str,
+    dimensions: Optional[int] = None,
+    auto_cutover: bool = False
+) -> Dict[str, Any]:
+    """
+    Build (or resume) a shadow index for a chatbot with another embedding model.
+
+    The chatbot keeps serving from its active index throughout. The new
+    version is verified when built and, with ``auto_cutover``, activated
+    if verification passes.
+
+    Args:
+        chatbot_id: Chatbot to re-index
+        embedding_model: Model for the new index
+        dimensions: Vector size (defaults to the model's native size)
+        auto_cutover: Switch to the new index once verified
+
+    Returns:
+        Dict[str, Any]: Build and verification result
+    """
+    from apps.chatbots.models import Chatbot
+    from apps.core.exceptions import ReindexBudgetExceeded
+    from apps.core.reindexing import ShadowReindexer
+    from apps.knowledge.models import VectorIndexVersion
+
+    try:
+        chatbot = Chatbot.objects.get(id=chatbot_id)
+        reindexer = ShadowReindexer()
+        version = reindexer.start(chatbot, embedding_model, dimensions)
+
+        def report(version):
+            expected = max(version.vectors_expected, 1)
+            self.update_progress(
+                min(int(80 * version.vectors_indexed / expected), 80), 100,
+                f"Indexed {version.vectors_indexed}/{version.vectors_expected} chunks into v{version.version}"
+            )
+
+        self.update_progress(0, 100, f"Building index v{version.version} with {embedding_model}")
+        reindexer.build(version, on_batch=report)
+
+        self.update_progress(85, 100, "Verifying vector counts and recall")
+        reindexer.verify(version)
+
+        activated = False
+        if auto_cutover and version.status == VectorIndexVersion.STATUS_READY:
+            self.update_progress(95, 100, f"Switching to index v{version.version}")
+            reindexer.cutover(version)
+            activated = True
+
+        self.update_progress(100, 100, "Re-index completed")
+
+        return self.mark_success({
+            "chatbot_id": chatbot_id,
+            "version": version.version,
+            "status": version.status,
+            "embedding_model": version.embedding_model,
+            "dimensions": version.dimensions,
+            "vectors_indexed": version.vectors_indexed,
+            "vectors_expected": version.vectors_expected,
+            "recall_at_k": version.recall_at_k,
+            "spent_usd": version.build_state.get('spent_usd', 0.0),
+            "activated": activated,
+            "error": version.error_message
+        })
+
+    except ReindexBudgetExceeded as e:
+        # Retrying can't help; the build resumes from its cursor once the budget is raised
+        logger.error(f"Re-index of chatbot {chatbot_id} stopped: {str(e)}")
+        self.mark_failure(e)
+        raise
+    except Exception as e:
+        if self.request.retries < self.max_retries:
+            self.retry_with_backoff(e)
+        else:
+            logger.error(f"Re-index of chatbot {chatbot_id} failed permanently: {str(e)}")
+            self.mark_failure(e)
+            raise
+
+
+@app.task(bind=True, base=BaseTaskWithProgress, name='apps.core.tasks.delete_vectors_task')
+def delete_vectors_task(self, chatbot_id: str, source_id: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Delete a removed knowledge source's vectors, or a removed chatbot's.
+    
+    Args:
+        chatbot_id: Chatbot owning the vectors
+        source_id: Only delete this source's vectors
+        
+    Returns:
+        Dict[str, Any]: Number of vectors deleted
+    """
+    from apps.core.reindexing import delete_indexed_vectors
+    from apps.knowledge.models import KnowledgeChunk
+    
+    try:
+        chunk_ids = None
+        if source_id:
+            # Only needed by backends that can't delete by metadata filter
+            chunk_ids = [
+                str(chunk_id)
+                for chunk_id in KnowledgeChunk.all_objects.filter(source_id=source_id).values_list('id', flat=True)
+            ]
+        
+        self.update_progress(10, 100, "Deleting vectors")
+        deleted = delete_indexed_vectors(chatbot_id, source_id, chunk_ids=chunk_ids, raise_errors=True)
+        self.update_progress(100, 100, "Vectors deleted")
+        
+        return self.mark_success({
+            "chatbot_id": chatbot_id,
+            "source_id": source_id,
+            "vectors_deleted": deleted
+        })
+        
+    except Exception as e:
+        if self.request.retries < self.max_retries:
+            self.retry_with_backoff(e)
+        else:
+            logger.error(f"Vector deletion for chatbot {chatbot_id} failed permanently: {str(e)}")
+            self.mark_failure(e)
+            raise
+
+
 @app.task(bind=True, name='apps.core.tasks.cleanup_expired_sessions')
 def cleanup_expired_sessions(self) -> Dict[str, Any]:
     """Clean up expired user sessions."""
@@ -946,7 +1174,6 @@ def process_knowledge_source_task(
     """
     try:
         from apps.knowledge.models import KnowledgeSource
-        from apps.core.document_processing_service import DocumentProcessingService
         
         self.update_progress(0, 100, "Starting knowledge source processing")
         
@@ -967,54 +1194,9 @@ def process_knowledge_source_task(
                 "message": "Source already processed"
             })
         
-        # Initialize document processing service
-        doc_service = DocumentProcessingService()
-        
         self.update_progress(20, 100, "Initializing document processing")
         
-        # Process based on source type
-        if source.content_type == 'document' and source.file_path:
-            # File-based processing
-            self.update_progress(30, 100, "Reading file content")
-            
-            try:
-                with open(source.file_path, 'rb') as f:
-                    file_content = f.read()
-                
-                filename = source.metadata.get('original_filename', source.name)
-                
-                self.update_progress(40, 100, "Processing document content")
-                
-                result = doc_service.process_uploaded_file(
-                    knowledge_source=source,
-                    file_content=file_content,
-                    filename=filename,
-                    mime_type=source.mime_type
-                )
-                
-            except Exception as e:
-                error_msg = f"File processing failed: {str(e)}"
-                self.mark_failure(Exception(error_msg))
-                raise
-                
-        elif source.content_type == 'url' and source.source_url:
-            # URL-based processing
-            self.update_progress(30, 100, "Crawling URL content")
-            
-            try:
-                result = doc_service.process_url_content(
-                    knowledge_source=source,
-                    url=source.source_url
-                )
-                
-            except Exception as e:
-                error_msg = f"URL processing failed: {str(e)}"
-                self.mark_failure(Exception(error_msg))
-                raise
-        else:
-            error_msg = f"Unsupported source type: {source.content_type}"
-            self.mark_failure(Exception(error_msg))
-            raise ValueError(error_msg)
+        result = _process_knowledge_source(self, source)
         
         self.update_progress(80, 100, "Finalizing processing")
         
@@ -1025,7 +1207,7 @@ def process_knowledge_source_task(
             return self.mark_success({
                 "source_id": knowledge_source_id,
                 "status": "completed",
-                "chunks_created": len(result.chunks),
+                "chunks_created": result.chunk_count,
                 "total_tokens": result.total_tokens,
                 "processing_time_ms": result.processing_time_ms,
                 "quality_score": result.processed_document.quality_score if result.processed_document else None
@@ -1044,140 +1226,294 @@ def process_knowledge_source_task(
             raise
 
 
-@app.task(bind=True, base=BaseTaskWithProgress, name='apps.core.tasks.train_chatbot_task')
-def train_chatbot_task(
-    self,
-    chatbot_id: str,
-    force_retrain: bool = False,
-    knowledge_source_ids: Optional[List[str]] = None
-) -> Dict[str, Any]:
+@app.task(bind=True, base=BaseTaskWithProgress, name='apps.core.tasks.crawl_url_site_task')
+def crawl_url_site_task(self, knowledge_source_id: str) -> Dict[str, Any]:
     """
-    Train chatbot with its knowledge sources.
+    Crawl the site behind a URL source and ingest the discovered pages.
     
     Args:
-        chatbot_id: Chatbot ID to train
-        force_retrain: Whether to force retraining
-        knowledge_source_ids: Specific knowledge sources to train with
+        knowledge_source_id: Root URL KnowledgeSource ID
         
     Returns:
-        Dict[str, Any]: Training result
+        Dict[str, Any]: Crawl summary
     """
     try:
-        from apps.chatbots.models import Chatbot
         from apps.knowledge.models import KnowledgeSource
+        from apps.core.document_processing_service import DocumentProcessingService
         
-        self.update_progress(0, 100, "Starting chatbot training")
-        
-        # Get chatbot
         try:
-            chatbot = Chatbot.objects.get(id=chatbot_id)
-        except Chatbot.DoesNotExist:
-            raise ValueError(f"Chatbot {chatbot_id} not found")
-        
-        # Update chatbot status to processing
-        chatbot.update_training_status('processing')
-        
-        self.update_progress(10, 100, "Loading knowledge sources")
-        
-        # Get knowledge sources
-        if knowledge_source_ids:
-            knowledge_sources = KnowledgeSource.objects.filter(
-                id__in=knowledge_source_ids,
-                chatbot=chatbot
-            )
-        else:
-            knowledge_sources = chatbot.knowledge_sources.all()
+            source = KnowledgeSource.objects.get(id=knowledge_source_id)
+        except KnowledgeSource.DoesNotExist:
+            raise ValueError(f"KnowledgeSource {knowledge_source_id} not found")
         
-        if not knowledge_sources.exists():
-            # No knowledge sources - mark as ready anyway for basic functionality
-            chatbot.update_training_status('completed')
-            chatbot.last_trained_at = timezone.now()
-            chatbot.save()
-            
-            return self.mark_success({
-                "chatbot_id": chatbot_id,
-                "knowledge_sources_processed": 0,
-                "status": "ready",
-                "message": "No knowledge sources found - chatbot ready for basic chat"
-            })
+        if source.content_type != 'url' or not source.source_url:
+            raise ValueError(f"KnowledgeSource {knowledge_source_id} is not a URL source")
         
-        self.update_progress(20, 100, f"Processing {knowledge_sources.count()} knowledge sources")
+        self.update_progress(5, 100, f"Crawling {source.source_url}")
         
-        # Process each knowledge source
-        processed_sources = 0
-        total_sources = knowledge_sources.count()
+        summary = DocumentProcessingService().process_site_crawl(source)
         
-        for i, source in enumerate(knowledge_sources):
-            progress = 20 + (i / total_sources) * 60
-            self.update_progress(
-                int(progress), 100, 
-                f"Processing knowledge source: {source.name}"
-            )
-            
-            # Update source status to processing if not already processed
-            if source.status != 'completed' or force_retrain:
-                source.status = 'processing'
-                source.save()
-                
-                try:
-                    # Trigger document/URL processing based on source type
-                    if hasattr(source, 'file') and source.file:
-                        # File-based knowledge source
-                        task_id = TaskManager.submit_document_processing(
-                            document_id=str(source.id),
-                            file_content=source.file.read() if source.file else b'',
-                            filename=source.file.name if source.file else 'unknown',
-                            content_type=source.file_type or 'text/plain',
-                            privacy_level='private',
-                            knowledge_base_id=str(chatbot.id),
-                            user_id=str(chatbot.user.id)
-                        )
-                    elif hasattr(source, 'url') and source.url:
-                        # URL-based knowledge source
-                        task_id = TaskManager.submit_url_processing(
-                            document_id=str(source.id),
-                            url=source.url,
-                            privacy_level='private',
-                            knowledge_base_id=str(chatbot.id),
-                            user_id=str(chatbot.user.id)
-                        )
-                    
-                    # For now, mark as completed immediately (simplified)
-                    source.status = 'completed'
-                    source.save()
-                    processed_sources += 1
-                    
-                except Exception as e:
-                    logger.error(f"Failed to process knowledge source {source.id}: {e}")
-                    source.status = 'failed'
-                    source.save()
-                    continue
-            else:
-                processed_sources += 1
+        self.update_progress(100, 100, f"Crawled {summary['pages_processed']} pages")
         
-        self.update_progress(80, 100, "Finalizing chatbot training")
+        return self.mark_success({
+            "source_id": knowledge_source_id,
+            **summary
+        })
         
-        # Update chatbot status
-        if processed_sources > 0:
-            chatbot.update_training_status('completed')
+    except Exception as e:
+        if self.request.retries < self.max_retries:
+            self.retry_with_backoff(e)
         else:
-            chatbot.update_training_status('failed')
+            logger.error(f"Site crawl failed permanently: {str(e)}")
+            self.mark_failure(e)
+            raise
+
+
+@app.task(bind=True, base=BaseTaskWithProgress, name='apps.core.tasks.recrawl_url_source_task')
+def recrawl_url_source_task(self, knowledge_source_id: str) -> Dict[str, Any]:
+    """
+    Conditionally re-crawl a URL knowledge source.
+    
+    Unchanged pages (304 or identical content hash) skip chunking and
+    embedding entirely.
+    
+    Args:
+        knowledge_source_id: KnowledgeSource ID to refresh
         
-        chatbot.last_trained_at = timezone.now()
-        chatbot.save()
+    Returns:
+        Dict[str, Any]: Recrawl result
+    """
+    try:
+        from apps.knowledge.models import KnowledgeSource
+        from apps.core.document_processing_service import DocumentProcessingService
         
-        self.update_progress(100, 100, "Chatbot training completed")
+        try:
+            source = KnowledgeSource.objects.get(id=knowledge_source_id)
+        except KnowledgeSource.DoesNotExist:
+            raise ValueError(f"KnowledgeSource {knowledge_source_id} not found")
         
-        result = {
+        if source.content_type != 'url' or not source.source_url:
+            raise ValueError(f"KnowledgeSource {knowledge_source_id} is not a URL source")
+        
+        self.update_progress(10, 100, f"Recrawling {source.source_url}")
+        
+        result = DocumentProcessingService().recrawl_url_content(source)
+        
+        if not result.success:
+            raise Exception(result.error_message or "URL recrawl failed")
+        
+        self.update_progress(100, 100, "URL recrawl completed")
+        
+        return self.mark_success({
+            "source_id": knowledge_source_id,
+            "status": "unchanged" if result.unchanged else "updated",
+            "chunks_created": result.chunk_count,
+            "total_tokens": result.total_tokens,
+            "processing_time_ms": result.processing_time_ms
+        })
+        
+    except Exception as e:
+        if self.request.retries < self.max_retries:
+            self.retry_with_backoff(e)
+        else:
+            logger.error(f"URL recrawl failed permanently: {str(e)}")
+            self.mark_failure(e)
+            raise
+
+
+@app.task(bind=True, name='apps.core.tasks.schedule_url_recrawls')
+def schedule_url_recrawls(self) -> Dict[str, Any]:
+    """Queue conditional recrawls for URL sources older than the recrawl interval."""
+    try:
+        from datetime import timedelta
+        from django.db.models import Q
+        from apps.knowledge.models import KnowledgeSource
+        from apps.core.models import ProcessingStatus
+        
+        cutoff = timezone.now() - timedelta(hours=settings.URL_RECRAWL_INTERVAL_HOURS)
+        
+        due_sources = list(
+            KnowledgeSource.objects.filter(
+                content_type='url',
+                source_url__isnull=False,
+                status=ProcessingStatus.COMPLETED
+            ).filter(
+                Q(last_crawled_at__isnull=True) | Q(last_crawled_at__lt=cutoff)
+            ).order_by('last_crawled_at').values_list(
+                'id', 'chatbot__user_id'
+            )[:settings.URL_RECRAWL_BATCH_SIZE]
+        )
+        
+        for source_id, owner_id in due_sources:
+            submit_bulk_task(
+                recrawl_url_source_task,
+                owner_id,
+                args=[str(source_id)],
+                priority=TaskPriority.LOW.value
+            )
+        
+        logger.info(f"Queued {len(due_sources)} URL sources for recrawl")
+        
+        return {
+            "queued_sources": len(due_sources),
+            "cutoff": cutoff.isoformat(),
+            "check_time": timezone.now().isoformat()
+        }
+        
+    except Exception as e:
+        logger.error(f"URL recrawl scheduling failed: {str(e)}")
+        raise
+
+
+@app.task(bind=True, name='apps.core.tasks.dispatch_fair_queue')
+def dispatch_fair_queue(self) -> Dict[str, Any]:
+    """Reclaim lost bulk task slots and dispatch waiting per-tenant work."""
+    try:
+        dispatched = fair_scheduler.dispatch_pending()
+        tenant_queues = fair_scheduler.tenant_queue_stats()
+        
+        if dispatched:
+            logger.info(f"Dispatched {dispatched} waiting bulk tasks")
+        
+        return {
+            "dispatched": dispatched,
+            "pending": sum(stats['pending'] for stats in tenant_queues.values()),
+            "tenants": len(tenant_queues),
+            "check_time": timezone.now().isoformat()
+        }
+        
+    except Exception as e:
+        logger.error(f"Fair queue dispatch failed: {str(e)}")
+        raise
+
+
+# Share of the training progress bar covered by per-source work
+TRAINING_PROGRESS_START = 20
+TRAINING_PROGRESS_END = 95
+
+# Upper bound on a training run's per-source results waiting in the cache
+TRAINING_RUN_TIMEOUT = 24 * 3600
+
+
+@app.task(bind=True, base=BaseTaskWithProgress, name='apps.core.tasks.train_chatbot_task')
+def train_chatbot_task(
+    self,
+    chatbot_id: str,
+    force_retrain: bool = False,
+    knowledge_source_ids: Optional[List[str]] = None
+) -> Dict[str, Any]:
+    """
+    Train chatbot with its knowledge sources.
+    
+    Sources are fanned out through the fair bulk scheduler under the
+    chatbot owner's per-tenant cap: each one is processed by
+    ``train_knowledge_source_task`` on any available worker, and the last
+    one to finish sends ``finalize_chatbot_training`` to set the chatbot's
+    status from their actual results. Progress for the whole run is
+    reported under this task's id.
+    
+    Args:
+        chatbot_id: Chatbot ID to train
+        force_retrain: Whether to force retraining
+        knowledge_source_ids: Specific knowledge sources to train with
+        
+    Returns:
+        Dict[str, Any]: Dispatch result (training continues in the source tasks)
+    """
+    from celery.utils import uuid
+    
+    try:
+        from apps.chatbots.models import Chatbot
+        from apps.knowledge.models import KnowledgeSource
+        
+        self.update_progress(0, 100, "Starting chatbot training")
+        
+        # Get chatbot
+        try:
+            chatbot = Chatbot.objects.get(id=chatbot_id)
+        except Chatbot.DoesNotExist:
+            raise ValueError(f"Chatbot {chatbot_id} not found")
+        
+        # Update chatbot status to processing
+        chatbot.update_training_status('processing')
+        
+        self.update_progress(10, 100, "Loading knowledge sources")
+        
+        # Get knowledge sources
+        if knowledge_source_ids:
+            knowledge_sources = KnowledgeSource.objects.filter(
+                id__in=knowledge_source_ids,
+                chatbot=chatbot
+            )
+        else:
+            knowledge_sources = chatbot.knowledge_sources.all()
+        
+        source_ids = [str(source_id) for source_id in knowledge_sources.values_list('id', flat=True)]
+        
+        if not source_ids:
+            # No knowledge sources - mark as ready anyway for basic functionality
+            chatbot.update_training_status('completed')
+            chatbot.last_trained_at = timezone.now()
+            chatbot.save()
+            
+            return self.mark_success({
+                "chatbot_id": chatbot_id,
+                "knowledge_sources_processed": 0,
+                "status": "ready",
+                "message": "No knowledge sources found - chatbot ready for basic chat"
+            })
+        
+        # Sources that will actually be reprocessed show as processing now
+        pending = knowledge_sources if force_retrain else knowledge_sources.exclude(status='completed')
+        pending.update(status='processing')
+        
+        training_task_id = getattr(self.request, 'id', None)
+        total_sources = len(source_ids)
+        _reset_training_progress(training_task_id)
+        
+        self.update_progress(
+            TRAINING_PROGRESS_START, 100,
+            f"Processing {total_sources} knowledge sources",
+            metadata={'completed_sources': 0, 'total_sources': total_sources}
+        )
+        
+        # Fan out one bulk task per source, capped per tenant like any other
+        # ingestion work; the callback runs when all of them are done
+        finalize_task_id = uuid()
+        dedupe_key = _request_dedupe_key(self.request)
+        callback = finalize_chatbot_training.s(
+            chatbot_id=chatbot_id,
+            training_task_id=training_task_id,
+            dedupe_key=dedupe_key
+        ).set(task_id=finalize_task_id).on_error(
+            chatbot_training_failed.si(chatbot_id, training_task_id, dedupe_key=dedupe_key)
+        )
+        _open_training_run(finalize_task_id, source_ids, callback)
+        for source_id in source_ids:
+            submit_bulk_task(
+                train_knowledge_source_task,
+                chatbot.user_id,
+                args=[source_id],
+                kwargs={
+                    'force_retrain': force_retrain,
+                    'training_task_id': training_task_id,
+                    'total_sources': total_sources,
+                    'finalize_task_id': finalize_task_id
+                }
+            )
+        
+        # This task finishes now, but the run goes on in the source tasks:
+        # duplicate submissions keep collapsing onto it until the callback is done
+        hand_off_task_dedupe(dedupe_key, training_task_id, finalize_task_id)
+        self.request.dedupe_handoff = True
+        
+        return {
             "chatbot_id": chatbot_id,
-            "knowledge_sources_processed": processed_sources,
             "total_knowledge_sources": total_sources,
-            "status": "ready" if processed_sources > 0 else "failed",
-            "training_completed_at": timezone.now().isoformat()
+            "status": "processing",
+            "finalize_task_id": finalize_task_id
         }
         
-        return self.mark_success(result)
-        
     except Exception as e:
         # Update chatbot status to failed
         try:
@@ -1195,6 +1531,166 @@ def train_chatbot_task(
             raise
 
 
+@app.task(bind=True, base=BaseTaskWithProgress, name='apps.core.tasks.train_knowledge_source_task')
+def train_knowledge_source_task(
+    self,
+    knowledge_source_id: str,
+    force_retrain: bool = False,
+    training_task_id: Optional[str] = None,
+    total_sources: int = 1,
+    finalize_task_id: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Process one knowledge source as part of a chatbot training run.
+    
+    Never fails the run: once retries are exhausted the source is marked
+    failed and a failed result is returned, so the remaining sources still
+    count towards training.
+    
+    The source's chunks are embedded here rather than by a separately
+    queued task, so the training callback only runs once their vectors exist.
+    
+    Args:
+        knowledge_source_id: KnowledgeSource ID to process
+        force_retrain: Whether to reprocess an already completed source
+        training_task_id: ID of the train_chatbot_task to report progress to
+        total_sources: Number of sources in the training run
+        finalize_task_id: Training run whose callback the last source sends
+        
+    Returns:
+        Dict[str, Any]: Per-source outcome with status completed/skipped/failed
+    """
+    from apps.knowledge.models import KnowledgeSource
+    from apps.core.models import ProcessingStatus
+    
+    source = None
+    try:
+        try:
+            source = KnowledgeSource.objects.get(id=knowledge_source_id)
+        except KnowledgeSource.DoesNotExist:
+            raise ValueError(f"KnowledgeSource {knowledge_source_id} not found")
+        
+        if source.status == ProcessingStatus.COMPLETED and not force_retrain:
+            outcome = {
+                "source_id": knowledge_source_id,
+                "status": "skipped",
+                "chunks_created": source.chunk_count
+            }
+        else:
+            result = _process_knowledge_source(self, source, queue_embeddings=False)
+            if not result.success:
+                raise Exception(result.error_message or "Processing failed with unknown error")
+            outcome = {
+                "source_id": knowledge_source_id,
+                "status": "completed",
+                "chunks_created": result.chunk_count,
+                "total_tokens": result.total_tokens
+            }
+        
+        # Skipped sources too: a previously queued embedding run may have failed
+        outcome.update(_embed_training_source(knowledge_source_id))
+        if "embedding_error" in outcome:
+            outcome["status"] = "failed"
+            outcome["error"] = f"Embedding generation failed: {outcome['embedding_error']}"
+        
+    except Exception as e:
+        if self.request.retries < self.max_retries:
+            self.retry_with_backoff(e)
+        
+        logger.error(f"Training failed for knowledge source {knowledge_source_id}: {str(e)}")
+        self.mark_failure(e)
+        if source is not None and source.status != ProcessingStatus.FAILED:
+            source.update_processing_status(ProcessingStatus.FAILED, error_message=str(e))
+        outcome = {
+            "source_id": knowledge_source_id,
+            "status": "failed",
+            "error": str(e)
+        }
+    
+    _record_training_progress(self, training_task_id, total_sources, outcome)
+    _finish_training_source(finalize_task_id, outcome)
+    return outcome
+
+
+@app.task(bind=True, base=BaseTaskWithProgress, name='apps.core.tasks.finalize_chatbot_training')
+def finalize_chatbot_training(
+    self,
+    source_results: List[Dict[str, Any]],
+    chatbot_id: str,
+    training_task_id: Optional[str] = None,
+    dedupe_key: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Training callback: set chatbot status from the per-source results.
+    
+    The chatbot is ready if at least one source trained (or was already
+    trained) and has its embeddings; it fails only when every source failed.
+    """
+    from apps.chatbots.models import Chatbot
+    
+    counts = Counter(outcome.get("status", "failed") for outcome in source_results)
+    processed_sources = counts["completed"] + counts["skipped"]
+    
+    chatbot = Chatbot.objects.get(id=chatbot_id)
+    if processed_sources > 0:
+        chatbot.update_training_status('completed')
+    else:
+        chatbot.update_training_status('failed')
+    
+    chatbot.last_trained_at = timezone.now()
+    chatbot.save()
+    
+    result = {
+        "chatbot_id": chatbot_id,
+        "knowledge_sources_processed": processed_sources,
+        "knowledge_sources_failed": counts["failed"],
+        "knowledge_sources_embedding_failed": sum(1 for outcome in source_results if "embedding_error" in outcome),
+        "total_knowledge_sources": len(source_results),
+        "failed_sources": [
+            {
+                "source_id": outcome["source_id"],
+                "stage": "embedding" if "embedding_error" in outcome else "processing",
+                "error": outcome.get("error")
+            }
+            for outcome in source_results if outcome.get("status") == "failed"
+        ],
+        "status": "ready" if processed_sources > 0 else "failed",
+        "training_completed_at": timezone.now().isoformat()
+    }
+    
+    # Clients track the run by the dispatcher's id; end it with this result
+    if training_task_id:
+        self.mark_success(result, task_id=training_task_id)
+    _reset_training_progress(training_task_id)
+    release_task_dedupe(dedupe_key, training_task_id)
+    
+    logger.info(
+        f"Chatbot {chatbot_id} training finished: {processed_sources}/{len(source_results)} sources ready"
+    )
+    return self.mark_success(result)
+
+
+@app.task(bind=True, base=BaseTaskWithProgress, name='apps.core.tasks.chatbot_training_failed')
+def chatbot_training_failed(
+    self,
+    chatbot_id: str,
+    training_task_id: Optional[str] = None,
+    dedupe_key: Optional[str] = None
+) -> None:
+    """Training error callback: don't leave the chatbot stuck in processing."""
+    from apps.chatbots.models import Chatbot
+    from apps.core.chatbot_cache import chatbot_config_cache
+    
+    logger.error(f"Chatbot {chatbot_id} training failed")
+    Chatbot.objects.filter(id=chatbot_id).update(status='failed')
+    # update() skips save signals
+    chatbot_config_cache.invalidate(chatbot_id)
+    if training_task_id:
+        self.mark_failure(RuntimeError(f"Chatbot {chatbot_id} training failed"), task_id=training_task_id)
+    _reset_training_progress(training_task_id)
+    release_task_dedupe(dedupe_key, training_task_id)
+
+
 @app.task(bind=True, name='apps.core.tasks.health_check')
 def health_check(self) -> Dict[str, Any]:
     """Perform system health checks."""
@@ -1272,6 +1768,219 @@ def _store_document_chunks(
     return chunks
 
 
+def _resume_document_job(task, document_id: str):
+    """
+    Get the checkpointing job for a document pipeline run.
+    
+    Checkpoints are kept on a ProcessingJob, which belongs to a
+    KnowledgeSource; documents without one run without checkpoints.
+    
+    Returns:
+        Tuple of (job or None, resumed)
+    """
+    from django.core.exceptions import ValidationError
+    from apps.knowledge.models import KnowledgeSource, ProcessingJob
+    
+    try:
+        source = KnowledgeSource.objects.filter(id=document_id).first()
+    except (ValueError, ValidationError):
+        source = None
+    if source is None:
+        return None, False
+    
+    job, resumed = ProcessingJob.resume_or_create(
+        source, 'extract_text', getattr(task.request, 'id', None)
+    )
+    if resumed:
+        logger.info(f"Resuming document job {job.id} for {document_id} with checkpoints {list(job.checkpoint)}")
+    return job, resumed
+
+
+def _training_progress_key(training_task_id: str) -> str:
+    return f"training_progress:{training_task_id}:done"
+
+
+def _reset_training_progress(training_task_id: Optional[str]) -> None:
+    """Clear the finished-source counter of a training run."""
+    if not training_task_id:
+        return
+    try:
+        cache.delete(_training_progress_key(training_task_id))
+    except Exception:
+        pass
+
+
+def _record_training_progress(task, training_task_id: Optional[str], total_sources: int, outcome: Dict[str, Any]) -> None:
+    """Count a finished source and update the training task's progress."""
+    if not training_task_id:
+        return
+    
+    key = _training_progress_key(training_task_id)
+    try:
+        cache.add(key, 0, timeout=24 * 3600)
+        done = cache.incr(key)
+    except Exception:
+        return
+    
+    span = TRAINING_PROGRESS_END - TRAINING_PROGRESS_START
+    task.update_progress(
+        TRAINING_PROGRESS_START + int(span * done / max(total_sources, 1)), 100,
+        f"Processed {done}/{total_sources} knowledge sources",
+        metadata={
+            'completed_sources': done,
+            'total_sources': total_sources,
+            'last_source': outcome
+        },
+        task_id=training_task_id
+    )
+
+
+def _training_run_key(finalize_task_id: str, name: str) -> str:
+    return f"training_run:{finalize_task_id}:{name}"
+
+
+def _open_training_run(finalize_task_id: str, source_ids: List[str], callback) -> None:
+    """Register a training run's sources and the callback that ends it."""
+    cache.set_many({
+        _training_run_key(finalize_task_id, 'run'): {'source_ids': source_ids, 'callback': callback},
+        _training_run_key(finalize_task_id, 'done'): 0,
+    }, timeout=TRAINING_RUN_TIMEOUT)
+
+
+def _finish_training_source(finalize_task_id: Optional[str], outcome: Dict[str, Any]) -> None:
+    """
+    Record a source's outcome; the last source of the run sends the callback.
+    
+    Stands in for a chord, whose header would bypass the fair scheduler:
+    ``cache.incr`` is atomic, so exactly one source sees the final count.
+    """
+    if not finalize_task_id:
+        return
+    
+    try:
+        cache.set(
+            _training_run_key(finalize_task_id, f"source:{outcome['source_id']}"),
+            outcome,
+            timeout=TRAINING_RUN_TIMEOUT
+        )
+        done = cache.incr(_training_run_key(finalize_task_id, 'done'))
+        run = cache.get(_training_run_key(finalize_task_id, 'run'))
+        if run is None or done != len(run['source_ids']):
+            return
+        
+        keys = [_training_run_key(finalize_task_id, f"source:{source_id}") for source_id in run['source_ids']]
+        outcomes = cache.get_many(keys)
+        source_results = [
+            outcomes.get(key) or {"source_id": source_id, "status": "failed", "error": "Source result expired"}
+            for key, source_id in zip(keys, run['source_ids'])
+        ]
+        cache.delete_many(keys + [_training_run_key(finalize_task_id, name) for name in ('run', 'done')])
+    except Exception as e:
+        logger.error(f"Failed to record training result for run {finalize_task_id}: {str(e)}")
+        return
+    
+    signature(run['callback']).apply_async((source_results,))
+
+
+def _process_knowledge_source(task, source, queue_embeddings: bool = True):
+    """
+    Run document or URL processing for a knowledge source.
+    
+    The file is read from disk by the worker processing it, so only the
+    source id needs to travel through the broker.
+    
+    Args:
+        task: Task reporting progress
+        source: KnowledgeSource to process
+        queue_embeddings: Queue the embedding task; False when the caller embeds
+        
+    Returns:
+        DocumentProcessingResult
+    """
+    from apps.core.document_processing_service import DocumentProcessingService
+    
+    # Initialize document processing service
+    doc_service = DocumentProcessingService(queue_embeddings=queue_embeddings)
+    
+    # Process based on source type
+    if source.content_type != 'url' and source.file_path:
+        # File-based processing
+        task.update_progress(30, 100, "Reading file content")
+        
+        try:
+            with open(source.file_path, 'rb') as f:
+                file_content = f.read()
+            
+            filename = source.metadata.get('original_filename', source.name)
+            
+            task.update_progress(40, 100, "Processing document content")
+            
+            return doc_service.process_uploaded_file(
+                knowledge_source=source,
+                file_content=file_content,
+                filename=filename,
+                mime_type=source.mime_type
+            )
+            
+        except Exception as e:
+            error_msg = f"File processing failed: {str(e)}"
+            task.mark_failure(Exception(error_msg))
+            raise
+            
+    elif source.content_type == 'url' and source.source_url:
+        # URL-based processing
+        task.update_progress(30, 100, "Crawling URL content")
+        
+        try:
+            return doc_service.process_url_content(
+                knowledge_source=source,
+                url=source.source_url
+            )
+            
+        except Exception as e:
+            error_msg = f"URL processing failed: {str(e)}"
+            task.mark_failure(Exception(error_msg))
+            raise
+    else:
+        error_msg = f"Unsupported source type: {source.content_type}"
+        task.mark_failure(Exception(error_msg))
+        raise ValueError(error_msg)
+
+
+def _embed_training_source(knowledge_source_id: str) -> Dict[str, Any]:
+    """
+    Embed a source's chunks in the current worker.
+    
+    Only chunks without embeddings are processed, so this is cheap for a
+    source that is already fully embedded.
+    
+    Returns:
+        Dict[str, Any]: ``embedded_chunks``, or ``embedding_error`` on failure
+    """
+    try:
+        result = generate_embeddings_for_knowledge_chunks(knowledge_source_id)
+    except Exception as e:
+        logger.error(f"Embedding generation failed for knowledge source {knowledge_source_id}: {str(e)}")
+        return {"embedding_error": str(e)}
+    return {"embedded_chunks": result.get("result", {}).get("processed_chunks", 0)}
+
+
+def _chunk_set_hash(chunks) -> str:
+    """Fingerprint a set of KnowledgeChunks so checkpoints are discarded if it changes."""
+    digest = hashlib.sha256()
+    for chunk_id, content_hash in chunks.order_by('chunk_index').values_list('id', 'content_hash').iterator():
+        digest.update(f"{chunk_id}:{content_hash};".encode())
+    return digest.hexdigest()
+
+
+def _text_chunk_set_hash(chunks) -> str:
+    """Fingerprint chunker output so checkpoints are discarded if chunking changes."""
+    digest = hashlib.sha256()
+    for chunk in chunks:
+        digest.update(hashlib.sha256(chunk.content.encode()).digest())
+    return digest.hexdigest()
+
+
 def _convert_db_chunk_to_document_chunk(db_chunk):
     """Convert database chunk to DocumentChunk object (simplified)."""
     # In production, this would use proper model conversion
@@ -1288,6 +1997,20 @@ def _update_chunk_embeddings(chunks: List, embeddings: List):
     logger.info(f"Updated embeddings for {len(chunks)} chunks")
 
 
+# Worker lifecycle
+@worker_process_init.connect
+def worker_process_init_handler(**kwargs):
+    """Start the long-lived event loop for async services in each worker process."""
+    start_worker_runtime()
+    reranking.warm_up()
+
+
+@worker_process_shutdown.connect
+def worker_process_shutdown_handler(**kwargs):
+    """Stop the worker's event loop."""
+    stop_worker_runtime()
+
+
 # Task monitoring and signals
 @task_prerun.connect
 def task_prerun_handler(sender=None, task_id=None, task=None, args=None, kwargs=None, **kwds):
@@ -1300,6 +2023,15 @@ def task_prerun_handler(sender=None, task_id=None, task=None, args=None, kwargs=
         task_name=task.name,
         worker_name=getattr(task.request, 'hostname', 'unknown')
     )
+    
+    # Measure async submission overhead for this task
+    task.request.async_stats_token = begin_task_stats()
+    
+    # Broker wait for fairly scheduled bulk tasks
+    try:
+        fair_scheduler.task_started(task.request)
+    except Exception as e:
+        logger.warning(f"Failed to record bulk task start for {task_id}: {str(e)}")
 
 
 @task_postrun.connect
@@ -1307,6 +2039,30 @@ def task_postrun_handler(sender=None, task_id=None, task=None, args=None, kwargs
                         retval=None, state=None, **kwds):
     """Handle task post-run signal."""
     logger.info(f"Task {task_id} ({task.name}) completed with state: {state}")
+    
+    token = getattr(task.request, 'async_stats_token', None)
+    if token is not None:
+        try:
+            stats = end_task_stats(token)
+        except ValueError:
+            stats = None
+        if stats is not None and stats.calls:
+            logger.info(f"Task {task_id} ({task.name}) async runtime: {stats.to_dict()}")
+    
+    # Progress buffered since the last coalesced write
+    progress_publisher.flush()
+    
+    # Let the next identical submission run once this one is done
+    dedupe_key = _request_dedupe_key(task.request)
+    if dedupe_key and state != 'RETRY' and not getattr(task.request, 'dedupe_handoff', False):
+        release_task_dedupe(dedupe_key, task_id)
+    
+    # A retrying task keeps its tenant slot until its final attempt
+    if state != 'RETRY':
+        try:
+            fair_scheduler.task_finished(task.request)
+        except Exception as e:
+            logger.warning(f"Failed to release bulk task slot for {task_id}: {str(e)}")
 
 
 @task_failure.connect
@@ -1320,9 +2076,205 @@ def task_failure_handler(sender=None, task_id=None, exception=None, traceback=No
     logger.error(f"Task failure traceback: {traceback}")
 
 
+# Idempotent submission
+DEDUPE_KEY_HEADER = 'dedupe_key'
+DEDUPE_LOCK_TIMEOUT = 6 * 3600  # Upper bound on a deduplicated run
+
+
+def task_idempotency_key(operation: str, *parts: Any) -> str:
+    """Cache key identifying one logical unit of work, e.g. (source, content hash)."""
+    digest = hashlib.sha256('|'.join(str(part) for part in parts).encode('utf-8')).hexdigest()
+    return f"task_dedupe:{operation}:{digest[:32]}"
+
+
+def release_task_dedupe(dedupe_key: Optional[str], task_id: Optional[str]) -> None:
+    """Release a dedupe lock if it is still held by ``task_id``."""
+    if not dedupe_key or not task_id:
+        return
+    try:
+        if cache.get(dedupe_key) == task_id:
+            cache.delete_many([dedupe_key, _dedupe_handoff_key(dedupe_key)])
+    except Exception as e:
+        logger.warning(f"Failed to release dedupe lock {dedupe_key}: {str(e)}")
+
+
+def _dedupe_handoff_key(dedupe_key: str) -> str:
+    return f"{dedupe_key}:handoff"
+
+
+def hand_off_task_dedupe(dedupe_key: Optional[str], task_id: Optional[str], handoff_id: str) -> None:
+    """
+    Keep a dedupe lock held by ``task_id`` after that task returns.
+    
+    For tasks that dispatch their work elsewhere (e.g. chatbot training): the
+    lock is then reclaimable only once ``handoff_id`` is done, and whoever
+    finishes the work releases it with ``release_task_dedupe(dedupe_key, task_id)``.
+    """
+    if not dedupe_key or not task_id:
+        return
+    try:
+        # Already released if the handed-off work finished first (eager mode)
+        if cache.get(dedupe_key) == task_id:
+            cache.set(_dedupe_handoff_key(dedupe_key), (task_id, handoff_id), timeout=DEDUPE_LOCK_TIMEOUT)
+    except Exception as e:
+        logger.warning(f"Failed to hand off dedupe lock {dedupe_key}: {str(e)}")
+
+
+def _request_dedupe_key(request) -> Optional[str]:
+    """Dedupe key a task was submitted with (worker or eager request)."""
+    headers = getattr(request, 'headers', None) or {}
+    return getattr(request, DEDUPE_KEY_HEADER, None) or headers.get(DEDUPE_KEY_HEADER)
+
+
 class TaskManager:
     """Manager for task operations and monitoring."""
     
+    @staticmethod
+    def submit_idempotent(
+        task,
+        idempotency_key: str,
+        args: Optional[List] = None,
+        kwargs: Optional[Dict[str, Any]] = None,
+        tenant_id: Optional[str] = None,
+        owner_id: Optional[str] = None,
+        **options
+    ) -> Tuple[str, bool]:
+        """
+        Submit a task unless identical work is already in flight.
+        
+        The first submission for a key takes an atomic lock (``cache.add``,
+        SET NX on Redis) holding its task id; repeats while it runs get that
+        id back instead of a new task. The lock is released when the task
+        finishes, or reclaimed if the holder (or the task it handed its work
+        off to, see ``hand_off_task_dedupe``) is already done.
+        
+        Args:
+            task: Celery task to submit
+            idempotency_key: Key from ``task_idempotency_key``
+            args: Task positional arguments
+            kwargs: Task keyword arguments
+            tenant_id: Submit through the fair bulk scheduler for this tenant
+            owner_id: User allowed to subscribe to the task's progress
+            
+        Returns:
+            Tuple[str, bool]: Task id and whether a new task was submitted
+        """
+        from celery.result import AsyncResult
+        from celery.states import READY_STATES
+        from celery.utils import uuid
+        
+        for _ in range(2):
+            task_id = uuid()
+            if cache.add(idempotency_key, task_id, timeout=DEDUPE_LOCK_TIMEOUT):
+                break
+            
+            existing_id = cache.get(idempotency_key)
+            if existing_id is None:
+                continue  # Released between add and get
+            
+            # A holder that handed its work off is judged by the task doing it
+            handoff = cache.get(_dedupe_handoff_key(idempotency_key))
+            running_id = handoff[1] if handoff and handoff[0] == existing_id else existing_id
+            if AsyncResult(running_id, app=app).state not in READY_STATES:
+                logger.info(f"Duplicate submission of {task.name} collapsed onto task {existing_id}")
+                return existing_id, False
+            
+            # Holder finished without releasing (e.g. worker lost)
+            release_task_dedupe(idempotency_key, existing_id)
+        else:
+            existing_id = cache.get(idempotency_key)
+            if existing_id:
+                return existing_id, False
+            raise RuntimeError(f"Could not acquire dedupe lock {idempotency_key}")
+        
+        # Before dispatch: eager tasks run inside apply_async
+        if owner_id is not None:
+            record_task_owner(task_id, owner_id)
+        
+        headers = dict(options.pop('headers', None) or {})
+        headers[DEDUPE_KEY_HEADER] = idempotency_key
+        try:
+            if tenant_id is not None:
+                submit_bulk_task(task, tenant_id, args=args, kwargs=kwargs, task_id=task_id, headers=headers, **options)
+            else:
+                task.apply_async(args=args, kwargs=kwargs, task_id=task_id, headers=headers, **options)
+        except Exception:
+            release_task_dedupe(idempotency_key, task_id)
+            raise
+        
+        return task_id, True
+    
+    @staticmethod
+    def submit_knowledge_source_processing(knowledge_source, force_reprocess: bool = False) -> Tuple[str, bool]:
+        """Submit knowledge source processing, deduplicated per source content."""
+        content_marker = (
+            knowledge_source.file_hash or knowledge_source.content_hash or knowledge_source.source_url or ''
+        )
+        return TaskManager.submit_idempotent(
+            process_knowledge_source_task,
+            task_idempotency_key('process_source', knowledge_source.id, content_marker, force_reprocess),
+            args=[str(knowledge_source.id)],
+            kwargs={'force_reprocess': force_reprocess},
+            tenant_id=knowledge_source.chatbot.user_id,
+            owner_id=knowledge_source.chatbot.user_id
+        )
+    
+    @staticmethod
+    def submit_chatbot_training(
+        chatbot,
+        force_retrain: bool = False,
+        knowledge_source_ids: Optional[List[str]] = None
+    ) -> Tuple[str, bool]:
+        """Submit chatbot training, deduplicated per chatbot and source contents."""
+        sources = chatbot.knowledge_sources.all()
+        if knowledge_source_ids:
+            sources = sources.filter(id__in=knowledge_source_ids)
+        source_markers = sorted(
+            f"{source_id}:{file_hash or content_hash or ''}"
+            for source_id, file_hash, content_hash in sources.values_list('id', 'file_hash', 'content_hash')
+        )
+        return TaskManager.submit_idempotent(
+            train_chatbot_task,
+            task_idempotency_key('train_chatbot', chatbot.id, force_retrain, *source_markers),
+            kwargs={
+                'chatbot_id': str(chatbot.id),
+                'force_retrain': force_retrain,
+                'knowledge_source_ids': knowledge_source_ids
+            },
+            owner_id=chatbot.user_id
+        )
+    
+    @staticmethod
+    def submit_vector_deletion(chatbot_id, source_id=None, chunk_count: Optional[int] = None) -> Optional[str]:
+        """
+        Delete a removed source's or chatbot's vectors.
+        
+        Sources with at most ``VECTOR_DELETE_INLINE_MAX_CHUNKS`` chunks are
+        deleted right away; larger ones and whole chatbots go to
+        ``delete_vectors_task``.
+        
+        Returns:
+            Optional[str]: Task id, or None if deleted inline
+        """
+        from apps.core.reindexing import delete_indexed_vectors
+        from apps.knowledge.models import KnowledgeChunk
+        
+        if source_id is not None and (chunk_count or 0) <= settings.VECTOR_DELETE_INLINE_MAX_CHUNKS:
+            chunk_ids = [
+                str(chunk_id)
+                for chunk_id in KnowledgeChunk.all_objects.filter(source_id=source_id).values_list('id', flat=True)
+            ]
+            delete_indexed_vectors(chatbot_id, source_id, chunk_ids=chunk_ids)
+            return None
+        
+        task_id, _ = TaskManager.submit_idempotent(
+            delete_vectors_task,
+            task_idempotency_key('delete_vectors', chatbot_id, source_id),
+            args=[str(chatbot_id)],
+            kwargs={'source_id': str(source_id) if source_id else None}
+        )
+        return task_id
+    
     @staticmethod
     def submit_document_processing(
         document_id: str,
@@ -1339,7 +2291,9 @@ class TaskManager:
         
         file_content_base64 = base64.b64encode(file_content).decode('utf-8')
         
-        task = process_document_pipeline.apply_async(
+        return submit_bulk_task(
+            process_document_pipeline,
+            user_id,
             args=[
                 document_id,
                 file_content_base64,
@@ -1351,8 +2305,6 @@ class TaskManager:
             ],
             priority=priority.value
         )
-        
-        return task.id
     
     @staticmethod
     def submit_url_processing(
@@ -1364,12 +2316,12 @@ class TaskManager:
         priority: TaskPriority = TaskPriority.NORMAL
     ) -> str:
         """Submit URL processing task."""
-        task = process_url.apply_async(
+        return submit_bulk_task(
+            process_url,
+            user_id,
             args=[document_id, url, privacy_level, knowledge_base_id, user_id],
             priority=priority.value
         )
-        
-        return task.id
     
     @staticmethod
     def get_task_status(task_id: str) -> Optional[Dict[str, Any]]:
@@ -6,7 +6,8 @@ Implements multiple chunking approaches optimized for context retrieval and LLM
 import re
 import math
 from abc import ABC, abstractmethod
-from typing import Dict, List, Optional, Tuple, Any
+import hashlib
+from typing import Dict, Iterable, Iterator, List, Optional, TextIO, Tuple, Any, Union
 from dataclasses import dataclass
 from enum import Enum
 import structlog
@@ -64,9 +65,32 @@ class ChunkingConfig:
             raise ValueError("Maximum chunk size must be >= minimum chunk size")
 
 
+def iter_text_segments(source: Union[str, TextIO], segment_size: int = 64 * 1024) -> Iterator[str]:
+    """
+    Yield a document as fixed-size text segments.
+    
+    Args:
+        source: Document text, or a text-mode file object read incrementally
+        segment_size: Characters per segment
+    """
+    if isinstance(source, str):
+        for start in range(0, len(source), segment_size):
+            yield source[start:start + segment_size]
+        return
+    
+    while True:
+        segment = source.read(segment_size)
+        if not segment:
+            return
+        yield segment
+
+
 class TextChunker(ABC):
     """Abstract base class for text chunking strategies."""
     
+    # Text buffered per chunk_text call when streaming
+    stream_window_chars = 256 * 1024
+    
     def __init__(self, config: ChunkingConfig):
         """
         Initialize chunker with configuration.
@@ -105,6 +129,79 @@ class TextChunker(ABC):
         """
         pass
     
+    def iter_chunks(
+        self,
+        segments: Iterable[str],
+        document_metadata: Dict[str, Any] = None
+    ) -> Iterator[TextChunk]:
+        """
+        Chunk a document lazily from an iterator of text segments.
+        
+        At most ``stream_window_chars`` (plus one segment) of text is
+        buffered. Each window is cut at the last paragraph break (falling
+        back to a line break, then a space) and passed to ``chunk_text``, so
+        memory stays constant however long the document is. Chunk indices
+        and character offsets are document-global, and every chunk
+        references the same ``document_metadata`` dict rather than a copy.
+        ``total_chunks`` is not known up front and is omitted.
+        
+        Args:
+            segments: Document text in order, in pieces of any size
+            document_metadata: Metadata about the source document
+            
+        Yields:
+            TextChunk: Chunks in document order
+        """
+        if document_metadata is None:
+            document_metadata = {}
+        
+        buffer = ""
+        offset = 0
+        state = {'next_index': 0, 'stream_id': None}
+        
+        for segment in segments:
+            buffer += segment
+            while len(buffer) >= self.stream_window_chars:
+                cut = self._window_cut(buffer)
+                yield from self._chunk_window(buffer[:cut], offset, document_metadata, state)
+                buffer = buffer[cut:]
+                offset += cut
+        
+        if buffer.strip():
+            yield from self._chunk_window(buffer, offset, document_metadata, state)
+    
+    def _window_cut(self, buffer: str) -> int:
+        """Position to end a streaming window at, preferring structural breaks."""
+        limit = self.stream_window_chars
+        for separator in ("\n\n", "\n", " "):
+            position = buffer.rfind(separator, 0, limit)
+            if position > limit // 2:
+                return position + len(separator)
+        return limit
+    
+    def _chunk_window(
+        self,
+        window: str,
+        offset: int,
+        document_metadata: Dict[str, Any],
+        state: Dict[str, Any]
+    ) -> Iterator[TextChunk]:
+        """Chunk one streaming window and rebase its chunks onto the document."""
+        if state['stream_id'] is None:
+            state['stream_id'] = hashlib.md5(window.encode()).hexdigest()[:8]
+        
+        for chunk in self.chunk_text(window, document_metadata):
+            index = state['next_index']
+            state['next_index'] += 1
+            
+            chunk.chunk_id = self._create_chunk_id(index, state['stream_id'])
+            if chunk.start_index >= 0:
+                chunk.start_index += offset
+                chunk.end_index += offset
+            chunk.metadata['chunk_index'] = index
+            chunk.metadata.pop('total_chunks', None)
+            yield chunk
+    
     def _count_tokens(self, text: str) -> int:
         """
         Count tokens in text.
@@ -180,7 +277,6 @@ class TextChunker(ABC):
         Returns:
             str: Unique chunk ID
         """
-        import hashlib
         chunk_data = f"{text_hash}_{index}_{self.__class__.__name__}"
         return hashlib.md5(chunk_data.encode()).hexdigest()[:12]
 
@@ -3,7 +3,6 @@ Vector search with metadata filtering and citation control.
 Implements privacy-aware search with multi-layer access controls.
 """
 
-import asyncio
 import time
 from typing import Any, Dict, List, Optional, Tuple, Union
 from dataclasses import dataclass
@@ -16,6 +15,8 @@ from django.core.cache import cache
 from apps.core.interfaces import VectorStore, SearchResult
 from apps.core.document_processing import PrivacyLevel
 from apps.core.circuit_breaker import CircuitBreaker
+from apps.core.lexical_search import lexical_index, reciprocal_rank_fusion
+from apps.core.reranking import CrossEncoderReranker, cross_encoder_reranker
 from chatbot_saas.config import get_settings
 
 
@@ -243,20 +244,10 @@ class PrivacyFilter:
 
 
 class SemanticReranker:
-    """Rerank search results based on semantic similarity."""
+    """Rerank search results with the process-wide cross-encoder (see apps.core.reranking)."""
     
-    def __init__(self):
-        self.model = None
-        self._load_reranking_model()
-    
-    def _load_reranking_model(self):
-        """Load reranking model."""
-        try:
-            from sentence_transformers import CrossEncoder
-            self.model = CrossEncoder('cross-encoder/ms-marco-MiniLM-L-6-v2')
-            logger.info("Loaded semantic reranking model")
-        except Exception as e:
-            logger.warning(f"Failed to load reranking model: {str(e)}")
+    def __init__(self, reranker: Optional[CrossEncoderReranker] = None):
+        self.reranker = reranker or cross_encoder_reranker
     
     async def rerank_results(
         self,
@@ -267,6 +258,9 @@ class SemanticReranker:
         """
         Rerank search results using semantic similarity.
         
+        Results keep their vector order when the model is not loaded yet or
+        misses its latency budget.
+        
         Args:
             query: Search query
             results: Initial search results
@@ -275,36 +269,24 @@ class SemanticReranker:
         Returns:
             List[SearchResultWithCitation]: Reranked results
         """
-        if not self.model or len(results) <= 1:
+        if len(results) <= 1:
             return results[:top_k]
         
-        try:
-            # Prepare query-document pairs
-            pairs = [(query, result.content) for result in results]
-            
-            # Get relevance scores
-            scores = await asyncio.get_event_loop().run_in_executor(
-                None, self.model.predict, pairs
-            )
-            
-            # Combine with original scores (weighted average)
-            for i, result in enumerate(results):
-                semantic_score = float(scores[i])
-                vector_score = result.score
-                
-                # Weighted combination (70% semantic, 30% vector)
-                combined_score = 0.7 * semantic_score + 0.3 * vector_score
-                result.score = combined_score
-            
-            # Sort by combined score and return top_k
-            reranked = sorted(results, key=lambda x: x.score, reverse=True)
-            
-            logger.info(f"Reranked {len(results)} results using semantic similarity")
-            return reranked[:top_k]
-            
-        except Exception as e:
-            logger.error(f"Reranking failed: {str(e)}")
+        scores = await self.reranker.ascore(query, [(result.chunk_id, result.content) for result in results])
+        if scores is None:
+            logger.info("Reranking skipped, keeping vector order")
             return results[:top_k]
+        
+        # Combine with original scores (weighted average)
+        for result, semantic_score in zip(results, scores):
+            # Weighted combination (70% semantic, 30% vector)
+            result.score = 0.7 * semantic_score + 0.3 * result.score
+        
+        # Sort by combined score and return top_k
+        reranked = sorted(results, key=lambda x: x.score, reverse=True)
+        
+        logger.info(f"Reranked {len(results)} results using semantic similarity")
+        return reranked[:top_k]
 
 
 class VectorSearchEngine:
@@ -436,10 +418,10 @@ class VectorSearchEngine:
         # Perform vector search
         vector_results = await self.search(query_vector, query_text, context, config)
         
-        # Perform keyword search (simplified implementation)
+        # Perform keyword search over the full-text index
         keyword_results = await self._keyword_search(query_text, context, config)
         
-        # Combine and rerank results
+        # Fuse the two rankings
         combined_results = self._combine_search_results(
             vector_results, keyword_results, keyword_weight
         )
@@ -452,13 +434,43 @@ class VectorSearchEngine:
         context: SearchContext,
         config: SearchConfig
     ) -> List[SearchResultWithCitation]:
-        """Perform keyword-based search."""
-        # This is a simplified implementation
-        # In practice, you would use Elasticsearch, Solr, or similar
+        """Perform full-text search, subject to the same privacy filtering as vector results."""
+        citable_only = config.search_scope == SearchScope.PUBLIC_ONLY
+        raw_results = []
+        for knowledge_base_id in context.knowledge_base_ids:
+            try:
+                matches = await lexical_index.asearch(
+                    knowledge_base_id, query_text, top_k=config.top_k, citable_only=citable_only
+                )
+            except Exception as e:
+                logger.warning(f"Keyword search failed: {str(e)}")
+                return []
+            for match in matches:
+                raw_results.append(SearchResult(
+                    id=match.chunk_id,
+                    score=match.score,
+                    content=match.content,
+                    metadata={
+                        "privacy_level": "citable" if match.is_citable else "private",
+                        "document_id": match.source_id,
+                        "knowledge_base_id": knowledge_base_id,
+                        "chunk_index": match.chunk_index,
+                        "token_count": match.token_count,
+                    }
+                ))
+        raw_results.sort(key=lambda result: result.score, reverse=True)
+        
+        keyword_results = []
+        for result in raw_results:
+            sanitized = PrivacyFilter.sanitize_result_for_privacy(
+                result,
+                context.user_id,
+                config.require_citations
+            )
+            if sanitized:
+                keyword_results.append(sanitized)
         
-        # For now, return empty results
-        # TODO: Implement actual keyword search
-        return []
+        return keyword_results
     
     def _combine_search_results(
         self,
@@ -466,34 +478,23 @@ class VectorSearchEngine:
         keyword_results: List[SearchResultWithCitation],
         keyword_weight: float
     ) -> List[SearchResultWithCitation]:
-        """Combine vector and keyword search results."""
-        # Create a mapping of chunk_id to results
+        """Combine vector and keyword search results by weighted reciprocal rank fusion."""
         result_map = {}
-        
-        # Add vector results
-        for result in vector_results:
-            result.score = result.score * (1 - keyword_weight)
+        for result in keyword_results + vector_results:
+            # Vector results carry the richer metadata
             result_map[result.chunk_id] = result
         
-        # Add or merge keyword results
-        for result in keyword_results:
-            weighted_score = result.score * keyword_weight
-            
-            if result.chunk_id in result_map:
-                # Combine scores
-                result_map[result.chunk_id].score += weighted_score
-            else:
-                # Add new result
-                result.score = weighted_score
-                result_map[result.chunk_id] = result
-        
-        # Sort by combined score
-        combined_results = sorted(
-            result_map.values(),
-            key=lambda x: x.score,
-            reverse=True
+        fused = reciprocal_rank_fusion(
+            [[r.chunk_id for r in vector_results], [r.chunk_id for r in keyword_results]],
+            weights=[1 - keyword_weight, keyword_weight]
         )
         
+        combined_results = []
+        for chunk_id, score in fused:
+            result = result_map[chunk_id]
+            result.score = score
+            combined_results.append(result)
+        
         return combined_results
     
     def _apply_intent_filtering(
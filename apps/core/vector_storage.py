@@ -5,6 +5,7 @@ Implements repository pattern with multiple storage backends.
 
 import hashlib
 import json
+import pickle
 import time
 import asyncio
 from typing import Dict, List, Optional, Tuple, Any, Protocol
@@ -22,10 +23,14 @@ from pydantic import BaseModel, Field
 from chatbot_saas.config import get_settings
 from .exceptions import VectorStorageError
 from .circuit_breaker import CircuitBreaker
+from .chunk_store import ahydrate_results, chunk_content_store
 
 settings = get_settings()
 logger = structlog.get_logger()
 
+# Dimension of the original (ada-002) index; other dimensions get their own table/index
+DEFAULT_VECTOR_DIMENSION = 1536
+
 
 @dataclass
 class VectorSearchResult:
@@ -59,18 +64,23 @@ class VectorStorageConfig(BaseModel):
     pinecone_index_name: str = Field("chatbot-embeddings", env="PINECONE_INDEX_NAME")
     
     # pgvector settings
-    vector_dimension: int = Field(1536, description="Vector dimension for embeddings")
+    vector_dimension: int = Field(DEFAULT_VECTOR_DIMENSION, description="Vector dimension for embeddings")
+    table_name: str = Field("vector_embeddings", description="pgvector table name")
     
     # General settings
     batch_size: int = Field(100, description="Batch size for bulk operations")
     timeout_seconds: int = Field(30, description="Operation timeout")
     enable_caching: bool = Field(True, description="Enable result caching")
     cache_ttl_hours: int = Field(1, description="Cache TTL in hours")
+    cache_size_sample_rate: int = Field(100, description="Measure the size of 1 in N cached search results")
 
 
 class VectorStorageBackend(ABC):
     """Abstract base class for vector storage backends."""
     
+    # Whether count_vectors is cheap enough to call before every search
+    has_cheap_counts = False
+    
     @abstractmethod
     async def initialize(self) -> bool:
         """Initialize the storage backend."""
@@ -99,6 +109,23 @@ class VectorStorageBackend(ABC):
     async def get_stats(self) -> Dict[str, Any]:
         """Get storage statistics."""
         pass
+    
+    async def count_vectors(self, namespace: str) -> Optional[int]:
+        """Count vectors in a namespace (None if the backend can't tell)."""
+        return None
+    
+    async def fetch_vectors(self, ids: List[str], namespace: Optional[str] = None) -> Dict[str, List[float]]:
+        """Stored vectors by id; ids the backend doesn't have are left out."""
+        return {}
+    
+    async def delete_by_filter(self, namespace: str, source_id: Optional[str] = None) -> Optional[int]:
+        """
+        Delete a namespace's vectors, or only those of one knowledge source.
+        
+        Returns the number deleted (None if the backend can't tell); raises
+        if the backend can't delete by filter.
+        """
+        raise NotImplementedError(f"{type(self).__name__} can't delete by filter")
 
 
 class PineconeBackend(VectorStorageBackend):
@@ -279,6 +306,30 @@ class PineconeBackend(VectorStorageBackend):
             namespace=namespace
         )
     
+    async def fetch_vectors(self, ids: List[str], namespace: Optional[str] = None) -> Dict[str, List[float]]:
+        """Fetch stored vectors from Pinecone by id."""
+        response = await self.circuit_breaker.call(self._perform_fetch, ids, namespace)
+        return {vector_id: list(vector.values) for vector_id, vector in response.vectors.items()}
+    
+    def _perform_fetch(self, ids: List[str], namespace: Optional[str] = None):
+        return self.index.fetch(ids=ids, namespace=namespace)
+    
+    async def delete_by_filter(self, namespace: str, source_id: Optional[str] = None) -> Optional[int]:
+        """
+        Drop a namespace, or delete a source's vectors with a metadata filter.
+        
+        Serverless indexes reject metadata-filter deletes; callers fall back
+        to deleting by id.
+        """
+        await self.circuit_breaker.call(self._perform_filter_delete, namespace, source_id)
+        self.logger.info("Vectors deleted from Pinecone by filter", namespace=namespace, source_id=source_id)
+        return None
+    
+    def _perform_filter_delete(self, namespace: str, source_id: Optional[str] = None):
+        if source_id is None:
+            return self.index.delete(delete_all=True, namespace=namespace)
+        return self.index.delete(filter={"source_id": {"$eq": source_id}}, namespace=namespace)
+    
     async def get_stats(self) -> Dict[str, Any]:
         """Get Pinecone index statistics."""
         try:
@@ -293,15 +344,29 @@ class PineconeBackend(VectorStorageBackend):
         except Exception as e:
             self.logger.error("Failed to get Pinecone stats", error=str(e))
             return {"backend": "pinecone", "error": str(e)}
+    
+    async def count_vectors(self, namespace: str) -> Optional[int]:
+        """Count vectors in a namespace from the index stats."""
+        try:
+            stats = await asyncio.to_thread(self.index.describe_index_stats)
+            summary = stats.namespaces.get(namespace)
+            return summary.vector_count if summary else 0
+        except Exception as e:
+            self.logger.error("Failed to count Pinecone vectors", namespace=namespace, error=str(e))
+            return None
 
 
 class PgVectorBackend(VectorStorageBackend):
     """PostgreSQL with pgvector extension backend for development."""
     
+    SQLITE_DELETE_BATCH = 500
+    has_cheap_counts = True
+    
     def __init__(self, config: VectorStorageConfig):
         self.config = config
         self.logger = structlog.get_logger().bind(component="PgVectorBackend")
-        self.table_name = "vector_embeddings"
+        self.table_name = config.table_name
+        self.counts_table = f"{config.table_name}_namespace_counts"
         self.is_sqlite = False
     
     async def initialize(self) -> bool:
@@ -335,6 +400,13 @@ class PgVectorBackend(VectorStorageBackend):
                         ON {self.table_name} (namespace);
                     """)
                     
+                    cursor.execute(f"""
+                        CREATE INDEX IF NOT EXISTS {self.table_name}_source_idx 
+                        ON {self.table_name} (namespace, {self._source_id_sql()});
+                    """)
+                    
+                    self._ensure_namespace_counts_sqlite(cursor)
+                    
                 else:
                     # PostgreSQL with pgvector
                     cursor.execute("CREATE EXTENSION IF NOT EXISTS vector;")
@@ -361,6 +433,13 @@ class PgVectorBackend(VectorStorageBackend):
                         CREATE INDEX IF NOT EXISTS {self.table_name}_namespace_idx 
                         ON {self.table_name} (namespace);
                     """)
+                    
+                    cursor.execute(f"""
+                        CREATE INDEX IF NOT EXISTS {self.table_name}_source_idx 
+                        ON {self.table_name} (namespace, ({self._source_id_sql()}));
+                    """)
+                    
+                    self._ensure_namespace_counts_postgresql(cursor)
             
             backend_type = "SQLite (fallback)" if self.is_sqlite else "PostgreSQL+pgvector"
             self.logger.info(
@@ -379,6 +458,129 @@ class PgVectorBackend(VectorStorageBackend):
             )
             return False
     
+    def _ensure_namespace_counts_sqlite(self, cursor) -> None:
+        """
+        Keep per-namespace vector counts in a side table, maintained by triggers.
+        
+        Rows are upserted with ON CONFLICT DO UPDATE: INSERT OR REPLACE
+        deletes without firing delete triggers and would double-count.
+        """
+        cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s", [self.counts_table]
+        )
+        existed = cursor.fetchone() is not None
+        
+        cursor.execute(f"""
+            CREATE TABLE IF NOT EXISTS {self.counts_table} (
+                namespace TEXT PRIMARY KEY,
+                vector_count INTEGER NOT NULL DEFAULT 0
+            );
+        """)
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS {self.table_name}_count_insert
+            AFTER INSERT ON {self.table_name}
+            BEGIN
+                INSERT INTO {self.counts_table} (namespace, vector_count)
+                VALUES (COALESCE(NEW.namespace, ''), 1)
+                ON CONFLICT (namespace) DO UPDATE SET vector_count = vector_count + 1;
+            END;
+        """)
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS {self.table_name}_count_delete
+            AFTER DELETE ON {self.table_name}
+            BEGIN
+                UPDATE {self.counts_table} SET vector_count = vector_count - 1
+                WHERE namespace = COALESCE(OLD.namespace, '');
+                DELETE FROM {self.counts_table}
+                WHERE namespace = COALESCE(OLD.namespace, '') AND vector_count <= 0;
+            END;
+        """)
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS {self.table_name}_count_update
+            AFTER UPDATE OF namespace ON {self.table_name}
+            WHEN COALESCE(OLD.namespace, '') != COALESCE(NEW.namespace, '')
+            BEGIN
+                UPDATE {self.counts_table} SET vector_count = vector_count - 1
+                WHERE namespace = COALESCE(OLD.namespace, '');
+                DELETE FROM {self.counts_table}
+                WHERE namespace = COALESCE(OLD.namespace, '') AND vector_count <= 0;
+                INSERT INTO {self.counts_table} (namespace, vector_count)
+                VALUES (COALESCE(NEW.namespace, ''), 1)
+                ON CONFLICT (namespace) DO UPDATE SET vector_count = vector_count + 1;
+            END;
+        """)
+        
+        if not existed:
+            self._backfill_namespace_counts(cursor)
+    
+    def _ensure_namespace_counts_postgresql(self, cursor) -> None:
+        """
+        Keep per-namespace vector counts in a side table, maintained by triggers.
+        
+        Statement-level triggers with transition tables apply one update per
+        namespace per statement, so bulk upserts and deletes don't hammer
+        the counter rows.
+        """
+        cursor.execute("SELECT to_regclass(%s)", [self.counts_table])
+        existed = cursor.fetchone()[0] is not None
+        
+        cursor.execute(f"""
+            CREATE TABLE IF NOT EXISTS {self.counts_table} (
+                namespace VARCHAR(255) PRIMARY KEY,
+                vector_count BIGINT NOT NULL DEFAULT 0
+            );
+        """)
+        cursor.execute(f"""
+            CREATE OR REPLACE FUNCTION {self.table_name}_count_rows() RETURNS trigger AS $$
+            BEGIN
+                IF TG_OP IN ('DELETE', 'UPDATE') THEN
+                    UPDATE {self.counts_table} AS counts
+                    SET vector_count = counts.vector_count - removed.n
+                    FROM (
+                        SELECT COALESCE(namespace, '') AS namespace, COUNT(*) AS n
+                        FROM old_rows GROUP BY 1
+                    ) AS removed
+                    WHERE counts.namespace = removed.namespace;
+                END IF;
+                IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                    INSERT INTO {self.counts_table} (namespace, vector_count)
+                    SELECT COALESCE(namespace, ''), COUNT(*) FROM new_rows GROUP BY 1
+                    ON CONFLICT (namespace) DO UPDATE
+                    SET vector_count = {self.counts_table}.vector_count + EXCLUDED.vector_count;
+                END IF;
+                IF TG_OP IN ('DELETE', 'UPDATE') THEN
+                    DELETE FROM {self.counts_table} WHERE vector_count <= 0;
+                END IF;
+                RETURN NULL;
+            END;
+            $$ LANGUAGE plpgsql;
+        """)
+        for event, transition in (
+            ('INSERT', 'NEW TABLE AS new_rows'),
+            ('UPDATE', 'OLD TABLE AS old_rows NEW TABLE AS new_rows'),
+            ('DELETE', 'OLD TABLE AS old_rows'),
+        ):
+            trigger = f"{self.table_name}_count_{event.lower()}"
+            cursor.execute(f"DROP TRIGGER IF EXISTS {trigger} ON {self.table_name};")
+            cursor.execute(f"""
+                CREATE TRIGGER {trigger}
+                AFTER {event} ON {self.table_name}
+                REFERENCING {transition}
+                FOR EACH STATEMENT EXECUTE PROCEDURE {self.table_name}_count_rows();
+            """)
+        
+        if not existed:
+            self._backfill_namespace_counts(cursor)
+    
+    def _backfill_namespace_counts(self, cursor) -> None:
+        """Count vectors written before the counts table existed (runs once)."""
+        cursor.execute(f"""
+            INSERT INTO {self.counts_table} (namespace, vector_count)
+            SELECT COALESCE(namespace, ''), COUNT(*) FROM {self.table_name}
+            GROUP BY COALESCE(namespace, '');
+        """)
+        self.logger.info("Backfilled namespace vector counts", table_name=self.table_name)
+    
     async def upsert_vectors(
         self, 
         vectors: List[Tuple[str, List[float], Dict[str, Any]]], 
@@ -464,7 +666,11 @@ class PgVectorBackend(VectorStorageBackend):
                         
                         try:
                             sqlite_cursor.execute(
-                                f"INSERT OR REPLACE INTO {self.table_name} (id, embedding, metadata, namespace, created_at, updated_at) VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)",
+                                f"INSERT INTO {self.table_name} (id, embedding, metadata, namespace, created_at, updated_at) "
+                                "VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP) "
+                                "ON CONFLICT (id) DO UPDATE SET embedding = excluded.embedding, "
+                                "metadata = excluded.metadata, namespace = excluded.namespace, "
+                                "updated_at = CURRENT_TIMESTAMP",
                                 [
                                     vector_id,
                                     json.dumps(embedding),
@@ -810,15 +1016,16 @@ class PgVectorBackend(VectorStorageBackend):
         try:
             with connection.cursor() as cursor:
                 if self.is_sqlite:
-                    # SQLite version
-                    if namespace:
-                        placeholders = ','.join('?' * len(ids))
-                        sql = "DELETE FROM " + self.table_name + " WHERE id IN (" + placeholders + ") AND namespace = ?"
-                        cursor.execute(sql, ids + [namespace])
-                    else:
-                        placeholders = ','.join('?' * len(ids))
-                        sql = "DELETE FROM " + self.table_name + " WHERE id IN (" + placeholders + ")"
-                        cursor.execute(sql, ids)
+                    # SQLite version, batched to stay under its bound-parameter limit
+                    for start in range(0, len(ids), self.SQLITE_DELETE_BATCH):
+                        batch = list(ids[start:start + self.SQLITE_DELETE_BATCH])
+                        placeholders = ','.join('?' * len(batch))
+                        if namespace:
+                            sql = "DELETE FROM " + self.table_name + " WHERE id IN (" + placeholders + ") AND namespace = ?"
+                            cursor.execute(sql, batch + [namespace])
+                        else:
+                            sql = "DELETE FROM " + self.table_name + " WHERE id IN (" + placeholders + ")"
+                            cursor.execute(sql, batch)
                 else:
                     # PostgreSQL version
                     if namespace:
@@ -846,49 +1053,141 @@ class PgVectorBackend(VectorStorageBackend):
             )
             return False
     
+    async def fetch_vectors(self, ids: List[str], namespace: Optional[str] = None) -> Dict[str, List[float]]:
+        """Fetch stored vectors by id (SQLite or PostgreSQL)."""
+        return await sync_to_async(self._fetch_vectors_sync)(ids, namespace)
+    
+    def _fetch_vectors_sync(self, ids: List[str], namespace: Optional[str] = None) -> Dict[str, List[float]]:
+        rows = []
+        with connection.cursor() as cursor:
+            if self.is_sqlite:
+                for start in range(0, len(ids), self.SQLITE_DELETE_BATCH):
+                    batch = list(ids[start:start + self.SQLITE_DELETE_BATCH])
+                    placeholders = ','.join('?' * len(batch))
+                    sql = "SELECT id, embedding FROM " + self.table_name + " WHERE id IN (" + placeholders + ")"
+                    if namespace:
+                        cursor.execute(sql + " AND namespace = ?", batch + [namespace])
+                    else:
+                        cursor.execute(sql, batch)
+                    rows.extend(cursor.fetchall())
+            else:
+                if namespace:
+                    cursor.execute(
+                        f"SELECT id, embedding FROM {self.table_name} WHERE id = ANY(%s) AND namespace = %s;",
+                        [list(ids), namespace]
+                    )
+                else:
+                    cursor.execute(f"SELECT id, embedding FROM {self.table_name} WHERE id = ANY(%s);", [list(ids)])
+                rows = cursor.fetchall()
+        
+        # SQLite stores JSON text; pgvector returns '[1,2,...]' without an adapter
+        return {
+            vector_id: [float(x) for x in (json.loads(embedding) if isinstance(embedding, str) else embedding)]
+            for vector_id, embedding in rows
+        }
+    
+    async def delete_by_filter(self, namespace: str, source_id: Optional[str] = None) -> Optional[int]:
+        """Delete by namespace, or by namespace and source (both indexed)."""
+        return await sync_to_async(self._delete_by_filter_sync)(namespace, source_id)
+    
+    def _delete_by_filter_sync(self, namespace: str, source_id: Optional[str] = None) -> int:
+        # Django's SQLite cursor translates %s placeholders too
+        sql = f"DELETE FROM {self.table_name} WHERE namespace = %s"
+        params = [namespace]
+        if source_id is not None:
+            sql += f" AND {self._source_id_sql()} = %s"
+            params.append(str(source_id))
+        
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            deleted = cursor.rowcount
+        
+        self.logger.info(
+            "Vectors deleted by filter",
+            namespace=namespace,
+            source_id=source_id,
+            count=deleted
+        )
+        return deleted
+    
+    def _source_id_sql(self) -> str:
+        """Expression for the source id in vector metadata (matches the source index)."""
+        if self.is_sqlite:
+            return "json_extract(metadata, '$.source_id')"
+        return "metadata->>'source_id'"
+    
     async def get_stats(self) -> Dict[str, Any]:
         """Get storage statistics (SQLite or PostgreSQL)."""
         return await sync_to_async(self._get_stats_sync)()
     
     def _get_stats_sync(self) -> Dict[str, Any]:
-        """Synchronous stats retrieval operation."""
+        """
+        Synchronous stats retrieval operation.
+        
+        Never scans the vector table: PostgreSQL totals come from the
+        planner's catalog estimates, and exact totals from the namespace
+        counts table (one row per namespace) when those aren't available.
+        """
         try:
             with connection.cursor() as cursor:
                 if self.is_sqlite:
                     # SQLite version
-                    sql = "SELECT COUNT(*) as total_vectors, COUNT(DISTINCT namespace) as namespaces FROM " + self.table_name
-                    cursor.execute(sql)
-                    
-                    row = cursor.fetchone()
+                    total_vectors, namespaces = self._sum_namespace_counts(cursor)
                     return {
                         "backend": "sqlite",
-                        "total_vectors": row[0],
-                        "namespaces": row[1],
-                        "table_size": "N/A (SQLite)"
+                        "total_vectors": total_vectors,
+                        "namespaces": namespaces,
+                        "table_size": "N/A (SQLite)",
+                        "approximate": False
                     }
                 else:
                     # PostgreSQL version  
-                    sql = f"""
-                        SELECT 
-                            COUNT(*) as total_vectors,
-                            COUNT(DISTINCT namespace) as namespaces,
-                            pg_size_pretty(pg_total_relation_size('{self.table_name}')) as table_size
-                        FROM {self.table_name};
-                    """
-                    cursor.execute(sql)
+                    cursor.execute("""
+                        SELECT vectors.reltuples::bigint, counts.reltuples::bigint,
+                               pg_size_pretty(pg_total_relation_size(vectors.oid))
+                        FROM pg_class vectors, pg_class counts
+                        WHERE vectors.oid = to_regclass(%s) AND counts.oid = to_regclass(%s);
+                    """, [self.table_name, self.counts_table])
+                    total_vectors, namespaces, table_size = cursor.fetchone()
                     
-                    row = cursor.fetchone()
+                    # Never analyzed yet (-1 on PostgreSQL 14+, 0 before)
+                    approximate = total_vectors > 0 and namespaces > 0
+                    if not approximate:
+                        total_vectors, namespaces = self._sum_namespace_counts(cursor)
                     return {
                         "backend": "pgvector",
-                        "total_vectors": row[0],
-                        "namespaces": row[1],
-                        "table_size": row[2]
+                        "total_vectors": total_vectors,
+                        "namespaces": namespaces,
+                        "table_size": table_size,
+                        "approximate": approximate
                     }
                 
         except Exception as e:
             backend_type = "SQLite" if self.is_sqlite else "PgVector"
             self.logger.error(f"Failed to get {backend_type} stats", error=str(e))
             return {"backend": backend_type.lower(), "error": str(e)}
+    
+    def _sum_namespace_counts(self, cursor) -> Tuple[int, int]:
+        cursor.execute(f"SELECT COALESCE(SUM(vector_count), 0), COUNT(*) FROM {self.counts_table}")
+        total_vectors, namespaces = cursor.fetchone()
+        return int(total_vectors), namespaces
+    
+    async def count_vectors(self, namespace: str) -> Optional[int]:
+        """Count vectors in a namespace (one counts-table lookup)."""
+        return await sync_to_async(self._count_vectors_sync)(namespace)
+    
+    def _count_vectors_sync(self, namespace: str) -> Optional[int]:
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f"SELECT vector_count FROM {self.counts_table} WHERE namespace = %s",
+                    [namespace or '']
+                )
+                row = cursor.fetchone()
+                return row[0] if row else 0
+        except Exception as e:
+            self.logger.error("Failed to count vectors", namespace=namespace, error=str(e))
+            return None
 
 
 class VectorStorageService:
@@ -904,6 +1203,16 @@ class VectorStorageService:
         self.logger = structlog.get_logger().bind(component="VectorStorageService")
         self.backend: Optional[VectorStorageBackend] = None
         self.backend_name = None
+        # Size of search results as cached (content is hydrated afterwards),
+        # measured on a sample: serializing them again costs as much as caching
+        self.search_stats = {
+            "searches": 0,
+            "cache_hits": 0,
+            "cached_results": 0,
+            "sized_results": 0,
+            "cached_bytes": 0,
+            "empty_namespace_skips": 0
+        }
         
         self.logger.info(
             "Vector storage service initializing",
@@ -1001,18 +1310,29 @@ class VectorStorageService:
         """
         Search for similar vectors with privacy filtering.
         By default, only returns citable content.
+        
+        Results are cached without chunk content, which is hydrated from
+        the chunk store after top-k selection.
         """
         if not self.backend:
             raise VectorStorageError("Vector storage not initialized")
         
+        self.search_stats["searches"] += 1
+        
         # Check cache first
         cache_key = None
         if self.config.enable_caching:
             cache_key = self._generate_cache_key(query_vector, top_k, namespace, filter_metadata)
             cached_results = cache.get(cache_key)
             if cached_results:
+                self.search_stats["cache_hits"] += 1
                 self.logger.info("Returning cached search results", cache_key=cache_key)
-                return cached_results
+                return await ahydrate_results(cached_results)
+        
+        # Chatbots without trained content don't need a vector search
+        if namespace and getattr(self.backend, 'has_cheap_counts', False) and await self.backend.count_vectors(namespace) == 0:
+            self.search_stats["empty_namespace_skips"] += 1
+            return []
         
         try:
             query = VectorSearchQuery(
@@ -1032,8 +1352,12 @@ class VectorStorageService:
                     results, 
                     timeout=self.config.cache_ttl_hours * 3600
                 )
+                self.search_stats["cached_results"] += 1
+                if (self.search_stats["cached_results"] - 1) % max(self.config.cache_size_sample_rate, 1) == 0:
+                    self.search_stats["sized_results"] += 1
+                    self.search_stats["cached_bytes"] += len(pickle.dumps(results, pickle.HIGHEST_PROTOCOL))
             
-            return results
+            return await ahydrate_results(results)
             
         except Exception as e:
             self.logger.error(
@@ -1124,6 +1448,61 @@ class VectorStorageService:
             )
             raise VectorStorageError(f"Failed to delete embeddings: {e}")
     
+    async def delete_by_filter(
+        self,
+        namespace: str,
+        source_id: Optional[str] = None,
+        fallback_ids: Optional[List[str]] = None
+    ) -> Optional[int]:
+        """
+        Delete a namespace's vectors, or one knowledge source's, without listing ids.
+        
+        Args:
+            namespace: Namespace to delete from
+            source_id: Only delete vectors whose metadata has this source id
+            fallback_ids: Vector ids to delete instead if the backend can't
+                delete by filter
+            
+        Returns:
+            Optional[int]: Vectors deleted, None if the backend can't tell
+        """
+        if not self.backend:
+            raise VectorStorageError("Vector storage not initialized")
+        
+        try:
+            deleted = await self.backend.delete_by_filter(namespace, source_id)
+        except Exception as e:
+            if fallback_ids is None:
+                self.logger.error(
+                    "Failed to delete embeddings by filter",
+                    namespace=namespace,
+                    source_id=source_id,
+                    error=str(e),
+                    error_type=type(e).__name__
+                )
+                raise VectorStorageError(f"Failed to delete embeddings by filter: {e}")
+            
+            self.logger.warning(
+                "Filter delete unavailable, deleting by id",
+                namespace=namespace,
+                source_id=source_id,
+                count=len(fallback_ids),
+                error=str(e)
+            )
+            for start in range(0, len(fallback_ids), self.config.batch_size):
+                if not await self.delete_embeddings(fallback_ids[start:start + self.config.batch_size], namespace):
+                    raise VectorStorageError(f"Failed to delete embeddings from {namespace}")
+            return len(fallback_ids)
+        
+        self.logger.info(
+            "Embeddings deleted by filter",
+            namespace=namespace,
+            source_id=source_id,
+            count=deleted,
+            backend=self.backend_name
+        )
+        return deleted
+    
     async def get_storage_stats(self) -> Dict[str, Any]:
         """Get storage backend statistics."""
         if not self.backend:
@@ -1136,12 +1515,30 @@ class VectorStorageService:
                 "caching_enabled": self.config.enable_caching,
                 "batch_size": self.config.batch_size
             }
+            sized = self.search_stats["sized_results"]
+            stats["search"] = {
+                **self.search_stats,
+                "avg_cached_result_bytes": round(self.search_stats["cached_bytes"] / sized) if sized else 0,
+                "content_store": dict(chunk_content_store.stats)
+            }
             return stats
             
         except Exception as e:
             self.logger.error("Failed to get storage stats", error=str(e))
             return {"error": str(e)}
     
+    async def count_vectors(self, namespace: str) -> Optional[int]:
+        """Count vectors in a namespace (None if the backend can't tell)."""
+        if not self.backend:
+            raise VectorStorageError("Vector storage not initialized")
+        return await self.backend.count_vectors(namespace)
+    
+    async def fetch_embeddings(self, ids: List[str], namespace: Optional[str] = None) -> Dict[str, List[float]]:
+        """Stored embeddings by id; ids not in the store are left out."""
+        if not self.backend:
+            raise VectorStorageError("Vector storage not initialized")
+        return await self.backend.fetch_vectors(ids, namespace)
+    
     def _generate_cache_key(
         self,
         query_vector: List[float],
@@ -1161,9 +1558,26 @@ class VectorStorageService:
 
 
 # Convenience function for quick setup
-async def create_vector_storage(backend: str = "auto") -> VectorStorageService:
-    """Create and initialize vector storage service."""
+async def create_vector_storage(
+    backend: str = "auto",
+    dimension: Optional[int] = None,
+    index_version: Optional[int] = None
+) -> VectorStorageService:
+    """
+    Create and initialize vector storage service.
+    
+    Re-indexed chatbots (``index_version`` above 1) get their own pgvector
+    table, since ids are unique per table and vector(n) columns are
+    fixed-size; on Pinecone they use a namespace of the shared index. A
+    non-default ``dimension`` selects the ``<index>-<dimension>`` Pinecone
+    index, which must already exist.
+    """
     config = VectorStorageConfig(backend=backend)
+    if index_version and index_version > 1:
+        config.table_name = f"{config.table_name}_v{index_version}"
+    if dimension and dimension != config.vector_dimension:
+        config.vector_dimension = dimension
+        config.pinecone_index_name = f"{config.pinecone_index_name}-{dimension}"
     service = VectorStorageService(config)
     
     if await service.initialize():
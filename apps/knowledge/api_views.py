@@ -82,10 +82,8 @@ class KnowledgeSourceViewSet(viewsets.ModelViewSet):
         return queryset.select_related('chatbot')
     
     def perform_destroy(self, instance):
-        """Delete knowledge source and its chunks."""
-        # TODO: Delete from vector store when implemented
-        # vector_service = VectorSearchService()
-        # vector_service.delete_source(str(instance.id))
+        """Delete knowledge source, its chunks and their vectors."""
+        from apps.core.tasks import task_manager
         
         # Delete file if exists
         if instance.file_path:
@@ -95,10 +93,16 @@ class KnowledgeSourceViewSet(viewsets.ModelViewSet):
         
         super().perform_destroy(instance)
         
+        # Large sources are deleted in the background
+        deletion_task_id = task_manager.submit_vector_deletion(
+            instance.chatbot_id, instance.id, chunk_count=instance.chunk_count
+        )
+        
         logger.info(
             "Knowledge source deleted",
             source_id=str(instance.id),
-            chatbot_id=str(instance.chatbot.id)
+            chatbot_id=str(instance.chatbot.id),
+            vector_deletion_task_id=deletion_task_id
         )
     
     @action(detail=True, methods=['post'])
@@ -106,37 +110,27 @@ class KnowledgeSourceViewSet(viewsets.ModelViewSet):
         """Reprocess a knowledge source."""
         source = self.get_object()
         
-        if source.processing_status == 'processing':
-            return Response(
-                {'error': 'Source is already being processed'},
-                status=status.HTTP_400_BAD_REQUEST
-            )
+        # Repeated requests collapse onto the run already in flight
+        from django.conf import settings
+        from apps.core.tasks import task_manager
+        task_id, submitted = task_manager.submit_knowledge_source_processing(source, force_reprocess=True)
         
-        # TODO: Trigger reprocessing when tasks are implemented
-        # if source.source_type == 'document':
-        #     process_document_task.delay(str(source.id))
-        # elif source.source_type == 'url':
-        #     process_url_task.delay(str(source.id))
-        # elif source.source_type == 'youtube':
-        #     process_youtube_task.delay(str(source.id))
-        # else:
-        #     return Response(
-        #         {'error': f'Cannot reprocess source type: {source.source_type}'},
-        #         status=status.HTTP_400_BAD_REQUEST
-        #     )
-        
-        source.processing_status = 'processing'
-        source.error_message = None
-        source.save()
+        if submitted and not getattr(settings, 'CELERY_TASK_ALWAYS_EAGER', False):
+            source.status = 'processing'
+            source.error_message = None
+            source.save(update_fields=['status', 'error_message'])
         
         logger.info(
             "Knowledge source reprocessing initiated",
             source_id=str(source.id),
-            source_type=source.source_type
+            source_type=source.content_type,
+            task_id=task_id,
+            deduplicated=not submitted
         )
         
         return Response({
-            'message': 'Reprocessing initiated',
+            'message': 'Reprocessing initiated' if submitted else 'Reprocessing already in progress',
+            'task_id': task_id,
             'status': 'processing'
         })
     
@@ -381,7 +375,7 @@ def upload_document(request):
                 "Document processed successfully",
                 source_id=str(source.id),
                 chatbot_id=str(chatbot.id),
-                chunks_created=len(result.chunks),
+                chunks_created=result.chunk_count,
                 total_tokens=result.total_tokens,
                 processing_time_ms=result.processing_time_ms
             )
@@ -473,10 +467,16 @@ def process_url(request):
                 "URL processed successfully",
                 source_id=str(source.id),
                 chatbot_id=str(chatbot.id),
-                chunks_created=len(result.chunks),
+                chunks_created=result.chunk_count,
                 total_tokens=result.total_tokens,
                 processing_time_ms=result.processing_time_ms
             )
+            
+            # Deeper crawls fan out over the site in the background
+            if serializer.validated_data.get('crawl_depth', 1) > 1:
+                from apps.core.tasks import crawl_url_site_task
+                from apps.core.task_scheduling import submit_bulk_task
+                submit_bulk_task(crawl_url_site_task, chatbot.user_id, args=[str(source.id)])
         else:
             logger.error(
                 "URL processing failed",
@@ -0,0 +1,42 @@
+# Generated by Django 4.2.7 on 2026-10-18 21:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("knowledge", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="knowledgesource",
+            name="content_hash",
+            field=models.CharField(
+                blank=True, help_text="SHA-256 hash of normalized extracted text", max_length=64, null=True
+            ),
+        ),
+        migrations.AddField(
+            model_name="knowledgesource",
+            name="http_etag",
+            field=models.CharField(
+                blank=True, help_text="ETag returned by the last successful crawl", max_length=255, null=True
+            ),
+        ),
+        migrations.AddField(
+            model_name="knowledgesource",
+            name="http_last_modified",
+            field=models.CharField(
+                blank=True, help_text="Last-Modified header returned by the last successful crawl", max_length=64, null=True
+            ),
+        ),
+        migrations.AddField(
+            model_name="knowledgesource",
+            name="last_crawled_at",
+            field=models.DateTimeField(blank=True, help_text="When the URL was last fetched (changed or not)", null=True),
+        ),
+        migrations.AddIndex(
+            model_name="knowledgesource",
+            index=models.Index(fields=["content_type", "last_crawled_at"], name="knowledge_s_content_fb62b4_idx"),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 4.2.7 on 2026-10-18 22:53
+
+import apps.core.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("knowledge", "0002_url_crawl_validators"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="processingjob",
+            name="checkpoint",
+            field=apps.core.models.JSONField(
+                blank=True, default=dict, help_text="Completed stage checkpoints keyed by stage name"
+            ),
+        ),
+        migrations.AddField(
+            model_name="processingjob",
+            name="extracted_text",
+            field=models.TextField(blank=True, help_text="Extracted document text, kept until the job completes", null=True),
+        ),
+    ]
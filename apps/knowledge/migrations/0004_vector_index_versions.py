@@ -0,0 +1,101 @@
+# Generated by Django 4.2.7 on 2026-10-19 00:19
+
+import apps.core.models
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("chatbots", "0002_add_crm_integration_fields"),
+        ("knowledge", "0003_processing_job_checkpoints"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="VectorIndexVersion",
+            fields=[
+                ("created_at", models.DateTimeField(auto_now_add=True, db_index=True)),
+                ("updated_at", models.DateTimeField(auto_now=True, db_index=True)),
+                ("deleted_at", models.DateTimeField(blank=True, db_index=True, null=True)),
+                ("id", models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ("version", models.PositiveIntegerField(help_text="Version number; 1 is the original chatbot namespace")),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("building", "Building"),
+                            ("ready", "Ready"),
+                            ("active", "Active"),
+                            ("retired", "Retired"),
+                            ("failed", "Failed"),
+                        ],
+                        default="building",
+                        max_length=20,
+                    ),
+                ),
+                ("embedding_model", models.CharField(max_length=100)),
+                ("dimensions", models.PositiveIntegerField()),
+                ("vectors_indexed", models.PositiveIntegerField(default=0)),
+                ("vectors_expected", models.PositiveIntegerField(default=0)),
+                (
+                    "recall_at_k",
+                    models.FloatField(blank=True, help_text="Share of sampled chunks found by their own content", null=True),
+                ),
+                (
+                    "build_state",
+                    apps.core.models.JSONField(
+                        blank=True, default=dict, help_text="Resume cursor, spend and verification details"
+                    ),
+                ),
+                ("error_message", models.TextField(blank=True, null=True)),
+                ("activated_at", models.DateTimeField(blank=True, null=True)),
+                ("retired_at", models.DateTimeField(blank=True, null=True)),
+                (
+                    "chatbot",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE, related_name="index_versions", to="chatbots.chatbot"
+                    ),
+                ),
+                (
+                    "created_by",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="%(class)s_created",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                (
+                    "updated_by",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="%(class)s_updated",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Vector Index Version",
+                "verbose_name_plural": "Vector Index Versions",
+                "db_table": "vector_index_versions",
+                "indexes": [models.Index(fields=["chatbot", "status"], name="vector_inde_chatbot_b5c755_idx")],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="vectorindexversion",
+            constraint=models.UniqueConstraint(fields=("chatbot", "version"), name="unique_index_version_per_chatbot"),
+        ),
+        migrations.AddConstraint(
+            model_name="vectorindexversion",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("status", "active")), fields=("chatbot",), name="one_active_index_per_chatbot"
+            ),
+        ),
+    ]
@@ -0,0 +1,21 @@
+from django.db import migrations
+
+
+def create_fulltext_index(apps, schema_editor):
+    from apps.core.lexical_search import ensure_lexical_index
+    ensure_lexical_index(schema_editor.connection)
+
+
+def drop_fulltext_index(apps, schema_editor):
+    from apps.core.lexical_search import drop_lexical_index
+    drop_lexical_index(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("knowledge", "0004_vector_index_versions"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_fulltext_index, drop_fulltext_index),
+    ]
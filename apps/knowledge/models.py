@@ -71,7 +71,32 @@ class KnowledgeSource(BaseModel):
         blank=True,
         help_text="URL for web pages or videos"
     )
-    
+
+    # URL crawl validators (used for conditional recrawls)
+    http_etag = models.CharField(
+        max_length=255,
+        null=True,
+        blank=True,
+        help_text="ETag returned by the last successful crawl"
+    )
+    http_last_modified = models.CharField(
+        max_length=64,
+        null=True,
+        blank=True,
+        help_text="Last-Modified header returned by the last successful crawl"
+    )
+    content_hash = models.CharField(
+        max_length=64,
+        null=True,
+        blank=True,
+        help_text="SHA-256 hash of normalized extracted text"
+    )
+    last_crawled_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text="When the URL was last fetched (changed or not)"
+    )
+
     # CRITICAL PRIVACY CONTROL
     is_citable = models.BooleanField(
         default=True,
@@ -124,6 +149,7 @@ class KnowledgeSource(BaseModel):
             models.Index(fields=['is_citable']),  # CRITICAL INDEX
             models.Index(fields=['file_hash']),
             models.Index(fields=['created_at']),
+            models.Index(fields=['content_type', 'last_crawled_at']),
         ]
         constraints = [
             models.UniqueConstraint(
@@ -436,10 +462,27 @@ class ProcessingJob(BaseModel):
         help_text="Detailed error information"
     )
     
+    # Stage checkpoints, so a retried task resumes instead of starting over
+    checkpoint = JSONField(
+        blank=True,
+        help_text="Completed stage checkpoints keyed by stage name"
+    )
+    extracted_text = models.TextField(
+        null=True,
+        blank=True,
+        help_text="Extracted document text, kept until the job completes"
+    )
+    
     # Timing
     started_at = models.DateTimeField(null=True, blank=True)
     completed_at = models.DateTimeField(null=True, blank=True)
     
+    # Checkpoint stages
+    STAGE_EXTRACTED = 'extracted'
+    STAGE_CHUNKED = 'chunked'
+    STAGE_EMBEDDED = 'embedded'
+    STAGE_STORED = 'stored'
+    
     class Meta:
         db_table = 'processing_jobs'
         verbose_name = 'Processing Job'
@@ -483,3 +526,162 @@ class ProcessingJob(BaseModel):
             progress=percentage,
             status=status
         )
+    
+    @classmethod
+    def resume_or_create(cls, source: 'KnowledgeSource', job_type: str, task_id: str = None):
+        """
+        Get the unfinished job left by an earlier attempt of a task, or start one.
+        
+        Celery keeps the task id across retries, so a retried task finds the
+        job (and its checkpoints) its previous attempt created.
+        
+        Returns:
+            Tuple of (job, resumed)
+        """
+        from django.utils import timezone
+        
+        if task_id:
+            job = cls.objects.filter(
+                source=source,
+                job_type=job_type,
+                celery_task_id=task_id
+            ).exclude(status=ProcessingStatus.COMPLETED).order_by('-created_at').first()
+            if job:
+                return job, True
+        
+        job = cls.objects.create(
+            source=source,
+            job_type=job_type,
+            celery_task_id=task_id,
+            status=ProcessingStatus.PROCESSING,
+            result_data={},
+            started_at=timezone.now()
+        )
+        return job, False
+    
+    def get_checkpoint(self, stage: str) -> dict:
+        """Get the recorded checkpoint for a stage (empty if not reached)."""
+        return (self.checkpoint or {}).get(stage, {})
+    
+    def save_checkpoint(self, stage: str, **data) -> None:
+        """Merge data into a stage checkpoint and persist it immediately."""
+        checkpoint = dict(self.checkpoint or {})
+        checkpoint[stage] = {**checkpoint.get(stage, {}), **data}
+        self.checkpoint = checkpoint
+        self.save(update_fields=['checkpoint', 'updated_at'])
+    
+    def reset_checkpoints(self, *stages: str) -> None:
+        """Drop checkpoints (all of them if no stages are given)."""
+        if stages:
+            self.checkpoint = {
+                stage: data for stage, data in (self.checkpoint or {}).items()
+                if stage not in stages
+            }
+        else:
+            self.checkpoint = {}
+        self.save(update_fields=['checkpoint', 'updated_at'])
+    
+    def complete(self, result_data: dict) -> None:
+        """Mark the job completed and release the extracted text checkpoint."""
+        from django.utils import timezone
+        
+        self.status = ProcessingStatus.COMPLETED
+        self.progress_percentage = 100.0
+        self.result_data = result_data
+        self.extracted_text = None
+        self.completed_at = timezone.now()
+        self.save(update_fields=[
+            'status', 'progress_percentage', 'result_data',
+            'extracted_text', 'completed_at', 'updated_at'
+        ])
+
+
+class VectorIndexVersion(BaseModel):
+    """
+    One version of a chatbot's vector index.
+    
+    Changing the embedding model builds a new version in its own namespace
+    and pgvector table (a shadow index) while the active one keeps serving. Exactly one version
+    per chatbot is active; cutover and rollback swap that flag atomically.
+    Chatbots without any version rows serve from the original namespace.
+    """
+    
+    STATUS_BUILDING = 'building'
+    STATUS_READY = 'ready'
+    STATUS_ACTIVE = 'active'
+    STATUS_RETIRED = 'retired'
+    STATUS_FAILED = 'failed'
+    
+    chatbot = models.ForeignKey(
+        'chatbots.Chatbot',
+        on_delete=models.CASCADE,
+        related_name='index_versions'
+    )
+    version = models.PositiveIntegerField(
+        help_text="Version number; 1 is the original chatbot namespace"
+    )
+    status = models.CharField(
+        max_length=20,
+        choices=[
+            (STATUS_BUILDING, 'Building'),
+            (STATUS_READY, 'Ready'),
+            (STATUS_ACTIVE, 'Active'),
+            (STATUS_RETIRED, 'Retired'),
+            (STATUS_FAILED, 'Failed'),
+        ],
+        default=STATUS_BUILDING
+    )
+    
+    # Embedding configuration the vectors were built with
+    embedding_model = models.CharField(max_length=100)
+    dimensions = models.PositiveIntegerField()
+    
+    # Build progress and verification
+    vectors_indexed = models.PositiveIntegerField(default=0)
+    vectors_expected = models.PositiveIntegerField(default=0)
+    recall_at_k = models.FloatField(
+        null=True,
+        blank=True,
+        help_text="Share of sampled chunks found by their own content"
+    )
+    build_state = JSONField(
+        blank=True,
+        help_text="Resume cursor, spend and verification details"
+    )
+    error_message = models.TextField(null=True, blank=True)
+    
+    activated_at = models.DateTimeField(null=True, blank=True)
+    retired_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        db_table = 'vector_index_versions'
+        verbose_name = 'Vector Index Version'
+        verbose_name_plural = 'Vector Index Versions'
+        indexes = [
+            models.Index(fields=['chatbot', 'status']),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['chatbot', 'version'],
+                name='unique_index_version_per_chatbot'
+            ),
+            models.UniqueConstraint(
+                fields=['chatbot'],
+                condition=models.Q(status='active'),
+                name='one_active_index_per_chatbot'
+            ),
+        ]
+    
+    def __str__(self):
+        return f"Index v{self.version} for {self.chatbot_id} ({self.embedding_model}, {self.status})"
+    
+    @staticmethod
+    def namespace_for(chatbot_id, version: int) -> str:
+        """Vector namespace of an index version."""
+        if version <= 1:
+            return f"chatbot_{chatbot_id}"
+        return f"chatbot_{chatbot_id}_v{version}"
+    
+    @property
+    def namespace(self) -> str:
+        return self.namespace_for(self.chatbot_id, self.version)
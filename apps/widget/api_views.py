@@ -12,6 +12,7 @@ from django.http import JsonResponse
 
 from apps.chatbots.models import Chatbot
 from apps.conversations.models import Conversation, Message
+from apps.core.chatbot_cache import chatbot_config_cache
 from apps.core.rag.pipeline import RAGPipeline
 from apps.core.exceptions import ServiceError
 
@@ -87,13 +88,10 @@ def widget_chat(request, slug):
     }
     """
     try:
-        # Get chatbot - allow ready or completed status
-        chatbot = get_object_or_404(
-            Chatbot.objects.filter(
-                public_url_slug=slug, 
-                status__in=['ready', 'completed']
-            )
-        )
+        # Get chatbot from the config cache - allow ready or completed status
+        chatbot = chatbot_config_cache.get_by_slug(slug)
+        if chatbot.status not in ('ready', 'completed'):
+            raise Chatbot.DoesNotExist
         
         # Get message from request
         message_text = request.data.get('message', '').strip()
@@ -116,12 +114,12 @@ def widget_chat(request, slug):
             try:
                 conversation = Conversation.objects.get(
                     id=conversation_id, 
-                    chatbot=chatbot
+                    chatbot_id=chatbot.id
                 )
             except Conversation.DoesNotExist:
                 # Create new conversation if specified ID doesn't exist
                 conversation = Conversation.objects.create(
-                    chatbot=chatbot,
+                    chatbot_id=chatbot.id,
                     metadata={
                         'source': 'widget',
                         'user_agent': request.META.get('HTTP_USER_AGENT', ''),
@@ -132,7 +130,7 @@ def widget_chat(request, slug):
         else:
             # Create new conversation
             conversation = Conversation.objects.create(
-                chatbot=chatbot,
+                chatbot_id=chatbot.id,
                 metadata={
                     'source': 'widget',
                     'user_agent': request.META.get('HTTP_USER_AGENT', ''),
@@ -153,20 +151,16 @@ def widget_chat(request, slug):
         try:
             # Import RAG components
             from apps.core.rag.pipeline import get_rag_pipeline
-            from apps.core.rag.llm_service import ChatbotConfig
             from asgiref.sync import async_to_sync
             
             # Get RAG pipeline for this chatbot
             rag_pipeline = get_rag_pipeline(str(chatbot.id))
             
             # Create chatbot configuration for widget (public mode)
-            chatbot_config = ChatbotConfig(
-                name=chatbot.name,
-                description=chatbot.description or "AI Assistant",
+            chatbot_config = chatbot.chatbot_config(
                 company_name="Widget User",  # Generic for public widget
-                temperature=getattr(chatbot, 'temperature', 0.7),
+                temperature=chatbot.temperature,
                 max_response_tokens=300,  # Shorter responses for widget
-                strict_citation_mode=True,
                 allow_private_reasoning=False  # Public widget mode
             )
             
@@ -232,8 +226,9 @@ def widget_chat(request, slug):
         
         # Check for CRM integration - Send to CRM if email detected
         try:
-            from apps.core.crm_service import CRMService
-            CRMService.process_conversation_for_crm(conversation, chatbot)
+            if chatbot.crm_enabled:
+                from apps.core.crm_service import CRMService
+                CRMService.process_conversation_for_crm(conversation, Chatbot.objects.get(id=chatbot.id))
         except Exception as e:
             logger.warning(f"CRM integration failed for conversation {conversation.id}: {str(e)}")
             # Don't fail the chat response if CRM fails
@@ -19,6 +19,10 @@ os.environ.setdefault("DJANGO_SETTINGS_MODULE", "chatbot_saas.settings")
 django_asgi_app = get_asgi_application()
 
 from apps.conversations import routing
+from apps.core import reranking
+
+# Load the reranking model in the background before the first query needs it
+reranking.warm_up()
 
 application = ProtocolTypeRouter({
     "http": django_asgi_app,
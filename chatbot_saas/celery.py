@@ -33,15 +33,34 @@ app.conf.beat_schedule = {
         'task': 'apps.core.tasks.monitor_embedding_costs',
         'schedule': 300.0,  # Every 5 minutes
     },
+    'schedule-url-recrawls': {
+        'task': 'apps.core.tasks.schedule_url_recrawls',
+        'schedule': 3600.0,  # Every hour (per-source interval enforced by the task)
+    },
+    'dispatch-fair-queue': {
+        'task': 'apps.core.tasks.dispatch_fair_queue',
+        'schedule': 30.0,  # Every 30 seconds (backstop; finishing tasks dispatch directly)
+    },
 }
 
 app.conf.timezone = 'UTC'
 
 # Task routing configuration
+# Latency-sensitive work (training orchestration, emails, CRM sync) stays on
+# the default 'interactive' queue; bulk ingestion gets its own queues and
+# workers so a large upload can't delay it. Bulk submissions go through
+# apps.core.task_scheduling for per-tenant fairness.
+app.conf.task_default_queue = 'interactive'
 app.conf.task_routes = {
     'apps.core.tasks.process_document_pipeline': {'queue': 'documents'},
-    'apps.core.tasks.generate_embeddings_task': {'queue': 'embeddings'},
+    'apps.core.tasks.process_url': {'queue': 'documents'},
+    'apps.core.tasks.crawl_url_site_task': {'queue': 'documents'},
+    'apps.core.tasks.recrawl_url_source_task': {'queue': 'documents'},
+    'apps.core.tasks.train_knowledge_source_task': {'queue': 'documents'},
+    'apps.core.tasks.generate_embeddings*': {'queue': 'embeddings'},
+    'apps.core.tasks.reindex_chatbot_task': {'queue': 'embeddings'},
     'apps.core.tasks.store_vectors_task': {'queue': 'vectors'},
+    'apps.core.tasks.delete_vectors_task': {'queue': 'vectors'},
     'apps.core.tasks.cleanup_*': {'queue': 'maintenance'},
 }
 
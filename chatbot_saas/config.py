@@ -62,6 +62,44 @@ class Settings(BaseSettings):
     CELERY_TASK_SOFT_TIME_LIMIT: int = Field(300, env="CELERY_TASK_SOFT_TIME_LIMIT")  # 5 minutes
     CELERY_TASK_TIME_LIMIT: int = Field(600, env="CELERY_TASK_TIME_LIMIT")  # 10 minutes
     CELERY_TASK_RETRY_DELAYS: str = Field("60,120,300", env="CELERY_TASK_RETRY_DELAYS")  # Retry delays in seconds
+    BULK_TASKS_PER_TENANT: int = Field(4, env="BULK_TASKS_PER_TENANT")  # Bulk tasks in flight per chatbot owner
+    BULK_TASK_SLOT_TTL_SECONDS: int = Field(7200, env="BULK_TASK_SLOT_TTL_SECONDS")  # Reclaim slots of lost tasks
+    TASK_PROGRESS_MIN_INTERVAL_SECONDS: float = Field(1.0, env="TASK_PROGRESS_MIN_INTERVAL_SECONDS")  # Coalesce progress writes
+    
+    # Re-indexing (embedding model migrations)
+    REINDEX_REQUESTS_PER_MINUTE: int = Field(300, env="REINDEX_REQUESTS_PER_MINUTE")
+    REINDEX_TOKENS_PER_MINUTE: int = Field(500000, env="REINDEX_TOKENS_PER_MINUTE")
+    REINDEX_MAX_COST_USD: float = Field(25.0, env="REINDEX_MAX_COST_USD")  # Per chatbot re-index
+    REINDEX_MIN_RECALL: float = Field(0.9, env="REINDEX_MIN_RECALL")  # Required before cutover
+    
+    # Vector search
+    CHUNK_CONTENT_CACHE_SIZE: int = Field(10000, env="CHUNK_CONTENT_CACHE_SIZE")  # Chunks per process
+    VECTOR_DELETE_INLINE_MAX_CHUNKS: int = Field(500, env="VECTOR_DELETE_INLINE_MAX_CHUNKS")  # Larger deletions run as a task
+    HYBRID_SEARCH_ENABLED: bool = Field(True, env="HYBRID_SEARCH_ENABLED")  # Fuse full-text matches into vector results
+    HYBRID_RRF_K: int = Field(60, env="HYBRID_RRF_K")  # Reciprocal rank fusion damping
+    
+    # Context building
+    TOKEN_COUNT_CACHE_SIZE: int = Field(4096, env="TOKEN_COUNT_CACHE_SIZE")  # Texts per process
+    CONTEXT_MMR_LAMBDA: float = Field(0.7, env="CONTEXT_MMR_LAMBDA")  # 1.0 ranks by relevance only
+
+    # Cross-encoder reranking (needs sentence-transformers)
+    RERANKER_ENABLED: bool = Field(False, env="RERANKER_ENABLED")  # Load the model at process start
+    RERANKER_MODEL: str = Field("cross-encoder/ms-marco-MiniLM-L-6-v2", env="RERANKER_MODEL")
+    RERANKER_BATCH_SIZE: int = Field(64, env="RERANKER_BATCH_SIZE")  # Query-chunk pairs per model call
+    RERANKER_MAX_WAIT_MS: float = Field(5.0, env="RERANKER_MAX_WAIT_MS")  # Wait for concurrent requests to batch with
+    RERANKER_TIMEOUT_MS: float = Field(200.0, env="RERANKER_TIMEOUT_MS")  # Keep vector order after this
+    RERANKER_CACHE_SIZE: int = Field(20000, env="RERANKER_CACHE_SIZE")  # (query, chunk) scores per process
+    
+    # Chatbot config cache
+    CHATBOT_CONFIG_CACHE_SIZE: int = Field(1000, env="CHATBOT_CONFIG_CACHE_SIZE")  # Chatbots per process
+    CHATBOT_CONFIG_LOCAL_TTL: float = Field(10.0, env="CHATBOT_CONFIG_LOCAL_TTL")  # Bounds cross-process staleness
+    CHATBOT_CONFIG_CACHE_TTL: int = Field(300, env="CHATBOT_CONFIG_CACHE_TTL")  # Shared cache entries
+    
+    # Semantic answer cache
+    ANSWER_CACHE_ENABLED: bool = Field(True, env="ANSWER_CACHE_ENABLED")
+    ANSWER_CACHE_MAX_DISTANCE: float = Field(0.05, env="ANSWER_CACHE_MAX_DISTANCE")  # Cosine distance between paraphrases
+    ANSWER_CACHE_SIZE: int = Field(256, env="ANSWER_CACHE_SIZE")  # Answers per chatbot per process
+    ANSWER_CACHE_TTL: int = Field(86400, env="ANSWER_CACHE_TTL")
     
     # Security
     JWT_SECRET_KEY: str = Field(..., env="JWT_SECRET_KEY")
@@ -107,6 +145,14 @@ class Settings(BaseSettings):
     MAX_EMBEDDING_BATCH_SIZE: int = Field(100, env="MAX_EMBEDDING_BATCH_SIZE")
     CACHE_TTL_SECONDS: int = Field(3600, env="CACHE_TTL_SECONDS")
     
+    # URL knowledge sources
+    URL_RECRAWL_INTERVAL_HOURS: int = Field(24, env="URL_RECRAWL_INTERVAL_HOURS")
+    URL_RECRAWL_BATCH_SIZE: int = Field(200, env="URL_RECRAWL_BATCH_SIZE")
+    URL_CRAWL_MAX_PAGES: int = Field(500, env="URL_CRAWL_MAX_PAGES")
+    URL_CRAWL_PER_HOST_CONCURRENCY: int = Field(4, env="URL_CRAWL_PER_HOST_CONCURRENCY")
+    HTML_EXTRACTION_STRATEGY: str = Field("lxml", env="HTML_EXTRACTION_STRATEGY")  # soup, lxml, main_content
+    HTML_EXTRACTION_MAX_CHARS: int = Field(2_000_000, env="HTML_EXTRACTION_MAX_CHARS")
+    
     # Monitoring
     SENTRY_DSN: Optional[str] = Field(None, env="SENTRY_DSN")
     LOG_LEVEL: str = Field("INFO", env="LOG_LEVEL")
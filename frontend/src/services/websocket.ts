@@ -125,6 +125,14 @@ export class WebSocketService {
     });
   }
 
+  // Pushed task progress (replaces polling the task status endpoint)
+  subscribeTaskProgress(taskId: string): void {
+    this.sendMessage({
+      type: 'subscribe_task_progress',
+      task_id: taskId
+    });
+  }
+
   // Connection state
   isConnected(): boolean {
     return this.ws?.readyState === WebSocket.OPEN;
@@ -119,7 +119,7 @@ export interface ChatResponse {
 }
 
 export interface WebSocketMessage {
-  type: 'connection_established' | 'chat_message' | 'typing_indicator' | 'error' | 'pong';
+  type: 'connection_established' | 'chat_message' | 'typing_indicator' | 'task_progress' | 'error' | 'pong';
   id?: string;
   role?: 'user' | 'assistant';
   content?: string;
@@ -131,6 +131,9 @@ export interface WebSocketMessage {
   user_identifier?: string;
   chatbot_id?: string;
   conversation_id?: string;
+  task_id?: string;
+  progress?: any;
+  final?: boolean;
 }
 
 export interface ApiError {
@@ -0,0 +1,208 @@
+"""
+Tests for the semantic answer cache in front of the RAG pipeline.
+"""
+
+import asyncio
+from unittest.mock import Mock, patch
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase
+
+from apps.chatbots.models import Chatbot
+from apps.core.answer_cache import CachedAnswer, SemanticAnswerCache, config_scope
+from apps.core.rag.context_builder import ContextData, ContextSource
+from apps.core.rag.llm_service import ChatbotConfig, GenerationResult
+from apps.core.rag.pipeline import RAGPipeline
+from apps.knowledge.models import KnowledgeSource
+
+User = get_user_model()
+
+EMBEDDINGS = {
+    "How long do refunds take?": [1.0, 0.0, 0.0],
+    "How long does a refund take?": [0.99, 0.05, 0.0],
+    "Do you ship to Canada?": [0.0, 1.0, 0.0],
+}
+
+
+def make_answer(content="Refunds take 5 days.", cost=0.002):
+    return CachedAnswer(
+        query="How long do refunds take?", content=content, citations=("Refund policy",),
+        citable_sources=(), sources_used=1, citable_count=1, private_count=0, context_score=0.8,
+        response_quality_score=0.9, input_tokens=900, output_tokens=40, estimated_cost=cost
+    )
+
+
+class FakeVectorSearch:
+    def __init__(self):
+        self.searches = 0
+
+    async def search(self, **kwargs):
+        self.searches += 1
+        return [Mock()]
+
+
+class FakeContextBuilder:
+    def build_context(self, **kwargs):
+        source = ContextSource(
+            content="Refunds take 5 days.", source_id="source-1", document_id="doc-1",
+            knowledge_base_id="kb-1", score=0.9, is_citable=True, citation_text="Refund policy"
+        )
+        return ContextData(
+            full_context="Refunds take 5 days.", citable_sources=[source], private_sources=[],
+            token_count=10, total_sources=1, citable_count=1, private_count=0,
+            context_score=0.8, search_metadata={}
+        )
+
+    def validate_context_privacy(self, context):
+        return {"valid": True, "issues": []}
+
+    def get_citation_list(self, context):
+        return ["Refund policy"]
+
+
+class FakeLLMService:
+    def __init__(self):
+        self.calls = 0
+
+    async def generate_response(self, context, user_query, chatbot_config):
+        self.calls += 1
+        return GenerationResult(
+            content="Refunds take 5 days.", usage={}, model="gpt-3.5-turbo", finish_reason="stop",
+            input_tokens=900, output_tokens=40, estimated_cost=0.002,
+            privacy_compliant=True, citations_extracted=[], generation_time=0.0
+        )
+
+
+class SemanticAnswerCacheTests(SimpleTestCase):
+    """Test similarity matching, scoping and generation-based invalidation."""
+
+    def setUp(self):
+        cache.clear()
+        self.answers = SemanticAnswerCache(max_distance=0.05, max_answers=2, ttl=60)
+
+    def test_paraphrases_hit_and_other_questions_miss(self):
+        self.answers.store('bot-1', EMBEDDINGS["How long do refunds take?"], make_answer())
+
+        hit = self.answers.lookup('bot-1', EMBEDDINGS["How long does a refund take?"])
+        self.assertEqual(hit.content, "Refunds take 5 days.")
+        self.assertIsNone(self.answers.lookup('bot-1', EMBEDDINGS["Do you ship to Canada?"]))
+        self.assertIsNone(self.answers.lookup('bot-2', EMBEDDINGS["How long do refunds take?"]))
+        self.assertIsNone(self.answers.lookup('bot-1', EMBEDDINGS["How long do refunds take?"], scope='widget'))
+
+        stats = self.answers.get_stats()
+        self.assertEqual((stats['hits'], stats['misses']), (1, 3))
+        self.assertEqual(stats['hit_rate'], 0.25)
+        self.assertAlmostEqual(stats['saved_cost_usd'], 0.002)
+        self.assertEqual(stats['saved_tokens'], 940)
+
+    def test_invalidation_reaches_other_processes(self):
+        other_process = SemanticAnswerCache(max_distance=0.05)
+        self.answers.store('bot-1', EMBEDDINGS["How long do refunds take?"], make_answer())
+
+        other_process.invalidate('bot-1')
+
+        self.assertIsNone(self.answers.lookup('bot-1', EMBEDDINGS["How long do refunds take?"]))
+
+    def test_oldest_answers_are_dropped_over_the_limit(self):
+        self.answers.store('bot-1', [1.0, 0.0, 0.0], make_answer("first"))
+        self.answers.store('bot-1', [0.0, 1.0, 0.0], make_answer("second"))
+        self.answers.store('bot-1', [0.0, 0.0, 1.0], make_answer("third"))
+
+        self.assertIsNone(self.answers.lookup('bot-1', [1.0, 0.0, 0.0]))
+        self.assertEqual(self.answers.lookup('bot-1', [0.0, 0.0, 1.0]).content, "third")
+
+    def test_scope_follows_the_llm_configuration(self):
+        public = ChatbotConfig(name="Support", description="Support bot", max_response_tokens=500)
+        widget = ChatbotConfig(name="Support", description="Support bot", max_response_tokens=300)
+
+        self.assertEqual(config_scope(None), "default")
+        self.assertNotEqual(config_scope(public), config_scope(widget))
+        self.assertEqual(config_scope(public), config_scope(ChatbotConfig(name="Support", description="Support bot")))
+
+
+class PipelineAnswerCacheTests(SimpleTestCase):
+    """Test the pipeline skips search and generation for near-duplicate questions."""
+
+    def setUp(self):
+        cache.clear()
+        self.vector_search = FakeVectorSearch()
+        self.llm = FakeLLMService()
+        self.answers = SemanticAnswerCache(max_distance=0.05)
+        privacy_filter = Mock()
+        privacy_filter.validate_response.return_value = Mock(passed=True, violations=[])
+        patches = [
+            patch('apps.core.rag.pipeline.get_vector_search_service', return_value=self.vector_search),
+            patch('apps.core.rag.pipeline.get_llm_service', return_value=self.llm),
+            patch('apps.core.rag.pipeline.get_privacy_filter', return_value=privacy_filter),
+            patch('apps.core.rag.pipeline.ContextBuilder', return_value=FakeContextBuilder()),
+            patch('apps.core.rag.pipeline.OpenAIEmbeddingService'),
+            patch('apps.core.rag.pipeline.track_metric'),
+            patch('apps.core.rag.pipeline.semantic_answer_cache', self.answers),
+        ]
+        for patcher in patches:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        self.pipeline = RAGPipeline('chatbot-1')
+
+        async def embed(query):
+            return EMBEDDINGS[query]
+
+        self.pipeline._generate_embedding = embed
+        self.config = ChatbotConfig(name="Support", description="Support bot", company_name="Acme")
+
+    def _ask(self, query):
+        return asyncio.run(self.pipeline.process_query(query, user_id="user-1", chatbot_config=self.config))
+
+    def test_near_duplicate_question_reuses_the_answer(self):
+        first = self._ask("How long do refunds take?")
+        second = self._ask("How long does a refund take?")
+
+        self.assertEqual((self.llm.calls, self.vector_search.searches), (1, 1))
+        self.assertEqual(second.content, first.content)
+        self.assertEqual(second.citations, ["Refund policy"])
+        self.assertEqual(second.estimated_cost, 0.0)
+        self.assertIn("answer_cache", second.stage_times)
+        self.assertAlmostEqual(self.answers.get_stats()['saved_cost_usd'], 0.002)
+
+        self._ask("Do you ship to Canada?")
+        self.assertEqual(self.llm.calls, 2)
+
+    def test_privacy_filtered_answers_are_not_cached(self):
+        self.pipeline.privacy_filter.validate_response.return_value = Mock(
+            passed=False, violations=[Mock()], sanitized_response="[redacted]"
+        )
+
+        self._ask("How long do refunds take?")
+        self._ask("How long does a refund take?")
+
+        self.assertEqual(self.llm.calls, 2)
+
+
+class AnswerCacheInvalidationTests(TestCase):
+    """Test source and training changes drop cached answers."""
+
+    def setUp(self):
+        cache.clear()
+        user = User.objects.create_user(email='answers@example.com', password='testpass123')
+        self.chatbot = Chatbot.objects.create(user=user, name='Support', public_url_slug='answers-bot')
+        self.answers = SemanticAnswerCache(max_distance=0.05)
+
+    def _cached(self):
+        return self.answers.lookup(self.chatbot.id, EMBEDDINGS["How long do refunds take?"])
+
+    def test_source_changes_and_retraining_invalidate(self):
+        self.answers.store(self.chatbot.id, EMBEDDINGS["How long do refunds take?"], make_answer())
+        source = KnowledgeSource.objects.create(chatbot=self.chatbot, name='Manual', content_type='pdf')
+        self.assertIsNone(self._cached())
+
+        self.answers.store(self.chatbot.id, EMBEDDINGS["How long do refunds take?"], make_answer())
+        self.chatbot.increment_conversation_count()
+        self.assertIsNotNone(self._cached())
+
+        self.chatbot.update_training_status('completed')
+        self.assertIsNone(self._cached())
+
+        self.answers.store(self.chatbot.id, EMBEDDINGS["How long do refunds take?"], make_answer())
+        source.delete()
+        self.assertIsNone(self._cached())
@@ -115,7 +115,7 @@ class ChatbotIntegrationTest(APITestCase):
         )
         
         # 4. Train chatbot
-        with patch('apps.core.tasks.train_chatbot_task.delay') as mock_train:
+        with patch('apps.core.tasks.train_chatbot_task.apply_async') as mock_train:
             response = self.client.post(f'/api/v1/chatbots/{chatbot_id}/train/')
             self.assertEqual(response.status_code, status.HTTP_200_OK)
             mock_train.assert_called_once()
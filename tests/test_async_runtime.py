@@ -0,0 +1,90 @@
+"""
+Tests for the worker-scoped async runtime used by Celery tasks.
+"""
+
+import asyncio
+import threading
+from unittest.mock import AsyncMock, Mock, patch
+from django.test import TestCase
+
+from apps.core.async_runtime import (
+    WorkerAsyncRuntime, begin_task_stats, end_task_stats, get_embedding_service,
+    get_vector_storage, run_async
+)
+from apps.core.embedding_service import EmbeddingConfig
+
+
+async def current_loop_and_thread():
+    return asyncio.get_running_loop(), threading.current_thread().name
+
+
+class RunAsyncFallbackTests(TestCase):
+    """Test run_async outside a worker."""
+
+    def test_uses_a_fresh_loop_per_call(self):
+        token = begin_task_stats()
+        first_loop, first_thread = run_async(current_loop_and_thread())
+        second_loop, _ = run_async(current_loop_and_thread())
+        stats = end_task_stats(token)
+
+        self.assertIsNot(first_loop, second_loop)
+        self.assertEqual(first_thread, threading.current_thread().name)
+        self.assertEqual(stats.calls, 2)
+        self.assertEqual(stats.reused_resources, 0)
+
+    @patch('apps.core.async_runtime.create_vector_storage', new_callable=AsyncMock)
+    def test_vector_storage_is_created_per_call(self, mock_create):
+        run_async(get_vector_storage())
+        run_async(get_vector_storage())
+
+        self.assertEqual(mock_create.await_count, 2)
+
+
+class WorkerAsyncRuntimeTests(TestCase):
+    """Test the long-lived worker loop and shared resources."""
+
+    def setUp(self):
+        self.runtime = WorkerAsyncRuntime()
+        patcher = patch('apps.core.async_runtime._runtime', self.runtime)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.runtime.start()
+        self.addCleanup(self.runtime.stop)
+
+    def test_coroutines_share_one_loop_thread(self):
+        first_loop, thread_name = run_async(current_loop_and_thread())
+        second_loop, _ = run_async(current_loop_and_thread())
+
+        self.assertIs(first_loop, second_loop)
+        self.assertIs(first_loop, self.runtime.loop)
+        self.assertEqual(thread_name, 'worker-async-runtime')
+
+    @patch('apps.core.async_runtime.create_vector_storage', new_callable=AsyncMock)
+    def test_vector_storage_is_initialized_once(self, mock_create):
+        mock_create.return_value = Mock(backend_name='pgvector')
+
+        token = begin_task_stats()
+        first = run_async(get_vector_storage())
+        second = run_async(get_vector_storage())
+        stats = end_task_stats(token)
+
+        self.assertIs(first, second)
+        mock_create.assert_awaited_once_with('auto')
+        self.assertEqual(stats.calls, 2)
+        self.assertEqual(stats.reused_resources, 1)
+        self.assertEqual(stats.to_dict()['calls'], 2)
+
+    @patch('apps.core.embedding_service.OpenAIEmbeddingService')
+    def test_embedding_services_are_shared_per_config(self, mock_service_cls):
+        mock_service_cls.side_effect = lambda config: Mock(config=config)
+
+        default = get_embedding_service(EmbeddingConfig())
+        self.assertIs(get_embedding_service(EmbeddingConfig()), default)
+        self.assertIsNot(get_embedding_service(EmbeddingConfig(max_batch_size=50)), default)
+
+    def test_stop_ends_loop_thread(self):
+        thread = self.runtime._thread
+        self.runtime.stop()
+
+        self.assertFalse(self.runtime.running)
+        self.assertFalse(thread.is_alive())
@@ -0,0 +1,126 @@
+"""
+Tests for deleting vectors by source or chatbot instead of by id.
+"""
+
+import asyncio
+import json
+from unittest.mock import patch
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+
+from apps.chatbots.models import Chatbot
+from apps.core.tasks import task_manager
+from apps.core.vector_storage import PgVectorBackend, VectorStorageConfig, VectorStorageService
+from apps.knowledge.models import KnowledgeChunk, KnowledgeSource
+
+User = get_user_model()
+
+
+class FilterDeleteFallbackBackend:
+    def __init__(self):
+        self.deleted_batches = []
+
+    async def delete_by_filter(self, namespace, source_id=None):
+        raise RuntimeError("Metadata filter deletes are not supported on serverless indexes")
+
+    async def delete_vectors(self, ids, namespace=None):
+        self.deleted_batches.append(list(ids))
+        return True
+
+
+class RecordingVectorStorage:
+    def __init__(self):
+        self.calls = []
+
+    async def delete_by_filter(self, namespace, source_id=None, fallback_ids=None):
+        self.calls.append((namespace, source_id, fallback_ids))
+        return 0
+
+
+class PgVectorFilterDeleteTests(TestCase):
+    """Test indexed filter deletes on the SQLite fallback table."""
+
+    def setUp(self):
+        self.backend = PgVectorBackend(VectorStorageConfig(backend='pgvector', table_name='vector_deletion_test'))
+        self.assertTrue(self.backend._initialize_sync())
+        with connection.cursor() as cursor:
+            for namespace, source_id, count in (('bot_a', 'source-1', 3), ('bot_a', 'source-2', 2), ('bot_b', 'source-1', 1)):
+                for i in range(count):
+                    cursor.execute(
+                        "INSERT INTO vector_deletion_test (id, embedding, metadata, namespace) VALUES (?, ?, ?, ?)",
+                        [f"{namespace}-{source_id}-{i}", '[]', json.dumps({'source_id': source_id}), namespace]
+                    )
+
+    def _remaining(self):
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT id FROM vector_deletion_test ORDER BY id")
+            return [row[0] for row in cursor.fetchall()]
+
+    def test_deletes_one_source_in_one_statement(self):
+        with self.assertNumQueries(1):
+            deleted = self.backend._delete_by_filter_sync('bot_a', 'source-1')
+
+        self.assertEqual(deleted, 3)
+        self.assertEqual(
+            self._remaining(),
+            ['bot_a-source-2-0', 'bot_a-source-2-1', 'bot_b-source-1-0']
+        )
+
+    def test_deletes_whole_namespace(self):
+        self.assertEqual(self.backend._delete_by_filter_sync('bot_a'), 5)
+        self.assertEqual(self._remaining(), ['bot_b-source-1-0'])
+
+    def test_source_delete_uses_the_source_index(self):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "EXPLAIN QUERY PLAN DELETE FROM vector_deletion_test "
+                f"WHERE namespace = ? AND {self.backend._source_id_sql()} = ?",
+                ['bot_a', 'source-1']
+            )
+            plan = ' '.join(str(row[-1]) for row in cursor.fetchall())
+
+        self.assertIn('vector_deletion_test_source_idx', plan)
+
+    def test_id_deletes_are_batched_under_parameter_limit(self):
+        ids = [f"missing-{i}" for i in range(2500)] + ['bot_b-source-1-0']
+
+        self.assertTrue(self.backend._delete_vectors_sync(ids, 'bot_b'))
+        self.assertNotIn('bot_b-source-1-0', self._remaining())
+
+
+class VectorDeletionServiceTests(TestCase):
+    """Test id fallback and wiring into source deletion."""
+
+    def test_falls_back_to_id_batches_when_filter_delete_is_unsupported(self):
+        service = VectorStorageService(VectorStorageConfig(backend='pinecone', batch_size=100))
+        service.backend = FilterDeleteFallbackBackend()
+        service.backend_name = 'fake'
+        ids = [f"chunk-{i}" for i in range(250)]
+
+        deleted = asyncio.run(service.delete_by_filter('bot_a', source_id='source-1', fallback_ids=ids))
+
+        self.assertEqual(deleted, 250)
+        self.assertEqual([len(batch) for batch in service.backend.deleted_batches], [100, 100, 50])
+
+    def test_source_deletion_runs_inline_or_in_background_by_size(self):
+        user = User.objects.create_user(email='delete@example.com', password='testpass123')
+        chatbot = Chatbot.objects.create(user=user, name='Support', public_url_slug='delete-bot')
+        source = KnowledgeSource.objects.create(chatbot=chatbot, name='Manual', content_type='pdf')
+        chunk = KnowledgeChunk.objects.create(source=source, content='Refunds take 5 days.', chunk_index=0)
+        storage = RecordingVectorStorage()
+
+        async def get_storage(**kwargs):
+            return storage
+
+        with patch('apps.core.reindexing.get_vector_storage', get_storage):
+            task_id = task_manager.submit_vector_deletion(chatbot.id, source.id, chunk_count=1)
+
+        self.assertIsNone(task_id)
+        self.assertEqual(storage.calls, [(f"chatbot_{chatbot.id}", str(source.id), [str(chunk.id)])])
+
+        with patch('apps.core.tasks.TaskManager.submit_idempotent', return_value=('task-1', True)) as submit:
+            task_id = task_manager.submit_vector_deletion(chatbot.id, source.id, chunk_count=100000)
+
+        self.assertEqual(task_id, 'task-1')
+        self.assertEqual(submit.call_args.kwargs['kwargs'], {'source_id': str(source.id)})
@@ -0,0 +1,78 @@
+"""
+Tests for the two-level chatbot config cache and its signal invalidation.
+"""
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+
+from apps.chatbots.models import Chatbot, ChatbotSettings
+from apps.core.chatbot_cache import ChatbotConfigCache, chatbot_config_cache
+
+User = get_user_model()
+
+
+class ChatbotConfigCacheTests(TestCase):
+    """Test hot-path lookups stay off the database until a save invalidates them."""
+
+    def setUp(self):
+        cache.clear()
+        chatbot_config_cache.clear()
+        user = User.objects.create_user(email='config@example.com', password='testpass123')
+        self.chatbot = Chatbot.objects.create(
+            user=user, name='Support', public_url_slug='config-bot', status='completed', temperature=0.3
+        )
+        self.settings = ChatbotSettings.objects.create(chatbot=self.chatbot, rate_limit_messages_per_hour=20)
+
+    def test_repeat_lookups_by_id_and_slug_skip_the_database(self):
+        with self.assertNumQueries(1):
+            snapshot = chatbot_config_cache.get_by_slug('config-bot')
+
+        with self.assertNumQueries(0):
+            self.assertEqual(chatbot_config_cache.get_by_id(self.chatbot.id), snapshot)
+            chatbot_config_cache.get_by_slug('config-bot')
+
+        self.assertEqual(snapshot.rate_limit_messages_per_hour, 20)
+        config = snapshot.chatbot_config(max_response_tokens=300)
+        self.assertEqual((config.name, config.max_response_tokens), ('Support', 300))
+
+    def test_other_processes_read_the_shared_cache(self):
+        chatbot_config_cache.get_by_id(self.chatbot.id)
+        other_process = ChatbotConfigCache()
+
+        with self.assertNumQueries(0):
+            snapshot = other_process.get_by_slug('config-bot')
+
+        self.assertEqual(snapshot.temperature, 0.3)
+        self.assertEqual(other_process.stats['shared_hits'], 1)
+
+    def test_chatbot_and_settings_saves_invalidate(self):
+        chatbot_config_cache.get_by_id(self.chatbot.id)
+
+        self.settings.rate_limit_messages_per_hour = 5
+        self.settings.save()
+        self.assertEqual(chatbot_config_cache.get_by_id(self.chatbot.id).rate_limit_messages_per_hour, 5)
+
+        self.chatbot.name = 'Helpdesk'
+        self.chatbot.save()
+        self.assertEqual(chatbot_config_cache.get_by_id(self.chatbot.id).name, 'Helpdesk')
+
+    def test_counter_updates_keep_the_cache(self):
+        chatbot_config_cache.get_by_id(self.chatbot.id)
+        self.chatbot.increment_conversation_count()
+
+        with self.assertNumQueries(0):
+            chatbot_config_cache.get_by_id(self.chatbot.id)
+
+    def test_renamed_and_deleted_chatbots_stop_resolving(self):
+        chatbot_config_cache.get_by_slug('config-bot')
+
+        self.chatbot.public_url_slug = 'renamed-bot'
+        self.chatbot.save()
+        with self.assertRaises(Chatbot.DoesNotExist):
+            chatbot_config_cache.get_by_slug('config-bot')
+        self.assertEqual(chatbot_config_cache.get_by_slug('renamed-bot').id, str(self.chatbot.id))
+
+        self.chatbot.delete()
+        with self.assertRaises(Chatbot.DoesNotExist):
+            chatbot_config_cache.get_by_id(self.chatbot.id)
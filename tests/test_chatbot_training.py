@@ -0,0 +1,155 @@
+"""
+Tests for fan-out chatbot training.
+"""
+
+import sys
+from unittest.mock import Mock, patch
+from django.core.cache import cache
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+
+import apps.chatbots.models
+import apps.core.models
+from apps.chatbots.models import Chatbot
+from apps.knowledge.models import KnowledgeSource
+from apps.core.tasks import submit_bulk_task, train_chatbot_task, train_knowledge_source_task
+
+User = get_user_model()
+
+
+def fake_processing(failing_names):
+    """Stand-in for source processing that fails for the named sources."""
+    def process(task, source, queue_embeddings=True):
+        if source.name in failing_names:
+            raise RuntimeError(f"{source.name} unreachable")
+        source.update_processing_status('completed', chunk_count=2)
+        return Mock(success=True, chunk_count=2, total_tokens=40)
+    return process
+
+
+@patch('apps.core.tasks.BaseTaskWithProgress.retry_with_backoff', Mock(return_value=None))
+class TrainChatbotTaskTests(TestCase):
+    """Test that training status follows the per-source task results."""
+
+    def setUp(self):
+        # Tasks import models lazily; keep the real modules even if another
+        # test module has swapped them out of sys.modules
+        patcher = patch.dict(sys.modules, {
+            'apps.chatbots.models': apps.chatbots.models,
+            'apps.core.models': apps.core.models,
+        })
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        cache.clear()
+        self.user = User.objects.create_user(email='trainer@example.com', password='testpass123')
+        self.chatbot = Chatbot.objects.create(user=self.user, name='Support', public_url_slug='support-bot')
+        self.docs = self._source('Docs', 'url')
+        self.blog = self._source('Blog', 'url')
+        self.faq = self._source('FAQ', 'txt', status='completed')
+
+    def _source(self, name, content_type, status='pending'):
+        return KnowledgeSource.objects.create(
+            chatbot=self.chatbot,
+            name=name,
+            content_type=content_type,
+            source_url=f"https://example.com/{name.lower()}" if content_type == 'url' else None,
+            status=status
+        )
+
+    def _train(self, failing_names=(), **kwargs):
+        with patch('apps.core.tasks._process_knowledge_source', side_effect=fake_processing(failing_names)) as process:
+            result = train_chatbot_task.delay(chatbot_id=str(self.chatbot.id), **kwargs)
+        self.chatbot.refresh_from_db()
+        return result, process
+
+    def test_sources_are_processed_and_failures_recorded(self):
+        result, process = self._train(failing_names={'Blog'})
+
+        processed = sorted(call.args[1].name for call in process.call_args_list)
+        self.assertEqual(processed, ['Blog', 'Docs'])
+        self.assertEqual(self.chatbot.status, 'completed')
+        self.docs.refresh_from_db()
+        self.blog.refresh_from_db()
+        self.faq.refresh_from_db()
+        self.assertEqual(self.docs.status, 'completed')
+        self.assertEqual(self.blog.status, 'failed')
+        self.assertIn('unreachable', self.blog.error_message)
+        self.assertEqual(self.faq.status, 'completed')
+
+        progress = cache.get(f"task_progress:{result.id}")
+        self.assertEqual(progress['status'], 'success')
+        self.assertEqual(progress['result']['knowledge_sources_processed'], 2)
+        self.assertEqual(progress['result']['failed_sources'][0]['source_id'], str(self.blog.id))
+
+    def test_chatbot_fails_when_every_source_fails(self):
+        self.faq.delete()
+
+        self._train(failing_names={'Docs', 'Blog'})
+
+        self.assertEqual(self.chatbot.status, 'failed')
+
+    def test_force_retrain_reprocesses_completed_sources(self):
+        _, process = self._train(force_retrain=True)
+
+        self.assertEqual(process.call_count, 3)
+        self.assertEqual(self.chatbot.status, 'completed')
+
+    def test_sources_are_embedded_before_training_finishes(self):
+        embedded = []
+
+        def embed(knowledge_source_id):
+            # The training callback must not have marked the chatbot ready yet
+            self.assertEqual(Chatbot.objects.get(id=self.chatbot.id).status, 'processing')
+            embedded.append(knowledge_source_id)
+            return {"result": {"processed_chunks": 2}}
+
+        with patch('apps.core.tasks.generate_embeddings_for_knowledge_chunks.run', side_effect=embed):
+            _, process = self._train()
+
+        self.assertEqual(sorted(embedded), sorted(str(s.id) for s in (self.docs, self.blog, self.faq)))
+        self.assertTrue(all(call.kwargs['queue_embeddings'] is False for call in process.call_args_list))
+        self.assertEqual(self.chatbot.status, 'completed')
+
+    def test_embedding_failures_are_reported(self):
+        def embed(knowledge_source_id):
+            if knowledge_source_id == str(self.docs.id):
+                raise RuntimeError("embedding provider down")
+            return {"result": {"processed_chunks": 2}}
+
+        with patch('apps.core.tasks.generate_embeddings_for_knowledge_chunks.run', side_effect=embed):
+            result, _ = self._train()
+
+        progress = cache.get(f"task_progress:{result.id}")
+        self.assertEqual(progress['result']['knowledge_sources_processed'], 2)
+        self.assertEqual(progress['result']['knowledge_sources_embedding_failed'], 1)
+        failure = progress['result']['failed_sources'][0]
+        self.assertEqual((failure['source_id'], failure['stage']), (str(self.docs.id), 'embedding'))
+        self.assertIn('embedding provider down', failure['error'])
+        self.assertEqual(self.chatbot.status, 'completed')
+
+    def test_sources_are_submitted_under_the_owners_bulk_cap(self):
+        with patch('apps.core.tasks.submit_bulk_task', wraps=submit_bulk_task) as submit:
+            self._train()
+
+        self.assertEqual(submit.call_count, 3)
+        for call in submit.call_args_list:
+            self.assertIs(call.args[0], train_knowledge_source_task)
+            self.assertEqual(call.args[1], self.user.id)
+        self.assertEqual(self.chatbot.status, 'completed')
+
+    def test_training_finishes_only_after_the_last_source(self):
+        with patch('apps.core.tasks.submit_bulk_task') as submit:
+            result, _ = self._train()
+        submissions = [(call.kwargs['args'], call.kwargs['kwargs']) for call in submit.call_args_list]
+
+        with patch('apps.core.tasks._process_knowledge_source', side_effect=fake_processing(())):
+            for args, kwargs in submissions:
+                self.chatbot.refresh_from_db()
+                self.assertEqual(self.chatbot.status, 'processing')
+                train_knowledge_source_task.apply(args=args, kwargs=kwargs)
+
+        self.chatbot.refresh_from_db()
+        self.assertEqual(self.chatbot.status, 'completed')
+        progress = cache.get(f"task_progress:{result.id}")
+        self.assertEqual(progress['result']['total_knowledge_sources'], 3)
+        self.assertFalse([key for key in cache._cache if 'training_run' in key])
@@ -0,0 +1,141 @@
+"""
+Tests for reusing semantic-chunker sentence embeddings as chunk embeddings.
+"""
+
+import asyncio
+from unittest.mock import Mock, AsyncMock, patch
+
+import numpy as np
+from django.test import TestCase
+
+from apps.core.chunking import ChunkingConfig, ChunkingStrategy, SemanticChunker, pool_embeddings
+from apps.core.document_processing import DocumentChunk, DocumentContent, DocumentType, PrivacyLevel
+from apps.core.embeddings import EmbeddingConfig, EmbeddingGenerator, EmbeddingProvider
+from apps.core.interfaces import EmbeddingResult
+
+MODEL = 'all-MiniLM-L6-v2'
+
+SENTENCES = [
+    "The widget loads asynchronously on every page.",
+    "It never blocks rendering of the host site.",
+    "The launcher appears in the bottom-right corner.",
+    "Billing runs on the first day of each month.",
+    "Invoices are emailed to the account owner.",
+    "Failed payments are retried after three days.",
+]
+
+
+def unit(vector):
+    vector = np.asarray(vector, dtype=np.float32)
+    return vector / np.linalg.norm(vector)
+
+
+def make_content(text):
+    return DocumentContent(
+        text=text,
+        title=None,
+        author=None,
+        metadata={},
+        privacy_level=PrivacyLevel.CITABLE,
+        source_type=DocumentType.TXT,
+        content_hash='doc-hash',
+        token_count=0
+    )
+
+
+def make_chunk(index, embedding=None, embedding_model=None):
+    return DocumentChunk(
+        content=f"Chunk {index} content.",
+        chunk_index=index,
+        start_char=0,
+        end_char=10,
+        token_count=5,
+        privacy_level=PrivacyLevel.PRIVATE,
+        metadata={},
+        content_hash=f"hash-{index}",
+        embedding=embedding,
+        embedding_model=embedding_model
+    )
+
+
+class PoolEmbeddingsTests(TestCase):
+    """Test pooling of sentence vectors."""
+
+    def test_pooled_vector_is_weighted_and_normalized(self):
+        pooled = pool_embeddings([[1.0, 0.0], [0.0, 1.0]], [3, 1])
+
+        self.assertAlmostEqual(float(np.linalg.norm(pooled)), 1.0, places=5)
+        self.assertGreater(pooled[0], pooled[1])
+
+
+@patch('apps.core.chunking.tiktoken.get_encoding', Mock(return_value=Mock(encode=str.split)))
+@patch('apps.core.chunking.SentenceTransformer')
+class SemanticChunkerEmbeddingTests(TestCase):
+    """Test that the semantic chunker emits pooled chunk embeddings."""
+
+    def _chunk(self, mock_model_cls, retrieval_model):
+        # Two topics: widget (x axis) and billing (y axis)
+        model = Mock()
+        model.encode.return_value = np.array([
+            unit([1, 0.1]), unit([1, 0.2]), unit([1, 0.15]),
+            unit([0.1, 1]), unit([0.2, 1]), unit([0.15, 1])
+        ])
+        mock_model_cls.return_value = model
+
+        config = ChunkingConfig(
+            strategy=ChunkingStrategy.SEMANTIC,
+            min_chunk_size=1,
+            min_sentences_per_chunk=2,
+            similarity_threshold=0.5,
+            retrieval_embedding_model=retrieval_model
+        )
+        return SemanticChunker(config).chunk_document(make_content(' '.join(SENTENCES)))
+
+    def test_chunks_carry_pooled_embeddings_for_matching_model(self, mock_model_cls):
+        chunks = self._chunk(mock_model_cls, MODEL)
+
+        self.assertEqual(len(chunks), 2)
+        for chunk in chunks:
+            self.assertEqual(chunk.embedding_model, MODEL)
+            self.assertAlmostEqual(float(np.linalg.norm(chunk.embedding)), 1.0, places=5)
+        self.assertGreater(chunks[0].embedding[0], chunks[0].embedding[1])
+        self.assertGreater(chunks[1].embedding[1], chunks[1].embedding[0])
+
+    def test_no_embeddings_for_other_retrieval_model(self, mock_model_cls):
+        chunks = self._chunk(mock_model_cls, 'text-embedding-ada-002')
+
+        self.assertTrue(chunks)
+        self.assertTrue(all(chunk.embedding is None for chunk in chunks))
+
+
+class EmbeddingGeneratorPrecomputedTests(TestCase):
+    """Test that precomputed chunk vectors skip the embedding pass."""
+
+    @patch('apps.core.embeddings.SentenceTransformerProvider')
+    def test_matching_precomputed_vectors_are_reused(self, mock_provider_cls):
+        provider = Mock()
+        provider.generate_embeddings = AsyncMock(return_value=[
+            EmbeddingResult(embedding=[0.0, 1.0], token_count=5, model=MODEL, metadata={})
+        ])
+        mock_provider_cls.return_value = provider
+
+        generator = EmbeddingGenerator()
+        config = EmbeddingConfig(
+            provider=EmbeddingProvider.SENTENCE_TRANSFORMERS,
+            model=MODEL,
+            dimension=2,
+            enable_caching=False
+        )
+        chunks = [
+            make_chunk(0, embedding=[1.0, 0.0], embedding_model=MODEL),
+            make_chunk(1),
+            make_chunk(2, embedding=[1.0, 0.0], embedding_model='other-model'),
+        ]
+
+        with patch.object(generator.cache, 'get_embedding', return_value=None):
+            batch = asyncio.run(generator.generate_chunk_embeddings(chunks, config))
+
+        sent_texts = provider.generate_embeddings.await_args.args[0]
+        self.assertEqual(sent_texts, [chunks[1].content, chunks[2].content])
+        self.assertEqual(batch.embeddings[0], [1.0, 0.0])
+        self.assertEqual(batch.metadata['precomputed_chunks'], 1)
@@ -0,0 +1,132 @@
+"""
+Tests for hydrating vector search results from the chunk content store.
+"""
+
+import asyncio
+import pickle
+import sys
+import uuid
+from unittest.mock import patch
+from django.core.cache import cache
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+
+from apps.chatbots.models import Chatbot
+from apps.core import vector_storage
+from apps.core.chunk_store import ChunkContentStore, chunk_content_store, hydrate_results
+from apps.core.reindexing import chunk_vector_metadata
+from apps.core.vector_storage import VectorSearchResult, VectorStorageConfig, VectorStorageService
+from apps.knowledge.models import KnowledgeChunk, KnowledgeSource
+
+User = get_user_model()
+
+
+class FakeBackend:
+    def __init__(self, results):
+        self.results = results
+        self.searches = 0
+
+    async def search_vectors(self, query):
+        self.searches += 1
+        return [VectorSearchResult(id=r.id, score=r.score, metadata=dict(r.metadata)) for r in self.results]
+
+
+class ChunkContentStoreTests(TestCase):
+    """Test bulk hydration, LRU reuse and contentless caching."""
+
+    def setUp(self):
+        cache.clear()
+        chunk_content_store.clear()
+        user = User.objects.create_user(email='store@example.com', password='testpass123')
+        chatbot = Chatbot.objects.create(user=user, name='Support', public_url_slug='store-bot')
+        self.source = KnowledgeSource.objects.create(chatbot=chatbot, name='Manual', content_type='pdf')
+        self.chunks = [
+            KnowledgeChunk.objects.create(
+                source=self.source,
+                content=f"Paragraph {i}: " + "refund policy details " * 50,
+                chunk_index=i
+            )
+            for i in range(3)
+        ]
+
+    def _results(self):
+        return [
+            VectorSearchResult(id=str(chunk.id), score=0.9, metadata=chunk_vector_metadata(chunk))
+            for chunk in self.chunks
+        ]
+
+    def test_hydrates_with_one_query_then_from_memory(self):
+        with self.assertNumQueries(1):
+            results = hydrate_results(self._results())
+
+        self.assertEqual([r.content for r in results], [c.content for c in self.chunks])
+        self.assertEqual(results[0].metadata['content'], self.chunks[0].content)
+
+        with self.assertNumQueries(0):
+            hydrate_results(self._results())
+
+    def test_stored_token_counts_come_along(self):
+        KnowledgeChunk.objects.filter(id=self.chunks[0].id).update(token_count=152)
+
+        results = hydrate_results(self._results())
+
+        self.assertEqual(results[0].metadata['token_count'], 152)
+        self.assertNotIn('token_count', results[1].metadata)
+
+    def test_least_recently_used_entries_are_evicted(self):
+        store = ChunkContentStore(max_entries=2)
+        ids = [str(chunk.id) for chunk in self.chunks]
+        store.get_many(ids[:2])
+        store.get_many(ids[:1])
+        store.get_many(ids[2:])
+
+        self.assertEqual(list(store._entries), [ids[0], ids[2]])
+
+    def test_inline_content_and_foreign_ids_are_left_alone(self):
+        inline = VectorSearchResult(id='doc_chunk_0', score=0.5, metadata={'content': 'inline'}, content='inline')
+        unknown = VectorSearchResult(id=str(uuid.uuid4()), score=0.4, metadata={})
+        foreign = VectorSearchResult(id='kb_chunk_1', score=0.3, metadata={})
+
+        with self.assertNumQueries(1):
+            hydrate_results([inline, unknown, foreign])
+
+        self.assertEqual(inline.content, 'inline')
+        self.assertIsNone(unknown.content)
+        self.assertIsNone(foreign.content)
+
+    # Another test module swaps in a mock module, which breaks pickling results
+    @patch.dict(sys.modules, {'apps.core.vector_storage': vector_storage})
+    def test_search_caches_results_without_content(self):
+        service = VectorStorageService(VectorStorageConfig(backend='pgvector'))
+        service.backend = FakeBackend(self._results())
+        service.backend_name = 'fake'
+        # Warm the store here: the test database isn't visible from sync_to_async threads
+        hydrate_results(self._results())
+
+        first = asyncio.run(service.search_similar([0.1, 0.2], top_k=3, namespace='ns'))
+        second = asyncio.run(service.search_similar([0.1, 0.2], top_k=3, namespace='ns'))
+
+        self.assertEqual(service.backend.searches, 1)
+        self.assertEqual(service.search_stats['cache_hits'], 1)
+        self.assertEqual([r.content for r in second], [r.content for r in first])
+        self.assertEqual(first[0].content, self.chunks[0].content)
+
+        # Cached entries stay a fraction of what inline content would cost
+        inline = self._results()
+        for result, chunk in zip(inline, self.chunks):
+            result.metadata['content'] = result.content = chunk.content
+        inline_bytes = len(pickle.dumps(inline, pickle.HIGHEST_PROTOCOL))
+        self.assertLess(service.search_stats['cached_bytes'] * 3, inline_bytes)
+
+    @patch.dict(sys.modules, {'apps.core.vector_storage': vector_storage})
+    def test_cached_result_size_is_measured_on_a_sample(self):
+        service = VectorStorageService(VectorStorageConfig(backend='pgvector', cache_size_sample_rate=2))
+        service.backend = FakeBackend(self._results())
+        service.backend_name = 'fake'
+        hydrate_results(self._results())
+
+        for i in range(5):
+            asyncio.run(service.search_similar([0.1, float(i)], top_k=3, namespace='ns'))
+
+        self.assertEqual(service.search_stats['cached_results'], 5)
+        self.assertEqual(service.search_stats['sized_results'], 3)
@@ -0,0 +1,150 @@
+"""
+Tests for tokenizer-based context budgeting and source packing.
+"""
+
+import re
+from unittest.mock import patch
+from django.test import SimpleTestCase
+
+from apps.core.rag import context_builder
+from apps.core.rag.context_builder import ContextBuilder, RankingStrategy, TokenCounter, pack_within_budget
+from apps.core.rag.vector_search_service import SearchResult
+from apps.core.rag_orchestrator import ContextAssembler, PrivacyMode
+
+
+class FakeEncoding:
+    """One token per word, so expected counts are easy to read."""
+
+    def __init__(self):
+        self.encoded = []
+
+    def encode(self, text, disallowed_special=()):
+        self.encoded.append(text)
+        return re.findall(r'\s*\S+', text)
+
+    def decode(self, tokens):
+        return "".join(tokens)
+
+
+def result(chunk_id, words, score, is_citable=True, token_count=None):
+    metadata = {'token_count': token_count} if token_count else {}
+    return SearchResult(
+        content=" ".join(f"{chunk_id}{i}" for i in range(words)), score=score, chunk_id=chunk_id,
+        document_id=f"doc-{chunk_id}", knowledge_base_id="kb-1", is_citable=is_citable, metadata=metadata
+    )
+
+
+class TokenBudgetTestCase(SimpleTestCase):
+
+    def setUp(self):
+        self.encoding = FakeEncoding()
+        patcher = patch.object(context_builder, 'get_encoding', return_value=self.encoding)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        context_builder._count_tokens.cache_clear()
+        self.addCleanup(context_builder._count_tokens.cache_clear)
+
+
+class TokenCounterTests(TokenBudgetTestCase):
+    """Test exact counting, caching and stored counts."""
+
+    def test_counts_are_exact_and_cached(self):
+        self.assertEqual(TokenCounter.count_tokens("refunds take five days"), 4)
+        self.assertEqual(TokenCounter.count_tokens("refunds take five days"), 4)
+
+        self.assertEqual(self.encoding.encoded, ["refunds take five days"])
+
+    def test_stored_counts_skip_the_tokenizer(self):
+        self.assertEqual(TokenCounter.count_source_tokens("refunds take five days", {'token_count': 7}), 7)
+        self.assertEqual(TokenCounter.count_source_tokens("refunds take five days", {'token_count': 0}), 4)
+        self.assertEqual(self.encoding.encoded, ["refunds take five days"])
+
+    def test_truncation_fits_the_limit(self):
+        truncated = TokenCounter.truncate_to_token_limit("word " * 100, max_tokens=50)
+
+        self.assertLessEqual(TokenCounter.count_tokens(truncated), 50)
+        self.assertTrue(truncated.endswith("..."))
+
+
+class PackWithinBudgetTests(SimpleTestCase):
+    """Test packing finds the best subset, not the greedy prefix."""
+
+    def test_beats_greedy_selection(self):
+        # Greedy takes the 0.9 source and has no room left for either 0.8 one
+        self.assertEqual(pack_within_budget([60, 50, 50], [0.9, 0.8, 0.8], 100), [1, 2])
+
+    def test_everything_that_fits_is_kept(self):
+        self.assertEqual(pack_within_budget([10, 20, 30], [0.1, 0.0, 0.5], 60), [0, 1, 2])
+        self.assertEqual(pack_within_budget([10, 200, 30], [0.1, 0.9, 0.5], 60), [0, 2])
+        self.assertEqual(pack_within_budget([10], [1.0], 0), [])
+
+
+class ContextBuilderBudgetTests(TokenBudgetTestCase):
+    """Test contexts are packed to the budget from stored chunk counts."""
+
+    def _build(self, results, max_tokens, include_private=True):
+        builder = ContextBuilder(max_context_tokens=max_tokens)
+        with patch('apps.core.rag.context_builder.track_metric'):
+            return builder.build_context(
+                results, "refunds", include_private=include_private,
+                ranking_strategy=RankingStrategy.SIMILARITY, enable_diversity=False
+            )
+
+    def test_packing_fills_the_budget_without_truncating(self):
+        results = [
+            result("a", 60, 0.9, token_count=60),
+            result("b", 45, 0.8, token_count=45),
+            result("c", 45, 0.8, is_citable=False, token_count=45),
+        ]
+
+        context = self._build(results, max_tokens=110)
+
+        self.assertEqual([s.source_id for s in context.citable_sources], ["b"])
+        self.assertEqual([s.source_id for s in context.private_sources], ["c"])
+        self.assertLessEqual(context.token_count, 110)
+        self.assertEqual(context.token_count, TokenCounter.count_tokens(context.full_context))
+        self.assertNotIn("...", context.full_context)
+        # Chunk contents were counted from stored counts, not re-tokenized
+        for chunk in results:
+            self.assertNotIn(chunk.content, self.encoding.encoded)
+
+    def test_private_sources_left_out_of_the_text_cost_nothing(self):
+        results = [result("a", 60, 0.9, token_count=60), result("b", 80, 0.8, is_citable=False, token_count=80)]
+
+        context = self._build(results, max_tokens=80, include_private=False)
+
+        self.assertEqual((context.citable_count, context.private_count), (1, 1))
+        self.assertNotIn(results[1].content, context.full_context)
+
+
+class ContextAssemblerBudgetTests(TokenBudgetTestCase):
+    """Test the orchestrator packs citable sources first, then private ones."""
+
+    def _search_result(self, chunk_id, tokens, score, is_citable=True):
+        return {
+            'id': chunk_id, 'content': "word " * tokens, 'score': score,
+            'metadata': {'is_citable': is_citable, 'token_count': tokens},
+        }
+
+    def test_private_sources_fill_the_remaining_space(self):
+        assembler = ContextAssembler(max_tokens=100)
+        results = [
+            self._search_result("a", 60, 0.9),
+            self._search_result("b", 50, 0.8),
+            self._search_result("c", 50, 0.8),
+            self._search_result("p1", 30, 0.95, is_citable=False),
+            self._search_result("p2", 5, 0.5, is_citable=False),
+        ]
+
+        context = assembler.assemble_context(results, [0.1], PrivacyMode.CONTEXTUAL)
+
+        self.assertEqual([s['chunk_id'] for s in context.citable_sources], ["b", "c"])
+        self.assertEqual([s['chunk_id'] for s in context.private_sources], [])
+        self.assertEqual(context.total_tokens, 100)
+        self.assertTrue(context.truncated)
+
+        assembler.max_tokens = 145
+        context = assembler.assemble_context(results, [0.1], PrivacyMode.CONTEXTUAL)
+        self.assertEqual([s['chunk_id'] for s in context.citable_sources], ["a", "b"])
+        self.assertEqual([s['chunk_id'] for s in context.private_sources], ["p1", "p2"])
+        self.assertEqual(context.total_tokens, 145)
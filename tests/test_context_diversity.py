@@ -0,0 +1,122 @@
+"""
+Tests for embedding-based MMR source selection in the context builder.
+"""
+
+import asyncio
+from unittest.mock import AsyncMock, patch
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase
+
+from apps.chatbots.models import Chatbot
+from apps.core.rag.context_builder import ContextBuilder, DiversityOptimizer, RankingStrategy
+from apps.core.rag.vector_search_service import SearchResult, VectorSearchService
+from apps.core.reindexing import ActiveIndex
+from apps.core.vector_storage import VectorSearchResult
+from apps.knowledge.models import KnowledgeChunk, KnowledgeSource
+
+User = get_user_model()
+
+
+def result(chunk_id, score, embedding, content=None, document_id=None):
+    return SearchResult(
+        content=content or f"Content of {chunk_id}", score=score, chunk_id=chunk_id,
+        document_id=document_id or f"doc-{chunk_id}", knowledge_base_id="kb-1", is_citable=True,
+        metadata={}, embedding=embedding
+    )
+
+
+class MMRSelectionTests(SimpleTestCase):
+    """Test MMR trades relevance against redundancy."""
+
+    def setUp(self):
+        # Two paraphrases of the refund policy share few words but nearly all meaning
+        self.results = [
+            result("refunds", 0.92, [1.0, 0.1, 0.0], "Refunds are issued within five business days."),
+            result("paraphrase", 0.91, [0.99, 0.12, 0.01], "Money back arrives in under a working week."),
+            result("shipping", 0.80, [0.1, 1.0, 0.0], "We ship to Canada and Mexico."),
+            result("returns", 0.75, [0.6, 0.1, 0.8], "Returned items must be unused."),
+        ]
+
+    def test_paraphrases_give_way_to_new_information(self):
+        selected = DiversityOptimizer.select_mmr(self.results, max_results=3, mmr_lambda=0.7)
+
+        self.assertEqual([r.chunk_id for r in selected], ["refunds", "shipping", "returns"])
+
+    def test_lambda_one_keeps_relevance_order(self):
+        selected = DiversityOptimizer.select_mmr(
+            self.results, max_results=3, mmr_lambda=1.0, duplicate_threshold=1.01
+        )
+
+        self.assertEqual([r.chunk_id for r in selected], ["refunds", "paraphrase", "shipping"])
+
+    def test_near_duplicates_are_dropped_even_with_room_left(self):
+        selected = DiversityOptimizer.select_mmr(self.results, max_results=10, mmr_lambda=0.7)
+
+        self.assertNotIn("paraphrase", [r.chunk_id for r in selected])
+        self.assertEqual(len(selected), 3)
+
+    def test_results_without_embeddings_keep_their_ranking(self):
+        results = [result(f"chunk-{i}", 0.9 - i / 10, None) for i in range(4)]
+
+        self.assertEqual(DiversityOptimizer.select_mmr(results, max_results=2), results[:2])
+
+    def test_missing_embedding_does_not_disable_diversity(self):
+        results = self.results + [result("lexical-only", 0.78, None)]
+
+        selected = DiversityOptimizer.select_mmr(results, max_results=10, mmr_lambda=0.7)
+
+        self.assertEqual(
+            [r.chunk_id for r in selected], ["refunds", "lexical-only", "shipping", "returns"]
+        )
+
+    def test_context_builder_selects_with_mmr(self):
+        builder = ContextBuilder(mmr_lambda=0.7)
+        with patch('apps.core.rag.context_builder.track_metric'):
+            context = builder.build_context(
+                self.results, "refund policy", ranking_strategy=RankingStrategy.SIMILARITY, max_sources=2
+            )
+
+        self.assertEqual([s.source_id for s in context.citable_sources], ["refunds", "shipping"])
+        self.assertEqual(context.search_metadata["mmr_lambda"], 0.7)
+
+
+class FakeVectorStorage:
+    def __init__(self, results):
+        self.results = results
+        self.calls = []
+
+    async def search_citable_only(self, **kwargs):
+        self.calls.append(kwargs)
+        return self.results
+
+
+class SearchEmbeddingTests(TestCase):
+    """Test candidates get their embeddings from the chunk rows, not the vector store."""
+
+    def test_embeddings_are_loaded_for_search_results(self):
+        user = User.objects.create_user(email='mmr@example.com', password='testpass123')
+        chatbot = Chatbot.objects.create(user=user, name='Support', public_url_slug='mmr-bot')
+        source = KnowledgeSource.objects.create(chatbot=chatbot, name='Policies', content_type='pdf')
+        chunk = KnowledgeChunk.objects.create(
+            source=source, content="Refunds take five days.", chunk_index=0,
+            embedding_model='test-model', embedding_vector=[1.0, 0.0, 0.0]
+        )
+        storage = FakeVectorStorage([
+            VectorSearchResult(
+                id=str(chunk.id), score=0.9, metadata={'content': chunk.content, 'is_citable': True},
+                content=chunk.content, embedding=None
+            )
+        ])
+        service = VectorSearchService(str(chatbot.id))
+        service.vector_storage = storage
+        active_index = ActiveIndex(chatbot_id=str(chatbot.id), embedding_model='test-model', dimensions=3)
+        # Queried up front: the test database isn't visible from sync_to_async threads
+        embeddings = service._stored_embeddings([str(chunk.id)], active_index)
+
+        with patch('apps.core.rag.vector_search_service.aget_active_index', AsyncMock(return_value=active_index)), \
+             patch.object(service, '_stored_embeddings', return_value=embeddings) as stored:
+            results = asyncio.run(service.search([1.0, 0.0, 0.0], "refunds", "visitor", hybrid=False))
+
+        self.assertEqual(results[0].embedding, [1.0, 0.0, 0.0])
+        self.assertNotIn('include_values', storage.calls[0])
+        stored.assert_called_once_with([str(chunk.id)], active_index)
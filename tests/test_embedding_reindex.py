@@ -0,0 +1,306 @@
+"""
+Tests for shadow re-indexing with verification, cutover and rollback.
+"""
+
+import asyncio
+import hashlib
+import json
+import math
+from unittest.mock import AsyncMock, patch
+from django.core.cache import cache
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import SimpleTestCase, TestCase
+
+from apps.chatbots.models import Chatbot
+from apps.core.embedding_service import BatchEmbeddingResult, EmbeddingResult
+from apps.core.exceptions import ReindexBudgetExceeded, ReindexError
+from apps.core.rag.vector_search_service import VectorSearchService
+from apps.core.reindexing import ActiveIndex, ShadowReindexer, ThroughputBudget, get_active_index, live_indexes
+from apps.core.vector_storage import PgVectorBackend, VectorSearchResult, VectorStorageConfig
+from apps.knowledge.models import KnowledgeChunk, KnowledgeSource, VectorIndexVersion
+
+User = get_user_model()
+
+DIMENSIONS = 8
+
+
+def fake_vector(text):
+    digest = hashlib.sha256(text.encode()).digest()
+    return [byte / 255 - 0.5 for byte in digest[:DIMENSIONS]]
+
+
+class FakeEmbeddingService:
+    def __init__(self):
+        self.embedded = []
+
+    async def generate_embeddings_batch(self, texts):
+        self.embedded.extend(texts)
+        results = [
+            EmbeddingResult(embedding=fake_vector(text), text_hash=text, model='fake',
+                            dimensions=DIMENSIONS, tokens_used=10, cost_usd=0.001)
+            for text in texts
+        ]
+        return BatchEmbeddingResult(
+            embeddings=results, total_tokens=10 * len(texts), total_cost_usd=0.001 * len(texts),
+            processing_time_ms=0, cache_hits=0, api_calls=1
+        )
+
+
+class FakeVectorStorage:
+    def __init__(self):
+        self.namespaces = {}
+
+    async def store_embeddings(self, embeddings, namespace=None):
+        self.namespaces.setdefault(namespace, {}).update(
+            {vector_id: vector for vector_id, vector, _ in embeddings}
+        )
+        return True
+
+    async def delete_embeddings(self, ids, namespace=None):
+        for vector_id in ids:
+            self.namespaces.get(namespace, {}).pop(vector_id, None)
+        return True
+
+    async def count_vectors(self, namespace):
+        return len(self.namespaces.get(namespace, {}))
+
+    async def fetch_embeddings(self, ids, namespace=None):
+        stored = self.namespaces.get(namespace, {})
+        return {vector_id: stored[vector_id] for vector_id in ids if vector_id in stored}
+
+    async def search_similar(self, query_vector, top_k=10, namespace=None, filter_metadata=None):
+        def cosine(vector):
+            dot = sum(a * b for a, b in zip(query_vector, vector))
+            return dot / (math.sqrt(sum(a * a for a in query_vector)) * math.sqrt(sum(b * b for b in vector)))
+
+        scored = sorted(
+            ((cosine(vector), vector_id) for vector_id, vector in self.namespaces.get(namespace, {}).items()),
+            reverse=True
+        )
+        return [VectorSearchResult(id=vector_id, score=score, metadata={}) for score, vector_id in scored[:top_k]]
+
+    async def search_citable_only(self, query_vector, top_k=10, namespace=None):
+        return await self.search_similar(query_vector, top_k=top_k, namespace=namespace)
+
+
+class ThroughputBudgetTests(TestCase):
+    """Test request/token throttling and the cost cap."""
+
+    def setUp(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def _sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+    def _budget(self, **kwargs):
+        return ThroughputBudget(clock=lambda: self.now, sleep=self._sleep, **kwargs)
+
+    def test_waits_for_request_window(self):
+        budget = self._budget(requests_per_minute=2, tokens_per_minute=10 ** 6, max_cost_usd=10)
+        for _ in range(3):
+            budget.reserve(100, 0.0001)
+
+        self.assertEqual(self.sleeps, [60.0])
+        self.assertEqual(budget.waited_seconds, 60.0)
+
+    def test_waits_for_token_window(self):
+        budget = self._budget(requests_per_minute=100, tokens_per_minute=1000, max_cost_usd=10)
+        budget.reserve(800, 0.0001)
+        self.now = 30.0
+        budget.reserve(800, 0.0001)
+
+        self.assertEqual(self.sleeps, [30.0])
+
+    def test_refuses_batch_over_cost_cap(self):
+        budget = self._budget(max_cost_usd=0.01, spent_usd=0.0095)
+        with self.assertRaises(ReindexBudgetExceeded):
+            budget.reserve(10000, 0.0001)
+
+
+class ShadowReindexerTests(TestCase):
+    """Test shadow builds, verification, cutover and rollback."""
+
+    def setUp(self):
+        cache.clear()
+
+        self.storage = FakeVectorStorage()
+        self.embeddings = FakeEmbeddingService()
+
+        async def get_storage(**kwargs):
+            return self.storage
+
+        for target, value in [
+            ('apps.core.reindexing.get_vector_storage', get_storage),
+            ('apps.core.reindexing.get_embedding_service', lambda config: self.embeddings),
+        ]:
+            patcher = patch(target, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        user = User.objects.create_user(email='reindex@example.com', password='testpass123')
+        self.chatbot = Chatbot.objects.create(user=user, name='Support', public_url_slug='reindex-bot')
+        self.source = KnowledgeSource.objects.create(chatbot=self.chatbot, name='Manual', content_type='pdf')
+        self.chunks = [self._chunk(i) for i in range(3)]
+        # Already embedded with the target model, so it's reused rather than re-embedded
+        self.chunks[0].embedding_vector = fake_vector(self.chunks[0].content)
+        self.chunks[0].embedding_model = 'text-embedding-3-small'
+        self.chunks[0].save()
+
+        self.reindexer = ShadowReindexer(
+            budget=ThroughputBudget(requests_per_minute=1000, tokens_per_minute=10 ** 6, max_cost_usd=1),
+            batch_size=2,
+            min_recall=0.9
+        )
+
+    def _chunk(self, index):
+        return KnowledgeChunk.objects.create(
+            source=self.source,
+            content=f"Section {index}: how to configure feature {index}",
+            chunk_index=index,
+            token_count=10
+        )
+
+    def _build_ready_version(self):
+        version = self.reindexer.start(self.chatbot, 'text-embedding-3-small', DIMENSIONS)
+        return self.reindexer.verify(version)
+
+    def test_build_resumes_and_reuses_matching_vectors(self):
+        version = self.reindexer.start(self.chatbot, 'text-embedding-3-small', DIMENSIONS)
+        self.reindexer.build(version, max_batches=1)
+
+        self.assertEqual(version.vectors_indexed, 2)
+        self.assertEqual(version.build_state['reused'], 1)
+
+        # Starting again returns the build in progress, which picks up at its cursor
+        resumed = self.reindexer.start(self.chatbot, 'text-embedding-3-small', DIMENSIONS)
+        self.assertEqual(resumed.id, version.id)
+        self.reindexer.build(resumed)
+
+        self.assertEqual(resumed.vectors_indexed, 3)
+        self.assertEqual(self.embeddings.embedded, [self.chunks[1].content, self.chunks[2].content])
+        self.assertAlmostEqual(resumed.build_state['spent_usd'], 0.002)
+        self.assertEqual(set(self.storage.namespaces[resumed.namespace]), {str(c.id) for c in self.chunks})
+
+    def test_cutover_switches_active_index_after_verification(self):
+        version = self.reindexer.start(self.chatbot, 'text-embedding-3-small', DIMENSIONS)
+        self.assertEqual(get_active_index(self.chatbot.id).version, 1)
+        with self.assertRaises(ReindexError):
+            self.reindexer.cutover(version)
+
+        self.reindexer.verify(version)
+        self.assertEqual(version.status, VectorIndexVersion.STATUS_READY)
+        self.assertEqual(version.recall_at_k, 1.0)
+
+        late_chunk = self._chunk(3)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.reindexer.cutover(version)
+
+        active = get_active_index(self.chatbot.id)
+        self.assertEqual((active.version, active.embedding_model, active.dimensions), (2, 'text-embedding-3-small', DIMENSIONS))
+        self.assertEqual(active.namespace, f"chatbot_{self.chatbot.id}_v2")
+        self.assertIn(str(late_chunk.id), self.storage.namespaces[active.namespace])
+        legacy = VectorIndexVersion.objects.get(chatbot=self.chatbot, version=1)
+        self.assertEqual(legacy.status, VectorIndexVersion.STATUS_RETIRED)
+
+    def test_cutover_copies_the_new_vectors_to_chunks(self):
+        version = self._build_ready_version()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.reindexer.cutover(version)
+
+        active = get_active_index(self.chatbot.id)
+        chunk_ids = [str(chunk.id) for chunk in self.chunks]
+        for chunk in KnowledgeChunk.objects.filter(id__in=chunk_ids):
+            self.assertEqual(chunk.embedding_model, 'text-embedding-3-small')
+            self.assertEqual(chunk.embedding_vector, self.storage.namespaces[active.namespace][str(chunk.id)])
+        # Search, diversity selection and lexical matches now find every chunk's embedding
+        self.assertEqual(set(VectorSearchService._stored_embeddings(chunk_ids, active)), set(chunk_ids))
+
+    def test_verification_fails_when_vectors_are_missing(self):
+        version = self.reindexer.start(self.chatbot, 'text-embedding-3-small', DIMENSIONS)
+        self.reindexer.build(version)
+        self.storage.namespaces[version.namespace].pop(str(self.chunks[1].id))
+
+        self.reindexer.verify(version)
+
+        self.assertEqual(version.status, VectorIndexVersion.STATUS_FAILED)
+        self.assertIn('2/3 vectors', version.error_message)
+        self.assertEqual(get_active_index(self.chatbot.id).version, 1)
+
+    def test_rollback_reactivates_and_catches_up_previous_index(self):
+        version = self._build_ready_version()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.reindexer.cutover(version)
+        added_while_active = self._chunk(3)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            previous = self.reindexer.rollback(self.chatbot)
+
+        self.assertEqual(previous.version, 1)
+        self.assertEqual(get_active_index(self.chatbot.id).version, 1)
+        version.refresh_from_db()
+        self.assertEqual(version.status, VectorIndexVersion.STATUS_RETIRED)
+        self.assertEqual(
+            list(self.storage.namespaces[f"chatbot_{self.chatbot.id}"]),
+            [str(added_while_active.id)]
+        )
+
+    def test_live_indexes_include_shadow_builds(self):
+        self.reindexer.start(self.chatbot, 'text-embedding-3-small', DIMENSIONS)
+
+        namespaces = [index.namespace for index in live_indexes(self.chatbot.id)]
+
+        self.assertEqual(namespaces, [f"chatbot_{self.chatbot.id}", f"chatbot_{self.chatbot.id}_v2"])
+
+    def test_unsupported_dimension_is_rejected(self):
+        with self.assertRaises(ReindexError):
+            self.reindexer.start(self.chatbot, 'text-embedding-ada-002', 256)
+
+
+class ReindexedSearchTests(SimpleTestCase):
+    """Test searches of a re-indexed chatbot reuse the active version's storage."""
+
+    def _search(self, service, active_index, storage):
+        with patch('apps.core.rag.vector_search_service.aget_active_index', AsyncMock(return_value=active_index)), \
+             patch.object(ActiveIndex, 'vector_storage', AsyncMock(return_value=storage)) as create:
+            results = asyncio.run(service.search([1.0, 0.0, 0.0], "refunds", "visitor", hybrid=False))
+        return results, create
+
+    def test_active_version_storage_is_created_once(self):
+        service = VectorSearchService('chatbot-1')
+        service.vector_storage = FakeVectorStorage()
+        storage = FakeVectorStorage()
+        v2 = ActiveIndex(chatbot_id='chatbot-1', version=2, embedding_model='text-embedding-3-large', dimensions=3)
+        storage.namespaces[v2.namespace] = {'chunk-1': [1.0, 0.0, 0.0]}
+
+        first, create = self._search(service, v2, storage)
+        self.assertEqual(create.await_count, 1)
+        second, create = self._search(service, v2, FakeVectorStorage())
+        create.assert_not_awaited()
+        self.assertEqual([r.chunk_id for r in first], ['chunk-1'])
+        self.assertEqual([r.chunk_id for r in second], ['chunk-1'])
+
+        # A cutover to another version gets its own storage
+        v3 = ActiveIndex(chatbot_id='chatbot-1', version=3, embedding_model='text-embedding-3-large', dimensions=3)
+        _, create = self._search(service, v3, FakeVectorStorage())
+        self.assertEqual(create.await_count, 1)
+
+
+class PgVectorFetchTests(TestCase):
+    """Test vectors are fetched by id on the SQLite fallback table."""
+
+    def test_fetches_stored_vectors_in_one_namespace(self):
+        backend = PgVectorBackend(VectorStorageConfig(backend='pgvector', table_name='vector_fetch_test'))
+        self.assertTrue(backend._initialize_sync())
+        with connection.cursor() as cursor:
+            for vector_id, namespace, vector in (('a', 'v2', [0.5, 1.0]), ('b', 'v2', [1.0, 0.0]), ('a-old', 'v1', [0.0, 1.0])):
+                cursor.execute(
+                    "INSERT INTO vector_fetch_test (id, embedding, metadata, namespace) VALUES (?, ?, ?, ?)",
+                    [vector_id, json.dumps(vector), '{}', namespace]
+                )
+
+        fetched = backend._fetch_vectors_sync(['a', 'a-old', 'missing'], 'v2')
+
+        self.assertEqual(fetched, {'a': [0.5, 1.0]})
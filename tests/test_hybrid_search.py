@@ -0,0 +1,183 @@
+"""
+Tests for full-text search over knowledge chunks and rank fusion with vector results.
+"""
+
+import asyncio
+from unittest.mock import AsyncMock, patch
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase
+
+from apps.chatbots.models import Chatbot
+from apps.core.document_processing import PrivacyLevel
+from apps.core.lexical_search import ensure_lexical_index, lexical_index, query_terms, reciprocal_rank_fusion
+from apps.core.rag.context_builder import RelevanceRanker
+from apps.core.rag.vector_search_service import SearchResult, VectorSearchService
+from apps.core.reindexing import ActiveIndex
+from apps.core.vector_search import SearchConfig, SearchContext, SearchScope, VectorSearchEngine
+from apps.knowledge.models import KnowledgeChunk, KnowledgeSource
+
+User = get_user_model()
+
+
+class FakeVectorStore:
+    def __init__(self, results=()):
+        self.results = list(results)
+
+    async def search(self, **kwargs):
+        return self.results
+
+
+class ReciprocalRankFusionTests(SimpleTestCase):
+    """Test rankings are merged by position, not raw score."""
+
+    def test_items_in_both_rankings_come_first(self):
+        fused = reciprocal_rank_fusion([["a", "b", "c"], ["c", "d"]], k=60)
+
+        self.assertEqual([item for item, _ in fused], ["c", "a", "b", "d"])
+        self.assertAlmostEqual(fused[0][1], 1 / 63 + 1 / 61)
+
+    def test_weights_scale_each_ranking(self):
+        fused = reciprocal_rank_fusion([["a"], ["b"]], k=60, weights=[0.3, 0.7])
+
+        self.assertEqual([item for item, _ in fused], ["b", "a"])
+
+    def test_codes_stay_whole_terms(self):
+        self.assertEqual(query_terms("Error ERR-4012 on v2.1, error again"), ["error", "err-4012", "on", "v2.1", "again"])
+
+
+class LexicalSearchTestCase(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        # Outside the class transaction: rolling back FTS5 DDL breaks the connection
+        ensure_lexical_index()
+        super().setUpClass()
+
+    def setUp(self):
+        user = User.objects.create_user(email='lexical@example.com', password='testpass123')
+        self.chatbot = Chatbot.objects.create(user=user, name='Support', public_url_slug='lexical-bot')
+        self.public = KnowledgeSource.objects.create(chatbot=self.chatbot, name='Catalog', content_type='pdf')
+        self.private = KnowledgeSource.objects.create(
+            chatbot=self.chatbot, name='Ops notes', content_type='pdf', is_citable=False
+        )
+        self.sku = self._chunk(self.public, "Replacement cartridge SKU-88412 fits every model of the purifier.")
+        self._chunk(self.public, "Filters should be replaced every six months for best results.")
+        self._chunk(self.public, "Our purifiers ship with a two year warranty.")
+        self.internal = self._chunk(self.private, "Supplier cost for SKU-88412 is four dollars.")
+        self.index = lexical_index
+
+    def _chunk(self, source, content, **fields):
+        return KnowledgeChunk.objects.create(
+            source=source, content=content, chunk_index=source.chunks.count(), **fields
+        )
+
+
+class LexicalIndexTests(LexicalSearchTestCase):
+    """Test exact-term search, privacy filtering and index maintenance."""
+
+    def test_exact_code_is_found_first(self):
+        matches = self.index.search(str(self.chatbot.id), "what does SKU-88412 cost", top_k=5, citable_only=False)
+
+        self.assertEqual(
+            {match.chunk_id for match in matches[:2]}, {str(self.sku.id), str(self.internal.id)}
+        )
+        self.assertTrue(all(match.score > 0 for match in matches))
+
+    def test_citable_only_leaves_out_private_chunks(self):
+        matches = self.index.search(str(self.chatbot.id), "SKU-88412", citable_only=True)
+
+        self.assertEqual([match.chunk_id for match in matches], [str(self.sku.id)])
+        self.assertEqual(matches[0].source_id, str(self.public.id))
+
+    def test_deleted_and_other_chatbot_content_is_excluded(self):
+        other = Chatbot.objects.create(user=self.chatbot.user, name='Other', public_url_slug='other-bot')
+        other_source = KnowledgeSource.objects.create(chatbot=other, name='Other', content_type='pdf')
+        self._chunk(other_source, "Cartridge SKU-88412 is also sold here.")
+        self.public.delete()
+
+        matches = self.index.search(str(self.chatbot.id), "SKU-88412", citable_only=True)
+
+        self.assertEqual(matches, [])
+
+    def test_new_and_edited_chunks_are_indexed(self):
+        self.index.search(str(self.chatbot.id), "warranty")
+        added = self._chunk(self.public, "Error code E-207 means the fan is blocked.")
+        self.sku.content = "Discontinued cartridge, see the new catalog."
+        self.sku.save()
+
+        self.assertEqual([m.chunk_id for m in self.index.search(str(self.chatbot.id), "E-207")], [str(added.id)])
+        self.assertEqual(self.index.search(str(self.chatbot.id), "SKU-88412"), [])
+
+
+class HybridSearchTests(LexicalSearchTestCase):
+    """Test full-text matches are fused into vector results."""
+
+    def test_service_adds_exact_matches_missed_by_vectors(self):
+        self.sku.embedding_model = 'test-model'
+        self.sku.embedding_vector = [1.0, 0.0, 0.0]
+        self.sku.save()
+        service = VectorSearchService(str(self.chatbot.id))
+        vector_results = [
+            SearchResult(
+                content="Filters should be replaced", score=0.82, chunk_id="vector-only", document_id="doc-1",
+                knowledge_base_id=str(self.chatbot.id), is_citable=True, metadata={}
+            )
+        ]
+
+        active_index = ActiveIndex(chatbot_id=str(self.chatbot.id), embedding_model='test-model', dimensions=3)
+        # Queried up front: the test database isn't visible from sync_to_async threads
+        matches = self.index.search(str(self.chatbot.id), "SKU-88412 price", top_k=5)
+        embeddings = service._stored_embeddings([m.chunk_id for m in matches], active_index)
+
+        with patch.object(self.index, 'asearch', AsyncMock(return_value=matches)), \
+             patch.object(service, '_stored_embeddings', return_value=embeddings):
+            results = asyncio.run(service._fuse_lexical_matches(
+                vector_results, [0.6, 0.8, 0.0], "SKU-88412 price", 5, True, active_index
+            ))
+
+        self.assertEqual([r.chunk_id for r in results], ["vector-only", str(self.sku.id)])
+        exact = results[1]
+        self.assertAlmostEqual(exact.score, 0.6, places=5)
+        self.assertEqual(exact.embedding, [1.0, 0.0, 0.0])
+        self.assertEqual(exact.metadata['lexical_score'], 1.0)
+        self.assertEqual(results[0].metadata['lexical_score'], 0.0)
+
+    def test_engine_keyword_results_pass_privacy_filtering(self):
+        engine = VectorSearchEngine(FakeVectorStore())
+        context = SearchContext(
+            user_id="visitor", knowledge_base_ids=[str(self.chatbot.id)],
+            privacy_level=PrivacyLevel.PRIVATE, search_intent="answer"
+        )
+        config = SearchConfig(top_k=5, search_scope=SearchScope.CITABLE_AND_PRIVATE)
+
+        matches = self.index.search(str(self.chatbot.id), "SKU-88412", top_k=5, citable_only=False)
+
+        with patch.object(self.index, 'asearch', AsyncMock(return_value=matches)), \
+             patch('apps.core.vector_search.settings.ENABLE_CACHING', False):
+            results = asyncio.run(engine.hybrid_search([0.1, 0.2], "SKU-88412", context, config))
+
+        # The private supplier note matched too, but visitors can't see it
+        self.assertEqual([r.chunk_id for r in results], [str(self.sku.id)])
+        self.assertTrue(results[0].can_cite)
+        self.assertAlmostEqual(results[0].score, 0.3 / 61)
+
+
+class KeywordRankingTests(SimpleTestCase):
+    """Test keyword ranking reuses full-text scores from hybrid search."""
+
+    def test_lexical_score_replaces_word_overlap(self):
+        results = [
+            SearchResult(
+                content="sku-88412 sku-88412", score=0.8, chunk_id="a", document_id="d", knowledge_base_id="kb",
+                is_citable=True, metadata={'lexical_score': 0.0}
+            ),
+            SearchResult(
+                content="Replacement cartridge", score=0.7, chunk_id="b", document_id="d", knowledge_base_id="kb",
+                is_citable=True, metadata={'lexical_score': 1.0}
+            ),
+        ]
+
+        ranked = RelevanceRanker.rank_by_keyword_match(results, "sku-88412")
+
+        self.assertEqual([r.chunk_id for r in ranked], ["b", "a"])
+        self.assertAlmostEqual(ranked[0].score, 0.7 * 1.5)
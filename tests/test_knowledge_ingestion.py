@@ -0,0 +1,689 @@
+"""
+Tests for knowledge source ingestion.
+"""
+
+import asyncio
+import io
+import threading
+import time
+from pathlib import Path
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import Mock, patch, AsyncMock
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+
+from apps.chatbots.models import Chatbot
+from apps.knowledge.models import KnowledgeSource, KnowledgeChunk, ProcessingJob
+from apps.core.models import ProcessingStatus
+from apps.core.document_processing_service import DocumentProcessingService, compute_content_hash
+from apps.core.document_processors import ProcessedDocument
+from apps.core.tasks import generate_embeddings_for_knowledge_chunks, process_document_pipeline
+from apps.core.text_chunking import ChunkerFactory, ChunkingConfig, ChunkingStrategy, iter_text_segments
+from apps.core.html_extraction import (
+    ExtractionStrategy, HTMLExtractorFactory, LxmlExtractor, MainContentExtractor, response_charset
+)
+from apps.core.site_crawler import (
+    CrawlConfig, SiteCrawler, canonicalize_url, iter_site_pages, parse_sitemap
+)
+
+User = get_user_model()
+
+
+def make_response(status_code=200, body=b"", headers=None):
+    response = Mock()
+    response.status_code = status_code
+    response.content = body
+    response.headers = headers or {}
+    response.raise_for_status = Mock()
+    response.iter_content = Mock(side_effect=lambda chunk_size=None: iter([body]))
+    return response
+
+
+BODY_TEXT = b"Embed the chat widget by pasting the script tag before the closing body tag of every page. " * 3
+PAGE_V1 = b"<html><head><title>Docs</title></head><body><p>" + BODY_TEXT + b"</p></body></html>"
+PAGE_V2 = b"<html><head><title>Docs</title></head><body><p>The new widget loader is async. " + BODY_TEXT + b"</p></body></html>"
+DOCS_URL = 'https://docs.example.com/'
+
+
+def crawl_calls(mock_get):
+    """Only the calls made against the crawled URL (tokenizer downloads may also use requests)."""
+    return [c for c in mock_get.call_args_list if c.args and c.args[0] == DOCS_URL]
+
+
+class ContentHashTests(TestCase):
+    """Test normalized content hashing for URL recrawls."""
+
+    def test_whitespace_differences_hash_equal(self):
+        self.assertEqual(
+            compute_content_hash("Hello   world\n\nagain"),
+            compute_content_hash("Hello world again ")
+        )
+
+    def test_text_differences_hash_differ(self):
+        self.assertNotEqual(compute_content_hash("Hello world"), compute_content_hash("Hello there"))
+
+
+class StreamingChunkingTests(TestCase):
+    """Test generator-based chunking of large documents."""
+
+    def setUp(self):
+        paragraphs = [
+            f"Paragraph {i} explains how the widget handles request number {i} for the account. "
+            f"It retries failed calls and logs the outcome for auditing."
+            for i in range(400)
+        ]
+        self.text = "\n\n".join(paragraphs)
+        self.chunker = ChunkerFactory.create_chunker(ChunkingConfig(
+            strategy=ChunkingStrategy.RECURSIVE_CHARACTER,
+            chunk_size=400,
+            chunk_overlap=50,
+            min_chunk_size=50
+        ))
+        self.chunker.stream_window_chars = 4096
+
+    def test_iter_text_segments_reads_file_objects(self):
+        segments = list(iter_text_segments(io.StringIO(self.text), segment_size=1000))
+
+        self.assertTrue(all(len(segment) <= 1000 for segment in segments))
+        self.assertEqual(''.join(segments), self.text)
+
+    def test_chunks_have_global_indices_and_offsets(self):
+        chunks = list(self.chunker.iter_chunks(iter_text_segments(self.text, segment_size=700), {'title': 'Guide'}))
+
+        self.assertGreater(len(chunks), 10)
+        self.assertEqual([chunk.metadata['chunk_index'] for chunk in chunks], list(range(len(chunks))))
+        self.assertEqual(len({chunk.chunk_id for chunk in chunks}), len(chunks))
+        for chunk in chunks:
+            self.assertIn(chunk.content.strip(), self.text[chunk.start_index:chunk.end_index + 1])
+            self.assertNotIn('total_chunks', chunk.metadata)
+        self.assertIn("Paragraph 399", chunks[-1].content)
+
+    def test_chunks_share_document_metadata(self):
+        metadata = {'title': 'Guide'}
+        chunks = self.chunker.iter_chunks(iter_text_segments(self.text), metadata)
+
+        self.assertTrue(all(chunk.metadata['document_metadata'] is metadata for chunk in chunks))
+
+    def test_buffer_is_bounded_by_window(self):
+        windows = []
+        chunk_text = self.chunker.chunk_text
+
+        def recording_chunk_text(text, document_metadata=None):
+            windows.append(len(text))
+            return chunk_text(text, document_metadata)
+
+        self.chunker.chunk_text = recording_chunk_text
+        list(self.chunker.iter_chunks(iter_text_segments(self.text, segment_size=500)))
+
+        self.assertGreater(len(windows), 1)
+        self.assertTrue(all(size <= self.chunker.stream_window_chars for size in windows))
+
+    def test_chunk_rows_are_written_in_batches_and_only_totals_kept(self):
+        user = User.objects.create_user(email='stream@example.com', password='testpass123')
+        chatbot = Chatbot.objects.create(user=user, name='Streamer', public_url_slug='streamer-bot')
+        source = KnowledgeSource.objects.create(chatbot=chatbot, name='Guide', content_type='text')
+        chunks = self.chunker.iter_chunks(iter_text_segments(self.text))
+
+        created = DocumentProcessingService()._create_knowledge_chunks(
+            source, chunks, Mock(metadata={}), batch_size=25
+        )
+
+        self.assertGreater(created.count, 25)
+        self.assertEqual(created.count, source.chunks.count())
+        self.assertEqual(created.total_tokens, sum(source.chunks.values_list('token_count', flat=True)))
+
+
+@patch('apps.core.tasks.generate_embeddings_for_knowledge_chunks.apply_async')
+@patch('requests.get')
+class RecrawlURLContentTests(TestCase):
+    """Test conditional, incremental URL recrawling."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(email='crawl@example.com', password='testpass123')
+        self.chatbot = Chatbot.objects.create(user=self.user, name='Crawler', public_url_slug='crawler-bot')
+        self.source = KnowledgeSource.objects.create(
+            chatbot=self.chatbot,
+            name='Docs',
+            content_type='url',
+            source_url=DOCS_URL,
+            is_citable=True
+        )
+        self.service = DocumentProcessingService()
+
+    def _initial_crawl(self, mock_get):
+        mock_get.return_value = make_response(
+            body=PAGE_V1, headers={'ETag': '"v1"', 'Last-Modified': 'Mon, 01 Jan 2024 00:00:00 GMT'}
+        )
+        result = self.service.process_url_content(self.source, self.source.source_url)
+        self.assertTrue(result.success)
+        self.assertEqual(result.chunk_count, result.chunks.count())
+        self.source.refresh_from_db()
+
+    def test_initial_crawl_stores_validators(self, mock_get, mock_embed):
+        self._initial_crawl(mock_get)
+
+        self.assertEqual(self.source.http_etag, '"v1"')
+        self.assertEqual(self.source.http_last_modified, 'Mon, 01 Jan 2024 00:00:00 GMT')
+        self.assertIsNotNone(self.source.content_hash)
+        self.assertIsNotNone(self.source.last_crawled_at)
+
+    def test_not_modified_short_circuits(self, mock_get, mock_embed):
+        self._initial_crawl(mock_get)
+        chunk_ids = set(self.source.chunks.values_list('id', flat=True))
+        mock_embed.reset_mock()
+
+        not_modified = make_response(status_code=304)
+        mock_get.return_value = not_modified
+        result = self.service.recrawl_url_content(self.source)
+
+        sent_headers = crawl_calls(mock_get)[-1].kwargs['headers']
+        self.assertEqual(sent_headers['If-None-Match'], '"v1"')
+        self.assertEqual(sent_headers['If-Modified-Since'], 'Mon, 01 Jan 2024 00:00:00 GMT')
+        self.assertTrue(result.success)
+        self.assertTrue(result.unchanged)
+        self.assertEqual(set(self.source.chunks.values_list('id', flat=True)), chunk_ids)
+        mock_embed.assert_not_called()
+        # The connection goes back to the pool
+        not_modified.close.assert_called_once()
+
+    def test_identical_hash_short_circuits(self, mock_get, mock_embed):
+        self._initial_crawl(mock_get)
+        mock_embed.reset_mock()
+
+        # Server ignores validators but serves the same content
+        mock_get.return_value = make_response(body=PAGE_V1.replace(b"closing body", b"closing\n      body"))
+        result = self.service.recrawl_url_content(self.source)
+
+        self.assertTrue(result.unchanged)
+        mock_embed.assert_not_called()
+
+    @patch('apps.core.async_runtime.create_vector_storage')
+    def test_changed_content_reprocesses(self, mock_storage, mock_get, mock_embed):
+        storage = Mock(backend_name='memory')
+        storage.store_embeddings = AsyncMock(return_value=True)
+        storage.delete_embeddings = AsyncMock(return_value=True)
+        storage.delete_by_filter = AsyncMock(return_value=3)
+        mock_storage.side_effect = AsyncMock(return_value=storage)
+
+        self._initial_crawl(mock_get)
+        old_hash = self.source.content_hash
+        old_chunk_ids = [str(i) for i in self.source.chunks.values_list('id', flat=True)]
+        mock_embed.reset_mock()
+
+        mock_get.return_value = make_response(body=PAGE_V2, headers={'ETag': '"v2"'})
+        result = self.service.recrawl_url_content(self.source)
+        self.source.refresh_from_db()
+
+        self.assertTrue(result.success)
+        self.assertFalse(result.unchanged)
+        self.assertNotEqual(self.source.content_hash, old_hash)
+        self.assertEqual(self.source.http_etag, '"v2"')
+        self.assertIn("new widget loader", self.source.chunks.order_by('chunk_index').first().content)
+        # The old chunks and vectors keep serving until the new ones are embedded
+        self.assertEqual(KnowledgeChunk.objects.filter(id__in=old_chunk_ids).count(), len(old_chunk_ids))
+        storage.delete_by_filter.assert_not_called()
+        storage.delete_embeddings.assert_not_called()
+        embed_kwargs = mock_embed.call_args.kwargs['kwargs']
+        self.assertEqual(sorted(embed_kwargs['superseded_chunk_ids']), sorted(old_chunk_ids))
+
+        stored = []
+        storage.store_embeddings.side_effect = lambda vector_data, namespace=None: stored.extend(
+            vector_id for vector_id, _, _ in vector_data
+        ) or True
+        with patch('apps.core.embedding_service.OpenAIEmbeddingService', return_value=fake_embedding_service([])):
+            run_attempt(generate_embeddings_for_knowledge_chunks, 'embed-1', str(self.source.id), **embed_kwargs)
+
+        new_chunk_ids = [str(i) for i in self.source.chunks.values_list('id', flat=True)]
+        self.assertEqual(sorted(stored), sorted(new_chunk_ids))
+        self.assertFalse(KnowledgeChunk.all_objects.filter(id__in=old_chunk_ids).exists())
+        self.assertEqual(sorted(storage.delete_embeddings.await_args.args[0]), sorted(old_chunk_ids))
+
+    def test_failed_reprocess_keeps_the_old_chunks(self, mock_get, mock_embed):
+        self._initial_crawl(mock_get)
+        old_chunks = list(self.source.chunks.values_list('id', 'chunk_index', 'content_hash'))
+        mock_embed.reset_mock()
+
+        mock_get.return_value = make_response(body=PAGE_V2, headers={'ETag': '"v2"'})
+        with patch.object(self.service, '_create_knowledge_chunks', side_effect=Exception("disk full")):
+            result = self.service.recrawl_url_content(self.source)
+
+        self.assertFalse(result.success)
+        self.assertEqual(list(self.source.chunks.values_list('id', 'chunk_index', 'content_hash')), old_chunks)
+        mock_embed.assert_not_called()
+
+    def test_failed_source_is_fully_reprocessed(self, mock_get, mock_embed):
+        self._initial_crawl(mock_get)
+        KnowledgeSource.objects.filter(id=self.source.id).update(status=ProcessingStatus.FAILED)
+        self.source.refresh_from_db()
+
+        mock_get.return_value = make_response(body=PAGE_V1)
+        with patch('apps.core.async_runtime.create_vector_storage', side_effect=Exception("offline")):
+            result = self.service.recrawl_url_content(self.source)
+
+        self.assertNotIn('If-None-Match', crawl_calls(mock_get)[-1].kwargs['headers'])
+        self.assertTrue(result.success)
+        self.assertFalse(result.unchanged)
+
+
+HTML_CORPUS = Path(__file__).parent / 'fixtures' / 'html_corpus'
+
+
+def run_attempt(task, task_id, *args, **kwargs):
+    """Run one attempt of a bound task under a fixed Celery task id."""
+    task.push_request(id=task_id, retries=0)
+    try:
+        return task.run(*args, **kwargs)
+    finally:
+        task.pop_request()
+
+
+def fake_embedding_service(embedded):
+    """Embedding service double that records which chunks it embedded."""
+    def embed(chunks, update_db=True):
+        # Saved before the task's event loop starts, on the test's connection
+        results = []
+        for chunk in chunks:
+            embedded.append(chunk.chunk_index)
+            chunk.embedding_vector = [float(chunk.chunk_index), 1.0]
+            chunk.save(update_fields=['embedding_vector'])
+            results.append((chunk, Mock(embedding=chunk.embedding_vector, cached=False, cost_usd=0.001, tokens_used=10)))
+        return AsyncMock(return_value=results)()
+
+    service = Mock()
+    service.generate_embeddings_for_knowledge_chunks = Mock(side_effect=embed)
+    return service
+
+
+def flaky_vector_storage(stored, fail_on_call):
+    """Vector storage double whose store fails once, on the given call number."""
+    calls = []
+
+    async def store(vector_data, namespace=None):
+        calls.append(len(calls) + 1)
+        if len(calls) == fail_on_call:
+            return False
+        stored.extend(vector_id for vector_id, _, _ in vector_data)
+        return True
+
+    storage = Mock(backend_name='memory')
+    storage.store_embeddings = AsyncMock(side_effect=store)
+    return storage
+
+
+@patch('apps.core.tasks.BaseTaskWithProgress.retry_with_backoff', Mock(side_effect=RuntimeError('retry')))
+class ResumableEmbeddingJobTests(TestCase):
+    """Test that retried ingestion tasks resume from job checkpoints."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(email='resume@example.com', password='testpass123')
+        self.chatbot = Chatbot.objects.create(user=self.user, name='Resume', public_url_slug='resume-bot')
+        self.source = KnowledgeSource.objects.create(
+            chatbot=self.chatbot,
+            name='Manual',
+            content_type='text',
+            is_citable=True
+        )
+        self.chunks = [
+            KnowledgeChunk.objects.create(
+                source=self.source,
+                content=f"Chunk {i} of the manual.",
+                chunk_index=i,
+                token_count=5
+            )
+            for i in range(5)
+        ]
+
+    def _run(self, task_id, embedded, stored, fail_on_call=None):
+        with patch('apps.core.embedding_service.OpenAIEmbeddingService', return_value=fake_embedding_service(embedded)), \
+                patch('apps.core.async_runtime.create_vector_storage',
+                      AsyncMock(return_value=flaky_vector_storage(stored, fail_on_call))):
+            return run_attempt(
+                generate_embeddings_for_knowledge_chunks, task_id, str(self.source.id), batch_size=2
+            )
+
+    def test_retry_resumes_without_reembedding(self):
+        embedded, stored = [], []
+
+        # Second batch is embedded but its vector store write fails
+        with self.assertRaises(RuntimeError):
+            self._run('task-1', embedded, stored, fail_on_call=2)
+        job = ProcessingJob.objects.get(celery_task_id='task-1')
+        self.assertEqual(job.get_checkpoint(ProcessingJob.STAGE_EMBEDDED)['chunk_index'], 3)
+        self.assertEqual(job.get_checkpoint(ProcessingJob.STAGE_STORED)['chunk_index'], 1)
+
+        result = self._run('task-1', embedded, stored)
+
+        self.assertEqual(result['status'], 'success')
+        self.assertEqual(embedded, [0, 1, 2, 3, 4])
+        self.assertEqual(sorted(stored), sorted(str(chunk.id) for chunk in self.chunks))
+        self.assertTrue(result['result']['resumed'])
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'completed')
+        self.assertEqual(ProcessingJob.objects.filter(source=self.source).count(), 1)
+
+    def test_changed_chunk_set_discards_checkpoints(self):
+        embedded, stored = [], []
+        with self.assertRaises(RuntimeError):
+            self._run('task-1', embedded, stored, fail_on_call=2)
+
+        KnowledgeChunk.objects.filter(source=self.source, chunk_index=4).delete()
+        KnowledgeChunk.objects.filter(source=self.source).update(embedding_vector=None)
+        embedded.clear()
+        self._run('task-1', embedded, stored)
+
+        self.assertEqual(embedded, [0, 1, 2, 3])
+
+    def test_pipeline_reuses_extracted_text_checkpoint(self):
+        processor = Mock()
+        processor.extract_text.return_value = ProcessedDocument(
+            text_content="Refunds are processed within five business days. " * 10,
+            metadata={},
+            word_count=70,
+            char_count=500
+        )
+        embedding_service = Mock()
+        embedding_service.generate_embeddings_batch = AsyncMock(side_effect=lambda texts: Mock(
+            embeddings=[Mock(embedding=[0.1, 0.2]) for _ in texts],
+            total_tokens=10,
+            total_cost_usd=0.001,
+            processing_time_ms=5
+        ))
+        stored = []
+        args = [
+            str(self.source.id), 'ZmlsZQ==', 'manual.txt', 'text/plain', 'kb-1', str(self.user.id), 'recursive_character'
+        ]
+
+        with patch('apps.core.tasks.DocumentProcessorFactory') as mock_factory, \
+                patch('apps.core.embedding_service.OpenAIEmbeddingService', return_value=embedding_service), \
+                patch('apps.core.async_runtime.create_vector_storage',
+                      AsyncMock(return_value=flaky_vector_storage(stored, fail_on_call=None))) as mock_storage:
+            mock_factory.return_value.create_processor.return_value = processor
+            mock_storage.return_value.store_embeddings.side_effect = [RuntimeError('vector db down'), True]
+
+            with self.assertRaises(RuntimeError):
+                run_attempt(process_document_pipeline, 'doc-1', *args)
+            job = ProcessingJob.objects.get(celery_task_id='doc-1')
+            self.assertIsNotNone(job.extracted_text)
+
+            result = run_attempt(process_document_pipeline, 'doc-1', *args)
+
+        self.assertEqual(result['status'], 'success')
+        processor.extract_text.assert_called_once()
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'completed')
+        self.assertIsNone(job.extracted_text)
+
+
+class HTMLExtractionTests(TestCase):
+    """Test HTML-to-text extractors."""
+
+    PAGE = (
+        b"<html><head><title> Pricing  Plans </title><style>p{color:red}</style></head>"
+        b"<body><nav>Home Docs</nav><h1>Pricing</h1><p>Starter is <b>free</b>.</p>"
+        b"<script>track()</script><ul><li>Pro</li><li>Team</li></ul><footer>Acme</footer></body></html>"
+    )
+
+    def test_lxml_extracts_block_separated_text(self):
+        result = LxmlExtractor().extract(self.PAGE)
+
+        self.assertEqual(result.title, 'Pricing Plans')
+        self.assertEqual(result.text, 'Pricing\nStarter is free.\nPro\nTeam')
+
+    def test_streaming_matches_whole_document(self):
+        extractor = LxmlExtractor()
+        html = (HTML_CORPUS / 'docs_page.html').read_bytes()
+        chunks = (html[i:i + 7] for i in range(0, len(html), 7))
+
+        self.assertEqual(extractor.extract_stream(chunks), extractor.extract(html))
+
+    def test_max_chars_truncates(self):
+        result = LxmlExtractor(max_chars=12).extract(self.PAGE)
+
+        self.assertTrue(result.truncated)
+        self.assertEqual(result.text, 'Pricing')
+
+    def test_main_content_drops_boilerplate(self):
+        html = (HTML_CORPUS / 'docs_page.html').read_bytes()
+        text = MainContentExtractor().extract(html).text
+
+        self.assertTrue(text.startswith('Installing the chat widget'))
+        for boilerplate in ('API reference', 'Tweet', 'All rights reserved', 'Docs / Installation'):
+            self.assertNotIn(boilerplate, text)
+
+    def test_soup_strategy_still_available(self):
+        extractor = HTMLExtractorFactory.create_extractor(ExtractionStrategy.SOUP)
+        result = extractor.extract(self.PAGE)
+
+        self.assertIn('Starter is free.', result.text)
+        self.assertNotIn('track()', result.text)
+
+    def test_response_charset(self):
+        self.assertEqual(response_charset({'Content-Type': 'text/html; charset="ISO-8859-1"'}), 'ISO-8859-1')
+        self.assertIsNone(response_charset({'content-type': 'text/html'}))
+
+
+class FixtureSite:
+    """Serve a dict of ``path -> (status, content_type, body)`` over local HTTP."""
+
+    def __init__(self, routes, delay=0.0):
+        self.routes = routes
+        self.delay = delay
+        self.requests = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+        site = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                with site._lock:
+                    site.requests.append(self.path)
+                    site.in_flight += 1
+                    site.max_in_flight = max(site.max_in_flight, site.in_flight)
+                try:
+                    time.sleep(site.delay)
+                    status, content_type, body = site.routes.get(
+                        self.path, (404, 'text/plain', b'not found')
+                    )
+                    self.send_response(status)
+                    self.send_header('Content-Type', content_type)
+                    self.send_header('Content-Length', str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                finally:
+                    with site._lock:
+                        site.in_flight -= 1
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.base_url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def html_page(title, body, links=()):
+    anchors = ''.join(f'<a href="{href}">{href}</a>' for href in links)
+    return (
+        200,
+        'text/html; charset=utf-8',
+        f"<html><head><title>{title}</title></head><body><p>{body}</p>{anchors}</body></html>".encode()
+    )
+
+
+def crawl_all(start_url, config):
+    async def run():
+        return [page async for page in SiteCrawler(config).crawl(start_url)]
+    return asyncio.run(run())
+
+
+class URLCanonicalizationTests(TestCase):
+    """Test URL canonicalization and sitemap parsing."""
+
+    def test_equivalent_urls_share_canonical_form(self):
+        canonical = canonicalize_url('https://docs.example.com/guide/')
+        for variant in (
+            'HTTPS://Docs.Example.com:443/guide/',
+            'https://docs.example.com/guide/#install',
+            'https://docs.example.com/a/../guide/',
+            'https://docs.example.com//guide/?utm_source=newsletter',
+        ):
+            self.assertEqual(canonicalize_url(variant), canonical)
+
+    def test_query_is_sorted_and_relative_links_resolved(self):
+        self.assertEqual(
+            canonicalize_url('page?b=2&a=1', base='http://example.com/docs/'),
+            'http://example.com/docs/page?a=1&b=2'
+        )
+
+    def test_non_http_urls_rejected(self):
+        self.assertIsNone(canonicalize_url('mailto:support@example.com'))
+        self.assertIsNone(canonicalize_url('javascript:void(0)'))
+
+    def test_parse_sitemap_and_index(self):
+        urlset = (
+            b'<?xml version="1.0"?><urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">'
+            b'<url><loc>https://example.com/a</loc></url><url><loc> https://example.com/b </loc></url></urlset>'
+        )
+        index = (
+            b'<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">'
+            b'<sitemap><loc>https://example.com/sitemap-docs.xml</loc></sitemap></sitemapindex>'
+        )
+        self.assertEqual(parse_sitemap(urlset), (['https://example.com/a', 'https://example.com/b'], []))
+        self.assertEqual(parse_sitemap(index), ([], ['https://example.com/sitemap-docs.xml']))
+        self.assertEqual(parse_sitemap(b'not xml'), ([], []))
+
+
+class SiteCrawlerTests(TestCase):
+    """Test the async site crawler against a local HTTP fixture server."""
+
+    def setUp(self):
+        self.site = FixtureSite({})
+        base = self.site.base_url
+        self.site.routes.update({
+            '/robots.txt': (200, 'text/plain', f"User-agent: *\nDisallow: /private/\nSitemap: {base}/sitemap.xml\n".encode()),
+            '/sitemap.xml': (200, 'application/xml', (
+                f'<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">'
+                f'<url><loc>{base}/docs/sitemap-only</loc></url></urlset>'
+            ).encode()),
+            '/docs/': html_page('Home', 'Welcome', ['intro', 'intro#top', '/docs/intro?utm_source=x', '/private/secret', 'logo.png']),
+            '/docs/intro': html_page('Intro', 'Getting started', ['deep']),
+            '/docs/deep': html_page('Deep', 'Deep page', ['deeper']),
+            '/docs/deeper': html_page('Deeper', 'Too deep'),
+            '/docs/sitemap-only': html_page('Sitemap', 'Only listed in the sitemap'),
+            '/private/secret': html_page('Secret', 'Blocked by robots'),
+        })
+
+    def tearDown(self):
+        self.site.close()
+
+    def test_discovers_pages_from_links_and_sitemap(self):
+        pages = crawl_all(f"{self.site.base_url}/docs/", CrawlConfig(max_depth=2))
+        paths = sorted(page.url[len(self.site.base_url):] for page in pages)
+
+        self.assertEqual(paths, ['/docs/', '/docs/deep', '/docs/intro', '/docs/sitemap-only'])
+        via = {page.url[len(self.site.base_url):]: page.discovered_via for page in pages}
+        self.assertEqual(via['/docs/sitemap-only'], 'sitemap')
+        self.assertEqual(via['/docs/intro'], 'link')
+
+    def test_corrupt_sitemap_falls_back_to_links(self):
+        self.site.routes['/sitemap.xml'] = (200, 'application/x-gzip', b'\x1f\x8b\x08\x00corrupt')
+
+        pages = crawl_all(f"{self.site.base_url}/docs/", CrawlConfig(max_depth=1))
+
+        paths = sorted(page.url[len(self.site.base_url):] for page in pages)
+        self.assertEqual(paths, ['/docs/', '/docs/intro'])
+
+    def test_crawl_finishes_when_sitemap_seeding_raises(self):
+        with patch.object(SiteCrawler, '_seed_from_sitemaps', side_effect=RuntimeError("boom")):
+            pages = crawl_all(f"{self.site.base_url}/docs/", CrawlConfig(max_depth=1))
+
+        self.assertEqual(len(pages), 2)
+
+    def test_fetches_each_canonical_url_once_and_respects_robots(self):
+        crawl_all(f"{self.site.base_url}/docs/", CrawlConfig(max_depth=1))
+
+        self.assertEqual(self.site.requests.count('/docs/intro'), 1)
+        self.assertNotIn('/private/secret', self.site.requests)
+        self.assertNotIn('/docs/logo.png', self.site.requests)
+
+    def test_max_pages_limits_crawl(self):
+        pages = crawl_all(f"{self.site.base_url}/docs/", CrawlConfig(max_depth=3, max_pages=2))
+        self.assertEqual(len(pages), 2)
+
+    def test_per_host_concurrency_is_bounded(self):
+        self.site.delay = 0.05
+        links = [f'/docs/p{i}' for i in range(12)]
+        self.site.routes['/docs/'] = html_page('Home', 'Index', links)
+        for link in links:
+            self.site.routes[link] = html_page(link, 'Page')
+
+        config = CrawlConfig(max_depth=1, per_host_concurrency=3, use_sitemaps=False, respect_robots=False)
+        pages = crawl_all(f"{self.site.base_url}/docs/", config)
+
+        self.assertEqual(len(pages), 13)
+        self.assertGreater(self.site.max_in_flight, 1)
+        self.assertLessEqual(self.site.max_in_flight, 3)
+
+    def test_iter_site_pages_streams_and_stops_early(self):
+        pages = iter_site_pages(f"{self.site.base_url}/docs/", CrawlConfig(max_depth=2))
+        first = next(pages)
+        pages.close()
+
+        self.assertEqual(first.url, f"{self.site.base_url}/docs/")
+
+
+@patch('apps.core.tasks.generate_embeddings_for_knowledge_chunks.apply_async')
+class SiteCrawlIngestionTests(TestCase):
+    """Test ingesting a crawled site into per-page knowledge sources."""
+
+    def setUp(self):
+        body = BODY_TEXT.decode()
+        self.site = FixtureSite({
+            '/docs/': html_page('Home', body, ['install', 'faq']),
+            '/docs/install': html_page('Install', 'Install guide. ' + body),
+            '/docs/faq': html_page('FAQ', 'Frequently asked questions. ' + body),
+        })
+        self.user = User.objects.create_user(email='site@example.com', password='testpass123')
+        self.chatbot = Chatbot.objects.create(user=self.user, name='Site', public_url_slug='site-bot')
+        self.root = KnowledgeSource.objects.create(
+            chatbot=self.chatbot,
+            name='Docs',
+            content_type='url',
+            source_url=f"{self.site.base_url}/docs/",
+            is_citable=False,
+            metadata={'crawl_depth': 2}
+        )
+
+    def tearDown(self):
+        self.site.close()
+
+    def test_pages_become_child_sources(self, mock_embed):
+        config = CrawlConfig(max_depth=1, use_sitemaps=False)
+        summary = DocumentProcessingService().process_site_crawl(self.root, crawl_config=config)
+
+        self.assertEqual(summary['pages_processed'], 2)
+        self.assertEqual(summary['pages_skipped'], 1)  # The root page itself
+        children = KnowledgeSource.objects.filter(metadata__parent_source_id=str(self.root.id))
+        self.assertEqual(
+            sorted(children.values_list('name', flat=True)), ['FAQ', 'Install']
+        )
+        for child in children:
+            self.assertEqual(child.status, ProcessingStatus.COMPLETED)
+            self.assertFalse(child.is_citable)
+            self.assertIsNotNone(child.content_hash)
+            self.assertGreater(child.chunks.count(), 0)
+
+    def test_known_pages_are_skipped(self, mock_embed):
+        config = CrawlConfig(max_depth=1, use_sitemaps=False)
+        service = DocumentProcessingService()
+        service.process_site_crawl(self.root, crawl_config=config)
+        summary = service.process_site_crawl(self.root, crawl_config=config)
+
+        self.assertEqual(summary['pages_processed'], 0)
+        self.assertEqual(summary['pages_skipped'], 3)
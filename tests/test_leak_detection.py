@@ -0,0 +1,165 @@
+"""
+Tests for incremental private-content detection in streamed responses.
+"""
+
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import patch
+from django.test import SimpleTestCase
+
+from apps.core.rag.context_builder import ContextData, ContextSource
+from apps.core.rag.llm_service import ChatbotConfig, LLMService
+from apps.core.rag.privacy_filter import StreamingLeakDetector
+
+PRIVATE = "Escalations go to the finance night desk on extension 4410 after six pm."
+
+
+def private_context(*contents):
+    sources = [
+        ContextSource(
+            content=content, source_id=f"source-{i}", document_id="doc-1", knowledge_base_id="kb-1",
+            score=0.9, is_citable=False
+        )
+        for i, content in enumerate(contents)
+    ]
+    return ContextData(
+        full_context="", citable_sources=[], private_sources=sources, token_count=0, total_sources=len(sources),
+        citable_count=0, private_count=len(sources), context_score=0.5, search_metadata={}
+    )
+
+
+def feed_all(detector, deltas):
+    """Index of the delta that revealed a leak, or None."""
+    for i, delta in enumerate(deltas):
+        detector.feed(delta)
+        if detector.leak:
+            return i
+    return None
+
+
+class StreamingLeakDetectorTests(SimpleTestCase):
+    """Test private phrases are caught across delta boundaries."""
+
+    def setUp(self):
+        self.detector = StreamingLeakDetector([PRIVATE])
+
+    def test_phrase_split_across_deltas_is_caught(self):
+        deltas = ["Please contact ", "the fin", "ance night ", "desk on ", "extension..."]
+
+        self.assertEqual(feed_all(self.detector, deltas), 3)
+        self.assertEqual(self.detector.leak, "the finance night desk on")
+
+    def test_phrase_from_the_middle_of_a_source_is_caught(self):
+        # Not within the first 20 characters of the source
+        deltas = ["Dial ", "Extension 4410 ", "AFTER SIX PM."]
+
+        self.assertEqual(feed_all(self.detector, deltas), 2)
+
+    def test_unfinished_word_is_not_matched_early(self):
+        # "six" could still become "sixty"
+        self.assertIsNone(feed_all(self.detector, ["on extension 4410 after six", "ty days."]))
+        self.detector.finish()
+        self.assertIsNone(self.detector.leak)
+
+    def test_last_word_is_screened_on_finish(self):
+        self.assertIsNone(feed_all(self.detector, ["on extension 4410 after ", "six"]))
+        self.assertEqual(self.detector.finish(), "")
+        self.assertEqual(self.detector.leak, "on extension 4410 after six")
+
+    def test_only_checked_text_is_released(self):
+        # OpenAI deltas are whole tokens, so every word ends at a delta boundary
+        detector = StreamingLeakDetector(["Staff note: the internal discount code is BLUEFOX until May."])
+        deltas = ["Sure", ",", " the", " internal", " discount", " code", " is", " BLUEFOX"]
+
+        released = "".join(detector.feed(delta) for delta in deltas)
+
+        self.assertEqual(detector.leak, "the internal discount code is")
+        self.assertEqual(released, "Sure, the internal discount code ")
+
+    def test_clean_token_stream_is_released_whole(self):
+        deltas = ["The", " finance", " team", " answers", " within", " six", " days"]
+
+        released = "".join(self.detector.feed(delta) for delta in deltas)
+
+        self.assertEqual(released, "The finance team answers within six ")
+        self.assertEqual(released + self.detector.finish(), "".join(deltas))
+        self.assertIsNone(self.detector.leak)
+
+    def test_private_marker_split_across_deltas_is_caught(self):
+        self.assertEqual(feed_all(self.detector, ["Per the [PRI", "VATE] notes"]), 1)
+
+    def test_clean_responses_pass(self):
+        deltas = ["The finance ", "team answers ", "refund questions ", "within six ", "business days."]
+
+        self.assertIsNone(feed_all(self.detector, deltas))
+        self.assertGreater(self.detector.indexed_phrases, 0)
+
+    def test_short_sources_match_whole(self):
+        detector = StreamingLeakDetector(["Codename Bluebird rollout", "ok"])
+
+        self.assertIsNone(feed_all(detector, ["ok, ", "sounds good"]))
+        self.assertEqual(feed_all(detector, ["the codename ", "bluebird roll", "out "]), 2)
+
+    def test_work_per_delta_does_not_grow_with_the_response(self):
+        detector = StreamingLeakDetector([PRIVATE] * 10)
+        delta = "more words in the reply "
+        detector.feed(delta)
+
+        with patch.object(detector, '_match', wraps=detector._match) as match:
+            detector.feed(delta)
+            early = match.call_count
+            for _ in range(500):
+                detector.feed(delta)
+            match.reset_mock()
+            detector.feed(delta)
+
+        self.assertEqual(match.call_count, early)
+        self.assertIsNone(detector.leak)
+
+
+class StreamingGenerationTests(SimpleTestCase):
+    """Test the LLM service stops streaming at the first leak."""
+
+    def _stream(self, deltas, context=None):
+        async def stream():
+            for delta in deltas:
+                yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=delta))])
+
+        async def create(**kwargs):
+            return stream()
+
+        with patch('apps.core.rag.llm_service.AsyncOpenAI'):
+            service = LLMService()
+        service.openai_client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+        config = ChatbotConfig(name="Support", description="Support bot")
+
+        async def run():
+            return [
+                chunk async for chunk in
+                service.generate_streaming_response(
+                    context or private_context(PRIVATE), "Who handles escalations?", config
+                )
+            ]
+
+        return asyncio.run(run())
+
+    def test_stream_is_cut_before_private_content_is_sent(self):
+        self.assertEqual(
+            self._stream(["Ask ", "the finance ", "night desk ", "on extension ", "4410."]),
+            ["Ask ", "the finance ", "night desk ", "[Response filtered for privacy protection]"]
+        )
+
+    def test_token_deltas_stop_before_the_private_phrase_completes(self):
+        context = private_context("Staff note: the internal discount code is BLUEFOX until May.")
+        deltas = ["Sure", ",", " the", " internal", " discount", " code", " is", " BLUEFOX"]
+
+        sent = self._stream(deltas, context)
+
+        self.assertEqual(sent[-1], "[Response filtered for privacy protection]")
+        self.assertEqual("".join(sent[:-1]), "Sure, the internal discount code ")
+
+    def test_leak_ending_the_stream_is_filtered(self):
+        self.assertEqual(
+            self._stream(["Call ", "on extension 4410 after ", "six"]),
+            ["Call ", "on extension 4410 after ", "[Response filtered for privacy protection]"]
+        )
@@ -0,0 +1,100 @@
+"""
+Tests for trigger-maintained namespace vector counts and cheap storage stats.
+"""
+
+import asyncio
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from apps.core.vector_storage import PgVectorBackend, VectorStorageConfig, VectorStorageService
+
+
+class CountingBackend:
+    has_cheap_counts = True
+
+    def __init__(self, counts):
+        self.counts = counts
+        self.searches = 0
+
+    async def count_vectors(self, namespace):
+        return self.counts.get(namespace, 0)
+
+    async def search_vectors(self, query):
+        self.searches += 1
+        return []
+
+
+class NamespaceVectorCountTests(TestCase):
+    """Test counters stay exact through inserts, upserts and deletes."""
+
+    def setUp(self):
+        self.backend = PgVectorBackend(VectorStorageConfig(backend='pgvector', table_name='vector_counts_test'))
+
+    def _insert(self, vector_id, namespace):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "INSERT INTO vector_counts_test (id, embedding, metadata, namespace) VALUES (%s, '[]', '{}', %s) "
+                "ON CONFLICT (id) DO UPDATE SET embedding = excluded.embedding, namespace = excluded.namespace",
+                [vector_id, namespace]
+            )
+
+    def _counts(self):
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT namespace, vector_count FROM vector_counts_test_namespace_counts ORDER BY namespace")
+            return dict(cursor.fetchall())
+
+    def test_counts_follow_upserts_moves_and_deletes(self):
+        self.assertTrue(self.backend._initialize_sync())
+        for i in range(3):
+            self._insert(f"a-{i}", 'bot_a')
+        self._insert('b-0', 'bot_b')
+        self._insert('a-0', 'bot_a')  # Re-upsert doesn't double count
+        self.assertEqual(self._counts(), {'bot_a': 3, 'bot_b': 1})
+
+        self._insert('a-1', 'bot_b')
+        self.assertEqual(self._counts(), {'bot_a': 2, 'bot_b': 2})
+
+        self.backend._delete_by_filter_sync('bot_a')
+        self.assertEqual(self._counts(), {'bot_b': 2})
+
+        with self.assertNumQueries(1):
+            self.assertEqual(self.backend._count_vectors_sync('bot_b'), 2)
+        self.assertEqual(self.backend._count_vectors_sync('bot_a'), 0)
+
+    def test_existing_vectors_are_backfilled_once(self):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "CREATE TABLE vector_counts_test (id TEXT PRIMARY KEY, embedding TEXT, metadata TEXT, "
+                "namespace TEXT, created_at TIMESTAMP, updated_at TIMESTAMP)"
+            )
+        self._insert('old-0', 'bot_a')
+        self._insert('old-1', 'bot_a')
+
+        self.assertTrue(self.backend._initialize_sync())
+        self.assertTrue(self.backend._initialize_sync())
+
+        self.assertEqual(self._counts(), {'bot_a': 2})
+
+    def test_stats_read_only_the_counts_table(self):
+        self.assertTrue(self.backend._initialize_sync())
+        for i in range(4):
+            self._insert(f"a-{i}", 'bot_a' if i % 2 else 'bot_b')
+
+        with CaptureQueriesContext(connection) as queries:
+            stats = self.backend._get_stats_sync()
+
+        self.assertEqual((stats['total_vectors'], stats['namespaces']), (4, 2))
+        self.assertFalse(stats['approximate'])
+        self.assertTrue(all(self.backend.counts_table in query['sql'] for query in queries))
+
+    def test_search_skips_empty_namespaces(self):
+        service = VectorStorageService(VectorStorageConfig(backend='pgvector', enable_caching=False))
+        service.backend = CountingBackend({'bot_a': 5})
+        service.backend_name = 'fake'
+
+        self.assertEqual(asyncio.run(service.search_similar([0.1], namespace='bot_new')), [])
+        asyncio.run(service.search_similar([0.1], namespace='bot_a'))
+
+        self.assertEqual(service.backend.searches, 1)
+        self.assertEqual(service.search_stats['empty_namespace_skips'], 1)
@@ -0,0 +1,205 @@
+"""
+Tests for token streaming through the RAG orchestrator and the WebSocket consumer.
+"""
+
+import asyncio
+import time
+from types import SimpleNamespace
+from unittest.mock import patch
+from django.core.cache import cache
+from django.test import SimpleTestCase
+
+from apps.core.exceptions import RAGError
+from apps.core.rag_orchestrator import PrivacyMode, RAGOrchestrator, RAGQuery
+from apps.core.streaming_service import RAGStreamingConsumer
+
+TOKEN_DELAY = 0.05
+
+
+def content_chunk(text):
+    return SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=text))], usage=None)
+
+
+class FakeStream:
+    def __init__(self, deltas):
+        self.chunks = [content_chunk(delta) for delta in deltas] + [
+            SimpleNamespace(choices=[], usage=SimpleNamespace(prompt_tokens=120, completion_tokens=len(deltas)))
+        ]
+        self.closed = False
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for chunk in self.chunks:
+            await asyncio.sleep(TOKEN_DELAY)
+            yield chunk
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeOpenAI:
+    def __init__(self, deltas):
+        self.stream = FakeStream(deltas)
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    async def create(self, **kwargs):
+        assert kwargs['stream']
+        return self.stream
+
+
+class FakeEmbeddingService:
+    async def generate_embeddings_batch(self, texts):
+        return SimpleNamespace(embeddings=[SimpleNamespace(embedding=[0.1, 0.2])])
+
+
+class FakeVectorService:
+    def __init__(self, results):
+        self.results = results
+
+    async def search_similar(self, **kwargs):
+        return self.results
+
+
+def search_result(content, is_citable=True):
+    return SimpleNamespace(
+        id=f"chunk-{len(content)}", content=content, score=0.9,
+        metadata={'is_citable': is_citable, 'document_title': 'Refund policy'}
+    )
+
+
+class OrchestratorStreamingTests(SimpleTestCase):
+    """Test deltas are forwarded as the LLM produces them."""
+
+    def setUp(self):
+        cache.clear()
+        self.orchestrator = RAGOrchestrator()
+        self.orchestrator.embedding_service = FakeEmbeddingService()
+        self.orchestrator.vector_service = FakeVectorService([
+            search_result("Refunds are issued within five business days."),
+            search_result("Internal escalation contact is the finance night desk.", is_citable=False),
+        ])
+        metric = patch('apps.core.rag_orchestrator.track_metric')
+        self.track_metric = metric.start()
+        self.addCleanup(metric.stop)
+
+    def _collect(self, query):
+        async def run():
+            events = []
+            async for event in self.orchestrator.stream_query(query):
+                events.append((time.time(), event))
+            return events
+        return asyncio.run(run())
+
+    def test_first_delta_arrives_before_generation_finishes(self):
+        deltas = ["Refunds ", "take ", "five ", "business ", "days ", "[CITE-1]."]
+        self.orchestrator.llm_service.client = FakeOpenAI(deltas)
+        started = time.time()
+
+        events = self._collect(RAGQuery(text="How long do refunds take?", user_id="u1", chatbot_id="bot-1"))
+
+        kinds = [event["type"] for _, event in events]
+        self.assertEqual([e["text"] for _, e in events if e["type"] == "delta"], deltas)
+        self.assertLess(kinds.index("delta"), kinds.index("completed"))
+        self.assertEqual(
+            [e["stage"] for _, e in events if e["type"] == "stage"],
+            ["analysis", "embedding", "search", "context", "generation", "privacy"]
+        )
+
+        first_delta_at = next(at for at, e in events if e["type"] == "delta")
+        completed = events[-1][1]
+        self.assertLess(first_delta_at - started, 3 * TOKEN_DELAY)
+        self.assertLess(completed["time_to_first_token"], completed["elapsed"] - 3 * TOKEN_DELAY)
+        self.assertEqual(completed["response"].text, "".join(deltas))
+        self.assertEqual(completed["response"].token_usage, {'input': 120, 'output': len(deltas)})
+        self.assertEqual(completed["response"].citations[0]['cite_number'], 1)
+        self.assertTrue(self.orchestrator.llm_service.client.stream.closed)
+        self.track_metric.assert_any_call("rag.stream.time_to_first_token", completed["time_to_first_token"] * 1000)
+
+    def test_strict_stream_stops_before_sending_private_content(self):
+        deltas = ["Ask ", "the [PRIVATE] desk ", "for help."]
+        self.orchestrator.llm_service.client = FakeOpenAI(deltas)
+        query = RAGQuery(text="Who handles escalations?", user_id="u1", chatbot_id="bot-1")
+        sent = []
+
+        async def run():
+            async for event in self.orchestrator.stream_query(query):
+                if event["type"] == "delta":
+                    sent.append(event["text"])
+
+        with self.assertRaises(RAGError):
+            asyncio.run(run())
+
+        self.assertEqual(sent, ["Ask "])
+        self.assertTrue(self.orchestrator.llm_service.client.stream.closed)
+
+    def test_contextual_stream_redacts_private_content_and_keeps_going(self):
+        deltas = ["Ask ", "the finance ", "night desk ", "for help ", "with refunds."]
+        self.orchestrator.llm_service.client = FakeOpenAI(deltas)
+        query = RAGQuery(
+            text="Who handles escalations?", user_id="u1", chatbot_id="bot-1", privacy_mode=PrivacyMode.CONTEXTUAL
+        )
+
+        events = self._collect(query)
+
+        sent = [e["text"] for _, e in events if e["type"] == "delta"]
+        self.assertEqual(sent, ["Ask ", "the finance ", "[redacted]", "for help ", "with refunds."])
+        completed = events[-1][1]
+        self.assertEqual(completed["type"], "completed")
+        self.assertEqual(completed["response"].text, "".join(sent))
+        self.assertTrue(self.orchestrator.llm_service.client.stream.closed)
+
+    def test_token_deltas_are_redacted_before_the_private_phrase_is_sent(self):
+        deltas = [" Ask", " the", " finance", " night", " desk", " for", " help."]
+        self.orchestrator.llm_service.client = FakeOpenAI(deltas)
+        query = RAGQuery(
+            text="Who handles escalations?", user_id="u1", chatbot_id="bot-1", privacy_mode=PrivacyMode.CONTEXTUAL
+        )
+
+        events = self._collect(query)
+
+        sent = "".join(e["text"] for _, e in events if e["type"] == "delta")
+        self.assertEqual(sent, " Ask the finance [redacted]for help.")
+        self.assertNotIn("night", sent)
+        self.assertEqual(events[-1][1]["response"].text, sent)
+
+
+class FakeOrchestrator:
+    async def stream_query(self, query):
+        yield {"type": "stage", "stage": "search", "duration": 0.01, "elapsed": 0.02}
+        for text in ("Refunds ", "take 5 days."):
+            yield {"type": "delta", "text": text}
+            await asyncio.sleep(TOKEN_DELAY)
+        response = SimpleNamespace(
+            citations=[], generation_time=0.1, cost_estimate=0.0001, privacy_validated=True,
+            context_used=SimpleNamespace(source_count={'citable': 1, 'private': 0}, total_tokens=40)
+        )
+        yield {"type": "completed", "response": response, "time_to_first_token": 0.02, "elapsed": 0.12}
+
+
+class StreamingConsumerTests(SimpleTestCase):
+    """Test the consumer relays orchestrator events without buffering."""
+
+    def test_chunks_are_sent_as_they_arrive(self):
+        consumer = RAGStreamingConsumer()
+        consumer.rag_orchestrator = FakeOrchestrator()
+        messages = []
+
+        async def send_message(message):
+            messages.append(message)
+
+        consumer.send_message = send_message
+        started = time.time()
+        asyncio.run(consumer.stream_rag_response(RAGQuery(text="Refunds?", user_id="u1", chatbot_id="bot-1")))
+
+        self.assertEqual(
+            [m["type"] for m in messages],
+            ["processing_status", "response_start", "response_chunk", "response_chunk",
+             "response_end", "citations", "query_completed"]
+        )
+        self.assertEqual(messages[0]["message"], "Searched knowledge base")
+        self.assertEqual([m["chunk"] for m in messages if m["type"] == "response_chunk"], ["Refunds ", "take 5 days."])
+        self.assertEqual(messages[-1]["metadata"]["time_to_first_token"], 0.02)
+        # No artificial per-chunk delay
+        self.assertLess(time.time() - started, 4 * TOKEN_DELAY)
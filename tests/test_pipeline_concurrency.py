@@ -0,0 +1,134 @@
+"""
+Tests for concurrent stage execution and background persistence in RAGPipeline.
+"""
+
+import asyncio
+import threading
+from unittest.mock import Mock, patch
+from django.test import SimpleTestCase
+
+from apps.core.rag.llm_service import ChatbotConfig, GenerationResult
+from apps.core.rag.pipeline import ConversationManager, RAGPipeline, RAGStage
+
+STAGE_DELAY = 0.2
+
+
+class StageTracker:
+    def __init__(self):
+        self.in_flight = 0
+        self.peak = 0
+
+    async def run(self, result):
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        await asyncio.sleep(STAGE_DELAY)
+        self.in_flight -= 1
+        return result
+
+
+class FakeVectorSearch:
+    async def search(self, **kwargs):
+        return []
+
+
+class FakeLLMService:
+    async def generate_response(self, context, user_query, chatbot_config):
+        return GenerationResult(
+            content="Refunds take 5 days.", usage={}, model="gpt-3.5-turbo", finish_reason="stop",
+            input_tokens=10, output_tokens=5, estimated_cost=0.0001,
+            privacy_compliant=True, citations_extracted=[], generation_time=0.0
+        )
+
+
+class RAGPipelineConcurrencyTests(SimpleTestCase):
+    """Test the stage graph with fake services."""
+
+    def setUp(self):
+        privacy_filter = Mock()
+        privacy_filter.validate_response.return_value = Mock(passed=True, violations=[])
+        patches = [
+            patch('apps.core.rag.pipeline.get_vector_search_service', return_value=FakeVectorSearch()),
+            patch('apps.core.rag.pipeline.get_llm_service', return_value=FakeLLMService()),
+            patch('apps.core.rag.pipeline.get_privacy_filter', return_value=privacy_filter),
+            patch('apps.core.rag.pipeline.OpenAIEmbeddingService'),
+            patch('apps.core.rag.pipeline.track_metric'),
+        ]
+        for patcher in patches:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        self.tracker = StageTracker()
+        self.pipeline = RAGPipeline('chatbot-1')
+        self.pipeline._generate_embedding = lambda query: self.tracker.run([0.1, 0.2])
+        self.pipeline._get_default_chatbot_config = lambda: self.tracker.run(
+            ChatbotConfig(name="Support", description="Support bot", company_name="Acme")
+        )
+
+        self.saved = threading.Event()
+        self.release_save = threading.Event()
+
+        def save(conversation_id, user_query, response, context):
+            self.release_save.wait(5)
+            self.saved.set()
+
+        self.pipeline._save_conversation_messages = save
+
+    def test_independent_stages_overlap_and_persistence_is_deferred(self):
+        async def create_conversation(chatbot_id, session_id, user_id):
+            return await self.tracker.run('conversation-1')
+
+        with patch.object(ConversationManager, 'create_conversation', create_conversation):
+            response = asyncio.run(self.pipeline.process_query(
+                "How long do refunds take?", user_id="user-1", session_id="session-1"
+            ))
+
+        self.assertEqual(response.content, "Refunds take 5 days.")
+        self.assertEqual(self.tracker.peak, 3)
+        self.assertLess(response.total_time, 2 * STAGE_DELAY)
+        for stage in (RAGStage.CONVERSATION_SETUP, RAGStage.CONFIG_LOADING, RAGStage.EMBEDDING_GENERATION):
+            self.assertGreaterEqual(response.stage_times[stage.value], STAGE_DELAY * 0.9)
+
+        # The response came back while the conversation write was still blocked
+        self.assertFalse(self.saved.is_set())
+        self.release_save.set()
+        self.pipeline.wait_for_pending_writes(timeout=5)
+        self.assertTrue(self.saved.is_set())
+
+    def test_failing_stage_fails_fast(self):
+        async def create_conversation(chatbot_id, session_id, user_id):
+            raise RuntimeError("database unavailable")
+
+        with patch.object(ConversationManager, 'create_conversation', create_conversation):
+            response = asyncio.run(self.pipeline.process_query(
+                "How long do refunds take?", user_id="user-1", session_id="session-1"
+            ))
+
+        self.assertIn("having trouble", response.content)
+        self.assertLess(response.total_time, STAGE_DELAY)
+        self.assertFalse(self.pipeline._pending_writes)
+
+    def test_writes_to_one_conversation_keep_their_order(self):
+        order = []
+        first_started = threading.Event()
+
+        def save(conversation_id, user_query, response, context):
+            if user_query == "first":
+                first_started.set()
+                self.release_save.wait(5)
+            order.append((conversation_id, user_query))
+
+        self.pipeline._save_conversation_messages = save
+        first = self.pipeline._schedule_conversation_save('conversation-1', "first", "a", Mock())
+        first_started.wait(5)
+        second = self.pipeline._schedule_conversation_save('conversation-1', "second", "b", Mock())
+        other = self.pipeline._schedule_conversation_save('conversation-2', "other", "c", Mock())
+
+        # Another conversation isn't held up by the slow write
+        other.result(timeout=5)
+        self.assertFalse(second.done())
+        self.release_save.set()
+        self.pipeline.wait_for_pending_writes(timeout=5)
+
+        self.assertEqual(order, [
+            ('conversation-2', "other"), ('conversation-1', "first"), ('conversation-1', "second")
+        ])
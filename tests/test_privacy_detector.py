@@ -0,0 +1,95 @@
+"""
+Tests for fingerprint-based private content detection.
+"""
+
+from io import StringIO
+from unittest.mock import patch
+from django.core.management import call_command
+from django.test import SimpleTestCase
+
+from apps.core.rag.context_builder import ContextData, ContextSource
+from apps.core.rag.privacy_filter import PrivateContentDetector, TextFingerprint
+
+PRIVATE = (
+    "Escalations go to the finance night desk on extension 4410. "
+    "Account ACME2291 owes $1,250.00; contact ops@acme.example or 555-867-5309."
+)
+
+
+def private_context(*contents):
+    sources = [
+        ContextSource(
+            content=content, source_id=f"chunk-{i}", document_id="doc-1", knowledge_base_id="kb-1",
+            score=0.9, is_citable=False
+        )
+        for i, content in enumerate(contents)
+    ]
+    return ContextData(
+        full_context="", citable_sources=[], private_sources=sources, token_count=0, total_sources=len(sources),
+        citable_count=0, private_count=len(sources), context_score=0.5, search_metadata={}
+    )
+
+
+class PrivateContentDetectorTests(SimpleTestCase):
+    """Test leaks are found by intersecting cached fingerprints."""
+
+    def setUp(self):
+        self.detector = PrivateContentDetector()
+        self.context = private_context(PRIVATE, "Internal roadmap discussion for the next quarter planning.")
+
+    def test_quotes_identifiers_and_pii_are_detected(self):
+        response = (
+            "Please reach the Finance Night Desk on extension 4410, mention account ACME2291 "
+            "or call 212-555-0100."
+        )
+
+        descriptions = [v.description for v in self.detector.detect_leak(response, self.context)]
+
+        self.assertEqual(descriptions, [
+            "Direct quote from private source detected: 'the finance night desk on...'",
+            "Direct quote from private source detected: 'finance night desk on extension...'",
+            "Direct quote from private source detected: 'night desk on extension 4410...'",
+            "Unique identifier from private source: ACME2291",
+            "Potential phone leaked from private source",
+        ])
+
+    def test_unrelated_responses_pass(self):
+        response = "Our finance team handles refunds within five business days."
+
+        self.assertEqual(self.detector.detect_leak(response, self.context), [])
+
+    def test_sources_are_fingerprinted_once_per_chunk(self):
+        with patch.object(TextFingerprint, 'from_text', wraps=TextFingerprint.from_text) as from_text:
+            for _ in range(3):
+                self.detector.detect_leak("Nothing private here at all today.", self.context)
+
+        # Two sources once, then only the response on each call
+        self.assertEqual(from_text.call_count, 2 + 3)
+
+    def test_changed_chunk_content_is_fingerprinted_again(self):
+        self.detector.detect_leak("Unrelated answer text.", self.context)
+        updated = private_context("The finance night desk moved to the east wing building.")
+
+        violations = self.detector.detect_leak("Visit the finance night desk moved upstairs.", updated)
+
+        self.assertEqual(len(violations), 1)
+
+    def test_fingerprint_cache_is_bounded(self):
+        detector = PrivateContentDetector(cache_size=2)
+        context = private_context(*(f"Private note number {i} for the account team." for i in range(5)))
+
+        detector.detect_leak("Unrelated answer text.", context)
+
+        self.assertEqual(len(detector._fingerprints), 2)
+
+
+class PrivacyBenchmarkCommandTests(SimpleTestCase):
+    """Test the benchmark command runs on a small corpus."""
+
+    def test_benchmark_reports_every_variant(self):
+        out = StringIO()
+        call_command('benchmark_privacy_filter', sources=2, source_words=50, response_tokens=100, iterations=2, stdout=out)
+
+        output = out.getvalue()
+        for variant in ("naive quote scan", "fingerprint (cold)", "fingerprint (cached)"):
+            self.assertIn(variant, output)
@@ -0,0 +1,161 @@
+"""
+Tests for the process-wide batched cross-encoder reranker.
+"""
+
+import asyncio
+import sys
+import threading
+import time
+from types import SimpleNamespace
+from unittest.mock import patch
+from django.test import SimpleTestCase
+
+from apps.core.document_processing import PrivacyLevel
+from apps.core.reranking import CrossEncoderReranker, cross_encoder_reranker
+from apps.core.vector_search import SearchResultWithCitation, SemanticReranker, VectorSearchEngine
+
+
+class FakeCrossEncoder:
+    """Scores a pair by how many query words the content contains."""
+
+    def __init__(self, model_name, delay=0.0, loaded=None):
+        self.model_name = model_name
+        self.delay = delay
+        self.calls = []
+        if loaded is not None:
+            loaded.wait()
+
+    def predict(self, pairs, batch_size=32, show_progress_bar=False):
+        time.sleep(self.delay)
+        self.calls.append(list(pairs))
+        return [float(sum(word in content.split() for word in query.split())) for query, content in pairs]
+
+
+def fake_library(**options):
+    return {'sentence_transformers': SimpleNamespace(CrossEncoder=lambda name: FakeCrossEncoder(name, **options))}
+
+
+def result(chunk_id, content, score):
+    return SearchResultWithCitation(
+        content=content, score=score, chunk_id=chunk_id, document_id="doc-1", knowledge_base_id="kb-1",
+        privacy_level=PrivacyLevel.CITABLE, can_cite=True, citation_text=None, source_title=None,
+        source_author=None, source_url=None, page_number=None, chunk_index=0, start_char=0, end_char=0,
+        metadata={}
+    )
+
+
+class CrossEncoderRerankerTests(SimpleTestCase):
+    """Test lazy loading, batching, caching and the latency budget."""
+
+    def _reranker(self, library=None, **kwargs):
+        kwargs.setdefault('timeout_ms', 2000)
+        reranker = CrossEncoderReranker(model_name='fake-model', **kwargs)
+        with patch.dict(sys.modules, library or fake_library()):
+            reranker.warm_up(wait=True)
+        return reranker
+
+    def test_concurrent_requests_share_one_model_call(self):
+        reranker = self._reranker(max_wait_ms=100)
+        candidates = [("c1", "refund policy"), ("c2", "shipping times")]
+
+        async def run():
+            return await asyncio.gather(
+                reranker.ascore("refund policy", candidates),
+                reranker.ascore("shipping times", candidates),
+                reranker.ascore("refund shipping", candidates),
+            )
+
+        scores = asyncio.run(run())
+
+        self.assertEqual(scores, [[2.0, 0.0], [0.0, 2.0], [1.0, 1.0]])
+        self.assertEqual(len(reranker.model.calls), 1)
+        self.assertEqual(len(reranker.model.calls[0]), 6)
+
+    def test_scores_are_cached_per_query_and_chunk(self):
+        reranker = self._reranker(max_wait_ms=0)
+
+        reranker.score("refund policy", [("c1", "refund policy"), ("c2", "shipping")])
+        scores = reranker.score("refund policy", [("c2", "shipping"), ("c3", "refund")])
+
+        self.assertEqual(scores, [0.0, 1.0])
+        self.assertEqual([len(call) for call in reranker.model.calls], [2, 1])
+        self.assertEqual(reranker.stats["hits"], 1)
+
+    def test_stats_are_exact_under_concurrent_requests(self):
+        reranker = self._reranker(max_wait_ms=0)
+        candidates = [("c1", "refund"), ("c2", "shipping")]
+        reranker.score("refund", candidates)
+
+        def lookups():
+            for _ in range(500):
+                reranker.score("refund", candidates)
+
+        threads = [threading.Thread(target=lookups) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(reranker.stats["hits"], 8 * 500 * 2)
+        self.assertEqual(reranker.stats["misses"], 2)
+
+    def test_cache_is_bounded(self):
+        reranker = self._reranker(max_wait_ms=0, cache_size=2)
+
+        reranker.score("refund", [(f"c{i}", "refund") for i in range(5)])
+
+        self.assertEqual(len(reranker._scores), 2)
+
+    def test_slow_scoring_falls_back(self):
+        reranker = self._reranker(library=fake_library(delay=0.3), max_wait_ms=0, timeout_ms=20)
+
+        self.assertIsNone(reranker.score("refund", [("c1", "refund")]))
+        self.assertEqual(reranker.stats["fallbacks"], 1)
+
+    def test_requests_do_not_wait_for_the_model_to_load(self):
+        loaded = threading.Event()
+        reranker = CrossEncoderReranker(model_name='fake-model', timeout_ms=2000)
+        with patch.dict(sys.modules, fake_library(loaded=loaded)):
+            start = time.perf_counter()
+            self.assertIsNone(reranker.score("refund", [("c1", "refund")]))
+            self.assertLess(time.perf_counter() - start, 0.5)
+            loaded.set()
+            self.assertTrue(reranker.warm_up(wait=True))
+
+        self.assertEqual(reranker.score("refund", [("c1", "refund")]), [1.0])
+
+    def test_missing_library_disables_reranking(self):
+        reranker = self._reranker(library={'sentence_transformers': None})
+
+        self.assertFalse(reranker.available)
+        self.assertIsNone(reranker.score("refund", [("c1", "refund")]))
+
+
+class SemanticRerankerTests(SimpleTestCase):
+    """Test search results are reordered through the shared reranker."""
+
+    def test_engines_share_the_process_reranker(self):
+        engines = [VectorSearchEngine(vector_store=None) for _ in range(2)]
+
+        self.assertIs(engines[0].reranker.reranker, cross_encoder_reranker)
+        self.assertIs(engines[1].reranker.reranker, cross_encoder_reranker)
+
+    def test_results_are_reordered_by_cross_encoder_scores(self):
+        reranker = CrossEncoderReranker(model_name='fake-model', max_wait_ms=0, timeout_ms=2000)
+        with patch.dict(sys.modules, fake_library()):
+            reranker.warm_up(wait=True)
+        results = [result("a", "shipping times", 0.9), result("b", "refund policy", 0.8)]
+
+        reranked = asyncio.run(SemanticReranker(reranker).rerank_results("refund policy", results, top_k=2))
+
+        self.assertEqual([r.chunk_id for r in reranked], ["b", "a"])
+
+    def test_vector_order_is_kept_when_scoring_is_unavailable(self):
+        reranker = CrossEncoderReranker(model_name='fake-model')
+        with patch.dict(sys.modules, {'sentence_transformers': None}):
+            reranker.warm_up(wait=True)
+        results = [result("a", "shipping times", 0.9), result("b", "refund policy", 0.8)]
+
+        reranked = asyncio.run(SemanticReranker(reranker).rerank_results("refund policy", results, top_k=1))
+
+        self.assertEqual([(r.chunk_id, r.score) for r in reranked], [("a", 0.9)])
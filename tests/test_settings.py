@@ -135,7 +135,7 @@ CELERY_RESULT_BACKEND = 'cache+memory://'
 # Add missing Celery settings required by celery.py
 CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
-CELERY_ACCEPT_CONTENT = 'json'
+CELERY_ACCEPT_CONTENT = ['json']
 CELERY_TIMEZONE = 'UTC'
 CELERY_ENABLE_UTC = True
 CELERY_WORKER_CONCURRENCY = 1
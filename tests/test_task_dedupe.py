@@ -0,0 +1,121 @@
+"""
+Tests for idempotent task submission.
+"""
+
+import sys
+from unittest.mock import Mock, PropertyMock, patch
+from celery.result import AsyncResult
+from django.core.cache import cache
+from django.apps import apps as django_apps
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+
+from apps.core.tasks import DEDUPE_KEY_HEADER, task_idempotency_key, task_manager
+
+# Resolved through the app registry: another test module replaces some model
+# modules in sys.modules at collection time
+Chatbot = django_apps.get_model('chatbots', 'Chatbot')
+KnowledgeSource = django_apps.get_model('knowledge', 'KnowledgeSource')
+User = get_user_model()
+
+
+class IdempotentSubmissionTests(TestCase):
+    """Test that duplicate submissions collapse onto the in-flight task."""
+
+    def setUp(self):
+        patcher = patch.dict(sys.modules, {
+            'apps.chatbots.models': django_apps.get_app_config('chatbots').models_module,
+            'apps.core.models': django_apps.get_app_config('core').models_module,
+        })
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        cache.clear()
+        self.user = User.objects.create_user(email='dedupe@example.com', password='testpass123')
+        self.chatbot = Chatbot.objects.create(user=self.user, name='Support', public_url_slug='dedupe-bot')
+        self.source = KnowledgeSource.objects.create(
+            chatbot=self.chatbot,
+            name='Manual',
+            content_type='pdf',
+            file_hash='a' * 64
+        )
+
+    def _state(self, value):
+        return patch('celery.result.AsyncResult.state', new_callable=PropertyMock, return_value=value)
+
+    @patch('apps.core.tasks.submit_bulk_task')
+    def test_duplicate_returns_in_flight_task(self, mock_submit):
+        first_id, first_submitted = task_manager.submit_knowledge_source_processing(self.source)
+        with self._state('STARTED'):
+            second_id, second_submitted = task_manager.submit_knowledge_source_processing(self.source)
+
+        self.assertTrue(first_submitted)
+        self.assertFalse(second_submitted)
+        self.assertEqual(second_id, first_id)
+        mock_submit.assert_called_once()
+        self.assertEqual(mock_submit.call_args.args[1], self.user.id)
+        self.assertEqual(mock_submit.call_args.kwargs['task_id'], first_id)
+        self.assertIn(DEDUPE_KEY_HEADER, mock_submit.call_args.kwargs['headers'])
+
+    @patch('apps.core.tasks.submit_bulk_task')
+    def test_changed_content_is_new_work(self, mock_submit):
+        first_id, _ = task_manager.submit_knowledge_source_processing(self.source)
+        self.source.file_hash = 'b' * 64
+
+        with self._state('STARTED'):
+            second_id, submitted = task_manager.submit_knowledge_source_processing(self.source)
+
+        self.assertTrue(submitted)
+        self.assertNotEqual(second_id, first_id)
+
+    @patch('apps.core.tasks.submit_bulk_task')
+    def test_lock_of_finished_task_is_reclaimed(self, mock_submit):
+        first_id, _ = task_manager.submit_knowledge_source_processing(self.source)
+
+        with self._state('SUCCESS'):
+            second_id, submitted = task_manager.submit_knowledge_source_processing(self.source)
+
+        self.assertTrue(submitted)
+        self.assertNotEqual(second_id, first_id)
+        self.assertEqual(mock_submit.call_count, 2)
+
+    @patch('apps.core.tasks.submit_bulk_task', side_effect=ConnectionError("broker down"))
+    def test_failed_submission_releases_lock(self, mock_submit):
+        with self.assertRaises(ConnectionError):
+            task_manager.submit_knowledge_source_processing(self.source)
+
+        key = task_idempotency_key('process_source', self.source.id, self.source.file_hash, False)
+        self.assertIsNone(cache.get(key))
+
+    @patch('apps.core.tasks.submit_bulk_task')
+    def test_duplicate_during_training_handoff_returns_running_training(self, mock_submit):
+        first_id, _ = task_manager.submit_chatbot_training(self.chatbot)
+        finalize_id = mock_submit.call_args.kwargs['kwargs']['finalize_task_id']
+
+        # The dispatcher has returned, but no source has finished yet
+        states = {first_id: 'SUCCESS', finalize_id: 'PENDING'}
+        with patch.object(AsyncResult, 'state', property(lambda result: states[result.id])):
+            second_id, submitted = task_manager.submit_chatbot_training(self.chatbot)
+
+            self.assertFalse(submitted)
+            self.assertEqual(second_id, first_id)
+
+            # A callback that died without releasing the lock frees it
+            states[finalize_id] = 'FAILURE'
+            third_id, submitted = task_manager.submit_chatbot_training(self.chatbot)
+
+        self.assertTrue(submitted)
+        self.assertNotEqual(third_id, first_id)
+
+    @patch('apps.core.tasks.BaseTaskWithProgress.retry_with_backoff', Mock(return_value=None))
+    @patch('apps.core.tasks._process_knowledge_source')
+    def test_training_lock_released_when_training_finishes(self, mock_process):
+        mock_process.return_value = Mock(success=True, chunk_count=1, total_tokens=10)
+
+        first_id, _ = task_manager.submit_chatbot_training(self.chatbot)
+        self.assertFalse([key for key in cache._cache if 'task_dedupe' in key])
+        second_id, submitted = task_manager.submit_chatbot_training(self.chatbot)
+
+        self.assertTrue(submitted)
+        self.assertNotEqual(second_id, first_id)
+        self.assertEqual(mock_process.call_count, 2)
+        self.assertFalse([key for key in cache._cache if 'task_dedupe' in key])
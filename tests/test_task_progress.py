@@ -0,0 +1,147 @@
+"""
+Tests for coalesced task progress with channel layer push.
+"""
+
+import asyncio
+import json
+import uuid
+from unittest.mock import AsyncMock, Mock, patch
+from channels.layers import get_channel_layer
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from apps.conversations.consumers import PrivateChatConsumer
+from apps.core.task_progress import (
+    ProgressPublisher, get_task_owner, get_task_progress, progress_group_name, record_task_owner
+)
+from apps.core.tasks import TaskManager
+
+IN_MEMORY_LAYER = {'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'}}
+
+
+@override_settings(CHANNEL_LAYERS=IN_MEMORY_LAYER)
+class ProgressPublisherTests(TestCase):
+    """Test write coalescing, forced flushes and push delivery."""
+
+    def setUp(self):
+        cache.clear()
+        self.publisher = ProgressPublisher(min_interval_seconds=60)
+        self.task_id = str(uuid.uuid4())
+
+    def _subscribe(self):
+        layer = get_channel_layer()
+        channel = asyncio.run(layer.new_channel())
+        asyncio.run(layer.group_add(progress_group_name(self.task_id), channel))
+        return layer, channel
+
+    def _received(self, layer, channel):
+        async def drain():
+            events = []
+            while True:
+                try:
+                    events.append(await asyncio.wait_for(layer.receive(channel), 0.05))
+                except asyncio.TimeoutError:
+                    return events
+        return asyncio.run(drain())
+
+    def test_updates_within_interval_are_coalesced(self):
+        layer, channel = self._subscribe()
+        on_flush = Mock()
+
+        for current in range(1, 11):
+            self.publisher.publish(self.task_id, {'current': current}, on_flush=on_flush)
+
+        self.assertEqual(get_task_progress(self.task_id), {'current': 1})
+        self.assertEqual(on_flush.call_count, 1)
+        self.assertEqual(self.publisher.stats, {'updates': 10, 'writes': 1})
+
+        self.assertEqual(self.publisher.flush(), 1)
+        self.assertEqual(get_task_progress(self.task_id), {'current': 10})
+        self.assertEqual(on_flush.call_count, 2)
+
+        events = self._received(layer, channel)
+        self.assertEqual([event['progress']['current'] for event in events], [1, 10])
+        self.assertEqual(events[0]['type'], 'task_progress_update')
+
+    def test_final_state_is_written_immediately(self):
+        layer, channel = self._subscribe()
+        self.publisher.publish(self.task_id, {'current': 1})
+        self.publisher.publish(self.task_id, {'current': 2})
+
+        self.publisher.publish(self.task_id, {'status': 'success'}, final=True)
+
+        self.assertEqual(get_task_progress(self.task_id), {'status': 'success'})
+        self.assertEqual(self.publisher.flush(), 0)
+        events = self._received(layer, channel)
+        self.assertTrue(events[-1]['final'])
+
+    def test_interval_elapsed_writes_again(self):
+        self.publisher.publish(self.task_id, {'current': 1})
+        with patch('apps.core.task_progress.time.monotonic', return_value=10 ** 9):
+            written = self.publisher.publish(self.task_id, {'current': 2})
+
+        self.assertTrue(written)
+        self.assertEqual(get_task_progress(self.task_id), {'current': 2})
+
+
+@override_settings(CHANNEL_LAYERS=IN_MEMORY_LAYER)
+class TaskProgressSubscriptionTests(TestCase):
+    """Test dashboard WebSocket subscription to task progress."""
+
+    def _consumer(self, user_id='user-1'):
+        consumer = PrivateChatConsumer()
+        consumer.channel_layer = Mock(group_add=AsyncMock())
+        consumer.channel_name = 'dashboard-channel'
+        consumer.send = AsyncMock()
+        consumer.user_identifier = user_id
+        return consumer
+
+    def test_subscribe_joins_group_and_sends_current_state(self):
+        task_id = str(uuid.uuid4())
+        record_task_owner(task_id, 'user-1')
+        cache.set(f"task_progress:{task_id}", {'percentage': 40})
+        consumer = self._consumer()
+
+        asyncio.run(consumer.handle_task_progress_subscription({'task_id': task_id}))
+
+        consumer.channel_layer.group_add.assert_awaited_once_with(progress_group_name(task_id), 'dashboard-channel')
+        sent = json.loads(consumer.send.await_args.kwargs['text_data'])
+        self.assertEqual(sent['type'], 'task_progress')
+        self.assertEqual(sent['progress'], {'percentage': 40})
+
+    def test_invalid_task_id_is_rejected(self):
+        consumer = self._consumer()
+
+        asyncio.run(consumer.handle_task_progress_subscription({'task_id': 'task_progress_*'}))
+
+        consumer.channel_layer.group_add.assert_not_awaited()
+        self.assertEqual(json.loads(consumer.send.await_args.kwargs['text_data'])['type'], 'error')
+
+    def test_other_users_tasks_are_rejected(self):
+        task_id = str(uuid.uuid4())
+        record_task_owner(task_id, 'user-1')
+        cache.set(f"task_progress:{task_id}", {'percentage': 40})
+        consumer = self._consumer(user_id='user-2')
+
+        asyncio.run(consumer.handle_task_progress_subscription({'task_id': task_id}))
+
+        consumer.channel_layer.group_add.assert_not_awaited()
+        sent = json.loads(consumer.send.await_args.kwargs['text_data'])
+        self.assertEqual(sent, {'type': 'error', 'message': 'Task not found'})
+
+    def test_tasks_without_an_owner_are_rejected(self):
+        consumer = self._consumer()
+
+        asyncio.run(consumer.handle_task_progress_subscription({'task_id': str(uuid.uuid4())}))
+
+        consumer.channel_layer.group_add.assert_not_awaited()
+
+    @patch('apps.core.tasks.train_chatbot_task.apply_async')
+    def test_training_submission_records_the_chatbot_owner(self, mock_apply):
+        chatbot = Mock(id=uuid.uuid4(), user_id=uuid.uuid4())
+        chatbot.knowledge_sources.all.return_value.values_list.return_value = []
+
+        task_id, submitted = TaskManager.submit_chatbot_training(chatbot)
+
+        self.assertTrue(submitted)
+        self.assertEqual(get_task_owner(task_id), str(chatbot.user_id))
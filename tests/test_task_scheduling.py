@@ -0,0 +1,137 @@
+"""
+Tests for per-tenant fair scheduling of bulk tasks.
+"""
+
+from unittest.mock import Mock, patch
+from django.core.cache import cache
+from django.test import TestCase
+
+from apps.core.task_scheduling import ENQUEUED_AT_HEADER, TENANT_HEADER, FairTaskScheduler
+
+
+def make_task(name='apps.core.tasks.process_url'):
+    task = Mock()
+    task.name = name
+    task.app.conf.task_always_eager = False
+    return task
+
+
+def request_for(sent_call):
+    """Worker-side request for a dispatched apply_async call."""
+    headers = sent_call.kwargs['headers']
+    return Mock(id=sent_call.kwargs['task_id'], headers=headers, **{
+        TENANT_HEADER: headers[TENANT_HEADER],
+        ENQUEUED_AT_HEADER: headers[ENQUEUED_AT_HEADER],
+    })
+
+
+class FairTaskSchedulerTests(TestCase):
+    """Test per-tenant caps, round-robin dispatch and queue stats."""
+
+    def setUp(self):
+        cache.clear()
+        self.scheduler = FairTaskScheduler(per_tenant_limit=2, in_flight_ttl_seconds=60, key_prefix='test_fair')
+        self.celery_task = Mock()
+        patcher = patch('chatbot_saas.celery.app.tasks', {'apps.core.tasks.process_url': self.celery_task})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.task = make_task()
+
+    def _sent_tenants(self, calls):
+        return [call.kwargs['headers'][TENANT_HEADER] for call in calls]
+
+    def test_tenant_is_capped_and_backlog_queued(self):
+        task_ids = [self.scheduler.submit(self.task, 'tenant-a', args=[i]) for i in range(5)]
+
+        self.assertEqual(self.celery_task.apply_async.call_count, 2)
+        self.assertEqual(len(set(task_ids)), 5)
+        stats = self.scheduler.tenant_queue_stats()['tenant-a']
+        self.assertEqual(stats['pending'], 3)
+        self.assertEqual(stats['in_flight'], 2)
+
+    def test_freed_slots_rotate_between_tenants(self):
+        for i in range(4):
+            self.scheduler.submit(self.task, 'tenant-a', args=[i])
+        for i in range(2):
+            self.scheduler.submit(self.task, 'tenant-b', args=[i])
+
+        first_wave = list(self.celery_task.apply_async.call_args_list)
+        self.assertEqual(self._sent_tenants(first_wave), ['tenant-a', 'tenant-a', 'tenant-b', 'tenant-b'])
+
+        # tenant-a's next task only starts when one of its own slots frees up
+        self.scheduler.task_finished(request_for(first_wave[2]))
+        self.assertEqual(self.celery_task.apply_async.call_count, 4)
+
+        self.scheduler.task_finished(request_for(first_wave[0]))
+        last = self.celery_task.apply_async.call_args
+        self.assertEqual(last.kwargs['headers'][TENANT_HEADER], 'tenant-a')
+        self.assertEqual(last.kwargs['args'], [2])
+
+    def test_submitted_task_id_is_used_on_dispatch(self):
+        for i in range(3):
+            self.scheduler.submit(self.task, 'tenant-a', args=[i])
+        waiting_id = self.scheduler.submit(self.task, 'tenant-a', args=[3], priority=1)
+
+        self.scheduler.task_finished(request_for(self.celery_task.apply_async.call_args_list[0]))
+        self.scheduler.task_finished(request_for(self.celery_task.apply_async.call_args_list[1]))
+
+        last = self.celery_task.apply_async.call_args
+        self.assertEqual(last.kwargs['task_id'], waiting_id)
+        self.assertEqual(last.kwargs['priority'], 1)
+
+    def test_expired_slots_are_reclaimed(self):
+        for i in range(3):
+            self.scheduler.submit(self.task, 'tenant-a', args=[i])
+
+        # Both running slots are now older than the TTL
+        self.scheduler.in_flight_ttl_seconds = -1
+        dispatched = self.scheduler.dispatch_pending()
+
+        self.assertEqual(dispatched, 1)
+        self.assertEqual(self.scheduler.tenant_queue_stats()['tenant-a']['pending'], 0)
+
+    def test_start_wait_and_idle_tenants_dropped_from_stats(self):
+        self.scheduler.submit(self.task, 'tenant-a', args=[0])
+        request = request_for(self.celery_task.apply_async.call_args)
+
+        self.scheduler.task_started(request)
+        stats = self.scheduler.tenant_queue_stats()['tenant-a']
+        self.assertEqual(stats['dispatched'], 1)
+        self.assertGreaterEqual(stats['avg_start_wait_ms'], 0.0)
+
+        self.scheduler.task_finished(request)
+        self.assertEqual(self.scheduler.tenant_queue_stats(), {})
+
+    def test_broker_is_called_outside_the_lock(self):
+        held = []
+        self.celery_task.apply_async.side_effect = lambda **kwargs: held.append(cache.get('test_fair:lock'))
+
+        self.scheduler.submit(self.task, 'tenant-a', args=[0])
+
+        self.assertEqual(held, [None])
+
+    def test_lock_is_not_released_for_a_later_holder(self):
+        with self.scheduler._lock():
+            # Expired mid-way and taken by another process
+            cache.set('test_fair:lock', 'other-holder', timeout=30)
+
+        self.assertEqual(cache.get('test_fair:lock'), 'other-holder')
+
+    def test_failed_send_frees_the_slot_and_requeues(self):
+        self.celery_task.apply_async.side_effect = [ConnectionError("broker down"), None]
+
+        task_id = self.scheduler.submit(self.task, 'tenant-a', args=[0])
+        stats = self.scheduler.tenant_queue_stats()['tenant-a']
+        self.assertEqual((stats['pending'], stats['in_flight'], stats['dispatched']), (1, 0, 0))
+
+        self.assertEqual(self.scheduler.dispatch_pending(), 1)
+        self.assertEqual(self.celery_task.apply_async.call_args.kwargs['task_id'], task_id)
+        self.assertEqual(self.scheduler.tenant_queue_stats()['tenant-a']['in_flight'], 1)
+
+    def test_eager_mode_sends_immediately(self):
+        self.task.app.conf.task_always_eager = True
+        for i in range(3):
+            self.scheduler.submit(self.task, 'tenant-a', args=[i])
+
+        self.assertEqual(self.celery_task.apply_async.call_count, 3)
+        self.assertEqual(self.scheduler.tenant_queue_stats(), {})